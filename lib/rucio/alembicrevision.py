@@ -12,4 +12,4 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-ALEMBIC_REVISION = '30d5206e9cad'  # the current alembic head revision
+ALEMBIC_REVISION = '4c1a7d2e9b53'  # the current alembic head revision
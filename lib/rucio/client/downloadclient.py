@@ -24,17 +24,18 @@ import signal
 import subprocess
 import time
 from queue import Empty, Queue, deque
-from threading import Thread
+from threading import Condition, Lock, Thread
 from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlparse
 
 from rucio import version
 from rucio.client.client import Client
-from rucio.common.checksum import CHECKSUM_ALGO_DICT, GLOBALLY_SUPPORTED_CHECKSUMS, PREFERRED_CHECKSUM, adler32
+from rucio.common.checksum import CHECKSUM_ALGO_DICT, GLOBALLY_SUPPORTED_CHECKSUMS, PREFERRED_CHECKSUM, STREAMING_CHECKSUM_ALGO_DICT, ChecksumCalculator, adler32
 from rucio.common.client import detect_client_location
 from rucio.common.config import config_get
 from rucio.common.constants import DEFAULT_VO
 from rucio.common.didtype import DID
-from rucio.common.exception import InputValidationError, NoFilesDownloaded, NotAllFilesDownloaded, RucioException
+from rucio.common.exception import InputValidationError, NoFilesDownloaded, NotAllFilesDownloaded, RucioException, SourceNotFound
 from rucio.common.pcache import Pcache
 from rucio.common.utils import execute, extract_scope, generate_uuid, parse_replicas_from_file, parse_replicas_from_string, send_trace, sizefmt
 from rucio.rse import rsemanager as rsemgr
@@ -44,7 +45,8 @@ if TYPE_CHECKING:
     from xmlrpc.client import ServerProxy as RPCServerProxy
 
     from rucio.common.constants import SORTING_ALGORITHMS_LITERAL
-    from rucio.common.types import LoggerFunction
+    from rucio.common.types import LoggerFunction, RSESettingsDict
+    from rucio.rse.protocols.protocol import RSEProtocol
 
 
 @enum.unique
@@ -155,6 +157,181 @@ class BaseExtractionTool:
         return False
 
 
+class HostStreamLimiter:
+    """
+    Limits the number of concurrent downloads from each storage host and adapts
+    the limit of each host to the throughput observed on it.
+
+    A host starts with `initial_streams` streams. Each time as many downloads as the
+    current limit have finished, the throughput of the host since the previous
+    evaluation is compared to the one before: one more stream is allowed if the
+    throughput improved by more than `tolerance`, one stream less if it degraded by
+    more than `tolerance`. The limit always stays between 1 and `max_streams`.
+    """
+
+    def __init__(
+            self,
+            initial_streams: int,
+            max_streams: int,
+            tolerance: float = 0.1
+    ):
+        self.max_streams = max(1, max_streams)
+        self.initial_streams = min(max(1, initial_streams), self.max_streams)
+        self.tolerance = tolerance
+        self._condition = Condition()
+        self._hosts = {}
+
+    def _host_state(self, host: str) -> dict[str, Any]:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {'limit': self.initial_streams, 'active': 0, 'done': 0, 'bytes': 0,
+                                         'window_start': time.time(), 'throughput': None}
+        return state
+
+    def limit(self, host: str) -> int:
+        """
+        Returns the current number of allowed streams for the host.
+        """
+        with self._condition:
+            return self._host_state(host)['limit']
+
+    def acquire(self, host: str) -> None:
+        """
+        Blocks until a stream to the host is available and takes it.
+        """
+        with self._condition:
+            state = self._host_state(host)
+            while state['active'] >= state['limit']:
+                self._condition.wait()
+            state['active'] += 1
+
+    def release(self, host: str, bytes_: Optional[int] = None) -> None:
+        """
+        Gives back a stream to the host.
+
+        Parameters
+        ----------
+        host :
+            The host the stream was taken for
+        bytes_ :
+            The size of the file downloaded with the stream, None if the download failed
+        """
+        with self._condition:
+            state = self._host_state(host)
+            state['active'] -= 1
+            if bytes_ is not None:
+                state['done'] += 1
+                state['bytes'] += bytes_
+                if state['done'] >= state['limit']:
+                    self._adapt(state)
+            self._condition.notify_all()
+
+    def _adapt(self, state: dict[str, Any]) -> None:
+        now = time.time()
+        # Count at least one byte per file, so that the file rate is taken into account for empty files
+        throughput = max(state['bytes'], state['done']) / max(now - state['window_start'], 1e-6)
+        previous = state['throughput']
+        if previous is None or throughput > previous * (1 + self.tolerance):
+            state['limit'] = min(state['limit'] + 1, self.max_streams)
+        elif throughput < previous * (1 - self.tolerance):
+            state['limit'] = max(state['limit'] - 1, 1)
+        state['throughput'] = throughput
+        state['done'] = 0
+        state['bytes'] = 0
+        state['window_start'] = now
+
+
+class ProtocolPool:
+    """
+    Keeps connected protocol objects, so that successive downloads from the same RSE
+    with the same scheme and implementation reuse the connection instead of opening
+    a new one per file. A protocol object is only used by one thread at a time.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._idle = {}
+
+    def get(self, key: tuple[str, str, Optional[str]]) -> Optional["RSEProtocol"]:
+        """
+        Returns an idle connected protocol object for the (rse, scheme, impl) key, None if there is none.
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def put(self, key: tuple[str, str, Optional[str]], protocol: "RSEProtocol") -> None:
+        """
+        Gives back a connected protocol object for reuse.
+        """
+        with self._lock:
+            self._idle.setdefault(key, []).append(protocol)
+
+    def close(self) -> None:
+        """
+        Closes all idle protocol objects.
+        """
+        with self._lock:
+            protocols = [protocol for idle in self._idle.values() for protocol in idle]
+            self._idle.clear()
+        for protocol in protocols:
+            try:
+                protocol.close()
+            except Exception:
+                pass
+
+
+class TraceSender:
+    """
+    Sends traces from a background thread, so that downloads don't wait for the trace
+    server. Traces queued while a request is ongoing are sent together in the next
+    request, up to `batch_size` traces per request.
+    """
+
+    _STOP = object()
+
+    def __init__(
+            self,
+            trace_endpoint: str,
+            user_agent: str,
+            batch_size: int = 100
+    ):
+        self.trace_endpoint = trace_endpoint
+        self.user_agent = user_agent
+        self.batch_size = batch_size
+        self._queue = Queue()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, trace: dict[str, Any]) -> None:
+        """
+        Queues a copy of the trace, as the caller may continue updating it.
+        """
+        self._queue.put(copy.deepcopy(trace))
+
+    def close(self) -> None:
+        """
+        Sends the queued traces and stops the background thread.
+        """
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            traces = [self._queue.get()]
+            while len(traces) < self.batch_size:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            if traces[-1] is self._STOP:
+                stop = True
+                traces.pop()
+            if traces:
+                send_trace(traces, self.trace_endpoint, self.user_agent)
+
+
 class DownloadClient:
 
     def __init__(
@@ -187,6 +364,7 @@ class DownloadClient:
                 self.logger = logger
 
         self.tracing = tracing
+        self._trace_sender = None
 
         if not self.tracing:
             self.logger(logging.DEBUG, 'Tracing is turned off.')
@@ -569,45 +747,58 @@ class DownloadClient:
         logger = self.logger
 
         num_files = len(input_items)
-        nlimit = 5
         num_threads = max(1, num_threads)
-        num_threads = min(num_files, num_threads, nlimit)
+        num_threads = min(num_files, num_threads)
+        # Number of concurrent downloads from a storage host before it proves to sustain more
+        initial_streams_per_host = 5
 
         input_queue = Queue()
         output_queue = Queue()
         input_queue.queue = deque(input_items)
+        protocols = ProtocolPool()
+        if self.tracing:
+            self._trace_sender = TraceSender(self.client.trace_host, self.client.user_agent)
 
-        if num_threads < 2:
-            logger(logging.INFO, 'Using main thread to download %d file(s)' % num_files)
-            self._download_worker(input_queue, output_queue, trace_custom_fields, traces_copy_out, '')
-            return list(output_queue.queue)
+        try:
+            if num_threads < 2:
+                logger(logging.INFO, 'Using main thread to download %d file(s)' % num_files)
+                self._download_worker(input_queue, output_queue, trace_custom_fields, traces_copy_out, '', protocols=protocols)
+                return list(output_queue.queue)
+
+            logger(logging.INFO, 'Using %d threads to download %d files' % (num_threads, num_files))
+            streams = HostStreamLimiter(initial_streams=initial_streams_per_host, max_streams=num_threads)
+            threads = []
+            for thread_num in range(0, num_threads):
+                log_prefix = 'Thread %s/%s: ' % (thread_num, num_threads)
+                kwargs = {'input_queue': input_queue,
+                          'output_queue': output_queue,
+                          'trace_custom_fields': trace_custom_fields,
+                          'traces_copy_out': traces_copy_out,
+                          'log_prefix': log_prefix,
+                          'streams': streams,
+                          'protocols': protocols}
+                try:
+                    thread = Thread(target=self._download_worker, kwargs=kwargs)
+                    thread.start()
+                    threads.append(thread)
+                except Exception as error:
+                    logger(logging.WARNING, 'Failed to start thread %d' % thread_num)
+                    logger(logging.DEBUG, error)
 
-        logger(logging.INFO, 'Using %d threads to download %d files' % (num_threads, num_files))
-        threads = []
-        for thread_num in range(0, num_threads):
-            log_prefix = 'Thread %s/%s: ' % (thread_num, num_threads)
-            kwargs = {'input_queue': input_queue,
-                      'output_queue': output_queue,
-                      'trace_custom_fields': trace_custom_fields,
-                      'traces_copy_out': traces_copy_out,
-                      'log_prefix': log_prefix}
             try:
-                thread = Thread(target=self._download_worker, kwargs=kwargs)
-                thread.start()
-                threads.append(thread)
-            except Exception as error:
-                logger(logging.WARNING, 'Failed to start thread %d' % thread_num)
-                logger(logging.DEBUG, error)
-
-        try:
-            logger(logging.DEBUG, 'Waiting for threads to finish')
-            for thread in threads:
-                thread.join()
-        except KeyboardInterrupt:
-            logger(logging.WARNING, 'You pressed Ctrl+C! Exiting gracefully')
-            for thread in threads:
-                thread.kill_received = True
-        return list(output_queue.queue)
+                logger(logging.DEBUG, 'Waiting for threads to finish')
+                for thread in threads:
+                    thread.join()
+            except KeyboardInterrupt:
+                logger(logging.WARNING, 'You pressed Ctrl+C! Exiting gracefully')
+                for thread in threads:
+                    thread.kill_received = True
+            return list(output_queue.queue)
+        finally:
+            protocols.close()
+            if self._trace_sender:
+                trace_sender, self._trace_sender = self._trace_sender, None
+                trace_sender.close()
 
     def _download_worker(
             self,
@@ -615,7 +806,9 @@ class DownloadClient:
             output_queue: Queue,
             trace_custom_fields: dict[str, Any],
             traces_copy_out: Optional[list[dict[str, Any]]],
-            log_prefix: str
+            log_prefix: str,
+            streams: Optional[HostStreamLimiter] = None,
+            protocols: Optional[ProtocolPool] = None
     ) -> None:
         """
         This function runs as long as there are items in the input queue,
@@ -634,6 +827,10 @@ class DownloadClient:
             Reference to an external list, where the traces should be uploaded
         log_prefix :
             String that will be put at the beginning of every log message
+        streams :
+            Optional: limiter of the concurrent downloads per storage host
+        protocols :
+            Optional: pool of connected protocol objects to reuse
         """
         logger = self.logger
 
@@ -646,7 +843,7 @@ class DownloadClient:
             try:
                 trace = copy.deepcopy(self.trace_tpl)
                 trace.update(trace_custom_fields)
-                download_result = self._download_item(item, trace, traces_copy_out, log_prefix)
+                download_result = self._download_item(item, trace, traces_copy_out, log_prefix, streams=streams, protocols=protocols)
                 output_queue.put(download_result)
             except KeyboardInterrupt:
                 logger(logging.WARNING, 'You pressed Ctrl+C! Exiting gracefully')
@@ -696,12 +893,28 @@ class DownloadClient:
         timeout = bytes_ // transfer_speed_timeout + transfer_speed_timeout_static_increment
         return timeout
 
+    def _connect_protocol(
+            self,
+            rse: "RSESettingsDict",
+            scheme: str,
+            impl: Optional[str],
+            logger: "LoggerFunction"
+    ) -> "RSEProtocol":
+        """
+        Creates a protocol object to read from the RSE and connects it.
+        """
+        protocol = rsemgr.create_protocol(rse, operation='read', scheme=scheme, impl=impl, auth_token=self.auth_token, logger=logger)
+        protocol.connect()
+        return protocol
+
     def _download_item(
             self,
             item: dict[str, Any],
             trace: dict[str, Any],
             traces_copy_out: Optional[list[dict[str, Any]]],
-            log_prefix: str = ''
+            log_prefix: str = '',
+            streams: Optional[HostStreamLimiter] = None,
+            protocols: Optional[ProtocolPool] = None
     ) -> dict[str, Any]:
         """
         Downloads the given item and sends traces for success/failure.
@@ -717,6 +930,10 @@ class DownloadClient:
             Reference to an external list, where the traces should be uploaded
         log_prefix :
             String that will be put at the beginning of every log message
+        streams :
+            Optional: limiter of the concurrent downloads per storage host
+        protocols :
+            Optional: pool of connected protocol objects to reuse
 
         Returns
         -------
@@ -851,53 +1068,100 @@ class DownloadClient:
             if impl:
                 logger(logging.INFO, '%sUsing Implementation (impl): %s ' % (log_prefix, impl))
 
+            # The stream to the host is held while connecting, so that there are never more connections than streams
+            host = urlparse(pfn).hostname or rse_name
+            if streams:
+                streams.acquire(host)
             try:
-                protocol = rsemgr.create_protocol(rse, operation='read', scheme=scheme, impl=impl, auth_token=self.auth_token, logger=logger)
-                protocol.connect()
-            except Exception as error:
-                logger(logging.WARNING, '%sFailed to create protocol for PFN: %s' % (log_prefix, pfn))
-                logger(logging.DEBUG, 'scheme: %s, exception: %s' % (scheme, error))
-                trace['stateReason'] = str(error)
-                continue
-
-            logger(logging.INFO, '%sUsing PFN: %s' % (log_prefix, pfn))
-            attempt = 0
-            retries = 2
-            # do some retries with the same PFN if the download fails
-            while not success and attempt < retries:
-                attempt += 1
-                item['attemptnr'] = attempt
-
-                if os.path.isfile(temp_file_path):
-                    logger(logging.DEBUG, '%sDeleting existing temporary file: %s' % (log_prefix, temp_file_path))
-                    os.unlink(temp_file_path)
-
-                start_time = time.time()
-
-                try:
-                    protocol.get(pfn, temp_file_path, transfer_timeout=transfer_timeout)
-                    success = True
-                except Exception as error:
-                    logger(logging.DEBUG, error)
-                    trace['clientState'] = FileDownloadState.FAILED
-                    trace['stateReason'] = str(error)
+                protocol_key = (rse_name, scheme, impl)
+                protocol = protocols.get(protocol_key) if protocols else None
+                reused = protocol is not None
+                if protocol is None:
+                    try:
+                        protocol = self._connect_protocol(rse, scheme, impl, logger)
+                    except Exception as error:
+                        logger(logging.WARNING, '%sFailed to create protocol for PFN: %s' % (log_prefix, pfn))
+                        logger(logging.DEBUG, 'scheme: %s, exception: %s' % (scheme, error))
+                        trace['stateReason'] = str(error)
+                        continue
 
-                end_time = time.time()
+                logger(logging.INFO, '%sUsing PFN: %s' % (log_prefix, pfn))
+                attempt = 0
+                retries = 2
+                # do some retries with the same PFN if the download fails
+                while not success and attempt < retries:
+                    attempt += 1
+                    item['attemptnr'] = attempt
 
-                if success and not item.get('merged_options', {}).get('ignore_checksum', False):
-                    verified, rucio_checksum, local_checksum = _verify_checksum(item, temp_file_path)
-                    if not verified:
-                        success = False
+                    if os.path.isfile(temp_file_path):
+                        logger(logging.DEBUG, '%sDeleting existing temporary file: %s' % (log_prefix, temp_file_path))
                         os.unlink(temp_file_path)
-                        logger(logging.WARNING, '%sChecksum validation failed for file: %s' % (log_prefix, did_str))
-                        logger(logging.DEBUG, 'Local checksum: %s, Rucio checksum: %s' % (local_checksum, rucio_checksum))
-                        trace['clientState'] = FileDownloadState.FAIL_VALIDATE
-                        trace['stateReason'] = 'Checksum validation failed: Local checksum: %s, Rucio checksum: %s' % (local_checksum, rucio_checksum)
-                if not success:
-                    logger(logging.WARNING, '%sDownload attempt failed. Try %s/%s' % (log_prefix, attempt, retries))
-                    self._send_trace(trace)
 
-            protocol.close()
+                    # Compute the checksum while transferring if the protocol supports it, instead of reading the file again
+                    checksum_name = None if item.get('merged_options', {}).get('ignore_checksum', False) else _checksum_to_verify(item)
+                    checksum_calculator = None
+                    get_kwargs = {}
+                    if checksum_name in STREAMING_CHECKSUM_ALGO_DICT and getattr(protocol, 'checksum_while_transferring', False):
+                        checksum_calculator = ChecksumCalculator([checksum_name])
+                        get_kwargs['checksum_calculator'] = checksum_calculator
+
+                    start_time = time.time()
+
+                    try:
+                        protocol.get(pfn, temp_file_path, transfer_timeout=transfer_timeout, **get_kwargs)
+                        success = True
+                    except Exception as error:
+                        if reused and not isinstance(error, SourceNotFound):
+                            # The pooled connection may have been closed meanwhile. Evict it and retry on a new one.
+                            logger(logging.DEBUG, '%sReused connection failed, reconnecting: %s' % (log_prefix, error))
+                            reused = False
+                            try:
+                                protocol.close()
+                            except Exception:
+                                pass
+                            try:
+                                protocol = self._connect_protocol(rse, scheme, impl, logger)
+                            except Exception as connect_error:
+                                protocol = None
+                                logger(logging.WARNING, '%sFailed to create protocol for PFN: %s' % (log_prefix, pfn))
+                                trace['clientState'] = FileDownloadState.FAILED
+                                trace['stateReason'] = str(connect_error)
+                                break
+                            attempt -= 1
+                            continue
+                        logger(logging.DEBUG, error)
+                        trace['clientState'] = FileDownloadState.FAILED
+                        trace['stateReason'] = str(error)
+
+                    end_time = time.time()
+
+                    if success and not item.get('merged_options', {}).get('ignore_checksum', False):
+                        if checksum_calculator is not None:
+                            verified, rucio_checksum, local_checksum = _verify_checksum(item, temp_file_path, checksum_calculator.hexdigests())
+                            item['checksum_bytes_read'] = 0
+                        else:
+                            verified, rucio_checksum, local_checksum = _verify_checksum(item, temp_file_path)
+                            item['checksum_bytes_read'] = os.path.getsize(temp_file_path) if checksum_name else 0
+                        logger(logging.DEBUG, '%sRead %d bytes of %s to verify its checksum' % (log_prefix, item['checksum_bytes_read'], did_str))
+                        if not verified:
+                            success = False
+                            os.unlink(temp_file_path)
+                            logger(logging.WARNING, '%sChecksum validation failed for file: %s' % (log_prefix, did_str))
+                            logger(logging.DEBUG, 'Local checksum: %s, Rucio checksum: %s' % (local_checksum, rucio_checksum))
+                            trace['clientState'] = FileDownloadState.FAIL_VALIDATE
+                            trace['stateReason'] = 'Checksum validation failed: Local checksum: %s, Rucio checksum: %s' % (local_checksum, rucio_checksum)
+                    if not success:
+                        logger(logging.WARNING, '%sDownload attempt failed. Try %s/%s' % (log_prefix, attempt, retries))
+                        self._send_trace(trace)
+
+                # A connection which failed the transfer is not kept for other files
+                if protocols and success:
+                    protocols.put(protocol_key, protocol)
+                elif protocol is not None:
+                    protocol.close()
+            finally:
+                if streams:
+                    streams.release(host, (item.get('bytes') or 0) if success else None)
 
         if not success:
             logger(logging.ERROR, '%sFailed to download file %s' % (log_prefix, did_str))
@@ -1960,7 +2224,10 @@ class DownloadClient:
             the trace to send
         """
         if self.tracing:
-            send_trace(trace, self.client.trace_host, self.client.user_agent)
+            if self._trace_sender:
+                self._trace_sender.send(trace)
+            else:
+                send_trace(trace, self.client.trace_host, self.client.user_agent)
 
     def preferred_impl(self, sources: list[dict[str, Any]]) -> Optional[str]:
         """
@@ -2032,23 +2299,31 @@ class DownloadClient:
         return supported_impl
 
 
+def _checksum_to_verify(item: dict[str, Any]) -> Optional[str]:
+    """
+    Returns the name of the checksum a downloaded item is verified with, None if the item has no usable checksum.
+    """
+    for checksum_name in [PREFERRED_CHECKSUM] + GLOBALLY_SUPPORTED_CHECKSUMS:
+        if item.get(checksum_name) and checksum_name in CHECKSUM_ALGO_DICT:
+            return checksum_name
+    return None
+
+
 def _verify_checksum(
         item: dict[str, Any],
-        path: str
+        path: str,
+        local_checksums: Optional[dict[str, str]] = None
 ) -> tuple[bool, Optional[str], Optional[str]]:
-    rucio_checksum = item.get(PREFERRED_CHECKSUM)
-    local_checksum = None
-    checksum_algo = CHECKSUM_ALGO_DICT.get(PREFERRED_CHECKSUM)
-
-    if rucio_checksum and checksum_algo:
-        local_checksum = checksum_algo(path)
-        return rucio_checksum == local_checksum, rucio_checksum, local_checksum
-
-    for checksum_name in GLOBALLY_SUPPORTED_CHECKSUMS:
-        rucio_checksum = item.get(checksum_name)
-        checksum_algo = CHECKSUM_ALGO_DICT.get(checksum_name)
-        if rucio_checksum and checksum_algo:
-            local_checksum = checksum_algo(path)
-            return rucio_checksum == local_checksum, rucio_checksum, local_checksum
-
-    return False, None, None
+    """
+    Compares the checksum of the item with the one of the local file. The local checksum is
+    taken from local_checksums if it was computed while transferring, otherwise the file is read.
+    """
+    checksum_name = _checksum_to_verify(item)
+    if checksum_name is None:
+        return False, None, None
+
+    rucio_checksum = item[checksum_name]
+    local_checksum = (local_checksums or {}).get(checksum_name)
+    if local_checksum is None:
+        local_checksum = CHECKSUM_ALGO_DICT[checksum_name](path)
+    return rucio_checksum == local_checksum, rucio_checksum, local_checksum
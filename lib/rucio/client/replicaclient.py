@@ -157,7 +157,7 @@ class ReplicaClient(BaseClient):
                       client_location=None, sort=None, domain=None,
                       signature_lifetime=None, nrandom=None,
                       resolve_archives=True, resolve_parents=False,
-                      updated_after=None):
+                      updated_after=None, page_size=None, cursor=None):
         """
         List file replicas for a list of data identifiers (DIDs).
 
@@ -193,6 +193,11 @@ class ReplicaClient(BaseClient):
             When set to True, find all parent datasets which contain the replicas.
         updated_after:
             epoch timestamp or datetime object (UTC time), only return replicas updated after this time
+        page_size:
+            If set, the replicas are listed page by page, with one request per page of at most
+            ``page_size`` replicas. Ignored with metalink, which is not paginated.
+        cursor:
+            Continuation token of a page, to resume a paginated listing from this page.
 
 
         Returns
@@ -242,6 +247,12 @@ class ReplicaClient(BaseClient):
         if metalink:
             headers['Accept'] = 'application/metalink4+xml'
 
+        if page_size and not metalink:
+            data['page_size'] = page_size
+            if cursor:
+                data['cursor'] = cursor
+            return self._list_replicas_pages(url, headers, data)
+
         # pass json dict in querystring
         r = self._send_request(url, headers=headers, type_='POST', data=dumps(data), stream=True)
         if r.status_code == codes.ok:
@@ -251,6 +262,25 @@ class ReplicaClient(BaseClient):
         exc_cls, exc_msg = self._get_exception(headers=r.headers, status_code=r.status_code, data=r.content)
         raise exc_cls(exc_msg)
 
+    def _list_replicas_pages(self, url, headers, data):
+        """
+        Iterate over the pages of a paginated list_replicas, following the continuation tokens.
+        """
+        while True:
+            r = self._send_request(url, headers=headers, type_='POST', data=dumps(data), stream=True)
+            if r.status_code != codes.ok:
+                exc_cls, exc_msg = self._get_exception(headers=r.headers, status_code=r.status_code, data=r.content)
+                raise exc_cls(exc_msg)
+            next_cursor = None
+            for rfile in self._load_json_data(r):
+                if 'next_cursor' in rfile:
+                    next_cursor = rfile['next_cursor']
+                else:
+                    yield rfile
+            if not next_cursor:
+                return
+            data['cursor'] = next_cursor
+
     def list_suspicious_replicas(self, rse_expression=None, younger_than=None, nattempts=None):
         """
         List file replicas tagged as suspicious.
@@ -27,7 +27,7 @@ from typing import TYPE_CHECKING, Any, Final, Optional, Union, cast
 from rucio import version
 from rucio.client.client import Client
 from rucio.common.bittorrent import bittorrent_v2_merkle_sha256
-from rucio.common.checksum import GLOBALLY_SUPPORTED_CHECKSUMS, adler32, md5
+from rucio.common.checksum import GLOBALLY_SUPPORTED_CHECKSUMS, checksums, checksums_of_files
 from rucio.common.client import detect_client_location
 from rucio.common.config import config_get, config_get_bool, config_get_int
 from rucio.common.constants import DEFAULT_VO, RseAttr
@@ -50,11 +50,14 @@ from rucio.common.utils import execute, generate_uuid, make_valid_did, retry, se
 from rucio.rse import rsemanager as rsemgr
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Mapping
+    from collections.abc import Iterable, Mapping, Sequence
 
     from rucio.common.types import AttachDict, DatasetDict, DIDStringDict, FileToUploadDict, FileToUploadWithCollectedAndDatasetInfoDict, FileToUploadWithCollectedInfoDict, LFNDict, LoggerFunction, PathTypeAlias, RSESettingsDict, TraceBaseDict, TraceDict
     from rucio.rse.protocols.protocol import RSEProtocol
 
+# The checksums of a file have to be known before uploading it, to register it and verify the transfer
+UPLOAD_CHECKSUMS: Final[list[str]] = ['adler32', 'md5']
+
 
 class UploadClient:
     def __init__(
@@ -816,7 +819,8 @@ class UploadClient:
     def _collect_file_info(
             self,
             filepath: "PathTypeAlias",
-            item: "FileToUploadDict"
+            item: "FileToUploadDict",
+            file_checksums: Optional[dict[str, str]] = None
     ) -> "FileToUploadWithCollectedInfoDict":
         """
         Collects and returns essential file descriptors (e.g., size, checksums, GUID, etc.).
@@ -832,6 +836,9 @@ class UploadClient:
         item
             A dictionary containing initial upload parameters (e.g., RSE name, scope) for the
             file. Some of its fields may be updated or augmented in the returned dictionary.
+        file_checksums
+            The Adler-32 and MD5 checksums of the file if they were already computed,
+            e.g. by `_collect_checksums` for a whole directory.
 
         Returns
         -------
@@ -845,8 +852,11 @@ class UploadClient:
         new_item['basename'] = os.path.basename(filepath)
 
         new_item['bytes'] = os.stat(filepath).st_size
-        new_item['adler32'] = adler32(filepath)
-        new_item['md5'] = md5(filepath)
+        if file_checksums is None:
+            # Compute all the checksums in a single read of the file
+            file_checksums = checksums(filepath, UPLOAD_CHECKSUMS)
+            self.logger(logging.DEBUG, 'Read %d bytes of %s to compute its checksums' % (new_item['bytes'], filepath))
+        new_item.update(file_checksums)
         new_item['meta'] = {'guid': self._get_file_guid(new_item)}
         new_item['state'] = 'C'
         if not new_item.get('did_scope'):
@@ -856,6 +866,28 @@ class UploadClient:
 
         return new_item
 
+    def _collect_checksums(
+            self,
+            filepaths: "Sequence[PathTypeAlias]"
+    ) -> list[dict[str, str]]:
+        """
+        Computes the Adler-32 and MD5 checksums of several files in parallel.
+
+        Parameters
+        ----------
+        filepaths
+            The local filesystem paths to the files.
+
+        Returns
+        -------
+        list[dict[str, str]]
+            The checksums of each file, in the order of `filepaths`.
+        """
+        start_time = time.time()
+        file_checksums = checksums_of_files(filepaths, UPLOAD_CHECKSUMS)
+        self.logger(logging.DEBUG, 'Computed the checksums of %d files in %.3f seconds' % (len(filepaths), time.time() - start_time))
+        return file_checksums
+
     def _collect_and_validate_file_info(
             self,
             items: "Iterable[FileToUploadDict]"
@@ -926,8 +958,9 @@ class UploadClient:
                 item['impl'] = impl
             if os.path.isdir(path) and not recursive:
                 dname, subdirs, fnames = next(os.walk(path))
-                for fname in fnames:
-                    file = self._collect_file_info(os.path.join(dname, fname), item)
+                filepaths = [os.path.join(dname, fname) for fname in fnames]
+                for filepath, file_checksums in zip(filepaths, self._collect_checksums(filepaths)):
+                    file = self._collect_file_info(filepath, item, file_checksums)
                     files.append(file)
                 if not len(fnames) and not len(subdirs):
                     logger(logging.WARNING, 'Skipping %s because it is empty.' % dname)
@@ -1387,8 +1420,9 @@ class UploadClient:
                 if len(fnames) > 0:
                     datasets.append({'scope': scope, 'name': root.split('/')[-1], 'rse': rse})
                     self.logger(logging.DEBUG, 'Appended dataset with DID %s:%s' % (scope, path))
-                    for fname in fnames:
-                        file = self._collect_file_info(os.path.join(root, fname), item)
+                    filepaths = [os.path.join(root, fname) for fname in fnames]
+                    for fname, filepath, file_checksums in zip(fnames, filepaths, self._collect_checksums(filepaths)):
+                        file = self._collect_file_info(filepath, item, file_checksums)
                         file = cast("FileToUploadWithCollectedAndDatasetInfoDict", file)
                         file['dataset_scope'] = scope
                         file['dataset_name'] = root.split('/')[-1]
@@ -12,14 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TYPE_CHECKING, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional
 
+from dogpile.cache.api import NO_VALUE
 from dogpile.cache.region import CacheRegion
 
 from rucio.common.config import config_get, is_client
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
+
+    from rucio.core.monitor import MetricManager
 
 
 CACHE_URL = config_get('cache', 'url', False, '127.0.0.1:11211', check_config_table=False)
@@ -79,6 +85,129 @@ class MemcacheRegion(CacheRegion):
             self.configure('dogpile.cache.null')
 
 
+class LocalCache:
+    """
+    Bounded, thread-safe, process-local cache with LRU eviction and per-entry expiration.
+
+    It is meant to sit in front of a MemcacheRegion for hot, small objects.
+    Like the dogpile regions, `get` returns NO_VALUE on a miss.
+    """
+    def __init__(
+            self,
+            maxsize: int = 1024,
+            expiration_time: Optional[float] = None
+    ):
+        """
+        :param maxsize:          Maximum number of entries kept. The least recently used entry is evicted first.
+        :param expiration_time:  Default lifetime of an entry in seconds. None means entries never expire.
+        """
+        self.maxsize = maxsize
+        self.expiration_time = expiration_time
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Any, tuple[Optional[float], Any]] = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return NO_VALUE
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return NO_VALUE
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, expiration_time: Optional[float] = None) -> None:
+        if expiration_time is None:
+            expiration_time = self.expiration_time
+        expires_at = time.monotonic() + expiration_time if expiration_time is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCacheRegion:
+    """
+    A LocalCache in front of a cache region (typically a MemcacheRegion).
+
+    Values found in the region are kept in the local tier, so hot objects are neither
+    fetched over the network nor unpickled again until the local entry expires.
+    The objects returned from the local tier are shared: callers must not modify them.
+    It offers the get/set/delete interface of the dogpile regions.
+    """
+    def __init__(
+            self,
+            region: CacheRegion,
+            local: LocalCache,
+            metrics: Optional['MetricManager'] = None,
+            name: str = 'cache'
+    ):
+        """
+        :param region:   The shared cache region.
+        :param local:    The process-local tier.
+        :param metrics:  If set, a counter '<name>.{result}' is increased on every lookup,
+                         with result one of 'local_hit', 'hit' (found in the region) or 'miss'.
+        :param name:     The prefix of the metric.
+        """
+        self.region = region
+        self.local = local
+        self.metrics = metrics
+        self.name = name
+
+    def _count(self, result: str) -> None:
+        if self.metrics is not None:
+            self.metrics.counter(f'{self.name}.{{result}}').labels(result=result).inc()
+
+    def get(self, key: str) -> Any:
+        value = self.local.get(key)
+        if value is not NO_VALUE:
+            self._count('local_hit')
+            return value
+        value = self.region.get(key)
+        if value is NO_VALUE:
+            self._count('miss')
+            return value
+        self._count('hit')
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, local_expiration_time: Optional[float] = None) -> None:
+        """
+        :param local_expiration_time: Lifetime of the entry in the local tier, if different from the default one.
+        """
+        self.region.set(key, value)
+        self.local.set(key, value, expiration_time=local_expiration_time)
+
+    def delete(self, key: str) -> None:
+        self.region.delete(key)
+        self.local.delete(key)
+
+    def delete_multi(self, keys: 'Sequence[str]') -> None:
+        self.region.delete_multi(keys)
+        for key in keys:
+            self.local.delete(key)
+
+    def invalidate_local(self) -> None:
+        """
+        Drop all the entries of the local tier. The region is left untouched.
+        """
+        self.local.invalidate()
+
+
 class CacheKey:
     """
     Helper class to generate cache keys
@@ -12,23 +12,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import hashlib
-import io
 import mmap
+import os
 import zlib
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from rucio.common.bittorrent import merkle_sha256
 from rucio.common.exception import ChecksumCalculationError
 
 if TYPE_CHECKING:
-    from _typeshed import FileDescriptorOrPath
+    from collections.abc import Iterable
+
+    from _typeshed import FileDescriptorOrPath, ReadableBuffer
 
 # GLOBALLY_SUPPORTED_CHECKSUMS = ['adler32', 'md5', 'sha256', 'crc32']
 GLOBALLY_SUPPORTED_CHECKSUMS = ['adler32', 'md5']
 PREFERRED_CHECKSUM = GLOBALLY_SUPPORTED_CHECKSUMS[0]
 CHECKSUM_KEY = 'supported_checksums'
 
+# Size of the blocks given to the checksum algorithms. A multiple of the memory page size,
+# large enough for hashlib and zlib to release the GIL and to amortize the per-call overhead.
+CHECKSUM_BLOCK_SIZE = 4 * 1024 * 1024
+
 
 def is_checksum_valid(checksum_name: str) -> bool:
     """
@@ -54,15 +61,6 @@ def set_preferred_checksum(checksum_name: str) -> None:
         PREFERRED_CHECKSUM = checksum_name
 
 
-def _iter_blocks(fobj):
-    """Iterate over blocks in a binary file-like object.
-
-    Uses blocks of size ``io.DEFAULT_BUFFER_SIZE * 8``.
-    """
-    block_size = io.DEFAULT_BUFFER_SIZE * 8
-    return iter(partial(fobj.read, block_size), b'')
-
-
 def adler32(file: "FileDescriptorOrPath") -> str:
     """
     An Adler-32 checksum is obtained by calculating two 16-bit checksums A and B
@@ -72,39 +70,7 @@ def adler32(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: Hexified string, padded to 8 values.
     """
-
-    # adler starting value is _not_ 0
-    adler = 1
-
-    can_mmap = False
-    # try:
-    #    with open(file, 'r+b') as f:
-    #        can_mmap = True
-    # except:
-    #    pass
-
-    try:
-        # use mmap if possible
-        if can_mmap:
-            with open(file, 'r+b') as f:
-                m = mmap.mmap(f.fileno(), 0)
-                # partial block reads at slightly increased buffer sizes
-                for block in _iter_blocks(m):
-                    adler = zlib.adler32(block, adler)
-        else:
-            with open(file, 'rb') as f:
-                # partial block reads at slightly increased buffer sizes
-                for block in _iter_blocks(f):
-                    adler = zlib.adler32(block, adler)
-
-    except Exception as e:
-        raise ChecksumCalculationError('adler32', str(file), e)
-
-    # backflip on 32bit -- can be removed once everything is fully migrated to 64bit
-    if adler < 0:
-        adler = adler + 2 ** 32
-
-    return str('%08x' % adler)
+    return checksums(file, ['adler32'])['adler32']
 
 
 def md5(file: "FileDescriptorOrPath") -> str:
@@ -114,15 +80,7 @@ def md5(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: string of 32 hexadecimal digits
     """
-    hash_md5 = hashlib.md5()
-    try:
-        with open(file, "rb") as f:
-            for block in _iter_blocks(f):
-                hash_md5.update(block)
-    except Exception as e:
-        raise ChecksumCalculationError('md5', str(file), e)
-
-    return hash_md5.hexdigest()
+    return checksums(file, ['md5'])['md5']
 
 
 def sha256(file: "FileDescriptorOrPath") -> str:
@@ -132,14 +90,7 @@ def sha256(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: string of 32 hexadecimal digits
     """
-    checksum = hashlib.sha256()
-    try:
-        with open(file, "rb") as f:
-            for block in _iter_blocks(f):
-                checksum.update(block)
-    except Exception as e:
-        raise ChecksumCalculationError('sha256', str(file), e)
-    return checksum.hexdigest()
+    return checksums(file, ['sha256'])['sha256']
 
 
 def crc32(file: "FileDescriptorOrPath") -> str:
@@ -149,14 +100,145 @@ def crc32(file: "FileDescriptorOrPath") -> str:
     :param file: file name
     :returns: string of 32 hexadecimal digits
     """
-    prev = 0
+    return checksums(file, ['crc32'])['crc32']
+
+
+class _Adler32:
+    def __init__(self):
+        # adler starting value is _not_ 0
+        self.value = 1
+
+    def update(self, block: "ReadableBuffer") -> None:
+        self.value = zlib.adler32(block, self.value)
+
+    def hexdigest(self) -> str:
+        return '%08x' % (self.value & 0xFFFFFFFF)
+
+
+class _Crc32:
+    def __init__(self):
+        self.value = 0
+
+    def update(self, block: "ReadableBuffer") -> None:
+        self.value = zlib.crc32(block, self.value)
+
+    def hexdigest(self) -> str:
+        return '%X' % (self.value & 0xFFFFFFFF)
+
+
+# The algorithms which can be computed incrementally, block by block
+STREAMING_CHECKSUM_ALGO_DICT = {
+    'adler32': _Adler32,
+    'md5': hashlib.md5,
+    'sha256': hashlib.sha256,
+    'crc32': _Crc32,
+}
+
+
+class ChecksumCalculator:
+    """
+    Computes several checksums in a single pass over data given block by block,
+    for example while the data is being transferred.
+
+    The digests are formatted like the ones of the corresponding per-file functions
+    of this module. `nbytes` counts the bytes which went through the calculator.
+    """
+
+    def __init__(self, checksum_names: "Iterable[str]"):
+        """
+        :param checksum_names: The algorithms to compute, keys of STREAMING_CHECKSUM_ALGO_DICT.
+        """
+        self._checksums = {name: STREAMING_CHECKSUM_ALGO_DICT[name]() for name in checksum_names}
+        self.nbytes = 0
+
+    def update(self, block: "ReadableBuffer") -> None:
+        for checksum in self._checksums.values():
+            checksum.update(block)
+        self.nbytes += len(block)
+
+    def hexdigests(self) -> dict[str, str]:
+        """
+        :returns: Dictionary {checksum_name: hexdigest} of the data given so far.
+        """
+        return {name: checksum.hexdigest() for name, checksum in self._checksums.items()}
+
+
+def _feed_file(file: "FileDescriptorOrPath", calculator: ChecksumCalculator, immutable: bool = False) -> None:
+    """
+    Gives the content of the file to the calculator in blocks of CHECKSUM_BLOCK_SIZE.
+
+    By default, the file is read into a single reused buffer. If the caller guarantees that the
+    file is immutable, it is mapped in memory instead, the blocks are then views on the mapping and
+    no data is copied. Reading a mapping beyond the end of a file truncated meanwhile kills the
+    process with SIGBUS, which cannot be caught, so files which may still be written to must not
+    be mapped. Files which cannot be mapped (empty files, pipes, ...) are always read.
+    """
+    with open(file, 'rb') as f:
+        mapping = None
+        if immutable:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
+
+        if mapping is not None:
+            with mapping, memoryview(mapping) as view:
+                for offset in range(0, len(view), CHECKSUM_BLOCK_SIZE):
+                    with view[offset:offset + CHECKSUM_BLOCK_SIZE] as block:
+                        calculator.update(block)
+        else:
+            buffer = bytearray(CHECKSUM_BLOCK_SIZE)
+            with memoryview(buffer) as view:
+                while nbytes := f.readinto(buffer):
+                    with view[:nbytes] as block:
+                        calculator.update(block)
+
+
+def checksums(file: "FileDescriptorOrPath", checksum_names: "Iterable[str]", immutable: bool = False) -> dict[str, str]:
+    """
+    Computes several checksums of the file, reading it only once.
+
+    :param file: file name
+    :param checksum_names: The algorithms to compute, keys of STREAMING_CHECKSUM_ALGO_DICT.
+    :param immutable: True if the file cannot be modified meanwhile. It is then mapped in memory instead of read.
+    :returns: Dictionary {checksum_name: hexdigest}.
+    """
+    checksum_names = list(checksum_names)
+    calculator = ChecksumCalculator(checksum_names)
     try:
-        with open(file, "rb") as f:
-            for block in _iter_blocks(f):
-                prev = zlib.crc32(block, prev)
+        _feed_file(file, calculator, immutable=immutable)
     except Exception as e:
-        raise ChecksumCalculationError('crc32', str(file), e)
-    return "%X" % (prev & 0xFFFFFFFF)
+        raise ChecksumCalculationError(','.join(checksum_names), str(file), e)
+    return calculator.hexdigests()
+
+
+def checksums_of_files(
+        files: "Iterable[FileDescriptorOrPath]",
+        checksum_names: "Iterable[str]",
+        max_workers: Optional[int] = None,
+        immutable: bool = False,
+) -> list[dict[str, str]]:
+    """
+    Computes several checksums of each of the files, the files being processed in parallel.
+
+    The files are distributed over a pool of threads: hashlib and zlib release the GIL
+    while hashing the large blocks given by `checksums`, so the threads use several cores
+    without the cost of starting processes and sending them the results.
+
+    :param files: file names
+    :param checksum_names: The algorithms to compute, keys of STREAMING_CHECKSUM_ALGO_DICT.
+    :param max_workers: Number of threads, defaults to the number of cores.
+    :param immutable: True if the files cannot be modified meanwhile. They are then mapped in memory instead of read.
+    :returns: List of dictionaries {checksum_name: hexdigest}, in the order of the files.
+    :raises ChecksumCalculationError: if the checksums of one of the files cannot be computed.
+    """
+    files = list(files)
+    checksum_names = list(checksum_names)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(files))
+    if max_workers <= 1:
+        return [checksums(file, checksum_names, immutable=immutable) for file in files]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(partial(checksums, checksum_names=checksum_names, immutable=immutable), files))
 
 
 CHECKSUM_ALGO_DICT = {
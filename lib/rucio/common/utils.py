@@ -820,11 +820,11 @@ def make_valid_did(lfn_dict: LFNDict) -> LFNDict:
     return lfn_copy  # type: ignore
 
 
-def send_trace(trace: TraceDict, trace_endpoint: str, user_agent: str, retries: int = 5) -> int:
+def send_trace(trace: Union[TraceDict, list[TraceDict]], trace_endpoint: str, user_agent: str, retries: int = 5) -> int:
     """
     Send the given trace to the trace endpoint
 
-    :param trace: the trace dictionary to send
+    :param trace: the trace dictionary to send, or a list of trace dictionaries to send in one request
     :param trace_endpoint: the endpoint where the trace should be send
     :param user_agent: the user agent sending the trace
     :param retries: the number of retries if sending fails
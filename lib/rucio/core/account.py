@@ -18,6 +18,7 @@ from re import match
 from traceback import format_exc
 from typing import TYPE_CHECKING, Any, Optional
 
+from dogpile.cache.api import NO_VALUE
 from sqlalchemy import and_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import exc
@@ -25,12 +26,13 @@ from sqlalchemy.orm import exc
 import rucio.core.account_counter
 import rucio.core.rse
 from rucio.common import exception
-from rucio.common.config import config_get_bool
+from rucio.common.cache import LocalCache
+from rucio.common.config import config_get_bool, config_get_int
 from rucio.common.constants import DEFAULT_VO
 from rucio.core.vo import vo_exists
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import AccountStatus, AccountType
-from rucio.db.sqla.session import read_session, stream_session, transactional_session
+from rucio.db.sqla.session import after_commit, read_session, stream_session, transactional_session
 
 if TYPE_CHECKING:
     from collections.abc import Iterator, Mapping
@@ -39,6 +41,10 @@ if TYPE_CHECKING:
 
     from rucio.common.types import AccountAttributesDict, AccountDict, AccountUsageModelDict, IdentityDict, InternalAccount, UsageDict
 
+# The attributes of the accounts, checked by the permission modules on most API calls
+ACCOUNT_ATTRIBUTES_CACHE = LocalCache(maxsize=config_get_int('cache', 'account_attributes_local_size', raise_exception=False, default=10000, check_config_table=False),
+                                      expiration_time=config_get_int('cache', 'account_attributes_local_ttl', raise_exception=False, default=30, check_config_table=False))
+
 
 @transactional_session
 def add_account(
@@ -309,13 +315,46 @@ def list_account_attributes(
     except exc.NoResultFound:
         raise exception.AccountNotFound("Account ID '{0}' does not exist".format(account))
 
-    query = select(
-        models.AccountAttrAssociation.key,
-        models.AccountAttrAssociation.value
-    ).where(
-        models.AccountAttrAssociation.account == account
-    )
-    return [row._asdict() for row in session.execute(query)]  # type: ignore (pending SQLA2.1: https://github.com/rucio/rucio/discussions/6615)
+    return [{'key': key, 'value': value} for key, value in _get_account_attributes(account, session=session).items()]  # type: ignore
+
+
+def _get_account_attributes(
+    account: "InternalAccount",
+    *,
+    session: "Session"
+) -> dict[str, Any]:
+    """
+    Get the attributes of an account, from ACCOUNT_ATTRIBUTES_CACHE if possible.
+    The returned dictionary is shared and must not be modified.
+
+    :param account: the account name.
+    :param session: The database session in use.
+
+    :returns: a dictionary {key: value} of the attributes.
+    """
+    attributes = ACCOUNT_ATTRIBUTES_CACHE.get(account)
+    if attributes is NO_VALUE:
+        query = select(
+            models.AccountAttrAssociation.key,
+            models.AccountAttrAssociation.value
+        ).where(
+            models.AccountAttrAssociation.account == account
+        )
+        attributes = {key: value for key, value in session.execute(query)}
+        ACCOUNT_ATTRIBUTES_CACHE.set(account, attributes)
+    return attributes
+
+
+def invalidate_account_attributes(account: "InternalAccount") -> None:
+    """
+    Drop the cached attributes of an account and the permission decisions which may depend on them.
+
+    :param account: the account name.
+    """
+    from rucio.core.permission import invalidate_permission_cache  # circular import: the permission modules use this module
+
+    ACCOUNT_ATTRIBUTES_CACHE.delete(account)
+    invalidate_permission_cache()
 
 
 @read_session
@@ -334,13 +373,7 @@ def has_account_attribute(
 
     :returns: True or False
     """
-    query = select(
-        models.AccountAttrAssociation.value
-    ).where(
-        models.AccountAttrAssociation.account == account,
-        models.AccountAttrAssociation.key == key
-    )
-    return session.execute(query).scalar() is not None
+    return _get_account_attributes(account, session=session).get(key) is not None
 
 
 @transactional_session
@@ -373,6 +406,7 @@ def add_account_attribute(
     new_attr = models.AccountAttrAssociation(account=account, key=key, value=value)
     try:
         new_attr.save(session=session)
+        after_commit(session, lambda: invalidate_account_attributes(account))
     except IntegrityError as error:
         if match('.*IntegrityError.*ORA-00001: unique constraint.*ACCOUNT_ATTR_MAP_PK.*violated.*', error.args[0]) \
            or match('.*IntegrityError.*1062.*Duplicate entry.*for key.*', error.args[0]) \
@@ -409,6 +443,7 @@ def del_account_attribute(
     if aid is None:
         raise exception.AccountNotFound('Attribute ({0}) does not exist for the account {1}!'.format(key, account))
     aid.delete(session=session)
+    after_commit(session, lambda: invalidate_account_attributes(account))
 
 
 @read_session
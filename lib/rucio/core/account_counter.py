@@ -14,13 +14,17 @@
 import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import and_, delete, insert, literal, select
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, update
 
+from rucio.common.exception import DatabaseException
+from rucio.common.utils import chunks
 from rucio.db.sqla import filter_thread_work, models
 from rucio.db.sqla.session import read_session, transactional_session
+from rucio.db.sqla.util import delete_and_return, delta_accumulator, temp_table_mngr
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from sqlalchemy.orm import Session
 
     from rucio.common.types import InternalAccount, RSEAccountCounterDict
@@ -64,7 +68,23 @@ def increase(
     :param bytes_:   The corresponding amount in bytes.
     :param session: The database session in use.
     """
-    models.UpdatedAccountCounter(account=account, rse_id=rse_id, files=files, bytes=bytes_).save(session=session)
+    delta_accumulator(session).add('updated_account_counters', (account, rse_id), files, bytes_, flush_fnc=_insert_updated_account_counters)
+
+
+def _insert_updated_account_counters(
+    deltas: "dict[tuple[InternalAccount, str], list[int]]",
+    session: "Session"
+) -> None:
+    """
+    Insert one updated_account_counters row per account and RSE for the deltas summed during the transaction.
+
+    :param deltas:  Dictionary {(account, rse_id): [files, bytes]}.
+    :param session: The database session in use.
+    """
+    values = [{'account': account, 'rse_id': rse_id, 'files': files, 'bytes': bytes_}
+              for (account, rse_id), (files, bytes_) in deltas.items() if files or bytes_]
+    if values:
+        session.execute(insert(models.UpdatedAccountCounter), values)
 
 
 @transactional_session
@@ -129,6 +149,7 @@ def get_updated_account_counters(
     :param session:            Database session in use.
     :returns:                  List of rse_ids whose rse_counters need to be updated.
     """
+    delta_accumulator(session).flush('updated_account_counters')
 
     query = select(
         models.UpdatedAccountCounter.account,
@@ -155,33 +176,122 @@ def update_account_counter(
     :param rse_id:   The rse_id to update.
     :param session:  Database session in use.
     """
+    update_account_counters([{'account': account, 'rse_id': rse_id}], session=session)
+
+
+@transactional_session
+def update_account_counters(
+    account_counters: "Sequence[RSEAccountCounterDict]",
+    *,
+    session: "Session"
+) -> int:
+    """
+    Read the updated_account_counters of several accounts and RSEs and update their account_counters.
+
+    The pending rows are summed and deleted with set-based statements, as in
+    rse_counter.update_rse_counters.
+
+    :param account_counters:  The account and rse_id pairs to update, as returned by get_updated_account_counters.
+    :param session:           Database session in use.
+    :returns:                 The number of consumed updated_account_counters rows.
+    """
+    delta_accumulator(session).flush('updated_account_counters')
+
+    temp_table = temp_table_mngr(session).create_id_table()
+    for chunk in chunks(account_counters, 100):
+        stmt = insert(
+            temp_table
+        ).from_select(
+            ['id'],
+            select(
+                models.UpdatedAccountCounter.id
+            ).where(
+                or_(*[and_(models.UpdatedAccountCounter.account == counter['account'],
+                           models.UpdatedAccountCounter.rse_id == counter['rse_id'])
+                      for counter in chunk])
+            )
+        )
+        session.execute(stmt)
 
     stmt = select(
-        models.UpdatedAccountCounter
-    ).where(
-        and_(models.UpdatedAccountCounter.account == account,
-             models.UpdatedAccountCounter.rse_id == rse_id)
+        models.UpdatedAccountCounter.account,
+        models.UpdatedAccountCounter.rse_id,
+        func.sum(models.UpdatedAccountCounter.files),
+        func.sum(models.UpdatedAccountCounter.bytes),
+        func.count()
+    ).join(
+        temp_table,
+        temp_table.id == models.UpdatedAccountCounter.id
+    ).group_by(
+        models.UpdatedAccountCounter.account,
+        models.UpdatedAccountCounter.rse_id
     )
-    updated_account_counters = session.execute(stmt).scalars().all()
-
-    try:
-        stmt = select(
+    nb_rows = 0
+    for account, rse_id, sum_files, sum_bytes, count in session.execute(stmt).all():
+        nb_rows += count
+        stmt = update(
             models.AccountUsage
         ).where(
             and_(models.AccountUsage.account == account,
                  models.AccountUsage.rse_id == rse_id)
+        ).values({
+            models.AccountUsage.files: models.AccountUsage.files + sum_files,
+            models.AccountUsage.bytes: models.AccountUsage.bytes + sum_bytes
+        }).execution_options(
+            synchronize_session=False
         )
-        account_counter = session.execute(stmt).scalar_one()
-        account_counter.bytes += sum([updated_account_counter.bytes for updated_account_counter in updated_account_counters])
-        account_counter.files += sum([updated_account_counter.files for updated_account_counter in updated_account_counters])
-    except NoResultFound:
-        models.AccountUsage(rse_id=rse_id,
-                            account=account,
-                            files=sum([updated_account_counter.files for updated_account_counter in updated_account_counters]),
-                            bytes=sum([updated_account_counter.bytes for updated_account_counter in updated_account_counters])).save(session=session)
-
-    for update in updated_account_counters:
-        update.delete(flush=False, session=session)
+        if not session.execute(stmt).rowcount:
+            models.AccountUsage(rse_id=rse_id,
+                                account=account,
+                                files=sum_files,
+                                bytes=sum_bytes).save(session=session)
+
+    stmt = delete(
+        models.UpdatedAccountCounter
+    ).where(
+        models.UpdatedAccountCounter.id.in_(select(temp_table.id))
+    ).execution_options(
+        synchronize_session=False
+    )
+    if session.execute(stmt).rowcount != nb_rows:
+        raise DatabaseException('updated_account_counters rows were consumed by a concurrent transaction')
+    return nb_rows
+
+
+@transactional_session
+def collapse_updated_account_counters(*, session: "Session") -> int:
+    """
+    Replace the updated_account_counters rows of each account and RSE by a single row holding their sum.
+
+    Meant to shrink a backlog of rows, for example one accumulated before the deltas were
+    summed per transaction.
+
+    :param session:  Database session in use.
+    :returns:        The number of removed rows.
+    """
+    stmt = select(
+        models.UpdatedAccountCounter.account,
+        models.UpdatedAccountCounter.rse_id
+    ).group_by(
+        models.UpdatedAccountCounter.account,
+        models.UpdatedAccountCounter.rse_id
+    ).having(
+        func.count() > 1
+    )
+    removed = 0
+    for account, rse_id in session.execute(stmt).all():
+        rows = delete_and_return(models.UpdatedAccountCounter,
+                                 and_(models.UpdatedAccountCounter.account == account,
+                                      models.UpdatedAccountCounter.rse_id == rse_id),
+                                 models.UpdatedAccountCounter.files,
+                                 models.UpdatedAccountCounter.bytes,
+                                 session=session)
+        session.execute(insert(models.UpdatedAccountCounter).values(account=account,
+                                                                    rse_id=rse_id,
+                                                                    files=sum(row.files for row in rows),
+                                                                    bytes=sum(row.bytes for row in rows)))
+        removed += len(rows) - 1
+    return removed
 
 
 @transactional_session
@@ -26,17 +26,20 @@ from dogpile.cache import make_region
 from dogpile.cache.api import NO_VALUE, NoValue
 from sqlalchemy import delete, null, or_, select
 
-from rucio.common.cache import MemcacheRegion
-from rucio.common.config import config_get_bool
+from rucio.common.cache import LocalCache, MemcacheRegion, TieredCacheRegion
+from rucio.common.config import config_get_bool, config_get_int
 from rucio.common.exception import CannotAuthenticate, RucioException
 from rucio.common.utils import chunks, date_to_str, generate_uuid
 from rucio.core.account import account_exists
+from rucio.core.monitor import MetricManager
 from rucio.core.oidc import validate_jwt
 from rucio.db.sqla import filter_thread_work, models
 from rucio.db.sqla.constants import IdentityType
 from rucio.db.sqla.session import read_session, transactional_session
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from sqlalchemy.orm import Session
 
     from rucio.common.types import InternalAccount, TokenDict, TokenValidationDict
@@ -83,9 +86,20 @@ def token_key_generator(namespace, fni, **kwargs):
 
 
 if config_get_bool('cache', 'use_external_cache_for_auth_tokens', default=False):
-    TOKENREGION = MemcacheRegion(expiration_time=900, function_key_generator=token_key_generator)
+    _TOKEN_SHARED_REGION = MemcacheRegion(expiration_time=900, function_key_generator=token_key_generator)
 else:
-    TOKENREGION = make_region(function_key_generator=token_key_generator).configure('dogpile.cache.memory', expiration_time=900)
+    _TOKEN_SHARED_REGION = make_region(function_key_generator=token_key_generator).configure('dogpile.cache.null')
+# The validated tokens are kept in a process-local tier, in front of memcached if it is used,
+# for at most the lifetime of each token. Invalid tokens are only kept in the local tier, for a short time.
+TOKENREGION = TieredCacheRegion(
+    region=_TOKEN_SHARED_REGION,
+    local=LocalCache(maxsize=config_get_int('cache', 'auth_token_local_size', raise_exception=False, default=10000, check_config_table=False),
+                     expiration_time=config_get_int('cache', 'auth_token_local_ttl', raise_exception=False, default=900, check_config_table=False)),
+    metrics=MetricManager(module=__name__),
+    name='token_cache',
+)
+INVALID_TOKEN_EXPIRATION_TIME = config_get_int('cache', 'auth_token_negative_ttl', raise_exception=False, default=10, check_config_table=False)
+_INVALID_TOKEN = object()
 
 
 @transactional_session
@@ -569,24 +583,42 @@ def validate_auth_token(token: str, *, session: "Session") -> "TokenValidationDi
 
     # Check if token can be found in cache region
     value: Union[NoValue, "TokenValidationDict"] = TOKENREGION.get(cache_key)
+    if value is _INVALID_TOKEN:
+        raise CannotAuthenticate("Token is invalid or expired.")
     if value is NO_VALUE:  # no cached entry found
-        value = query_token(token, session=session)
-        if not value:
-            # identify JWT access token and validate
-            # & save it in Rucio if scope and audience are correct
-            if len(token.split(".")) == 3:
-                value = validate_jwt(token, session=session)
-            else:
-                raise CannotAuthenticate(traceback.format_exc())
-        # save token in the cache
-        TOKENREGION.set(cache_key, value)
+        try:
+            value = query_token(token, session=session)
+            if not value:
+                # identify JWT access token and validate
+                # & save it in Rucio if scope and audience are correct
+                if len(token.split(".")) == 3:
+                    value = validate_jwt(token, session=session)
+                else:
+                    raise CannotAuthenticate(traceback.format_exc())
+        except CannotAuthenticate:
+            TOKENREGION.local.set(cache_key, _INVALID_TOKEN, expiration_time=INVALID_TOKEN_EXPIRATION_TIME)
+            raise
+        # save token in the cache, locally not longer than its lifetime
+        lifetime = value.get('lifetime', datetime.datetime(1970, 1, 1))  # type: ignore (value is narrowed to dict, but type-checker doesn't see it)
+        TOKENREGION.set(cache_key, value, local_expiration_time=min(TOKENREGION.local.expiration_time,
+                                                                    max((lifetime - datetime.datetime.utcnow()).total_seconds(), 0)))
     lifetime = value.get('lifetime', datetime.datetime(1970, 1, 1))  # type: ignore (value is narrowed to dict, but type-checker doesn't see it)
     if lifetime < datetime.datetime.utcnow():  # check if expired
         TOKENREGION.delete(cache_key)
+        TOKENREGION.local.set(cache_key, _INVALID_TOKEN, expiration_time=INVALID_TOKEN_EXPIRATION_TIME)
         raise CannotAuthenticate(f"Token found but expired since {date_to_str(lifetime)}.")
     return cast("TokenValidationDict", value)
 
 
+def invalidate_cached_tokens(tokens: "Sequence[str]") -> None:
+    """
+    Remove tokens from both tiers of the token cache, e.g. after they were deleted from the database.
+
+    :param tokens: Authentication tokens as variable-length strings.
+    """
+    TOKENREGION.delete_multi([token.strip().replace(' ', '') for token in tokens])
+
+
 def token_dictionary(token: models.Token) -> "TokenDict":
     return {'token': token.token, 'expires_at': token.expired_at}
 
@@ -618,3 +650,4 @@ def __delete_expired_tokens_account(account: "InternalAccount", *, session: "Ses
             models.Token.token.in_(chunk)
         )
         session.execute(delete_query)
+    invalidate_cached_tokens(tokens)
@@ -16,7 +16,7 @@ import datetime
 import hashlib
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy import and_, bindparam, delete, func, insert, select, update
 
 from rucio.common.exception import DatabaseException
 from rucio.common.utils import pid_exists
@@ -24,6 +24,7 @@ from rucio.db.sqla.models import Heartbeat
 from rucio.db.sqla.session import read_session, transactional_session
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from threading import Thread
     from typing import TypedDict
 
@@ -192,6 +193,117 @@ def live(
                   payload=payload).save(session=session)
 
     # assign thread identifier
+    result = _list_live_threads(hash_executable, older_than, session=session)
+
+    # there is no universally applicable rownumber in SQLAlchemy
+    # so we have to do it in Python
+    assign_thread = 0
+    for r in range(len(result)):
+        if result[r][0] == hostname and result[r][1] == pid and result[r][2] == thread_id:
+            assign_thread = r
+            break
+
+    return {'assign_thread': assign_thread,
+            'nr_threads': len(result)}
+
+
+@transactional_session
+def live_bulk(
+    executable: str,
+    hostname: str,
+    pid: int,
+    threads: "Sequence[tuple[Thread, Optional[str]]]",
+    older_than: int = 600,
+    hash_executable: Optional[str] = None,
+    *,
+    session: "Session"
+) -> dict[int, dict[str, int]]:
+    """
+    Register the heartbeats of several threads of a process on a given node.
+    Equivalent to calling live for each thread, but the heartbeats are upserted in bulk
+    and the assignments of all threads are computed from a single query.
+
+    :param executable: Executable name as a string, e.g., conveyor-submitter.
+    :param hostname: Hostname as a string, e.g., rucio-daemon-prod-01.cern.ch.
+    :param pid: UNIX Process ID as a number, e.g., 1234.
+    :param threads: List of (Python Thread Object, payload) tuples.
+    :param older_than: Ignore specified heartbeats older than specified nr of seconds.
+    :param hash_executable: Hash of the executable.
+    :param session: The database session in use.
+
+    :returns heartbeats: Dictionary {thread identifier: {assign_thread, nr_threads}}
+    """
+    if not hash_executable:
+        hash_executable = calc_hash(executable)
+
+    now = datetime.datetime.utcnow()
+    payloads = {thread.ident: (thread.name, payload) for thread, payload in threads}
+
+    stmt = select(
+        Heartbeat.thread_id
+    ).where(
+        and_(Heartbeat.executable == hash_executable,
+             Heartbeat.hostname == hostname,
+             Heartbeat.pid == pid)
+    )
+    existing_thread_ids = set(session.execute(stmt).scalars())
+
+    to_update, to_insert = [], []
+    for thread_id, (thread_name, payload) in payloads.items():
+        values = {'executable': hash_executable,
+                  'hostname': hostname,
+                  'pid': pid,
+                  'thread_id': thread_id,
+                  'updated_at': now,
+                  'payload': payload}
+        if thread_id in existing_thread_ids:
+            to_update.append(values)
+        else:
+            to_insert.append({**values,
+                              'readable': executable[:Heartbeat.readable.property.columns[0].type.length],
+                              'thread_name': thread_name,
+                              'created_at': now})
+    if to_update:
+        # Unlike an ORM bulk update, this ignores the heartbeats deleted concurrently (e.g. by sanity_check).
+        # They are inserted again at the next beat.
+        table = Heartbeat.__table__
+        stmt = update(
+            table
+        ).where(
+            and_(table.c.executable == bindparam('b_executable'),
+                 table.c.hostname == bindparam('b_hostname'),
+                 table.c.pid == bindparam('b_pid'),
+                 table.c.thread_id == bindparam('b_thread_id'))
+        ).values({
+            table.c.updated_at: bindparam('b_updated_at'),
+            table.c.payload: bindparam('b_payload'),
+        })
+        session.execute(stmt, [{'b_%s' % column: value for column, value in values.items()} for values in to_update])
+    if to_insert:
+        session.execute(insert(Heartbeat), to_insert)
+
+    result = _list_live_threads(hash_executable, older_than, session=session)
+    positions = {(row[0], row[1], row[2]): r for r, row in enumerate(result)}
+    return {thread_id: {'assign_thread': positions.get((hostname, pid, thread_id), 0),
+                        'nr_threads': len(result)}
+            for thread_id in payloads}
+
+
+def _list_live_threads(
+    hash_executable: str,
+    older_than: int,
+    *,
+    session: "Session"
+) -> list[tuple[str, int, int]]:
+    """
+    List the threads of an executable with a recent heartbeat, in the order used for the assignments.
+
+    :param hash_executable: Hash of the executable.
+    :param older_than: Ignore specified heartbeats older than specified nr of seconds.
+    :param session: The database session in use.
+
+    :returns: List of (hostname, pid, thread_id) tuples
+    """
     stmt = select(
         Heartbeat.hostname,
         Heartbeat.pid,
@@ -212,18 +324,7 @@ def live(
         Heartbeat.pid,
         Heartbeat.thread_id
     )
-    result = session.execute(stmt).all()
-
-    # there is no universally applicable rownumber in SQLAlchemy
-    # so we have to do it in Python
-    assign_thread = 0
-    for r in range(len(result)):
-        if result[r][0] == hostname and result[r][1] == pid and result[r][2] == thread_id:
-            assign_thread = r
-            break
-
-    return {'assign_thread': assign_thread,
-            'nr_threads': len(result)}
+    return session.execute(stmt).all()
 
 
 @transactional_session
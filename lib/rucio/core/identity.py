@@ -24,7 +24,7 @@ from rucio.common import exception
 from rucio.core.account import account_exists
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import IdentityType
-from rucio.db.sqla.session import read_session, transactional_session
+from rucio.db.sqla.session import after_commit, read_session, transactional_session
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -124,6 +124,7 @@ def del_identity(identity: str, type_: IdentityType, *, session: "Session") -> N
     if id_ is None:
         raise exception.IdentityError('Identity (\'%s\',\'%s\') does not exist!' % (identity, type_))
     id_.delete(session=session)
+    after_commit(session, _invalidate_permission_decisions)
 
 
 @transactional_session
@@ -167,6 +168,7 @@ def add_account_identity(
 
     try:
         iaa.save(session=session)
+        after_commit(session, _invalidate_permission_decisions)
     except IntegrityError as error:
         if match('.*IntegrityError.*ORA-00001: unique constraint.*violated.*', error.args[0]) \
                 or match('.*IntegrityError.*UNIQUE constraint failed.*', error.args[0]) \
@@ -261,6 +263,7 @@ def del_account_identity(identity: str, type_: IdentityType, account: "InternalA
     if aid is None:
         raise exception.IdentityError('Identity (\'%s\',\'%s\') does not exist!' % (identity, type_))
     aid.delete(session=session)
+    after_commit(session, _invalidate_permission_decisions)
 
 
 @read_session
@@ -299,3 +302,12 @@ def list_accounts_for_identity(identity: str, type_: IdentityType, *, session: "
         models.IdentityAccountAssociation.identity_type == type_
     )
     return session.execute(query).scalars().all()
+
+
+def _invalidate_permission_decisions() -> None:
+    """
+    Drop the permission decisions kept by the process, as the ones granting tokens depend on the identities.
+    """
+    from rucio.core.permission import invalidate_permission_cache  # circular import: the permission modules use this module
+
+    invalidate_permission_cache()
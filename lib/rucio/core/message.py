@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import json
+from datetime import datetime, timedelta
+from itertools import islice
 from typing import TYPE_CHECKING
 
 from sqlalchemy import delete, insert, or_, select, update
@@ -21,12 +23,14 @@ from sqlalchemy.exc import IntegrityError
 from rucio.common.config import config_get_list
 from rucio.common.constants import MAX_MESSAGE_LENGTH, HermesService
 from rucio.common.exception import InvalidObject, RucioException
-from rucio.common.utils import APIEncoder, chunks
+from rucio.common.extra import import_extras
+from rucio.common.utils import APIEncoder, chunks, generate_uuid
 from rucio.db.sqla import filter_thread_work
 from rucio.db.sqla.models import Message, MessageHistory
 from rucio.db.sqla.session import transactional_session
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from typing import Any, Optional
 
     from sqlalchemy.orm import Session
@@ -34,6 +38,32 @@ if TYPE_CHECKING:
     MessageType = dict[str, Any]
     MessagesListType = list[MessageType]
 
+EXTRA_MODULES = import_extras(['orjson'])
+
+
+def decode_payloads(payloads: "Sequence[str]") -> "list[Any]":
+    """
+    Decode a batch of JSON message payloads.
+
+    The payloads are joined into a single JSON array, decoded with orjson if it is installed.
+    If the batch cannot be decoded at once, the payloads are decoded one by one with json.
+
+    :param payloads: The JSON encoded payloads.
+    :returns: The decoded payloads, in the same order.
+    """
+    if not payloads:
+        return []
+    batch = '[%s]' % ','.join(payloads)
+    orjson = EXTRA_MODULES['orjson']
+    try:
+        decoded = orjson.loads(batch) if orjson else json.loads(batch)
+        if len(decoded) == len(payloads):
+            return decoded
+    except ValueError:
+        # e.g. NaN, which is not supported by orjson
+        pass
+    return [json.loads(payload) for payload in payloads]
+
 
 @transactional_session
 def add_messages(messages: "MessagesListType", *, session: "Session") -> None:
@@ -117,7 +147,6 @@ def retrieve_messages(bulk: int = 1000,
 
     :returns messages: List of dictionaries {id, created_at, event_type, payload, services}
     """
-    messages = []
     try:
         stmt_subquery = select(
             Message.id
@@ -148,6 +177,7 @@ def retrieve_messages(bulk: int = 1000,
             Message.created_at,
             Message.event_type,
             Message.payload,
+            Message.payload_nolimit,
             Message.services
         )
         if session.bind.dialect.name == 'mysql':
@@ -174,31 +204,175 @@ def retrieve_messages(bulk: int = 1000,
 
         # Step 3:
         # Assemble message object
-        for id_, created_at, event_type, payload, services in session.execute(stmt).all():
-            message = {'id': id_,
-                       'created_at': created_at,
-                       'event_type': event_type,
-                       'services': services}
-
-            # Only switch SQL context when necessary
-            if payload == 'nolimit':
-                nolimit_stmt = select(
-                    Message.payload_nolimit
+        messages = _build_messages(session.execute(stmt).all())
+
+        return messages
+
+    except IntegrityError as e:
+        raise RucioException(e.args)
+
+
+def _build_messages(rows: "Sequence[Any]") -> "MessagesListType":
+    """
+    Assemble the message objects from (id, created_at, event_type, payload, payload_nolimit, services) rows.
+    """
+    payloads = decode_payloads([str(payload_nolimit) if payload == 'nolimit' else str(payload)
+                                for _, _, _, payload, payload_nolimit, _ in rows])
+    return [{'id': id_,
+             'created_at': created_at,
+             'event_type': event_type,
+             'payload': payload,
+             'services': services}
+            for (id_, created_at, event_type, _, _, services), payload in zip(rows, payloads)]
+
+
+@transactional_session
+def claim_messages(bulk: int = 1000,
+                   lease_duration: int = 600,
+                   owner: "Optional[str]" = None,
+                   event_type: "Optional[str]" = None,
+                   old_mode: bool = True,
+                   service_filter: "Optional[str]" = None,
+                   *, session: "Session") -> "MessagesListType":
+    """
+    Claim up to $bulk messages by taking a lease on them.
+
+    Unlike retrieve_messages, the work is not partitioned between the callers: any number of
+    callers can claim messages concurrently, and a message is returned to a single caller until
+    its lease expires. The messages claimed by a caller which died are thus claimed again by the
+    others after lease_duration seconds. Processed messages must be deleted with delete_messages;
+    the other ones can be released with release_messages to be claimed again right away.
+
+    On PostgreSQL and Oracle, the messages are selected with FOR UPDATE SKIP LOCKED. On the other
+    databases, only the selected messages whose lease could still be taken are returned.
+
+    :param bulk: Number of messages as an integer.
+    :param lease_duration: Duration of the lease in seconds.
+    :param owner: Identifier of the caller, recorded in the lease together with a token unique to the call.
+    :param event_type: Return only specified event_type. If None, returns everything.
+    :param old_mode: If True, doesn't return email if event_type is None.
+    :param service_filter: When a service is supplied this queries the database for messages for that service.
+    :param session: The database session to use.
+
+    :returns messages: List of dictionaries {id, created_at, event_type, payload, services}
+    """
+    now = datetime.utcnow()
+    # Whole seconds: a DATETIME column without fractional seconds (MySQL) would round the stored value
+    lease_expires_at = (now + timedelta(seconds=lease_duration)).replace(microsecond=0)
+    # The claimed messages are read back by their lease owner, which must thus be unique to the call
+    lease_owner = '%s:%s' % (owner, generate_uuid()) if owner else generate_uuid()
+    claimable = or_(Message.lease_expires_at.is_(None),
+                    Message.lease_expires_at < now)
+
+    filters = [claimable]
+    if service_filter:
+        filters.append(Message.services == service_filter)
+    if event_type:
+        filters.append(Message.event_type == event_type)
+    elif old_mode:
+        filters.append(Message.event_type != 'email')
+
+    try:
+        if session.bind.dialect.name in ['oracle', 'postgresql']:
+            stmt = select(
+                Message.id,
+                Message.created_at,
+                Message.event_type,
+                Message.payload,
+                Message.payload_nolimit,
+                Message.services
+            ).where(
+                *filters
+            ).order_by(
+                Message.created_at
+            ).with_for_update(
+                skip_locked=True,
+                # oracle: we must specify a column, not a table; however, it doesn't matter which column, the lock is put on the whole row
+                # postgresql: sqlalchemy driver automatically converts it to a table name
+                of=Message.id
+            )
+            # Oracle doesn't allow a limit together with FOR UPDATE: only the fetched rows are locked there
+            if session.bind.dialect.name == 'postgresql':
+                stmt = stmt.limit(bulk)
+            rows = list(islice(session.execute(stmt.execution_options(yield_per=bulk)), bulk))
+            for ids in chunks([row[0] for row in rows], 1000):
+                stmt = update(
+                    Message
                 ).where(
-                    Message.id == id_
+                    Message.id.in_(ids)
+                ).values(
+                    lease_owner=lease_owner,
+                    lease_expires_at=lease_expires_at
+                ).execution_options(
+                    synchronize_session=False
                 )
-                message['payload'] = json.loads(str(session.execute(nolimit_stmt).scalar_one()))
-            else:
-                message['payload'] = json.loads(str(payload))
-
-            messages.append(message)
+                session.execute(stmt)
+            return _build_messages(rows)
 
-        return messages
+        stmt = select(
+            Message.id
+        ).where(
+            *filters
+        ).order_by(
+            Message.created_at
+        ).limit(
+            bulk
+        )
+        candidate_ids = session.execute(stmt).scalars().all()
+        # The candidates are not locked: only take the lease of the ones not claimed by another caller in the meantime
+        for ids in chunks(candidate_ids, 1000):
+            stmt = update(
+                Message
+            ).where(
+                Message.id.in_(ids),
+                claimable
+            ).values(
+                lease_owner=lease_owner,
+                lease_expires_at=lease_expires_at
+            ).execution_options(
+                synchronize_session=False
+            )
+            session.execute(stmt)
+        stmt = select(
+            Message.id,
+            Message.created_at,
+            Message.event_type,
+            Message.payload,
+            Message.payload_nolimit,
+            Message.services
+        ).where(
+            Message.lease_owner == lease_owner
+        ).order_by(
+            Message.created_at
+        )
+        return _build_messages(session.execute(stmt).all())
 
     except IntegrityError as e:
         raise RucioException(e.args)
 
 
+@transactional_session
+def release_messages(messages: "MessagesListType", *, session: "Session") -> None:
+    """
+    Release the lease of claimed messages, so that they can be claimed again right away.
+
+    :param messages: The messages to release as a list of dictionaries.
+    :param session: The database session to use.
+    """
+    for ids in chunks([message['id'] for message in messages], 1000):
+        stmt = update(
+            Message
+        ).where(
+            Message.id.in_(ids)
+        ).values(
+            lease_owner=None,
+            lease_expires_at=None
+        ).execution_options(
+            synchronize_session=False
+        )
+        session.execute(stmt)
+
+
 @transactional_session
 def delete_messages(messages: "MessagesListType", *, session: "Session") -> None:
     """
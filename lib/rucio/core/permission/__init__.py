@@ -15,16 +15,22 @@
 import importlib
 import logging
 from configparser import NoOptionError, NoSectionError
+from contextlib import contextmanager
+from contextvars import ContextVar
 from os import environ
 from typing import TYPE_CHECKING, Any
 
+from dogpile.cache.api import NO_VALUE
+
 import rucio.core.permission.generic
 from rucio.common import config, exception
+from rucio.common.cache import LocalCache
 from rucio.common.constants import DEFAULT_VO
 from rucio.common.plugins import check_policy_module_version
 from rucio.common.policy import get_policy
 
 if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator
     from typing import Optional
 
     from sqlalchemy.orm import Session
@@ -36,6 +42,12 @@ LOGGER = logging.getLogger('policy')
 # dictionary of permission modules for each VO
 permission_modules = {}
 
+# Decisions of the actions declared in the CACHEABLE_ACTIONS of the permission modules are kept
+# for the duration of the permission_cache context and, for a short time, for the whole process
+PROCESS_DECISIONS = LocalCache(maxsize=config.config_get_int('cache', 'permission_decisions_local_size', raise_exception=False, default=10000, check_config_table=False),
+                               expiration_time=config.config_get_int('cache', 'permission_decisions_local_ttl', raise_exception=False, default=30, check_config_table=False))
+_REQUEST_DECISIONS: "ContextVar[Optional[dict[Hashable, PermissionResult]]]" = ContextVar('permission_decisions', default=None)
+
 try:
     multivo = config.config_get_bool('common', 'multi_vo')
 except (NoOptionError, NoSectionError):
@@ -141,6 +153,46 @@ class PermissionResult:
         return self.allowed
 
 
+@contextmanager
+def permission_cache() -> "Iterator[None]":
+    """
+    Keep the decisions of the cacheable actions taken in this context, e.g. while serving a request,
+    so that bulk operations checking the same permission many times only evaluate it once.
+    """
+    token = _REQUEST_DECISIONS.set({})
+    try:
+        yield
+    finally:
+        _REQUEST_DECISIONS.reset(token)
+
+
+def invalidate_permission_cache() -> None:
+    """
+    Drop the decisions kept for the process, e.g. after account attributes or identities changed.
+    """
+    PROCESS_DECISIONS.invalidate()
+
+
+def _decision_key(
+        module: Any,
+        issuer: "InternalAccount",
+        action: str,
+        kwargs: dict[str, Any]
+) -> "Optional[Hashable]":
+    """
+    :returns: the cache key of the decision, or None if the action is not declared as cacheable by the permission module.
+    """
+    relevant_kwargs = getattr(module, 'CACHEABLE_ACTIONS', {}).get(action)
+    if relevant_kwargs is None:
+        return None
+    key = (issuer, action, tuple(kwargs.get(name) for name in relevant_kwargs))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 def has_permission(
         issuer: "InternalAccount",
         action: str,
@@ -150,6 +202,29 @@ def has_permission(
 ) -> PermissionResult:
     if issuer.vo not in permission_modules:
         load_permission_for_vo(issuer.vo)
+
+    key = _decision_key(permission_modules[issuer.vo], issuer, action, kwargs)
+    if key is not None:
+        request_decisions = _REQUEST_DECISIONS.get()
+        result = request_decisions.get(key) if request_decisions is not None else None
+        if result is None:
+            result = PROCESS_DECISIONS.get(key)
+            if result is NO_VALUE:
+                result = _has_permission(issuer, action, kwargs, session=session)
+                PROCESS_DECISIONS.set(key, result)
+            if request_decisions is not None:
+                request_decisions[key] = result
+        return result
+    return _has_permission(issuer, action, kwargs, session=session)
+
+
+def _has_permission(
+        issuer: "InternalAccount",
+        action: str,
+        kwargs: dict[str, Any],
+        *,
+        session: "Optional[Session]" = None
+) -> PermissionResult:
     try:
         result = permission_modules[issuer.vo].has_permission(issuer, action, kwargs, session=session)
     except TypeError:
@@ -31,6 +31,25 @@ if TYPE_CHECKING:
     from rucio.common.types import InternalAccount
 
 
+# Actions whose decision only depends on the issuer, on the listed kwargs and on slowly changing
+# state (account attributes, identities, scope owners). Their decisions are cached by has_permission.
+CACHEABLE_ACTIONS = {
+    'add_rule': ('account', 'locked'),
+    'get_auth_token_user_pass': ('account', 'username'),
+    'get_auth_token_gss': ('account', 'gsscred'),
+    'get_auth_token_x509': ('account', 'dn'),
+    'get_auth_token_saml': ('account', 'saml_nameid'),
+    'attach_dids': ('scope',),
+    'set_metadata': ('scope',),
+    'set_metadata_bulk': ('scope',),
+    'declare_bad_file_replicas': (),
+    'add_replicas': ('rse',),
+    'skip_availability_check': (),
+    'update_replicas_states': (),
+    'get_signed_url': (),
+}
+
+
 def has_permission(issuer: "InternalAccount", action: str, kwargs: dict[str, Any], *, session: "Optional[Session]" = None) -> bool:
     """
     Checks if an account has the specified permission to
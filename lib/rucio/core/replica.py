@@ -12,8 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
 import copy
 import heapq
+import json
 import logging
 import math
 import random
@@ -25,7 +27,6 @@ from itertools import groupby
 from json import dumps
 from re import match
 from struct import unpack
-from traceback import format_exc
 from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 
 import requests
@@ -69,6 +70,9 @@ if TYPE_CHECKING:
 REGION = MemcacheRegion(expiration_time=60)
 METRICS = MetricManager(module=__name__)
 
+# Number of files for which list_replicas builds the PFNs together
+LIST_REPLICAS_PFN_CHUNK_SIZE = 1000
+
 
 ScopeName = namedtuple('ScopeName', ['scope', 'name'])
 Association = namedtuple('Association', ['scope', 'name', 'child_scope', 'child_name'])
@@ -888,7 +892,8 @@ def _get_list_replicas_protocols(
         domain: str,
         schemes: Optional[list[str]],
         additional_schemes: "Iterable[str]",
-        session: "Session"
+        session: "Session",
+        logger: "LoggerFunction" = logging.log
 ) -> "list[tuple[str, RSEProtocol, int]]":
     """
     Select the protocols to be used by list_replicas to build the PFNs for all replicas on the given RSE
@@ -913,7 +918,7 @@ def _get_list_replicas_protocols(
         except exception.RSEProtocolNotSupported:
             pass  # no need to be verbose
         except Exception:
-            print(format_exc())
+            logger(logging.ERROR, 'Failed to select the read protocols of RSE %s', rse_id, exc_info=True)
 
     for s in additional_schemes:
         if s not in rse_schemes:
@@ -930,47 +935,46 @@ def _get_list_replicas_protocols(
         except exception.RSEProtocolNotSupported:
             pass  # no need to be verbose
         except Exception:
-            print(format_exc())
+            logger(logging.ERROR, 'Failed to create the %s protocol of RSE %s', s, rse_id, exc_info=True)
     return protocols
 
 
-def _build_list_replicas_pfn(
-        scope: "InternalScope",
-        name: str,
+def _build_list_replicas_pfns(
+        lfns: "Sequence[LFNDict]",
         rse_id: str,
         domain: str,
         protocol: "RSEProtocol",
-        path: str,
         sign_urls: bool,
         signature_lifetime: Optional[int],
         client_location: Optional[IPDict],
         logger: "LoggerFunction" = logging.log,
         *,
         session: "Session",
-) -> str:
+) -> dict[str, str]:
     """
-    Generate the PFN for the given scope/name on the rse.
-    If needed, sign the PFN url
-    If relevant, add the server-side root proxy to the pfn url
+    Generate the PFNs for a chunk of files on the rse, with one lfns2pfns call for the whole chunk.
+    If needed, sign the PFN urls
+    If relevant, add the server-side root proxy to the pfn urls
+
+    The RSE attributes and configuration values are looked up once per chunk.
+
+    :returns: dictionary {'scope:name': pfn}, with the external scope, as returned by lfns2pfns.
     """
-    lfn: LFNDict = {
-        'scope': scope.external,  # type: ignore (scope.external might be None)
-        'name': name,
-        'path': path
-    }
-    pfn: str = list(protocol.lfns2pfns(lfns=lfn).values())[0]
+    pfns = protocol.lfns2pfns(lfns=list(lfns))
+    scheme = protocol.attributes['scheme']
 
     # do we need to sign the URLs?
-    if sign_urls and protocol.attributes['scheme'] == 'https':
+    if sign_urls and scheme == 'https':
         service = get_rse_attribute(rse_id, RseAttr.SIGN_URL, session=session)
         if service:
-            pfn = get_signed_url(rse_id=rse_id, service=service, operation='read', url=pfn, lifetime=signature_lifetime)
+            pfns = {lfn: get_signed_url(rse_id=rse_id, service=service, operation='read', url=pfn, lifetime=signature_lifetime)
+                    for lfn, pfn in pfns.items()}
 
     # server side root proxy handling if location is set.
     # supports root and http destinations
     # cannot be pushed into protocols because we need to lookup rse attributes.
     # ultra-conservative implementation.
-    if domain == 'wan' and protocol.attributes['scheme'] in ['root', 'http', 'https'] and client_location:
+    if domain == 'wan' and scheme in ['root', 'http', 'https'] and client_location:
 
         if 'site' in client_location and client_location['site']:
             replica_site = get_rse_attribute(rse_id, RseAttr.SITE, session=session)
@@ -980,27 +984,26 @@ def _build_list_replicas_pfn(
             if client_location['site'] != replica_site:
                 cache_site = config_get('clientcachemap', client_location['site'], default='', session=session)
                 if cache_site != '':
-                    # print('client', client_location['site'], 'has cache:', cache_site)
-                    # print('filename', name)
-                    selected_prefix = get_multi_cache_prefix(cache_site, name)
-                    if selected_prefix:
-                        pfn = f"root://{selected_prefix}//{pfn.replace('davs://', 'root://')}"
+                    for lfn, pfn in pfns.items():
+                        selected_prefix = get_multi_cache_prefix(cache_site, lfn.split(':', 1)[1])
+                        if selected_prefix:
+                            pfns[lfn] = f"root://{selected_prefix}//{pfn.replace('davs://', 'root://')}"
                 else:
-                    # print('site:', client_location['site'], 'has no cache')
-                    # print('lets check if it has defined an internal root proxy ')
+                    # check if the site has defined an internal root proxy
                     root_proxy_internal = config_get('root-proxy-internal',    # section
                                                      client_location['site'],  # option
                                                      default='',               # empty string to circumvent exception
                                                      session=session)
 
                     if root_proxy_internal:
-                        # TODO: XCache does not seem to grab signed URLs. Doublecheck with XCache devs.
-                        #       For now -> skip prepending XCache for GCS.
-                        if 'storage.googleapis.com' in pfn or 'atlas-google-cloud.cern.ch' in pfn or 'amazonaws.com' in pfn:
-                            pass  # ATLAS HACK
-                        else:
-                            # don't forget to mangle gfal-style davs URL into generic https URL
-                            pfn = f"root://{root_proxy_internal}//{pfn.replace('davs://', 'https://')}"
+                        for lfn, pfn in pfns.items():
+                            # TODO: XCache does not seem to grab signed URLs. Doublecheck with XCache devs.
+                            #       For now -> skip prepending XCache for GCS.
+                            if 'storage.googleapis.com' in pfn or 'atlas-google-cloud.cern.ch' in pfn or 'amazonaws.com' in pfn:
+                                pass  # ATLAS HACK
+                            else:
+                                # don't forget to mangle gfal-style davs URL into generic https URL
+                                pfns[lfn] = f"root://{root_proxy_internal}//{pfn.replace('davs://', 'https://')}"
 
     simulate_multirange = get_rse_attribute(rse_id, RseAttr.SIMULATE_MULTIRANGE, session=session)
 
@@ -1014,9 +1017,40 @@ def _build_list_replicas_pfn(
         if simulate_multirange <= 0:
             logger(logging.WARNING, f'Value {simulate_multirange} encountered when retrieving RSE attribute "{RseAttr.SIMULATE_MULTIRANGE}" is <= 0, used default value "1".')
             simulate_multirange = 1
-        pfn += f'&#multirange=false&nconnections={simulate_multirange}'
+        suffix = f'&#multirange=false&nconnections={simulate_multirange}'
+        pfns = {lfn: pfn + suffix for lfn, pfn in pfns.items()}
 
-    return pfn
+    return pfns
+
+
+def _build_list_replicas_pfns_safe(
+        lfns: "Sequence[LFNDict]",
+        rse_id: str,
+        domain: str,
+        protocol: "RSEProtocol",
+        sign_urls: bool,
+        signature_lifetime: Optional[int],
+        client_location: Optional[IPDict],
+        logger: "LoggerFunction" = logging.log,
+        *,
+        session: "Session",
+) -> dict[str, str]:
+    """
+    Build the PFNs of a chunk of files with _build_list_replicas_pfns. If building the
+    chunk fails, retry file by file, so that a single faulty file only loses its own PFN.
+    """
+    kwargs = {'rse_id': rse_id, 'domain': domain, 'protocol': protocol, 'sign_urls': sign_urls,
+              'signature_lifetime': signature_lifetime, 'client_location': client_location, 'logger': logger}
+    try:
+        return _build_list_replicas_pfns(lfns=lfns, **kwargs, session=session)
+    except Exception:
+        if len(lfns) == 1:
+            logger(logging.ERROR, 'Failed to build the PFN of %s:%s on RSE %s', lfns[0]['scope'], lfns[0]['name'], rse_id, exc_info=True)
+            return {}
+    pfns = {}
+    for lfn in lfns:
+        pfns.update(_build_list_replicas_pfns_safe(lfns=[lfn], **kwargs, session=session))
+    return pfns
 
 
 def _list_replicas(
@@ -1047,136 +1081,143 @@ def _list_replicas(
             except Exception:
                 pass  # do not hard fail if site cannot be resolved or is empty
 
-    file, pfns_cache = {}, {}
     protocols_cache = defaultdict(dict)
 
-    for _, replica_group in groupby(replicas, key=lambda x: (x[0], x[1])):  # Group by scope/name
-        file = {}
-        pfns = {}
-        for scope, name, archive_scope, archive_name, bytes_, md5, adler32, path, state, rse_id, rse, rse_type, volatile in replica_group:
-            if isinstance(archive_scope, str):
-                archive_scope = InternalScope(archive_scope, from_external=False)
-
-            is_archive = bool(archive_scope and archive_name)
-
-            # it is the first row in the scope/name group
-            if not file:
-                file['scope'], file['name'] = scope, name
-                file['bytes'], file['md5'], file['adler32'] = bytes_, md5, adler32
-                file['pfns'], file['rses'], file['states'] = {}, {}, {}
-                if resolve_parents:
-                    file['parents'] = ['%s:%s' % (parent['scope'].internal, parent['name'])
-                                       for parent in rucio.core.did.list_all_parent_dids(scope, name, session=session)]
-
-            if not rse_id:
-                continue
-
-            rse_key = rse if by_rse_name else rse_id
-            file['states'][rse_key] = str(state.name if state else state)
+    # The files are processed in chunks: the PFNs of all the files of a chunk which share
+    # the same RSE, protocol and domain are built together with a single lfns2pfns call.
+    file_groups = (list(replica_group) for _, replica_group in groupby(replicas, key=lambda x: (x[0], x[1])))  # Group by scope/name
+    for chunk in chunks(file_groups, LIST_REPLICAS_PFN_CHUNK_SIZE):
+        files = []
+        lfns_by_protocol = defaultdict(dict)
+        for replica_group in chunk:
+            file = {}
+            file_pfns = []
+            for scope, name, archive_scope, archive_name, bytes_, md5, adler32, path, state, rse_id, rse, rse_type, volatile in replica_group:
+                if isinstance(archive_scope, str):
+                    archive_scope = InternalScope(archive_scope, from_external=False)
+
+                is_archive = bool(archive_scope and archive_name)
+
+                # it is the first row in the scope/name group
+                if not file:
+                    file['scope'], file['name'] = scope, name
+                    file['bytes'], file['md5'], file['adler32'] = bytes_, md5, adler32
+                    file['pfns'], file['rses'], file['states'] = {}, {}, {}
+                    if resolve_parents:
+                        file['parents'] = ['%s:%s' % (parent['scope'].internal, parent['name'])
+                                           for parent in rucio.core.did.list_all_parent_dids(scope, name, session=session)]
+
+                if not rse_id:
+                    continue
 
-            if not show_pfns:
-                continue
+                rse_key = rse if by_rse_name else rse_id
+                file['states'][rse_key] = str(state.name if state else state)
 
-            # It's the first time we see this RSE, initialize the protocols needed for PFN generation
-            protocols = protocols_cache.get(rse_id, {}).get(is_archive)
-            if not protocols:
-                # select the lan door in autoselect mode, otherwise use the wan door
-                domain = input_domain
-                if domain is None:
-                    domain = 'wan'
-                    if local_rses and rse_id in local_rses:
-                        domain = 'lan'
-
-                protocols = _get_list_replicas_protocols(
-                    rse_id=rse_id,
-                    domain=domain,
-                    schemes=schemes,
-                    # We want 'root' for archives even if it wasn't included into 'schemes'
-                    additional_schemes=['root'] if is_archive else [],
-                    session=session,
-                )
-                protocols_cache[rse_id][is_archive] = protocols
+                if not show_pfns:
+                    continue
 
-            # build the pfns
-            for domain, protocol, priority in protocols:
-                # If the current "replica" is a constituent inside an archive, we must construct the pfn for the
-                # parent (archive) file and append the xrdcl.unzip query string to it.
-                if is_archive:
-                    t_scope = archive_scope
-                    t_name = archive_name
-                else:
-                    t_scope = scope
-                    t_name = name
-
-                if 'determinism_type' in protocol.attributes:  # PFN is cacheable
-                    try:
-                        path = pfns_cache['%s:%s:%s' % (protocol.attributes['determinism_type'], t_scope.internal, t_name)]
-                    except KeyError:  # No cache entry scope:name found for this protocol
-                        path = protocol._get_path(t_scope, t_name)  # type: ignore (t_scope is InternalScope instead of str)
-                        pfns_cache['%s:%s:%s' % (protocol.attributes['determinism_type'], t_scope.internal, t_name)] = path
-
-                try:
-                    pfn = _build_list_replicas_pfn(
-                        scope=t_scope,
-                        name=t_name,
+                # It's the first time we see this RSE, initialize the protocols needed for PFN generation
+                protocols = protocols_cache.get(rse_id, {}).get(is_archive)
+                if not protocols:
+                    # select the lan door in autoselect mode, otherwise use the wan door
+                    domain = input_domain
+                    if domain is None:
+                        domain = 'wan'
+                        if local_rses and rse_id in local_rses:
+                            domain = 'lan'
+
+                    protocols = _get_list_replicas_protocols(
                         rse_id=rse_id,
                         domain=domain,
-                        protocol=protocol,
-                        path=path,
-                        sign_urls=sign_urls,
-                        signature_lifetime=signature_lifetime,
-                        client_location=client_location,
+                        schemes=schemes,
+                        # We want 'root' for archives even if it wasn't included into 'schemes'
+                        additional_schemes=['root'] if is_archive else [],
                         session=session,
                     )
+                    protocols_cache[rse_id][is_archive] = protocols
 
-                    client_extract = False
+                # register the pfns to build
+                for domain, protocol, priority in protocols:
+                    # If the current "replica" is a constituent inside an archive, we must construct the pfn for the
+                    # parent (archive) file and append the xrdcl.unzip query string to it.
                     if is_archive:
-                        domain = 'zip'
-                        pfn = add_url_query(pfn, {'xrdcl.unzip': name})
-                        if protocol.attributes['scheme'] == 'root':
-                            # xroot supports downloading files directly from inside an archive. Disable client_extract and prioritize xroot.
-                            client_extract = False
-                            priority = -1
-                        else:
-                            client_extract = True
-
-                    pfns[pfn] = {
-                        'rse_id': rse_id,
-                        'rse': rse,
-                        'type': str(rse_type.name),
-                        'volatile': volatile,
-                        'domain': domain,
-                        'priority': priority,
-                        'client_extract': client_extract
-                    }
-
-                except Exception:
-                    # never end up here
-                    print(format_exc())
-
-                if protocol.attributes['scheme'] == 'srm':
-                    try:
-                        file['space_token'] = protocol.attributes['extended_attributes']['space_token']
-                    except KeyError:
-                        file['space_token'] = None
-
-        # fill the 'pfns' and 'rses' dicts in file
-        if pfns:
-            # set the total order for the priority
-            # --> exploit that L(AN) comes before W(AN) before Z(IP) alphabetically
-            # and use 1-indexing to be compatible with metalink
-            sorted_pfns = sorted(pfns.items(), key=lambda item: (item[1]['domain'], item[1]['priority'], item[0]))
-            for i, (pfn, pfn_value) in enumerate(list(sorted_pfns), start=1):
-                pfn_value['priority'] = i
-                file['pfns'][pfn] = pfn_value
-
-            sorted_pfns = sorted(file['pfns'].items(), key=lambda item: (item[1]['rse_id'], item[1]['priority'], item[0]))
-            for pfn, pfn_value in sorted_pfns:
-                rse_key = pfn_value['rse'] if by_rse_name else pfn_value['rse_id']
-                file['rses'].setdefault(rse_key, []).append(pfn)
-
-        if file:
-            yield file
+                        t_scope = archive_scope
+                        t_name = archive_name
+                    else:
+                        t_scope = scope
+                        t_name = name
+
+                    lfn_key = '%s:%s' % (t_scope.external, t_name)
+                    lfns_by_protocol[rse_id, domain, protocol][lfn_key] = {'scope': t_scope.external, 'name': t_name, 'path': path}
+                    file_pfns.append((lfn_key, rse_id, rse, rse_type, volatile, domain, protocol, priority, is_archive))
+
+                    if protocol.attributes['scheme'] == 'srm':
+                        try:
+                            file['space_token'] = protocol.attributes['extended_attributes']['space_token']
+                        except KeyError:
+                            file['space_token'] = None
+
+            files.append((file, file_pfns))
+
+        # build the pfns of the whole chunk
+        pfns_by_protocol = {}
+        for (rse_id, domain, protocol), lfns in lfns_by_protocol.items():
+            pfns_by_protocol[rse_id, domain, protocol] = _build_list_replicas_pfns_safe(
+                lfns=list(lfns.values()),
+                rse_id=rse_id,
+                domain=domain,
+                protocol=protocol,
+                sign_urls=sign_urls,
+                signature_lifetime=signature_lifetime,
+                client_location=client_location,
+                session=session,
+            )
+
+        for file, file_pfns in files:
+            pfns = {}
+            for lfn_key, rse_id, rse, rse_type, volatile, domain, protocol, priority, is_archive in file_pfns:
+                pfn = pfns_by_protocol[rse_id, domain, protocol].get(lfn_key)
+                if pfn is None:
+                    continue
+
+                client_extract = False
+                if is_archive:
+                    domain = 'zip'
+                    pfn = add_url_query(pfn, {'xrdcl.unzip': file['name']})
+                    if protocol.attributes['scheme'] == 'root':
+                        # xroot supports downloading files directly from inside an archive. Disable client_extract and prioritize xroot.
+                        client_extract = False
+                        priority = -1
+                    else:
+                        client_extract = True
+
+                pfns[pfn] = {
+                    'rse_id': rse_id,
+                    'rse': rse,
+                    'type': str(rse_type.name),
+                    'volatile': volatile,
+                    'domain': domain,
+                    'priority': priority,
+                    'client_extract': client_extract
+                }
+
+            # fill the 'pfns' and 'rses' dicts in file
+            if pfns:
+                # set the total order for the priority
+                # --> exploit that L(AN) comes before W(AN) before Z(IP) alphabetically
+                # and use 1-indexing to be compatible with metalink
+                sorted_pfns = sorted(pfns.items(), key=lambda item: (item[1]['domain'], item[1]['priority'], item[0]))
+                for i, (pfn, pfn_value) in enumerate(list(sorted_pfns), start=1):
+                    pfn_value['priority'] = i
+                    file['pfns'][pfn] = pfn_value
+
+                sorted_pfns = sorted(file['pfns'].items(), key=lambda item: (item[1]['rse_id'], item[1]['priority'], item[0]))
+                for pfn, pfn_value in sorted_pfns:
+                    rse_key = pfn_value['rse'] if by_rse_name else pfn_value['rse_id']
+                    file['rses'].setdefault(rse_key, []).append(pfn)
+
+            if file:
+                yield file
 
     for scope, name, bytes_, md5, adler32 in _list_files_wo_replicas(files_wo_replica, session=session):
         yield {
@@ -1190,6 +1231,109 @@ def _list_replicas(
         }
 
 
+class ListReplicasCursor:
+    """
+    Keyset cursor for the paginated mode of list_replicas.
+
+    The cursor holds the (scope, name, rse_id) of the last replica returned by the previous
+    page. Pages always end on a complete file, so a file is never split between two pages.
+    list_replicas advances the cursor in place; `exhausted` is set once the last page was read.
+    """
+
+    def __init__(
+            self,
+            page_size: int,
+            scope: Optional[InternalScope] = None,
+            name: Optional[str] = None,
+            rse_id: Optional[str] = None,
+    ):
+        if page_size < 1:
+            raise exception.InvalidObject('The page size must be a positive integer')
+        self.page_size = page_size
+        self.scope = scope
+        self.name = name
+        self.rse_id = rse_id
+        self.exhausted = False
+
+    def to_token(self) -> str:
+        """
+        Serialize the position of the cursor into an opaque continuation token.
+        """
+        scope = self.scope.internal if isinstance(self.scope, InternalScope) else self.scope
+        payload = json.dumps([scope, self.name, self.rse_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @classmethod
+    def from_token(cls, token: str, page_size: int) -> "ListReplicasCursor":
+        """
+        Build a cursor from a continuation token returned by a previous page.
+
+        :raises InvalidObject: if the token cannot be decoded.
+        """
+        try:
+            scope, name, rse_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+            if not isinstance(scope, str) or not isinstance(name, str) or not isinstance(rse_id, (str, type(None))):
+                raise ValueError
+        except (ValueError, TypeError):
+            raise exception.InvalidObject('Invalid list_replicas continuation token')
+        return cls(page_size=page_size, scope=InternalScope(scope, from_external=False), name=name, rse_id=rse_id)
+
+
+def _list_replicas_page(
+        replica_sources: "Sequence[Select]",
+        cursor: ListReplicasCursor,
+        *,
+        session: "Session"
+) -> list["Row"]:
+    """
+    Fetch the next page of replica rows of the given sources and advance the cursor.
+
+    Each source is queried with a keyset condition on (scope, name, rse_id) and a limit of
+    page_size rows, which bounds both the memory and the lifetime of the database cursors.
+    The rows of the last file of the page are re-fetched entirely, so the page ends on a
+    complete file.
+    """
+
+    def _columns(stmt):
+        columns = stmt.selected_columns
+        return columns.scope, columns.name, columns.rse_id
+
+    def _after_cursor(stmt):
+        if cursor.scope is None:
+            return stmt
+        scope, name, rse_id = _columns(stmt)
+        after_name = name > cursor.name
+        if cursor.rse_id is not None:
+            after_name = or_(after_name, and_(name == cursor.name, rse_id > cursor.rse_id))
+        return stmt.where(or_(scope > cursor.scope, and_(scope == cursor.scope, after_name)))
+
+    page_size = cursor.page_size
+    results = []
+    for stmt in replica_sources:
+        scope, name, rse_id = _columns(stmt)
+        results.append(session.execute(_after_cursor(stmt).order_by(scope, name, rse_id).limit(page_size)).all())
+
+    rows = list(heapq.merge(*results, key=lambda row: (row.scope, row.name)))
+    if len(rows) <= page_size and all(len(result) < page_size for result in results):
+        cursor.exhausted = True
+        if rows:
+            cursor.scope, cursor.name = rows[-1].scope, rows[-1].name
+        return rows
+
+    rows = rows[:page_size]
+    last_scope, last_name = rows[-1].scope, rows[-1].name
+    rows = [row for row in rows if (row.scope, row.name) != (last_scope, last_name)]
+    last_file_rows = []
+    for stmt in replica_sources:
+        scope, name, _ = _columns(stmt)
+        last_file_rows.extend(session.execute(stmt.where(scope == last_scope, name == last_name)).all())
+    rows.extend(last_file_rows)
+
+    rse_ids = [row.rse_id for row in last_file_rows if row.rse_id is not None]
+    cursor.scope, cursor.name, cursor.rse_id = last_scope, last_name, max(rse_ids) if rse_ids else None
+    return rows
+
+
 @stream_session
 def list_replicas(
         dids: "Sequence[dict[str, Any]]",
@@ -1209,6 +1353,7 @@ def list_replicas(
         nrandom: Optional[int] = None,
         updated_after: Optional[datetime] = None,
         by_rse_name: bool = False,
+        cursor: Optional[ListReplicasCursor] = None,
         *, session: "Session",
 ) -> 'Iterator':
     """
@@ -1229,6 +1374,7 @@ def list_replicas(
     :param resolve_parents: When set to true, find all parent datasets which contain the replicas.
     :param updated_after: datetime (UTC time), only return replicas updated after this time
     :param by_rse_name: if True, rse information will be returned in dicts indexed by rse name; otherwise: in dicts indexed by rse id
+    :param cursor: If set, only return the next page of files after the cursor position, and advance the cursor.
     :param session: The database session in use.
     """
     # For historical reasons:
@@ -1447,6 +1593,12 @@ def list_replicas(
         num_files, num_collections, num_constituents = session.execute(stmt).one()  # returns None on empty input
         return num_files or 0, num_collections or 0, num_constituents or 0
 
+    if cursor:
+        if nrandom:
+            raise exception.InvalidObject('nrandom cannot be used together with a pagination cursor')
+        if cursor.exhausted:
+            return
+
     if dids:
         filter_ = {'vo': dids[0]['scope'].vo}
     else:
@@ -1454,6 +1606,8 @@ def list_replicas(
 
     dids = {(did['scope'], did['name']): did for did in dids}  # type: ignore (Deduplicate input)
     if not dids:
+        if cursor:
+            cursor.exhausted = True
         return
 
     input_dids_temp_table = temp_table_mngr(session).create_scope_name_table()
@@ -1485,6 +1639,14 @@ def list_replicas(
         )
 
     if not replica_sources:
+        if cursor:
+            cursor.exhausted = True
+        return
+
+    if cursor:
+        replica_tuples = _list_replicas_page(replica_sources, cursor, session=session)
+        yield from _list_replicas(replica_tuples, pfns, schemes, [], client_location, domain,  # type: ignore (replica_tuples, pending SQLA2.1: https://github.com/rucio/rucio/discussions/6615)
+                                  sign_urls, signature_lifetime, resolve_parents, filter_, by_rse_name, session=session)
         return
 
     # In the simple case that somebody calls list_replicas on big collections with nrandom set,
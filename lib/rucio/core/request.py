@@ -25,7 +25,7 @@ from collections import defaultdict, namedtuple
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Optional, Union
 
-from sqlalchemy import and_, delete, exists, insert, or_, select, update
+from sqlalchemy import and_, bindparam, delete, exists, insert, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import asc, false, func, null, true
@@ -36,7 +36,7 @@ from rucio.common.exception import InvalidRSEExpression, RequestNotFound, RucioE
 from rucio.common.types import FilterDict, InternalAccount, InternalScope, LoggerFunction, RequestDict
 from rucio.common.utils import chunks, generate_uuid
 from rucio.core.distance import get_distances
-from rucio.core.message import add_message, add_messages
+from rucio.core.message import add_messages
 from rucio.core.monitor import MetricManager
 from rucio.core.rse import RseCollection, RseData, get_rse_attribute, get_rse_name, get_rse_vo
 from rucio.core.rse_expression_parser import parse_expression
@@ -312,7 +312,7 @@ def queue_requests(
     """
     logger(logging.DEBUG, "queue requests")
 
-    request_clause = []
+    transfer_dids = set()
     rses = {}
     preparer_enabled = config_get_bool('conveyor', 'use_preparer', raise_exception=False, default=False)
     for req in requests:
@@ -323,34 +323,38 @@ def queue_requests(
                 req['attributes'] = json.loads(req['attributes'] or '{}')
 
         if req['request_type'] == RequestType.TRANSFER:
-            request_clause.append(and_(models.Request.scope == req['scope'],
-                                       models.Request.name == req['name'],
-                                       models.Request.dest_rse_id == req['dest_rse_id'],
-                                       models.Request.request_type == RequestType.TRANSFER))
+            transfer_dids.add((req['scope'], req['name']))
 
         if req['dest_rse_id'] not in rses:
             rses[req['dest_rse_id']] = get_rse_name(req['dest_rse_id'], session=session)
 
     # Check existing requests
-    existing_requests = []
-    if request_clause:
-        for requests_condition in chunks(request_clause, 1000):
-            stmt = select(
-                models.Request.scope,
-                models.Request.name,
-                models.Request.dest_rse_id
-            ).with_hint(
-                models.Request,
-                'INDEX(REQUESTS REQUESTS_SC_NA_RS_TY_UQ_IDX)',
-                'oracle'
-            ).where(
-                or_(*requests_condition)
-            )
-            existing_requests.extend(session.execute(stmt))
+    existing_requests = set()
+    if transfer_dids:
+        temp_table = temp_table_mngr(session).create_scope_name_table()
+        for chunk in chunks([{'scope': scope, 'name': name} for scope, name in transfer_dids], 10000):
+            session.execute(insert(temp_table), chunk)
+        stmt = select(
+            models.Request.scope,
+            models.Request.name,
+            models.Request.dest_rse_id
+        ).join_from(
+            temp_table,
+            models.Request,
+            and_(models.Request.scope == temp_table.scope,
+                 models.Request.name == temp_table.name)
+        ).with_hint(
+            models.Request,
+            'INDEX(REQUESTS REQUESTS_SC_NA_RS_TY_UQ_IDX)',
+            'oracle'
+        ).where(
+            models.Request.request_type == RequestType.TRANSFER
+        )
+        existing_requests.update((scope, name, dest_rse_id) for scope, name, dest_rse_id in session.execute(stmt))
 
     new_requests, sources, messages = [], [], []
     for request in requests:
-        dest_rse_name = get_rse_name(rse_id=request['dest_rse_id'], session=session)
+        dest_rse_name = rses[request['dest_rse_id']]
         if request['request_type'] == RequestType.TRANSFER and (request['scope'], request['name'], request['dest_rse_id']) in existing_requests:
             logger(logging.WARNING, 'Request TYPE %s for DID %s:%s at RSE %s exists - ignoring' % (request['request_type'],
                                                                                                    request['scope'],
@@ -1001,36 +1005,118 @@ def transition_request_state(
 
     # TODO: Should this be a private method?
 
-    if request is None:
-        request = get_request(request_id, session=session)
+    outcomes = transition_requests_state(
+        {
+            request_id: {
+                'state': state,
+                'external_id': external_id,
+                'transferred_at': transferred_at,
+                'started_at': started_at,
+                'staging_started_at': staging_started_at,
+                'staging_finished_at': staging_finished_at,
+                'source_rse_id': source_rse_id,
+                'err_msg': err_msg,
+                'attributes': attributes,
+            }
+        },
+        requests={request_id: request} if request is not None else None,
+        session=session,
+        logger=logger,
+    )
+    return outcomes[request_id]
 
-    if not request:
-        # The request was deleted in the meantime. Ignore it.
-        logger(logging.WARNING, "Request %s not found. Cannot set its state to %s", request_id, state)
-        return False
 
-    if request['state'] == state:
-        logger(logging.INFO, "Request %s state is already %s. Will skip the update.", request_id, state)
-        return False
+@METRICS.count_it
+@transactional_session
+def transition_requests_state(
+        transitions: "Mapping[str, Mapping[str, Any]]",
+        *,
+        requests: "Optional[Mapping[str, Optional[dict[str, Any]]]]" = None,
+        session: "Session",
+        logger: LoggerFunction = logging.log
+) -> dict[str, bool]:
+    """
+    Bulk version of transition_request_state: update the requests whose state changed.
+    The requests are written with one executemany UPDATE per set of updated columns. A request
+    deleted in the meantime is skipped with a warning, like a request which was not found.
 
-    if state in [RequestState.FAILED, RequestState.DONE, RequestState.LOST] and (request["external_id"] != external_id):
-        logger(logging.ERROR, "Request %s should not be updated to 'Failed' or 'Done' without external transfer_id" % request_id)
-        return False
+    :param transitions: Dictionary {request_id: fields}, fields being the keyword arguments of transition_request_state.
+    :param requests:    Optional dictionary {request_id: request} of already loaded requests. The other requests are loaded from the database.
+    :param session:     Database session to use.
+    :param logger:      Optional decorated logger that can be passed from the calling daemons or servers.
+    :returns:           Dictionary {request_id: boolean showing if the request was actually updated or not}.
+    """
 
-    update_request(
-        request_id=request_id,
-        state=state,
-        transferred_at=transferred_at,
-        started_at=started_at,
-        staging_started_at=staging_started_at,
-        staging_finished_at=staging_finished_at,
-        source_rse_id=source_rse_id,
-        err_msg=err_msg,
-        attributes=attributes,
-        raise_on_missing=True,
-        session=session,
-    )
-    return True
+    requests = dict(requests or {})
+    missing_request_ids = [request_id for request_id in transitions if requests.get(request_id) is None]
+    if missing_request_ids:
+        requests.update(get_requests(missing_request_ids, session=session))
+
+    outcomes = {}
+    rows = []
+    now = datetime.datetime.utcnow()
+    for request_id, fields in transitions.items():
+        outcomes[request_id] = False
+        request = requests.get(request_id)
+        state = fields.get('state')
+
+        if not request:
+            # The request was deleted in the meantime. Ignore it.
+            logger(logging.WARNING, "Request %s not found. Cannot set its state to %s", request_id, state)
+            continue
+
+        if request['state'] == state:
+            logger(logging.INFO, "Request %s state is already %s. Will skip the update.", request_id, state)
+            continue
+
+        if state in [RequestState.FAILED, RequestState.DONE, RequestState.LOST] and (request["external_id"] != fields.get('external_id')):
+            logger(logging.ERROR, "Request %s should not be updated to 'Failed' or 'Done' without external transfer_id" % request_id)
+            continue
+
+        row = {'id': request_id, 'updated_at': now}
+        for field in ('state', 'transferred_at', 'started_at', 'staging_started_at', 'staging_finished_at', 'source_rse_id', 'err_msg'):
+            if fields.get(field) is not None:
+                row[field] = fields[field]
+        if fields.get('attributes') is not None:
+            row['attributes'] = json.dumps(fields['attributes'])
+        rows.append(row)
+        outcomes[request_id] = True
+
+    if not rows:
+        return outcomes
+
+    # executemany needs the same parameters for all the rows: one statement per set of updated columns
+    rows_by_columns = {}
+    for row in rows:
+        rows_by_columns.setdefault(tuple(sorted(row)), []).append(row)
+
+    table = models.Request.__table__
+    rowcount = 0
+    try:
+        for columns, rows_to_update in rows_by_columns.items():
+            stmt = update(
+                table
+            ).where(
+                table.c.id == bindparam('b_id')
+            ).values({
+                column: bindparam('b_%s' % column) for column in columns if column != 'id'
+            })
+            result = session.execute(stmt, [{'b_%s' % column: value for column, value in row.items()} for row in rows_to_update])
+            rowcount += result.rowcount
+    except IntegrityError as error:
+        raise RucioException(error.args)
+
+    if not session.bind.dialect.supports_sane_multi_rowcount or rowcount != len(rows):
+        updated_ids = [row['id'] for row in rows]
+        existing_ids = set()
+        for chunk in chunks(updated_ids, 1000):
+            existing_ids.update(session.execute(select(models.Request.id).where(models.Request.id.in_(chunk))).scalars())
+        for request_id in updated_ids:
+            if request_id not in existing_ids:
+                # The request was deleted in the meantime. Ignore it.
+                logger(logging.WARNING, "Request %s not found. Cannot set its state to %s", request_id, transitions[request_id].get('state'))
+                outcomes[request_id] = False
+    return outcomes
 
 
 @METRICS.count_it
@@ -1061,6 +1147,43 @@ def transition_requests_state_if_possible(
         raise RucioException(error.args)
 
 
+@METRICS.count_it
+@transactional_session
+def touch_requests(
+    request_ids: "Iterable[str]",
+    *,
+    session: "Session"
+) -> set[str]:
+    """
+    Update the update time of requests.
+
+    :param request_ids:  Request-IDs as 32 character hex strings.
+    :param session:      Database session to use.
+    :returns:            The IDs of the requests which don't exist.
+    """
+
+    request_ids = set(request_ids)
+    rowcount = 0
+    try:
+        for chunk in chunks(list(request_ids), 1000):
+            stmt = update(
+                models.Request
+            ).where(
+                models.Request.id.in_(chunk)
+            ).execution_options(
+                synchronize_session=False
+            ).values({
+                models.Request.updated_at: datetime.datetime.utcnow()
+            })
+            rowcount += session.execute(stmt).rowcount
+    except IntegrityError as error:
+        raise RucioException(error.args)
+
+    if rowcount == len(request_ids):
+        return set()
+    return request_ids.difference(get_requests(request_ids, session=session))
+
+
 @METRICS.count_it
 @transactional_session
 def touch_requests_by_rule(
@@ -1127,6 +1250,37 @@ def get_request(
         raise RucioException(error.args)
 
 
+@read_session
+def get_requests(
+    request_ids: "Iterable[str]",
+    *,
+    session: "Session"
+) -> dict[str, dict[str, Any]]:
+    """
+    Retrieve requests by their IDs. Requests which don't exist are absent from the result.
+
+    :param request_ids:  Request-IDs as 32 character hex strings.
+    :param session:      Database session to use.
+    :returns:            Dictionary {request_id: request as a dictionary}.
+    """
+
+    requests = {}
+    try:
+        for chunk in chunks(list(request_ids), 1000):
+            stmt = select(
+                models.Request
+            ).where(
+                models.Request.id.in_(chunk)
+            )
+            for request in session.execute(stmt).scalars():
+                request = request.to_dict()
+                request['attributes'] = json.loads(str(request['attributes'] or '{}'))
+                requests[request['id']] = request
+    except IntegrityError as error:
+        raise RucioException(error.args)
+    return requests
+
+
 @METRICS.count_it
 @read_session
 def get_request_by_did(
@@ -2841,20 +2995,78 @@ def add_monitor_message(
     :param session:           The database session to use.
     """
 
+    add_monitor_messages([(new_state, request, additional_fields)], session=session)
+
+
+def add_monitor_messages(
+    messages: "Iterable[tuple[RequestState, RequestDict, Mapping[str, Any]]]",
+    *,
+    session: "Session"
+) -> None:
+    """
+    Create the messages for hermes of several requests and add them all at once.
+
+    :param messages: The (new_state, request, additional_fields) of each message, as taken by add_monitor_message.
+    :param session:  The database session to use.
+    """
+
+    messages = list(messages)
+    if not messages:
+        return
+
+    datatypes = get_did_datatypes(((request['scope'], request['name']) for _, request, _ in messages), session=session)
+    add_messages([
+        _monitor_message(new_state, request, additional_fields, datatype=datatypes.get((request['scope'], request['name'])), session=session)
+        for new_state, request, additional_fields in messages
+    ], session=session)
+
+
+@read_session
+def get_did_datatypes(
+    dids: "Iterable[tuple[InternalScope, str]]",
+    *,
+    session: "Session"
+) -> dict[tuple[InternalScope, str], Optional[str]]:
+    """
+    Retrieve the datatype of several DIDs, as included in the messages for hermes.
+
+    :param dids:     The (scope, name) of the DIDs.
+    :param session:  The database session to use.
+    :returns:        Dictionary {(scope, name): datatype}. DIDs which don't exist are absent from the result.
+    """
+
+    datatypes = {}
+    for chunk in chunks(list(set(dids)), 100):
+        stmt = select(
+            models.DataIdentifier.scope,
+            models.DataIdentifier.name,
+            models.DataIdentifier.datatype
+        ).where(
+            or_(*[and_(models.DataIdentifier.scope == scope,
+                       models.DataIdentifier.name == name) for scope, name in chunk])
+        )
+        datatypes.update(((scope, name), datatype) for scope, name, datatype in session.execute(stmt))
+    return datatypes
+
+
+def _monitor_message(
+    new_state: RequestState,
+    request: RequestDict,
+    additional_fields: "Mapping[str, Any]",
+    *,
+    datatype: Optional[str],
+    session: "Session"
+) -> dict[str, Any]:
+    """
+    Build the message for hermes of a request, as taken by add_messages.
+    """
+
     if request['request_type']:
         transfer_status = '%s-%s' % (request['request_type'].name, new_state.name)
     else:
         transfer_status = 'transfer-%s' % new_state.name
     transfer_status = transfer_status.lower()
 
-    stmt = select(
-        models.DataIdentifier.datatype
-    ).where(
-        and_(models.DataIdentifier.scope == request['scope'],
-             models.DataIdentifier.name == request['name'])
-    )
-    datatype = session.execute(stmt).scalar_one_or_none()
-
     # Start by filling up fields from database request or with defaults.
     message = {'activity': request.get('activity', None),
                'request-id': request['id'],
@@ -2924,7 +3136,7 @@ def add_monitor_message(
         field_value = message[time_field]
         message[time_field] = str(field_value) if field_value else None
 
-    add_message(transfer_status, message, session=session)
+    return {'event_type': transfer_status, 'payload': message}
 
 
 def get_transfer_error(
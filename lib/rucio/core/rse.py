@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import json
+import threading
 from datetime import datetime
 from io import StringIO
 from re import match
@@ -34,7 +35,7 @@ from rucio.common.utils import Availability
 from rucio.core.rse_counter import add_counter, get_counter
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import ReplicaState, RSEType
-from rucio.db.sqla.session import read_session, stream_session, transactional_session
+from rucio.db.sqla.session import after_commit, read_session, stream_session, transactional_session
 from rucio.db.sqla.util import temp_table_mngr
 
 if TYPE_CHECKING:
@@ -49,11 +50,41 @@ T = TypeVar('T', bound="RseData")
 RSE_SETTINGS = ["continent", "city", "region_code", "country_name", "time_zone", "ISP", "ASN"]
 REGION = MemcacheRegion(expiration_time=900)
 
+_RSE_STATE_VERSION = 0
+_RSE_STATE_VERSION_LOCK = threading.Lock()
+
+
+def get_rse_state_version() -> int:
+    """
+    Returns a process-local counter which is incremented every time this process
+    commits a modification of an RSE definition or its attributes. In-process caches derived from
+    RSE definitions (e.g. resolved RSE expressions) compare it to detect stale entries.
+    """
+    return _RSE_STATE_VERSION
+
+
+def _bump_rse_state_version() -> None:
+    global _RSE_STATE_VERSION
+    with _RSE_STATE_VERSION_LOCK:
+        _RSE_STATE_VERSION += 1
+
+
+def _invalidate_rse_info(rse_id: str) -> None:
+    """
+    Drop the cached rse_info of the RSE, in memcached and in the process-local tier of rsemanager.
+    """
+    from rucio.rse import rsemanager  # circular import
+
+    REGION.delete('rse_info_%s' % rse_id)
+    rsemanager.invalidate_rse_info(rse_id)
+
 
 class RseData:
     """
     Helper data class storing rse data grouped in one place.
     """
+    __slots__ = ('id', '_name', '_columns', '_attributes', '_info', '_usage', '_limits', '_transfer_limits', '__weakref__')
+
     def __init__(
             self,
             id_: str,
@@ -549,6 +580,7 @@ def del_rse(
     except sqlalchemy.orm.exc.NoResultFound:
         raise exception.RSENotFound('RSE with id \'%s\' cannot be found' % rse_id)
     db_rse.delete(session=session)
+    after_commit(session, _bump_rse_state_version)
     try:
         del_rse_attribute(rse_id=rse_id, key=rse_name, session=session)
     except exception.RSEAttributeNotFound:
@@ -581,6 +613,7 @@ def restore_rse(
     db_rse.deleted = False
     db_rse.deleted_at = None
     db_rse.save(session=session)
+    after_commit(session, _bump_rse_state_version)
     rse_name = db_rse.rse
     add_rse_attribute(rse_id=rse_id, key=rse_name, value=True, session=session)
 
@@ -868,6 +901,9 @@ def add_rse_attribute(
     except IntegrityError:
         rse = get_rse_name(rse_id=rse_id, session=session)
         raise exception.Duplicate(f"RSE attribute '{key}-{value}' for RSE '{rse}' already exists!")
+    after_commit(session, _bump_rse_state_version)
+    # attributes like lfn2pfn_algorithm or verify_checksum are part of the rse_info
+    after_commit(session, lambda: _invalidate_rse_info(rse_id))
     return True
 
 
@@ -898,6 +934,9 @@ def del_rse_attribute(
     except sqlalchemy.orm.exc.NoResultFound:
         raise exception.RSEAttributeNotFound('RSE attribute \'%s\' cannot be found' % key)
     rse_attr.delete(session=session)
+    after_commit(session, _bump_rse_state_version)
+    # attributes like lfn2pfn_algorithm or verify_checksum are part of the rse_info
+    after_commit(session, lambda: _invalidate_rse_info(rse_id))
     return True
 
 
@@ -1031,6 +1070,28 @@ def get_rses_with_attribute(
     return rse_list
 
 
+@read_session
+def list_rse_attribute_associations(*, session: "Session") -> list[tuple[str, str, Union[str, bool]]]:
+    """
+    Return the attributes of all the non-deleted RSEs in a single query.
+
+    :param session: The database session in use.
+
+    :returns: List of (rse_id, key, value) tuples
+    """
+    stmt = select(
+        models.RSEAttrAssociation.rse_id,
+        models.RSEAttrAssociation.key,
+        models.RSEAttrAssociation.value
+    ).join(
+        models.RSE,
+        models.RSE.id == models.RSEAttrAssociation.rse_id
+    ).where(
+        models.RSE.deleted == false()
+    )
+    return [(rse_id, key, value) for rse_id, key, value in session.execute(stmt)]
+
+
 @read_session
 def get_rses_with_attribute_value(
     key: str,
@@ -1509,6 +1570,7 @@ def add_protocol(
             raise exception.InvalidObject('Missing values!')
 
         raise exception.RucioException(error.args)
+    after_commit(session, lambda: _invalidate_rse_info(rse_id))
     return new_protocol
 
 
@@ -1720,6 +1782,7 @@ def update_protocols(
             msg = 'RSE \'%s\' does not support protocol \'%s\' for hostname \'%s\' on port \'%s\'' % (rse, scheme, hostname, port)
             raise exception.RSEProtocolNotSupported(msg)
         up.update(data, flush=True, session=session)
+        after_commit(session, lambda: _invalidate_rse_info(rse_id))
     except (IntegrityError, OperationalError) as error:
         if 'UNIQUE'.lower() in error.args[0].lower() or 'Duplicate' in error.args[0]:  # Covers SQLite, Oracle and MySQL error
             raise exception.Duplicate('Protocol \'%s\' on port %s already registered for  \'%s\' with hostname \'%s\'.' % (scheme, port, rse, hostname))
@@ -1779,6 +1842,7 @@ def del_protocols(
 
     for row in p:
         row.delete(session=session)
+    after_commit(session, lambda: _invalidate_rse_info(rse_id))
 
 
 MUTABLE_RSE_PROPERTIES = {
@@ -1856,6 +1920,8 @@ def update_rse(rse_id: str, parameters: dict[str, Any], *, session: "Session"):
         add_rse_attribute(rse_id, setting, param[setting], session=session)
 
     db_rse.update(param, session=session)
+    after_commit(session, _bump_rse_state_version)
+    after_commit(session, lambda: _invalidate_rse_info(rse_id))
     if 'rse' in param:
         add_rse_attribute(rse_id=rse_id, key=parameters['name'], value=True, session=session)
         del_rse_attribute(rse_id=rse_id, key=old_rse_name, session=session)
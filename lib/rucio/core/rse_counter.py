@@ -13,12 +13,14 @@
 # limitations under the License.
 from typing import TYPE_CHECKING
 
-from sqlalchemy import and_, delete, select
+from sqlalchemy import and_, delete, func, insert, select, update
 from sqlalchemy.exc import NoResultFound
 
-from rucio.common.exception import CounterNotFound
+from rucio.common.exception import CounterNotFound, DatabaseException
+from rucio.common.utils import chunks
 from rucio.db.sqla import filter_thread_work, models
 from rucio.db.sqla.session import read_session, transactional_session
+from rucio.db.sqla.util import delete_and_return, delta_accumulator, temp_table_mngr
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
@@ -46,8 +48,20 @@ def increase(rse_id, files, bytes_, *, session: "Session"):
     :param bytes_:   The number of added bytes.
     :param session: The database session in use.
     """
-    models.UpdatedRSECounter(rse_id=rse_id, files=files, bytes=bytes_).\
-        save(session=session)
+    delta_accumulator(session).add('updated_rse_counters', rse_id, files, bytes_, flush_fnc=_insert_updated_rse_counters)
+
+
+def _insert_updated_rse_counters(deltas, session: "Session"):
+    """
+    Insert one updated_rse_counters row per RSE for the deltas summed during the transaction.
+
+    :param deltas:  Dictionary {rse_id: [files, bytes]}.
+    :param session: The database session in use.
+    """
+    values = [{'rse_id': rse_id, 'files': files, 'bytes': bytes_}
+              for rse_id, (files, bytes_) in deltas.items() if files or bytes_]
+    if values:
+        session.execute(insert(models.UpdatedRSECounter), values)
 
 
 @transactional_session
@@ -124,6 +138,7 @@ def get_updated_rse_counters(total_workers, worker_number, *, session: "Session"
     :param session:            Database session in use.
     :returns:                  List of rse_ids whose rse_counters need to be updated.
     """
+    delta_accumulator(session).flush('updated_rse_counters')
     stmt = select(
         models.UpdatedRSECounter.rse_id
     ).distinct(
@@ -141,34 +156,113 @@ def update_rse_counter(rse_id, *, session: "Session"):
     :param rse_id:   The rse_id to update.
     :param session:  Database session in use.
     """
+    update_rse_counters([rse_id], session=session)
+
+
+@transactional_session
+def update_rse_counters(rse_ids, *, session: "Session") -> int:
+    """
+    Read the updated_rse_counters of several RSEs and update their rse_counters.
+
+    The pending rows are summed and deleted with set-based statements: their ids are
+    copied into a temporary table, summed per RSE with one grouped query and deleted
+    with one statement. Rows added by concurrent transactions in the meantime are
+    left for the next call.
+
+    :param rse_ids:  The rse_ids to update.
+    :param session:  Database session in use.
+    :returns:        The number of consumed updated_rse_counters rows.
+    """
+    delta_accumulator(session).flush('updated_rse_counters')
+
+    temp_table = temp_table_mngr(session).create_id_table()
+    for chunk in chunks(rse_ids, 1000):
+        stmt = insert(
+            temp_table
+        ).from_select(
+            ['id'],
+            select(
+                models.UpdatedRSECounter.id
+            ).where(
+                models.UpdatedRSECounter.rse_id.in_(chunk)
+            )
+        )
+        session.execute(stmt)
 
     stmt = select(
-        models.UpdatedRSECounter
-    ).where(
-        models.UpdatedRSECounter.rse_id == rse_id
+        models.UpdatedRSECounter.rse_id,
+        func.sum(models.UpdatedRSECounter.files),
+        func.sum(models.UpdatedRSECounter.bytes),
+        func.count()
+    ).join(
+        temp_table,
+        temp_table.id == models.UpdatedRSECounter.id
+    ).group_by(
+        models.UpdatedRSECounter.rse_id
     )
-    updated_rse_counters = session.execute(stmt).scalars().all()
-    sum_bytes = sum([updated_rse_counter.bytes for updated_rse_counter in updated_rse_counters])
-    sum_files = sum([updated_rse_counter.files for updated_rse_counter in updated_rse_counters])
-
-    try:
-        stmt = select(
+    nb_rows = 0
+    for rse_id, sum_files, sum_bytes, count in session.execute(stmt).all():
+        nb_rows += count
+        stmt = update(
             models.RSEUsage
         ).where(
             and_(models.RSEUsage.rse_id == rse_id,
                  models.RSEUsage.source == 'rucio')
+        ).values({
+            models.RSEUsage.used: func.coalesce(models.RSEUsage.used, 0) + sum_bytes,
+            models.RSEUsage.files: func.coalesce(models.RSEUsage.files, 0) + sum_files
+        }).execution_options(
+            synchronize_session=False
         )
-        rse_counter = session.execute(stmt).scalar_one()
-        rse_counter.used = (rse_counter.used or 0) + sum_bytes
-        rse_counter.files = (rse_counter.files or 0) + sum_files
-    except NoResultFound:
-        models.RSEUsage(rse_id=rse_id,
-                        used=sum_bytes,
-                        files=sum_files,
-                        source='rucio').save(session=session)
+        if not session.execute(stmt).rowcount:
+            models.RSEUsage(rse_id=rse_id,
+                            used=sum_bytes,
+                            files=sum_files,
+                            source='rucio').save(session=session)
+
+    stmt = delete(
+        models.UpdatedRSECounter
+    ).where(
+        models.UpdatedRSECounter.id.in_(select(temp_table.id))
+    ).execution_options(
+        synchronize_session=False
+    )
+    if session.execute(stmt).rowcount != nb_rows:
+        raise DatabaseException('updated_rse_counters rows were consumed by a concurrent transaction')
+    return nb_rows
+
 
-    for update in updated_rse_counters:
-        update.delete(flush=False, session=session)
+@transactional_session
+def collapse_updated_rse_counters(*, session: "Session") -> int:
+    """
+    Replace the updated_rse_counters rows of each RSE by a single row holding their sum.
+
+    Meant to shrink a backlog of rows, for example one accumulated before the deltas were
+    summed per transaction. Rows concurrently consumed by update_rse_counter make one of
+    the two transactions fail instead of being counted twice.
+
+    :param session:  Database session in use.
+    :returns:        The number of removed rows.
+    """
+    stmt = select(
+        models.UpdatedRSECounter.rse_id
+    ).group_by(
+        models.UpdatedRSECounter.rse_id
+    ).having(
+        func.count() > 1
+    )
+    removed = 0
+    for rse_id in session.execute(stmt).scalars().all():
+        rows = delete_and_return(models.UpdatedRSECounter,
+                                 models.UpdatedRSECounter.rse_id == rse_id,
+                                 models.UpdatedRSECounter.files,
+                                 models.UpdatedRSECounter.bytes,
+                                 session=session)
+        session.execute(insert(models.UpdatedRSECounter).values(rse_id=rse_id,
+                                                                files=sum(row.files for row in rows),
+                                                                bytes=sum(row.bytes for row in rows)))
+        removed += len(rows) - 1
+    return removed
 
 
 @transactional_session
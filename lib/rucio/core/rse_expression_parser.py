@@ -15,16 +15,20 @@
 import abc
 import re
 from hashlib import sha256
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Union
 
-from dogpile.cache.api import NoValue
+from dogpile.cache.api import NO_VALUE, NoValue
 
-from rucio.common.cache import MemcacheRegion
+from rucio.common.cache import LocalCache, MemcacheRegion
+from rucio.common.config import config_get
 from rucio.common.exception import InvalidRSEExpression, RSEWriteBlocked
-from rucio.core.rse import get_rse_attribute, get_rses_with_attribute, list_rses
-from rucio.db.sqla.session import transactional_session
+from rucio.core.rse import get_rse_attribute, get_rse_state_version, get_rses_with_attribute, list_rse_attribute_associations, list_rses
+from rucio.db.sqla import models
+from rucio.db.sqla.session import read_session, transactional_session
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     from sqlalchemy.orm import Session
 
 
@@ -37,7 +41,13 @@ COMPLEMENT = r'(\\%s)' % (PRIMITIVE)
 
 PATTERN = r'^%s(%s|%s|%s)*' % (PRIMITIVE, UNION, INTERSECTION, COMPLEMENT)
 
+COMPILED_PRIMITIVE = re.compile(PRIMITIVE)
+COMPILED_PATTERN = re.compile(PATTERN)
+
 REGION = MemcacheRegion(expiration_time=600)
+LOCAL_REGION = LocalCache(maxsize=10000, expiration_time=600)
+COMPILED_EXPRESSIONS = LocalCache(maxsize=10000)
+BITMAP_INDEX_REGION = LocalCache(maxsize=1, expiration_time=600)
 
 
 @transactional_session
@@ -45,40 +55,32 @@ def parse_expression(expression, filter_=None, *, session: "Session"):
     """
     Parse a RSE expression and return the list of RSE dictionaries.
 
+    Resolved expressions are cached in-process, tagged with the RSE state version of
+    :py:func:`rucio.core.rse.get_rse_state_version`, so that modifications of RSEs or
+    their attributes done by this process invalidate them. Memcached is used as second tier.
+
     :param expression:    RSE expression, e.g: 'CERN|BNL'.
     :param filter_:       Availability filter (dictionary) used for the RSEs. e.g.: {'availability_write': True}
     :param session:       Database session in use.
     :returns:             A list of rse dictionaries.
     :raises:              InvalidRSEExpression, RSENotFound, RSEWriteBlocked
     """
-    result = REGION.get(sha256(expression.encode()).hexdigest())
-    if type(result) is NoValue:
-        # Evaluate the correctness of the parentheses
-        parantheses_open_count = 0
-        parantheses_close_count = 0
-        for char in expression:
-            if (char == '('):
-                parantheses_open_count += 1
-            elif (char == ')'):
-                parantheses_close_count += 1
-            if (parantheses_close_count > parantheses_open_count):
-                raise InvalidRSEExpression('Problem with parentheses.')
-        if (parantheses_open_count != parantheses_close_count):
-            raise InvalidRSEExpression('Problem with parentheses.')
-
-        # Check the expression pattern
-        match = re.match(PATTERN, expression)
-        if match is None:
-            raise InvalidRSEExpression('Expression does not comply to RSE Expression syntax')
-        else:
-            if match.group() != expression:
-                raise InvalidRSEExpression('Expression does not comply to RSE Expression syntax')
-        result_tuple = __resolve_term_expression(expression)[0].resolve_elements(session=session)
-        # result_tuple = ([rse_ids], {rse_id: {rse_info}})
-        result = []
-        for rse in list(result_tuple[0]):
-            result.append(result_tuple[1][rse])
-        REGION.set(sha256(expression.encode()).hexdigest(), result)
+    # Read the version before resolving, so that a concurrent modification marks the new entry as stale
+    state_version = get_rse_state_version()
+    cached = LOCAL_REGION.get(expression)
+    if isinstance(cached, NoValue) or cached[0] != state_version:
+        result = NO_VALUE
+        if isinstance(cached, NoValue):
+            # Only trust memcached if this process did not see the RSEs change since it last resolved the expression
+            result = REGION.get(sha256(expression.encode()).hexdigest())
+        if isinstance(result, NoValue):
+            result = resolve_expression(expression, session=session)
+            REGION.set(sha256(expression.encode()).hexdigest(), result)
+        LOCAL_REGION.set(expression, (state_version, result))
+    else:
+        result = cached[1]
+    # The cached dictionaries are shared, never hand them out directly
+    result = [rse.copy() for rse in result]
 
     # Filter for VO
     vo_result = []
@@ -110,6 +112,93 @@ def parse_expression(expression, filter_=None, *, session: "Session"):
     return final_result
 
 
+@read_session
+def resolve_expression(expression, engine=None, index=None, *, session: "Session"):
+    """
+    Resolve a RSE expression without going through the caches.
+
+    :param expression:    RSE expression, e.g: 'CERN|BNL'.
+    :param engine:        'set' resolves every primitive with its own query and combines sets of RSE ids,
+                          'bitmap' combines precomputed bitmaps of a RSEBitmapIndex with bitwise operations.
+                          Defaults to the 'rse_expression_engine' option of the 'core' section, or 'set'.
+    :param index:         RSEBitmapIndex used by the bitmap engine. Defaults to the cached index of the current RSEs.
+    :param session:       Database session in use.
+    :returns:             A list of rse dictionaries.
+    :raises:              InvalidRSEExpression
+    """
+    if engine is None:
+        engine = config_get('core', 'rse_expression_engine', raise_exception=False, default='set', session=session)
+    compiled = __compile_expression(expression)
+    if engine == 'bitmap':
+        if index is None:
+            index = get_rse_bitmap_index(session=session)
+        return index.materialize(compiled.resolve_bitmap(index, session=session))
+    elif engine == 'set':
+        result_tuple = compiled.resolve_elements(session=session)
+        # result_tuple = ([rse_ids], {rse_id: {rse_info}})
+        result = []
+        for rse in list(result_tuple[0]):
+            result.append(result_tuple[1][rse])
+        return result
+    raise ValueError('Unknown RSE expression engine %s' % engine)
+
+
+@read_session
+def get_rse_bitmap_index(*, session: "Session"):
+    """
+    Return the RSEBitmapIndex of the current RSEs. The index is kept in-process and
+    rebuilt when the RSE state version changes or after 600 seconds.
+
+    :param session:       Database session in use.
+    :returns:             RSEBitmapIndex
+    """
+    state_version = get_rse_state_version()
+    cached = BITMAP_INDEX_REGION.get('rse_bitmap_index')
+    if not isinstance(cached, NoValue) and cached[0] == state_version:
+        return cached[1]
+    index = RSEBitmapIndex(list_rses(session=session), list_rse_attribute_associations(session=session))
+    BITMAP_INDEX_REGION.set('rse_bitmap_index', (state_version, index))
+    return index
+
+
+def __compile_expression(expression):
+    """
+    Validate a RSE expression and build its expression tree. Trees are cached by expression string.
+
+    :param expression:  RSE expression, e.g: 'CERN|BNL'.
+    :returns:           The root BaseExpressionElement of the expression.
+    :raises:            InvalidRSEExpression
+    """
+    compiled = COMPILED_EXPRESSIONS.get(expression)
+    if not isinstance(compiled, NoValue):
+        return compiled
+
+    # Evaluate the correctness of the parentheses
+    parantheses_open_count = 0
+    parantheses_close_count = 0
+    for char in expression:
+        if (char == '('):
+            parantheses_open_count += 1
+        elif (char == ')'):
+            parantheses_close_count += 1
+        if (parantheses_close_count > parantheses_open_count):
+            raise InvalidRSEExpression('Problem with parentheses.')
+    if (parantheses_open_count != parantheses_close_count):
+        raise InvalidRSEExpression('Problem with parentheses.')
+
+    # Check the expression pattern
+    match = COMPILED_PATTERN.match(expression)
+    if match is None:
+        raise InvalidRSEExpression('Expression does not comply to RSE Expression syntax')
+    else:
+        if match.group() != expression:
+            raise InvalidRSEExpression('Expression does not comply to RSE Expression syntax')
+
+    compiled = __resolve_term_expression(expression)[0]
+    COMPILED_EXPRESSIONS.set(expression, compiled)
+    return compiled
+
+
 def __resolve_term_expression(expression):
     """
     Resolves a Term Expression and returns an object of type BaseExpressionElement
@@ -172,7 +261,7 @@ def __resolve_primitive_expression(expression):
     :param expression:    String of the expression
     :returns:             Tuple of RSEAttribute, primitive expression
     """
-    primitiveexpression = re.match(PRIMITIVE, expression).group()
+    primitiveexpression = COMPILED_PRIMITIVE.match(expression).group()
     if ('=' in primitiveexpression):
         keyvalue = primitiveexpression.split("=")
         return (RSEAttributeEqualCheck(keyvalue[0], keyvalue[1]), primitiveexpression)
@@ -208,6 +297,88 @@ def __extract_term(expression):
     raise SystemError('This point in the code should not be reachable')
 
 
+def _normalize_attribute_value(value: Any) -> str:
+    """
+    Normalise an attribute value like the BooleanString column does when binding it,
+    so that the bitmap engine matches the same values as the SQL equality filter.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower()
+    return str(value)
+
+
+class RSEBitmapIndex:
+    """
+    Dense integer index over all the active RSEs, used by the bitmap engine.
+
+    Every RSE is given a bit position and a set of RSEs is represented by a Python int with
+    the corresponding bits set, so union, intersection and complement are single bitwise
+    operations. The bitmaps of all attribute=value pairs are precomputed when the index is built
+    and RSE dictionaries are only looked up once, for the final result.
+    """
+
+    def __init__(self, rses: "list[dict[str, Any]]", attributes: "Iterable[tuple[str, str, Union[str, bool]]]"):
+        """
+        Build the index.
+
+        :param rses:          List of RSE dictionaries, as returned by list_rses.
+        :param attributes:    Iterable of (rse_id, key, value) tuples.
+        """
+        self.rses = rses
+        self.positions = {rse['id']: position for position, rse in enumerate(rses)}
+        self.all = (1 << len(rses)) - 1
+        self.attribute_values: dict[str, list[tuple[int, Union[str, bool]]]] = {}
+
+        size = (len(rses) + 7) // 8
+        bits: dict[tuple[str, str], bytearray] = {}
+        for rse_id, key, value in attributes:
+            position = self.positions.get(rse_id)
+            if position is None:
+                continue
+            self.attribute_values.setdefault(key, []).append((position, value))
+            bitarray = bits.get((key, _normalize_attribute_value(value)))
+            if bitarray is None:
+                bitarray = bits[(key, _normalize_attribute_value(value))] = bytearray(size)
+            bitarray[position >> 3] |= 1 << (position & 7)
+        self.equal_bitmaps = {key_value: int.from_bytes(bitarray, 'little') for key_value, bitarray in bits.items()}
+
+    def bitmap_from_rses(self, rses: "Iterable[dict[str, Any]]") -> int:
+        """
+        Convert a list of RSE dictionaries into a bitmap.
+        """
+        bitmap = 0
+        for rse in rses:
+            position = self.positions.get(rse['id'])
+            if position is not None:
+                bitmap |= 1 << position
+        return bitmap
+
+    def equal(self, key: str, value: Union[str, bool]) -> int:
+        """
+        Bitmap of the RSEs having the attribute key=value.
+        """
+        return self.equal_bitmaps.get((key, _normalize_attribute_value(value)), 0)
+
+    def matching(self, key: str, predicate: "Callable[[Union[str, bool]], bool]") -> int:
+        """
+        Bitmap of the RSEs having the attribute key with a value for which predicate is true.
+        """
+        bitmap = 0
+        for position, value in self.attribute_values.get(key, []):
+            if predicate(value):
+                bitmap |= 1 << position
+        return bitmap
+
+    def materialize(self, bitmap: int) -> "list[dict[str, Any]]":
+        """
+        Convert a bitmap into the list of RSE dictionaries.
+        """
+        rses = self.rses
+        return [rses[position] for position, bit in enumerate(reversed(bin(bitmap)[2:])) if bit == '1']
+
+
 class BaseExpressionElement(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def resolve_elements(self, session):
@@ -220,6 +391,18 @@ class BaseExpressionElement(metaclass=abc.ABCMeta):
         """
         pass
 
+    @abc.abstractmethod
+    def resolve_bitmap(self, index, session):
+        """
+        Resolve the ExpressionElement and return the bitmap of the matching RSEs
+
+        :param index:    RSEBitmapIndex
+        :param session:  Database session in use
+        :returns:        Bitmap of the RSE positions in the index
+        :rtype:          Integer
+        """
+        pass
+
 
 class RSEAll(BaseExpressionElement):
     """
@@ -238,6 +421,12 @@ class RSEAll(BaseExpressionElement):
             rse_dict[rse['id']] = rse
         return (set([rse['id'] for rse in output]), rse_dict)
 
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        return index.all
+
 
 class RSEAttributeEqualCheck(BaseExpressionElement):
     """
@@ -266,6 +455,15 @@ class RSEAttributeEqualCheck(BaseExpressionElement):
             rse_dict[rse['id']] = rse
         return (set([rse['id'] for rse in output]), rse_dict)
 
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        if hasattr(models.RSE, self.key):
+            # RSE columns are filtered by list_rses, keep exactly the same semantics
+            return index.bitmap_from_rses(list_rses({self.key: self.value}, session=session))
+        return index.equal(self.key, self.value)
+
 
 class RSEAttributeSmallerCheck(BaseExpressionElement):
     """
@@ -301,6 +499,17 @@ class RSEAttributeSmallerCheck(BaseExpressionElement):
                 continue
         return (set(output), rse_dict)
 
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        def predicate(value):
+            try:
+                return float(value) < float(self.value)
+            except ValueError:
+                return False
+        return index.matching(self.key, predicate)
+
 
 class RSEAttributeLargerCheck(BaseExpressionElement):
     """
@@ -336,6 +545,17 @@ class RSEAttributeLargerCheck(BaseExpressionElement):
                 continue
         return (set(output), rse_dict)
 
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        def predicate(value):
+            try:
+                return float(value) > float(self.value)
+            except ValueError:
+                return False
+        return index.matching(self.key, predicate)
+
 
 class BaseRSEOperator(BaseExpressionElement, metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -390,6 +610,12 @@ class ComplementOperator(BaseRSEOperator):
         right_term_tuple = self.right_term.resolve_elements(session=session)
         return (left_term_tuple[0] - right_term_tuple[0], dict(list(left_term_tuple[1].items()) + list(right_term_tuple[1].items())))
 
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        return self.left_term.resolve_bitmap(index, session=session) & ~self.right_term.resolve_bitmap(index, session=session)
+
 
 class UnionOperator(BaseRSEOperator):
     """
@@ -424,6 +650,12 @@ class UnionOperator(BaseRSEOperator):
         right_term_tuple = self.right_term.resolve_elements(session=session)
         return (left_term_tuple[0] | right_term_tuple[0], dict(list(left_term_tuple[1].items()) + list(right_term_tuple[1].items())))
 
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        return self.left_term.resolve_bitmap(index, session=session) | self.right_term.resolve_bitmap(index, session=session)
+
 
 class IntersectOperator(BaseRSEOperator):
     """
@@ -457,3 +689,9 @@ class IntersectOperator(BaseRSEOperator):
         left_term_tuple = self.left_term.resolve_elements(session=session)
         right_term_tuple = self.right_term.resolve_elements(session=session)
         return (left_term_tuple[0] & right_term_tuple[0], dict(list(left_term_tuple[1].items()) + list(right_term_tuple[1].items())))
+
+    def resolve_bitmap(self, index, session):
+        """
+        Inherited from :py:func:`BaseExpressionElement.resolve_bitmap`
+        """
+        return self.left_term.resolve_bitmap(index, session=session) & self.right_term.resolve_bitmap(index, session=session)
@@ -23,7 +23,7 @@ from string import Template
 from typing import TYPE_CHECKING, Any, Literal, Optional, TypeVar, Union
 
 from dogpile.cache.api import NoValue
-from sqlalchemy import delete, desc, select, update
+from sqlalchemy import delete, desc, insert, select, update
 from sqlalchemy.exc import (
     IntegrityError,
     NoResultFound,  # https://pydoc.dev/sqlalchemy/latest/sqlalchemy.exc.NoResultFound.html
@@ -77,10 +77,11 @@ from rucio.core.monitor import MetricManager
 from rucio.core.rse import get_rse, get_rse_name, get_rse_usage, list_rse_attributes
 from rucio.core.rse_expression_parser import parse_expression
 from rucio.core.rse_selector import RSESelector
-from rucio.core.rule_grouping import apply_rule, apply_rule_grouping, create_transfer_dict, repair_stuck_locks_and_apply_rule_grouping
+from rucio.core.rule_grouping import apply_rule, apply_rule_grouping, create_transfer_dict, flush_locks_and_replicas, repair_stuck_locks_and_apply_rule_grouping
 from rucio.db.sqla import filter_thread_work, models
 from rucio.db.sqla.constants import OBSOLETE, BadFilesStatus, DIDAvailability, DIDReEvaluation, DIDType, LockState, ReplicaState, RequestType, RSEType, RuleGrouping, RuleNotification, RuleState
 from rucio.db.sqla.session import read_session, stream_session, transactional_session
+from rucio.db.sqla.util import temp_table_mngr
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterator, Sequence
@@ -3365,13 +3366,8 @@ def __find_stuck_locks_and_repair_them(
                                                                      rule=rule,
                                                                      source_rses=source_rses,
                                                                      session=session)
-    # Add the replicas
-    session.add_all([item for sublist in replicas_to_create.values() for item in sublist])
-    session.flush()
-
-    # Add the locks
-    session.add_all([item for sublist in locks_to_create.values() for item in sublist])
-    session.flush()
+    # Add the replicas and the locks
+    flush_locks_and_replicas(replicas_to_create=replicas_to_create, locks_to_create=locks_to_create, session=session)
 
     # Increase rse_counters
     for rse_id in replicas_to_create.keys():
@@ -3954,109 +3950,68 @@ def __resolve_dids_to_locks_and_replicas(
             source_replicas[(did.child_scope, did.child_name)] = []
         datasetfiles = [{'scope': dids[0].scope, 'name': dids[0].name, 'files': files}]
 
-        # Prepare the locks and files
-        lock_clauses = []
-        replica_clauses = []
-        for did in dids:
-            lock_clauses.append(and_(models.ReplicaLock.scope == did.child_scope,
-                                     models.ReplicaLock.name == did.child_name))
-            replica_clauses.append(and_(models.RSEFileAssociation.scope == did.child_scope,
-                                        models.RSEFileAssociation.name == did.child_name))
-        lock_clause_chunks = [lock_clauses[x:x + 10] for x in range(0, len(lock_clauses), 10)]
-        replica_clause_chunks = [replica_clauses[x:x + 10] for x in range(0, len(replica_clauses), 10)]
-
-        replicas_rse_clause = []
-        source_replicas_rse_clause = []
-        locks_rse_clause = []
-        if restrict_rses:
-            for rse_id in restrict_rses:
-                replicas_rse_clause.append(models.RSEFileAssociation.rse_id == rse_id)
-                locks_rse_clause.append(models.ReplicaLock.rse_id == rse_id)
-        if source_rses:
-            for rse_id in source_rses:
-                source_replicas_rse_clause.append(models.RSEFileAssociation.rse_id == rse_id)
+        # Load the locks and replicas of all files at once, by joining against a temporary table
+        temp_table = temp_table_mngr(session).create_scope_name_table()
+        values = [{'scope': did.child_scope, 'name': did.child_name} for did in dids]
+        for chunk in chunks(values, 10000):
+            session.execute(insert(temp_table), chunk)
 
-        for lock_clause_chunk in lock_clause_chunks:
-            if locks_rse_clause:
-                stmt = select(
-                    models.ReplicaLock
-                ).with_hint(
-                    models.ReplicaLock, 'INDEX(LOCKS LOCKS_PK)', 'oracle'
-                ).where(
-                    and_(or_(*lock_clause_chunk),
-                         or_(*locks_rse_clause))
-                ).with_for_update(
-                    nowait=nowait
-                )
-                tmp_locks = session.execute(stmt).scalars().all()
-            else:
-                stmt = select(
-                    models.ReplicaLock
-                ).with_hint(
-                    models.ReplicaLock, 'INDEX(LOCKS LOCKS_PK)', 'oracle'
-                ).where(
-                    or_(*lock_clause_chunk)
-                ).with_for_update(
-                    nowait=nowait
-                )
-                tmp_locks = session.execute(stmt).scalars().all()
-            for lock in tmp_locks:
-                if (lock.scope, lock.name) not in locks:
-                    locks[(lock.scope, lock.name)] = [lock]
-                else:
-                    locks[(lock.scope, lock.name)].append(lock)
+        stmt = select(
+            models.ReplicaLock
+        ).join_from(
+            temp_table,
+            models.ReplicaLock,
+            and_(models.ReplicaLock.scope == temp_table.scope,
+                 models.ReplicaLock.name == temp_table.name)
+        ).with_hint(
+            models.ReplicaLock, 'INDEX(LOCKS LOCKS_PK)', 'oracle'
+        ).with_for_update(
+            nowait=nowait,
+            of=models.ReplicaLock.scope,
+        )
+        if restrict_rses:
+            stmt = stmt.where(models.ReplicaLock.rse_id.in_(restrict_rses))
+        for lock in session.execute(stmt).scalars():
+            locks.setdefault((lock.scope, lock.name), []).append(lock)
 
-        for replica_clause_chunk in replica_clause_chunks:
-            if replicas_rse_clause:
-                stmt = select(
-                    models.RSEFileAssociation
-                ).with_hint(
-                    models.RSEFileAssociation, 'INDEX(REPLICAS REPLICAS_PK)', 'oracle'
-                ).where(
-                    and_(or_(*replica_clause_chunk),
-                         or_(*replicas_rse_clause),
-                         models.RSEFileAssociation.state != ReplicaState.BEING_DELETED)
-                ).with_for_update(
-                    nowait=nowait
-                )
-                tmp_replicas = session.execute(stmt).scalars().all()
-            else:
-                stmt = select(
-                    models.RSEFileAssociation
-                ).with_hint(
-                    models.RSEFileAssociation, 'INDEX(REPLICAS REPLICAS_PK)', 'oracle'
-                ).where(
-                    and_(or_(*replica_clause_chunk),
-                         models.RSEFileAssociation.state != ReplicaState.BEING_DELETED)
-                ).with_for_update(
-                    nowait=nowait
-                )
-                tmp_replicas = session.execute(stmt).scalars().all()
-            for replica in tmp_replicas:
-                if (replica.scope, replica.name) not in replicas:
-                    replicas[(replica.scope, replica.name)] = [replica]
-                else:
-                    replicas[(replica.scope, replica.name)].append(replica)
+        stmt = select(
+            models.RSEFileAssociation
+        ).join_from(
+            temp_table,
+            models.RSEFileAssociation,
+            and_(models.RSEFileAssociation.scope == temp_table.scope,
+                 models.RSEFileAssociation.name == temp_table.name)
+        ).with_hint(
+            models.RSEFileAssociation, 'INDEX(REPLICAS REPLICAS_PK)', 'oracle'
+        ).where(
+            models.RSEFileAssociation.state != ReplicaState.BEING_DELETED
+        ).with_for_update(
+            nowait=nowait,
+            of=models.RSEFileAssociation.scope,
+        )
+        if restrict_rses:
+            stmt = stmt.where(models.RSEFileAssociation.rse_id.in_(restrict_rses))
+        for replica in session.execute(stmt).scalars():
+            replicas.setdefault((replica.scope, replica.name), []).append(replica)
 
         if source_rses:
-            for replica_clause_chunk in replica_clause_chunks:
-                stmt = select(
-                    models.RSEFileAssociation.scope,
-                    models.RSEFileAssociation.name,
-                    models.RSEFileAssociation.rse_id
-                ).with_hint(
-                    models.RSEFileAssociation, 'INDEX(REPLICAS REPLICAS_PK)', 'oracle'
-                ).where(
-                    and_(or_(*replica_clause_chunk),
-                         or_(*source_replicas_rse_clause),
-                         models.RSEFileAssociation.state == ReplicaState.AVAILABLE)
-                )
-                tmp_source_replicas = session.execute(stmt).all()
-                for scope, name, rse_id in tmp_source_replicas:
-                    if (scope, name) not in source_replicas:
-                        source_replicas[(scope, name)] = [rse_id]
-                    else:
-                        source_replicas[(scope, name)].append(rse_id)
+            stmt = select(
+                models.RSEFileAssociation.scope,
+                models.RSEFileAssociation.name,
+                models.RSEFileAssociation.rse_id
+            ).join_from(
+                temp_table,
+                models.RSEFileAssociation,
+                and_(models.RSEFileAssociation.scope == temp_table.scope,
+                     models.RSEFileAssociation.name == temp_table.name)
+            ).with_hint(
+                models.RSEFileAssociation, 'INDEX(REPLICAS REPLICAS_PK)', 'oracle'
+            ).where(
+                and_(models.RSEFileAssociation.rse_id.in_(source_rses),
+                     models.RSEFileAssociation.state == ReplicaState.AVAILABLE)
+            )
+            for scope, name, rse_id in session.execute(stmt):
+                source_replicas.setdefault((scope, name), []).append(rse_id)
     else:
         # The evaluate_dids will be containers and/or datasets
         for did in dids:
@@ -4114,22 +4069,19 @@ def __create_locks_replicas_transfers(
     source_rses = source_rses or []
     logger(logging.DEBUG, "Creating locks and replicas for rule %s [%d/%d/%d]", str(rule.id), rule.locks_ok_cnt, rule.locks_replicating_cnt, rule.locks_stuck_cnt)
 
-    replicas_to_create, locks_to_create, transfers_to_create = apply_rule_grouping(datasetfiles=datasetfiles,
-                                                                                   locks=locks,
-                                                                                   replicas=replicas,
-                                                                                   source_replicas=source_replicas,
-                                                                                   rseselector=rseselector,
-                                                                                   rule=rule,
-                                                                                   preferred_rse_ids=preferred_rse_ids,
-                                                                                   source_rses=source_rses,
-                                                                                   session=session)
-    # Add the replicas
-    session.add_all([item for sublist in replicas_to_create.values() for item in sublist])
-    session.flush()
-
-    # Add the locks
-    session.add_all([item for sublist in locks_to_create.values() for item in sublist])
-    session.flush()
+    # The rule counters are modified for each created lock. Don't flush them after each query.
+    with session.no_autoflush:
+        replicas_to_create, locks_to_create, transfers_to_create = apply_rule_grouping(datasetfiles=datasetfiles,
+                                                                                       locks=locks,
+                                                                                       replicas=replicas,
+                                                                                       source_replicas=source_replicas,
+                                                                                       rseselector=rseselector,
+                                                                                       rule=rule,
+                                                                                       preferred_rse_ids=preferred_rse_ids,
+                                                                                       source_rses=source_rses,
+                                                                                       session=session)
+    # Add the replicas and the locks
+    flush_locks_and_replicas(replicas_to_create=replicas_to_create, locks_to_create=locks_to_create, session=session)
 
     # Increase rse_counters
     for rse_id in replicas_to_create.keys():
@@ -16,7 +16,7 @@ import logging
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, insert, select
 from sqlalchemy.exc import NoResultFound
 
 import rucio.core.did
@@ -33,14 +33,66 @@ from rucio.db.sqla.constants import OBSOLETE, DIDType, LockState, ReplicaState,
 from rucio.db.sqla.session import transactional_session
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Mapping, Sequence
 
     from sqlalchemy.orm import Session
 
-    from rucio.common.types import InternalScope
+    from rucio.common.types import InternalAccount, InternalScope
     from rucio.core.rse_selector import RSESelector
 
 
+class ReplicaLockRecord:
+    """
+    Lightweight stand-in for a new models.ReplicaLock, used by the grouping algorithms.
+
+    Datasets can have hundreds of thousands of files, so the new locks are kept as plain
+    records and only converted to database rows by flush_locks_and_replicas.
+    """
+    __slots__ = ('scope', 'name', 'rule_id', 'rse_id', 'account', 'bytes', 'state', 'repair_cnt', 'created_at', 'updated_at')
+
+    def __init__(self, scope: "InternalScope", name: str, rule_id: str, rse_id: str, account: "InternalAccount", bytes_: Optional[int], state: LockState) -> None:
+        self.scope = scope
+        self.name = name
+        self.rule_id = rule_id
+        self.rse_id = rse_id
+        self.account = account
+        self.bytes = bytes_
+        self.state = state
+        self.repair_cnt = None
+        # Set by the database on insert, like for a new (not yet flushed) models.ReplicaLock
+        self.created_at = None
+        self.updated_at = None
+
+
+def flush_locks_and_replicas(
+    replicas_to_create: "Mapping[str, Sequence[models.RSEFileAssociation]]",
+    locks_to_create: "Mapping[str, Sequence[ReplicaLockRecord]]",
+    *,
+    session: "Session"
+) -> None:
+    """
+    Write the replicas and locks returned by the grouping algorithms to the database.
+
+    :param replicas_to_create:  Dict of new replica objects indexed by rse_id.
+    :param locks_to_create:     Dict of new lock records indexed by rse_id.
+    :param session:             The db session in use.
+    """
+    session.add_all([item for sublist in replicas_to_create.values() for item in sublist])
+    # The rule and the replicas must be in the database before inserting the locks
+    session.flush()
+
+    values = [{'scope': lock.scope,
+               'name': lock.name,
+               'rule_id': lock.rule_id,
+               'rse_id': lock.rse_id,
+               'account': lock.account,
+               'bytes': lock.bytes,
+               'state': lock.state}
+              for sublist in locks_to_create.values() for lock in sublist]
+    if values:
+        session.execute(insert(models.ReplicaLock), values)
+
+
 @transactional_session
 def apply_rule_grouping(
     datasetfiles: "Sequence[dict[str, Any]]",
@@ -260,6 +312,7 @@ def __apply_rule_to_files_none_grouping(
     :attention:                This method modifies the contents of the locks and replicas input parameters.
     """
     locks_to_create = {}            # {'rse_id': [locks]}
+    rse_attributes_cache = {}       # {'rse_id': (staging_required, maximum_pin_lifetime)}
     replicas_to_create = {}         # {'rse_id': [replicas]}
     transfers_to_create = []        # [{'dest_rse_id':, 'scope':, 'name':, 'request_type':, 'metadata':}]
     preferred_rse_ids = preferred_rse_ids or []
@@ -299,6 +352,7 @@ def __apply_rule_to_files_none_grouping(
                                           replicas=replicas,
                                           source_replicas=source_replicas,
                                           transfers_to_create=transfers_to_create,
+                                          rse_attributes_cache=rse_attributes_cache,
                                           session=session)
                 selected_rse_ids.append(rse_tuple[0])
         if dataset['scope'] is not None:
@@ -362,6 +416,7 @@ def __apply_rule_to_files_all_grouping(
     """
 
     locks_to_create = {}            # {'rse_id': [locks]}
+    rse_attributes_cache = {}       # {'rse_id': (staging_required, maximum_pin_lifetime)}
     replicas_to_create = {}         # {'rse_id': [replicas]}
     transfers_to_create = []        # [{'dest_rse_id':, 'scope':, 'name':, 'request_type':, 'metadata':}]
     preferred_rse_ids = preferred_rse_ids or []
@@ -415,6 +470,7 @@ def __apply_rule_to_files_all_grouping(
                                           replicas=replicas,
                                           source_replicas=source_replicas,
                                           transfers_to_create=transfers_to_create,
+                                          rse_attributes_cache=rse_attributes_cache,
                                           session=session)
             # Add a DatasetLock to the DB
             if dataset['scope'] is not None:
@@ -512,6 +568,7 @@ def __apply_rule_to_files_dataset_grouping(
     :attention:                This method modifies the contents of the locks and replicas input parameters.
     """
     locks_to_create = {}            # {'rse_id': [locks]}
+    rse_attributes_cache = {}       # {'rse_id': (staging_required, maximum_pin_lifetime)}
     replicas_to_create = {}         # {'rse_id': [replicas]}
     transfers_to_create = []        # [{'dest_rse_id':, 'scope':, 'name':, 'request_type':, 'metadata':}]
     preferred_rse_ids = preferred_rse_ids or []
@@ -563,6 +620,7 @@ def __apply_rule_to_files_dataset_grouping(
                                           replicas=replicas,
                                           source_replicas=source_replicas,
                                           transfers_to_create=transfers_to_create,
+                                          rse_attributes_cache=rse_attributes_cache,
                                           session=session)
             # Add a DatasetLock to the DB
             if dataset['scope'] is not None:
@@ -649,6 +707,7 @@ def __repair_stuck_locks_with_none_grouping(datasetfiles, locks, replicas, sourc
     """
 
     locks_to_create = {}            # {'rse_id': [locks]}
+    rse_attributes_cache = {}       # {'rse_id': (staging_required, maximum_pin_lifetime)}
     replicas_to_create = {}         # {'rse_id': [replicas]}
     transfers_to_create = []        # [{'dest_rse_id':, 'scope':, 'name':, 'request_type':, 'metadata':}]
     locks_to_delete = {}            # {'rse_id': [locks]}
@@ -723,6 +782,7 @@ def __repair_stuck_locks_with_none_grouping(datasetfiles, locks, replicas, sourc
                                                       replicas=replicas,
                                                       source_replicas=source_replicas,
                                                       transfers_to_create=transfers_to_create,
+                                                      rse_attributes_cache=rse_attributes_cache,
                                                       session=session)
                             rule.locks_stuck_cnt -= 1
                             __set_replica_unavailable(replica=[replica for replica in replicas[(file['scope'], file['name'])] if replica.rse_id == lock.rse_id][0],
@@ -948,7 +1008,7 @@ def __is_retry_required(lock, activity):
 
 
 @transactional_session
-def __create_lock_and_replica(file, dataset, rule, rse_id, staging_area, availability_write, locks_to_create, locks, source_rses, replicas_to_create, replicas, source_replicas, transfers_to_create, *, session: "Session", logger=logging.log):
+def __create_lock_and_replica(file, dataset, rule, rse_id, staging_area, availability_write, locks_to_create, locks, source_rses, replicas_to_create, replicas, source_replicas, transfers_to_create, rse_attributes_cache=None, *, session: "Session", logger=logging.log):
     """
     This method creates a lock and if necessary a new replica and fills the corresponding dictionaries.
 
@@ -965,6 +1025,7 @@ def __create_lock_and_replica(file, dataset, rule, rse_id, staging_area, availab
     :param replicas:             Dictionary of the replicas.
     :param source_replicas:      Dictionary of the source replicas.
     :param transfers_to_create:  List of transfers to create.
+    :param rse_attributes_cache: Optional dictionary used to memoize the staging attributes of the RSEs across calls.
     :param session:              The db session in use.
     :param logger:               Optional decorated logger that can be passed from the calling daemons or servers.
     :returns:                    True, if the created lock is replicating, False otherwise.
@@ -993,8 +1054,13 @@ def __create_lock_and_replica(file, dataset, rule, rse_id, staging_area, availab
                                                         session=session))
 
     # If staging_required type RSE then set pin to RSE attribute maximum_pin_lifetime
-    staging_required = get_rse_attribute(rse_id, RseAttr.STAGING_REQUIRED, session=session)
-    maximum_pin_lifetime = get_rse_attribute(rse_id, RseAttr.MAXIMUM_PIN_LIFETIME, session=session)
+    if rse_attributes_cache is not None and rse_id in rse_attributes_cache:
+        staging_required, maximum_pin_lifetime = rse_attributes_cache[rse_id]
+    else:
+        staging_required = get_rse_attribute(rse_id, RseAttr.STAGING_REQUIRED, session=session)
+        maximum_pin_lifetime = get_rse_attribute(rse_id, RseAttr.MAXIMUM_PIN_LIFETIME, session=session)
+        if rse_attributes_cache is not None:
+            rse_attributes_cache[rse_id] = staging_required, maximum_pin_lifetime
 
     if staging_required:
         if (not copy_pin_lifetime and maximum_pin_lifetime) or (copy_pin_lifetime and maximum_pin_lifetime and copy_pin_lifetime < int(maximum_pin_lifetime)):
@@ -1150,7 +1216,7 @@ def __create_lock_and_replica(file, dataset, rule, rse_id, staging_area, availab
 
 def __create_lock(rule, rse_id, scope, name, bytes_, state, existing_replica, logger=logging.log):
     """
-    Create and return a new SQLAlchemy Lock object.
+    Create and return a new lock record.
 
     :param rule:              The SQLAlchemy rule object.
     :param rse_id:            The rse_id of the lock.
@@ -1162,13 +1228,13 @@ def __create_lock(rule, rse_id, scope, name, bytes_, state, existing_replica, lo
     :param logger:            Optional decorated logger that can be passed from the calling daemons or servers.
     """
 
-    new_lock = models.ReplicaLock(rule_id=rule.id,
-                                  rse_id=rse_id,
-                                  scope=scope,
-                                  name=name,
-                                  account=rule.account,
-                                  bytes=bytes_,
-                                  state=state)
+    new_lock = ReplicaLockRecord(rule_id=rule.id,
+                                 rse_id=rse_id,
+                                 scope=scope,
+                                 name=name,
+                                 account=rule.account,
+                                 bytes_=bytes_,
+                                 state=state)
     if state == LockState.OK:
         existing_replica.lock_cnt += 1
         existing_replica.tombstone = None
@@ -1335,6 +1401,7 @@ def apply_rule(did, rule, rses, source_rses, rseselector, *, session: "Session",
     rse_counters_bytes = {}
     account_counters_files = {}
     account_counters_bytes = {}
+    rse_attributes_cache = {}
 
     if did.did_type == DIDType.FILE:
         # NOTE: silently ignore rule.grouping
@@ -1389,6 +1456,7 @@ def apply_rule(did, rule, rses, source_rses, rseselector, *, session: "Session",
                                           rse_id=rse_id, staging_area=staging_area, availability_write=availability_write, source_rses=source_rses,
                                           replicas=replicas, locks=locks, source_replicas=source_replicas,
                                           locks_to_create=locks_to_create, replicas_to_create=replicas_to_create, transfers_to_create=transfers_to_create,
+                                          rse_attributes_cache=rse_attributes_cache,
                                           session=session)
 
             # prnt(locks_to_create, 'locks_to_create')
@@ -1396,8 +1464,7 @@ def apply_rule(did, rule, rses, source_rses, rseselector, *, session: "Session",
             # prnt(transfers_to_create, 'transfers_to_create')
 
             # flush to DB
-            session.add_all([item for sublist in replicas_to_create.values() for item in sublist])
-            session.add_all([item for sublist in locks_to_create.values() for item in sublist])
+            flush_locks_and_replicas(replicas_to_create=replicas_to_create, locks_to_create=locks_to_create, session=session)
             request_core.queue_requests(requests=transfers_to_create, session=session)
             session.flush()
 
@@ -1546,6 +1613,7 @@ def apply_rule(did, rule, rses, source_rses, rseselector, *, session: "Session",
                                                   rse_id=rse_id, staging_area=staging_area, availability_write=availability_write, source_rses=source_rses,
                                                   replicas=replicas, locks=locks, source_replicas=source_replicas,
                                                   locks_to_create=locks_to_create, replicas_to_create=replicas_to_create, transfers_to_create=transfers_to_create,
+                                                  rse_attributes_cache=rse_attributes_cache,
                                                   session=session)
 
                 # prnt(locks_to_create, 'locks_to_create')
@@ -1553,8 +1621,7 @@ def apply_rule(did, rule, rses, source_rses, rseselector, *, session: "Session",
                 # prnt(transfers_to_create, 'transfers_to_create')
 
                 # flush to DB
-                session.add_all([item for sublist in replicas_to_create.values() for item in sublist])
-                session.add_all([item for sublist in locks_to_create.values() for item in sublist])
+                flush_locks_and_replicas(replicas_to_create=replicas_to_create, locks_to_create=locks_to_create, session=session)
                 request_core.queue_requests(requests=transfers_to_create, session=session)
                 session.flush()
 
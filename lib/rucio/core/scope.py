@@ -23,7 +23,7 @@ from rucio.common.exception import AccountNotFound, Duplicate, RucioException, V
 from rucio.core.vo import vo_exists
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import AccountStatus, ScopeStatus
-from rucio.db.sqla.session import read_session, transactional_session
+from rucio.db.sqla.session import after_commit, read_session, transactional_session
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
@@ -68,6 +68,10 @@ def add_scope(scope, account, *, session: "Session"):
     except Exception:
         raise RucioException(str(format_exc()))
 
+    # the decisions of the permission modules depend on the scope owners
+    from rucio.core.permission import invalidate_permission_cache  # circular import: the permission modules use this module
+    after_commit(session, invalidate_permission_cache)
+
 
 @read_session
 def bulk_add_scopes(scopes, account, skip_existing=False, *, session: "Session"):
@@ -20,10 +20,12 @@ import weakref
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar, Union, cast
 
-from sqlalchemy import and_, select
+from dogpile.cache.api import NO_VALUE
+from sqlalchemy import and_, func, select
 
+from rucio.common.cache import LocalCache
 from rucio.common.config import config_get, config_get_int
-from rucio.common.exception import InvalidRSEExpression, NoDistance, RSEProtocolNotSupported
+from rucio.common.exception import InvalidRSEExpression, NoDistance, RSENotFound, RSEProtocolNotSupported
 from rucio.common.utils import PriorityQueue
 from rucio.core.rse import RseCollection, RseData
 from rucio.core.rse_expression_parser import parse_expression
@@ -37,7 +39,7 @@ TE = TypeVar("TE", bound="Edge")
 ExpiringObjectCacheNewObject = TypeVar("ExpiringObjectCacheNewObject")
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable, Iterator
+    from collections.abc import Callable, Iterable, Iterator, Sequence
     from typing import Protocol
 
     from sqlalchemy.orm import Session
@@ -59,10 +61,16 @@ if TYPE_CHECKING:
 
 
 DEFAULT_HOP_PENALTY = 10
+SHORTEST_PATHS_CACHE_SIZE = 1000
+# A row can be committed after rows with a later updated_at. Rows updated this long before
+# the high-water mark are fetched again by refresh() to not miss such late commits.
+REFRESH_OVERLAP = datetime.timedelta(minutes=5)
 INF = float('inf')
 
 
 class Node(RseData):
+    __slots__ = ('in_edges', 'out_edges', 'cost', 'enabled', 'used_for_multihop')
+
     def __init__(self, rse_id: str) -> None:
         super().__init__(rse_id)
 
@@ -75,6 +83,8 @@ class Node(RseData):
 
 
 class Edge(Generic[TN]):
+    __slots__ = ('_src_node', '_dst_node', 'cost', 'enabled')
+
     def __init__(self, src_node: TN, dst_node: TN) -> None:
         self._src_node = weakref.ref(src_node)
         self._dst_node = weakref.ref(dst_node)
@@ -117,6 +127,27 @@ class Edge(Generic[TN]):
         return f'{self._src_node}-->{self._dst_node}'
 
 
+class _ShortestPathsTree(Generic[TN]):
+    """
+    Shortest paths from every reachable node towards a destination node.
+
+    Only the result for visited_nodes is known: an absent path for any other node means
+    that it was never searched for. Cached trees are shared between threads and never
+    modified in-place.
+    """
+    __slots__ = ('paths', 'scheme_missmatch_found', 'visited_nodes')
+
+    def __init__(self, dst_node: TN) -> None:
+        self.paths: dict[TN, list[dict[str, Any]]] = {dst_node: []}
+        self.scheme_missmatch_found: set[TN] = set()
+        self.visited_nodes: set[TN] = set()
+
+    def update(self, other: "_ShortestPathsTree[TN]") -> None:
+        self.paths.update(other.paths)
+        self.scheme_missmatch_found.update(other.scheme_missmatch_found)
+        self.visited_nodes.update(other.visited_nodes)
+
+
 class Topology(RseCollection, Generic[TN, TE]):
     """
     Helper private class used to easily fetch topological information for a subset of RSEs.
@@ -136,6 +167,17 @@ class Topology(RseCollection, Generic[TN, TE]):
         self._hop_penalty = DEFAULT_HOP_PENALTY
         self.ignore_availability = ignore_availability
 
+        # High-water marks used by refresh() to only fetch what changed since the last (re-)load
+        self._distances_hwm: Optional[datetime.datetime] = None
+        self._node_tables_hwm: dict[str, tuple[Optional[datetime.datetime], dict[Optional[str], tuple[int, Optional[datetime.datetime]]]]] = {}
+        # Serializes refresh() calls. Kept separate from _lock to not block readers during database queries.
+        self._refresh_lock = threading.Lock()
+
+        # Shortest path trees indexed by destination and search parameters. Must be invalidated
+        # each time the graph changes.
+        self._shortest_paths_cache = LocalCache(maxsize=SHORTEST_PATHS_CACHE_SIZE)
+        self._shortest_paths_version = 0
+
         self._lock = threading.RLock()
 
     @transactional_session
@@ -198,7 +240,7 @@ class Topology(RseCollection, Generic[TN, TE]):
 
     def delete_edge(self, src_node: TN, dst_node: TN) -> None:
         with self._lock:
-            edge = self._edges[src_node, dst_node]
+            edge = self._edges.pop((src_node, dst_node))
             edge.remove_from_nodes()
 
     @property
@@ -224,6 +266,7 @@ class Topology(RseCollection, Generic[TN, TE]):
                 if not multihop_rse_ids:
                     logger(logging.WARNING, 'multihop_rse_expression is not empty, but returned no RSEs')
 
+        previous_config = set(self._multihop_nodes), self._hop_penalty
         for node in self._multihop_nodes:
             node.used_for_multihop = False
 
@@ -236,6 +279,8 @@ class Topology(RseCollection, Generic[TN, TE]):
                 self._multihop_nodes.add(node)
 
         self._hop_penalty = config_get_int('transfers', 'hop_penalty', default=DEFAULT_HOP_PENALTY, session=session)
+        if previous_config != (self._multihop_nodes, self._hop_penalty):
+            self._invalidate_shortest_paths()
         return self
 
     @read_session
@@ -260,18 +305,14 @@ class Topology(RseCollection, Generic[TN, TE]):
         )
 
         loaded_edges = set()
+        distances_hwm = None
         for distance in session.execute(stmt).scalars():
-            if distance.distance is None:
-                continue
-
-            src_node = self[distance.src_rse_id]
-            dst_node = self[distance.dest_rse_id]
-            edge = self.get_or_create_edge(src_node, dst_node)
-
-            sanitized_dist = int(distance.distance) if distance.distance >= 0 else 0
-            edge.cost = sanitized_dist
+            if distances_hwm is None or distance.updated_at > distances_hwm:
+                distances_hwm = distance.updated_at
 
-            loaded_edges.add((src_node, dst_node))
+            edge_key = self._apply_distance(distance)
+            if edge_key is not None:
+                loaded_edges.add(edge_key)
 
         if len(loaded_edges) != len(self._edges):
             # Remove edges which don't exist in the database anymore
@@ -279,7 +320,227 @@ class Topology(RseCollection, Generic[TN, TE]):
             for src_node, dst_node in to_remove:
                 self.delete_edge(src_node, dst_node)
 
+        self._distances_hwm = distances_hwm
         self._edges_loaded = True
+        self._invalidate_shortest_paths()
+
+    def _invalidate_shortest_paths(self) -> None:
+        with self._lock:
+            self._shortest_paths_cache.invalidate()
+            self._shortest_paths_version += 1
+
+    def _apply_distance(self, distance: models.Distance) -> "Optional[tuple[TN, TN]]":
+        """
+        Create, update or delete the edge corresponding to the given database row.
+        Returns the edge key if the edge exists in the graph after the operation.
+        """
+        src_node = self[distance.src_rse_id]
+        dst_node = self[distance.dest_rse_id]
+        if distance.distance is None:
+            if (src_node, dst_node) in self._edges:
+                self.delete_edge(src_node, dst_node)
+            return None
+
+        edge = self.get_or_create_edge(src_node, dst_node)
+        edge.cost = int(distance.distance) if distance.distance >= 0 else 0
+        return src_node, dst_node
+
+    @read_session
+    def refresh(self, *, session: "Session", logger: "LoggerFunction" = logging.log) -> "Self":
+        """
+        Bring an already populated topology up-to-date with the database.
+
+        Instead of re-building the whole graph, only the distances and RSEs updated since the previous
+        (re-)load are fetched and applied in-place. Row insertions and deletions cannot all be detected
+        using updated_at, so they are detected by comparing row counts with the previous refresh (per RSE
+        for the RSE tables). A difference in the distances falls back to a full reload of the edges. The
+        database is queried without holding the topology lock; it is only taken to apply the changes.
+        """
+        with self._refresh_lock:
+            nodes_changed = self._refresh_nodes(session=session, logger=logger)
+            edges_changed = self._refresh_edges(session=session, logger=logger)
+            if nodes_changed or edges_changed:
+                self._invalidate_shortest_paths()
+        return self
+
+    def _refresh_edges(self, *, session: "Session", logger: "LoggerFunction" = logging.log) -> bool:
+        if not self._edges_loaded:
+            # Nothing loaded yet, or a new node was added since. ensure_edges_loaded will do the work.
+            return False
+
+        if self._distances_hwm is None:
+            with self._lock:
+                self._ensure_edges_loaded(session=session)
+            return True
+
+        rse_ids = list(self.rse_id_to_data_map.keys())
+        stmt = select(
+            models.Distance
+        ).where(
+            and_(
+                models.Distance.src_rse_id.in_(rse_ids),
+                models.Distance.dest_rse_id.in_(rse_ids),
+                models.Distance.updated_at >= self._distances_hwm - REFRESH_OVERLAP,
+            )
+        )
+        distances = session.execute(stmt).scalars().all()
+
+        stmt = select(
+            func.count()
+        ).select_from(
+            models.Distance
+        ).where(
+            and_(
+                models.Distance.src_rse_id.in_(rse_ids),
+                models.Distance.dest_rse_id.in_(rse_ids),
+                models.Distance.distance.isnot(None),
+            )
+        )
+        db_nb_edges = session.execute(stmt).scalar_one()
+
+        with self._lock:
+            for distance in distances:
+                if distance.updated_at > self._distances_hwm:
+                    self._distances_hwm = distance.updated_at
+                self._apply_distance(distance)
+
+            # Once the updated rows are applied, an insertion shows up as an extra edge in the graph
+            # and a deletion as an extra row in the database.
+            if db_nb_edges != len(self._edges):
+                logger(logging.DEBUG, 'Distances were added or deleted in the database. Reloading all edges.')
+                self._ensure_edges_loaded(session=session)
+                return True
+
+        if distances:
+            logger(logging.DEBUG, 'Applied %d updated distance(s) to the topology', len(distances))
+        return bool(distances)
+
+    def _refresh_nodes(self, *, session: "Session", logger: "LoggerFunction" = logging.log) -> bool:
+        # The tables from which RseData is loaded, with the column holding the id of the RSE
+        tables = (
+            (models.RSE, models.RSE.id),
+            (models.RSEAttrAssociation, models.RSEAttrAssociation.rse_id),
+            (models.RSEProtocol, models.RSEProtocol.rse_id),
+            (models.RSEUsage, models.RSEUsage.rse_id),
+            (models.RSELimit, models.RSELimit.rse_id),
+            (models.RSETransferLimit, models.RSETransferLimit.rse_id),
+            # Not bound to an RSE: any change re-loads the transfer limits of all nodes
+            (models.TransferLimit, None),
+        )
+
+        changed_rse_ids = set()
+        transfer_limits_changed = False
+        reload_all = False
+        for table, rse_id_column in tables:
+            group_by = () if rse_id_column is None else (rse_id_column, )
+            stmt = select(
+                *group_by,
+                func.count(),
+                func.max(table.updated_at),
+            ).select_from(
+                table
+            ).group_by(
+                *group_by
+            )
+            rows_by_rse = {}
+            for *rse_id, nb_rows, max_updated_at in session.execute(stmt):
+                rows_by_rse[str(rse_id[0]) if rse_id else None] = nb_rows, max_updated_at
+            new_hwm = max((updated_at for _, updated_at in rows_by_rse.values() if updated_at is not None), default=None)
+
+            hwm, previous_rows_by_rse = self._node_tables_hwm.get(table.__tablename__, (None, None))
+            self._node_tables_hwm[table.__tablename__] = new_hwm, rows_by_rse
+            if previous_rows_by_rse is None:
+                # First refresh
+                reload_all = True
+                continue
+
+            # Rows were added, deleted, or updated with a newer updated_at
+            changed = {rse_id for rse_id in previous_rows_by_rse.keys() | rows_by_rse.keys()
+                       if previous_rows_by_rse.get(rse_id) != rows_by_rse.get(rse_id)}
+            if hwm is not None and rse_id_column is not None:
+                # Rows committed late, with an updated_at older than the newest row of their RSE
+                stmt = select(
+                    rse_id_column
+                ).where(
+                    table.updated_at >= hwm - REFRESH_OVERLAP
+                ).distinct()
+                changed.update(str(rse_id) for rse_id in session.execute(stmt).scalars())
+            elif hwm is not None:
+                stmt = select(
+                    func.count()
+                ).select_from(
+                    table
+                ).where(
+                    table.updated_at >= hwm - REFRESH_OVERLAP
+                )
+                if session.execute(stmt).scalar_one():
+                    changed.add(None)
+
+            if rse_id_column is None:
+                transfer_limits_changed = bool(changed)
+            else:
+                changed_rse_ids.update(changed)
+
+        if reload_all:
+            nodes = list(self.rse_id_to_data_map.values())
+        else:
+            nodes = [node for rse_id, node in self.rse_id_to_data_map.items() if rse_id in changed_rse_ids]
+        nb_reloaded = self._reload_nodes(nodes, session=session, logger=logger)
+        if transfer_limits_changed and not reload_all:
+            nb_reloaded += self._reload_nodes(
+                (node for rse_id, node in self.rse_id_to_data_map.items() if rse_id not in changed_rse_ids),
+                fields=('transfer_limits', ),
+                session=session,
+                logger=logger,
+            )
+        return nb_reloaded > 0
+
+    def _reload_nodes(
+            self,
+            nodes: "Iterable[TN]",
+            *,
+            fields: "Sequence[str]" = ('name', 'columns', 'attributes', 'info', 'usage', 'limits', 'transfer_limits'),
+            session: "Session",
+            logger: "LoggerFunction" = logging.log
+    ) -> int:
+        """
+        Re-fetch the already loaded fields of the given nodes. The new data is loaded into detached
+        objects and then swapped in, so that concurrent readers never observe a partially loaded node.
+        Returns the number of re-loaded nodes.
+        """
+        nodes_by_loaded_fields = {}
+        for node in nodes:
+            loaded_fields = tuple(f for f in fields if getattr(node, f'_{f}') is not None)
+            if loaded_fields:
+                nodes_by_loaded_fields.setdefault(loaded_fields, []).append(node)
+
+        nb_reloaded = 0
+        for loaded_fields, nodes_to_reload in nodes_by_loaded_fields.items():
+            fresh_data = {node.id: RseData(node.id) for node in nodes_to_reload}
+            # Transfer limits are not supported by the bulk load
+            bulk_fields = [f for f in loaded_fields if f != 'transfer_limits']
+            try:
+                if bulk_fields:
+                    RseData.bulk_load(
+                        rse_id_to_data=fresh_data,
+                        include_deleted=True,
+                        session=session,
+                        **{f'load_{f}': True for f in bulk_fields},
+                    )
+                if 'transfer_limits' in loaded_fields:
+                    for rse_data in fresh_data.values():
+                        rse_data.ensure_loaded(load_transfer_limits=True, session=session)
+            except RSENotFound as error:
+                # Keep the stale data. It will be dropped together with the whole topology object
+                logger(logging.WARNING, 'Failed to refresh topology nodes: %s', error)
+                continue
+            for node in nodes_to_reload:
+                for f in loaded_fields:
+                    setattr(node, f'_{f}', getattr(fresh_data[node.id], f'_{f}'))
+            nb_reloaded += len(nodes_to_reload)
+        if nb_reloaded:
+            logger(logging.DEBUG, 'Refreshed %d topology node(s)', nb_reloaded)
+        return nb_reloaded
 
     @read_session
     def search_shortest_paths(
@@ -295,17 +556,71 @@ class Topology(RseCollection, Generic[TN, TE]):
     ) -> dict[TN, list[dict[str, Any]]]:
         """
         Find the shortest paths from multiple sources towards dest_rse_id.
+
+        The reverse shortest-path tree rooted at the destination is cached and re-used by subsequent
+        calls towards the same destination, until the topology changes. The search stops as soon as
+        the paths of all the sources are known; if a later call needs other sources, the search is
+        re-run for them and the results are merged into the cached tree.
         """
 
         for rse in itertools.chain(src_nodes, [dst_node], self._multihop_nodes):
             rse.ensure_loaded(load_attributes=True, load_info=True, session=session)
         self.ensure_edges_loaded(session=session)
 
+        cache_version = self._shortest_paths_version
+        cache_key = (dst_node, operation_src, operation_dest, domain, tuple(limit_dest_schemes or ()))
         if self._multihop_nodes:
             # Filter out island source RSEs
             nodes_to_find = {node for node in src_nodes if node.out_edges}
+            # Source RSEs which are not enabled for multihop can still be traversed to reach other sources,
+            # so the tree depends on them. It doesn't depend on any other source.
+            nodes_to_traverse = frozenset(node for node in nodes_to_find if not node.used_for_multihop)
+            cache_key += (nodes_to_traverse, )
         else:
+            # Only direct connections to the destination are considered. Each source is independent of
+            # the other ones.
             nodes_to_find = set(src_nodes)
+            nodes_to_traverse = None
+
+        tree = self._shortest_paths_cache.get(cache_key)
+        if tree is NO_VALUE:
+            tree = _ShortestPathsTree(dst_node)
+        nodes_to_find.difference_update(tree.visited_nodes)
+        nodes_to_find.discard(dst_node)
+        if nodes_to_find:
+            new_tree = self._shortest_paths_tree(dst_node=dst_node, nodes_to_find=nodes_to_find,
+                                                 nodes_to_traverse=nodes_to_traverse,
+                                                 operation_src=operation_src, operation_dest=operation_dest,
+                                                 domain=domain, limit_dest_schemes=limit_dest_schemes)
+            new_tree.update(tree)
+            tree = new_tree
+            with self._lock:
+                if cache_version == self._shortest_paths_version:
+                    self._shortest_paths_cache.set(cache_key, tree)
+
+        result = {}
+        for node in src_nodes:
+            path = tree.paths.get(node)
+            if path is not None:
+                result[node] = path
+            elif node in tree.scheme_missmatch_found:
+                result[node] = []
+        return result
+
+    def _shortest_paths_tree(
+            self,
+            dst_node: TN,
+            nodes_to_find: set[TN],
+            nodes_to_traverse: Optional["Iterable[TN]"],
+            operation_src: str,
+            operation_dest: str,
+            domain: str,
+            limit_dest_schemes: list[str],
+    ) -> "_ShortestPathsTree[TN]":
+        """
+        Run the Dijkstra's algorithm towards dst_node until the shortest paths from all nodes_to_find
+        are known. Besides the multihop nodes, only nodes_to_traverse (nodes_to_find if None) are traversed.
+        """
 
         class _NodeStateProvider:
             _hop_penalty = self._hop_penalty
@@ -319,7 +634,7 @@ class Topology(RseCollection, Generic[TN, TE]):
                     except ValueError:
                         self.cost = self._hop_penalty
 
-        scheme_missmatch_found = {}
+        tree = _ShortestPathsTree(dst_node)
 
         class _EdgeStateProvider:
             def __init__(self, edge: TE) -> None:
@@ -349,12 +664,13 @@ class Topology(RseCollection, Generic[TN, TE]):
                     }
                     return True
                 except RSEProtocolNotSupported:
-                    scheme_missmatch_found[self.edge.src_node] = True
+                    tree.scheme_missmatch_found.add(self.edge.src_node)
                     return False
 
-        paths = {dst_node: []}
+        paths = tree.paths
+        remaining_nodes = set(nodes_to_find)
         for node, distance, _, edge_to_next_hop, edge_state in self.dijkstra_spf(dst_node=dst_node,
-                                                                                 nodes_to_find=nodes_to_find,
+                                                                                 nodes_to_find=set(nodes_to_traverse if nodes_to_traverse is not None else nodes_to_find),
                                                                                  node_state_provider=_NodeStateProvider,
                                                                                  edge_state_provider=_EdgeStateProvider):
             nh_node = edge_to_next_hop.dst_node
@@ -368,19 +684,14 @@ class Topology(RseCollection, Generic[TN, TE]):
             }
             paths[node] = [hop] + paths[nh_node]
 
-            nodes_to_find.discard(node)
-            if not nodes_to_find:
+            remaining_nodes.discard(node)
+            if not remaining_nodes:
                 # We found the shortest paths to all desired nodes
                 break
 
-        result = {}
-        for node in src_nodes:
-            path = paths.get(node)
-            if path is not None:
-                result[node] = path
-            elif scheme_missmatch_found.get(node):
-                result[node] = []
-        return result
+        # The nodes still remaining are unreachable, the search was exhausted
+        tree.visited_nodes.update(paths, nodes_to_find)
+        return tree
 
     def dijkstra_spf(
             self,
@@ -428,27 +739,46 @@ class ExpiringObjectCache(Generic[ExpiringObjectCacheNewObject]):
     """
     Thread-safe container which builds and object with the function passed in parameter and
     caches it for the TTL duration.
+
+    If refresh_fnc is given, it is called on the cached object every refresh_interval seconds
+    to update it in-place. The object is still fully re-built once the TTL expires.
     """
 
     def __init__(
             self,
             ttl: int,
-            new_obj_fnc: "Callable[[], ExpiringObjectCacheNewObject]"
+            new_obj_fnc: "Callable[[], ExpiringObjectCacheNewObject]",
+            refresh_interval: Optional[int] = None,
+            refresh_fnc: "Optional[Callable[[ExpiringObjectCacheNewObject], Any]]" = None,
     ) -> None:
         self._lock = threading.Lock()
         self._object: Optional[ExpiringObjectCacheNewObject] = None
         self._creation_time: Optional[datetime.datetime] = None
+        self._refresh_time: Optional[datetime.datetime] = None
         self._new_obj_fnc = new_obj_fnc
+        self._refresh_fnc = refresh_fnc
         self._ttl = ttl
+        self._refresh_interval = refresh_interval
 
     def get(self, logger: "LoggerFunction" = logging.log) -> ExpiringObjectCacheNewObject:
         with self._lock:
+            now = datetime.datetime.utcnow()
             if not self._object \
                     or not self._creation_time \
-                    or datetime.datetime.utcnow() - self._creation_time > datetime.timedelta(seconds=self._ttl):
+                    or now - self._creation_time > datetime.timedelta(seconds=self._ttl):
                 self._object = self._new_obj_fnc()
-                self._creation_time = datetime.datetime.utcnow()
+                if self._refresh_fnc:
+                    # Initialize the refresh state of the new object
+                    self._refresh_fnc(self._object)
+                self._creation_time = self._refresh_time = now
                 logger(logging.INFO, "Refreshed topology object")
+            elif self._refresh_fnc \
+                    and self._refresh_interval is not None \
+                    and self._refresh_time \
+                    and now - self._refresh_time > datetime.timedelta(seconds=self._refresh_interval):
+                self._refresh_fnc(self._object)
+                self._refresh_time = now
+                logger(logging.DEBUG, "Incrementally refreshed topology object")
             return self._object
 
 
@@ -24,12 +24,12 @@ from typing import TYPE_CHECKING, cast
 
 from dogpile.cache import make_region
 from dogpile.cache.api import NoValue
-from sqlalchemy import select, update
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 
 from rucio.common.config import config_get, config_get_list
 from rucio.common.constants import DEFAULT_VO, SUPPORTED_PROTOCOLS, RseAttr, TransferLimitDirection
-from rucio.common.exception import InvalidRSEExpression, RequestNotFound, RSEProtocolNotSupported, RucioException, UnsupportedOperation
+from rucio.common.exception import InvalidRSEExpression, RequestNotFound, RSEProtocolNotSupported, RucioException
 from rucio.common.utils import construct_non_deterministic_pfn, get_transfer_schemas
 from rucio.core import did
 from rucio.core import message as message_core
@@ -432,13 +432,18 @@ def set_transfers_state(
     logger(logging.INFO, 'Setting state(%s), transfertool(%s), external_host(%s) and eid(%s) for transfers: %s',
            state.name, transfertool, external_host, external_id, ', '.join(t.rws.request_id for t in transfers))
     try:
+        # The source is the only per-request value: update the requests with one statement per source RSE
+        request_ids_by_source = defaultdict(list)
         for transfer in transfers:
             rws = transfer.rws
             logger(logging.DEBUG, 'COPYING REQUEST %s DID %s:%s USING %s with state(%s) with eid(%s)' % (rws.request_id, rws.scope, rws.name, external_host, state, external_id))
+            request_ids_by_source[transfer.src.rse.id].append(rws.request_id)
+
+        for source_rse_id, request_ids in request_ids_by_source.items():
             stmt = update(
                 models.Request
             ).where(
-                models.Request.id == transfer.rws.request_id,
+                models.Request.id.in_(request_ids),
                 models.Request.state == RequestState.SUBMITTING
             ).execution_options(
                 synchronize_session=False
@@ -447,24 +452,21 @@ def set_transfers_state(
                     models.Request.state: state,
                     models.Request.external_id: external_id,
                     models.Request.external_host: external_host,
-                    models.Request.source_rse_id: transfer.src.rse.id,
+                    models.Request.source_rse_id: source_rse_id,
                     models.Request.submitted_at: submitted_at,
                     models.Request.transfertool: transfertool,
                 }
             )
             rowcount = session.execute(stmt).rowcount
 
-            if rowcount == 0:
-                raise RucioException("%s: failed to set transfer state: request doesn't exist or is not in SUBMITTING state" % rws)
+            if rowcount != len(request_ids):
+                raise RucioException("%s: failed to set transfer state: request doesn't exist or is not in SUBMITTING state" % ', '.join(request_ids))
 
-            stmt = select(
-                models.DataIdentifier.datatype
-            ).where(
-                models.DataIdentifier.scope == rws.scope,
-                models.DataIdentifier.name == rws.name,
-            )
-            datatype = session.execute(stmt).scalar_one_or_none()
+        datatypes = request_core.get_did_datatypes(((t.rws.scope, t.rws.name) for t in transfers), session=session)
 
+        messages = []
+        for transfer in transfers:
+            rws = transfer.rws
             msg = {'request-id': rws.request_id,
                    'request-type': rws.request_type,
                    'scope': rws.scope.external,
@@ -484,7 +486,7 @@ def set_transfers_state(
                    'external-id': external_id,
                    'external-host': external_host,
                    'queued_at': str(submitted_at),
-                   'datatype': datatype}
+                   'datatype': datatypes.get((rws.scope, rws.name))}
             if rws.scope.vo != DEFAULT_VO:
                 msg['vo'] = rws.scope.vo
 
@@ -501,7 +503,9 @@ def set_transfers_state(
                 transfer_status = 'transfer-%s' % msg['state']
             transfer_status = transfer_status.lower()
 
-            message_core.add_message(transfer_status, msg, session=session)
+            messages.append({'event_type': transfer_status, 'payload': msg})
+
+        message_core.add_messages(messages, session=session)
 
     except IntegrityError as error:
         raise RucioException(error.args)
@@ -527,26 +531,72 @@ def update_transfer_state(
     :returns:                     The number of updated requests
     """
 
-    request_id = tt_status_report.request_id
-    nb_updated = 0
-    try:
-        fields_to_update = tt_status_report.get_db_fields_to_update(session=session, logger=logger)
+    outcomes = update_transfers_state([tt_status_report], stats_manager, session=session, logger=logger)
+    return outcomes[tt_status_report.request_id]
+
+
+@METRICS.time_it
+@transactional_session
+def update_transfers_state(
+        tt_status_reports: 'Iterable[TransferStatusReport]',
+        stats_manager: request_core.TransferStatsManager,
+        *,
+        session: "Session",
+        logger=logging.log
+) -> dict[str, int]:
+    """
+    Bulk version of update_transfer_state. The state transitions of all the requests are applied
+    together, and their messages for hermes are added with a single insert.
+
+    :param tt_status_reports:     The transfertool status updates, retrieved via request.query_request().
+    :param session:               The database session to use.
+    :param logger:                Optional decorated logger that can be passed from the calling daemons or servers.
+    :returns:                     Dictionary {request_id: number of updated requests}.
+    :raises:                      Any error preventing the update of the requests. The transaction must then be
+                                  rolled back: the requests are partially updated.
+    """
+
+    outcomes = {}
+    reports_by_request_id = {}
+    fields_by_request_id = {}
+    request_ids_to_touch = []
+    for tt_status_report in tt_status_reports:
+        request_id = tt_status_report.request_id
+        outcomes[request_id] = 0
+        try:
+            fields_to_update = tt_status_report.get_db_fields_to_update(session=session, logger=logger)
+        except Exception:
+            logger(logging.CRITICAL, "Exception", exc_info=True)
+            continue
         if not fields_to_update:
-            request_core.update_request(request_id, raise_on_missing=True, session=session)
-            return False
+            request_ids_to_touch.append(request_id)
         else:
             logger(logging.INFO, 'UPDATING REQUEST %s FOR %s with changes: %s' % (str(request_id), tt_status_report, fields_to_update))
+            reports_by_request_id[request_id] = tt_status_report
+            fields_by_request_id[request_id] = fields_to_update
 
-            request = request_core.get_request(request_id, session=session)
-            updated = transition_request_state(request_id, request=request, session=session, **fields_to_update)
+    try:
+        if request_ids_to_touch:
+            for request_id in request_core.touch_requests(request_ids_to_touch, session=session):
+                logger(logging.WARNING, "Request %s doesn't exist - Error: Request %s state cannot be updated." % (request_id, request_id))
+
+        if not fields_by_request_id:
+            return outcomes
+
+        requests = request_core.get_requests(fields_by_request_id, session=session)
+        updated = request_core.transition_requests_state(fields_by_request_id, requests=requests, session=session, logger=logger)
 
-            if not updated:
-                return nb_updated
-            nb_updated += 1
+        messages = []
+        for request_id, tt_status_report in reports_by_request_id.items():
+            if not updated[request_id]:
+                continue
+            request = requests[request_id]
+            fields_to_update = fields_by_request_id[request_id]
+            outcomes[request_id] += 1
 
             if tt_status_report.state == RequestState.FAILED:
                 if request_core.is_intermediate_hop(request):
-                    nb_updated += request_core.handle_failed_intermediate_hop(request, session=session)
+                    outcomes[request_id] += request_core.handle_failed_intermediate_hop(request, session=session)
 
             if tt_status_report.state:
                 stats_manager.observe(
@@ -560,18 +610,12 @@ def update_transfer_state(
                     transferred_at=fields_to_update.get('transferred_at', None),
                     session=session,
                 )
-            request_core.add_monitor_message(
-                new_state=tt_status_report.state,
-                request=request,
-                additional_fields=tt_status_report.get_monitor_msg_fields(session=session, logger=logger),
-                session=session
-            )
-            return nb_updated
-    except UnsupportedOperation as error:
-        logger(logging.WARNING, "Request %s doesn't exist - Error: %s" % (request_id, str(error).replace('\n', '')))
-        return 0
+            messages.append((tt_status_report.state, request, tt_status_report.get_monitor_msg_fields(session=session, logger=logger)))
+        request_core.add_monitor_messages(messages, session=session)
     except Exception:
         logger(logging.CRITICAL, "Exception", exc_info=True)
+        raise
+    return outcomes
 
 
 @transactional_session
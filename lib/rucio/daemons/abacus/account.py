@@ -16,6 +16,7 @@
 Abacus-Account is a daemon to update Account counters.
 """
 
+import functools
 import logging
 import threading
 import time
@@ -24,21 +25,24 @@ from typing import TYPE_CHECKING
 import rucio.db.sqla.util
 from rucio.common import exception
 from rucio.common.logging import setup_logging
-from rucio.common.utils import get_thread_with_periodic_running_function
-from rucio.core.account_counter import fill_account_counter_history_table, get_updated_account_counters, update_account_counter
+from rucio.common.utils import chunks, get_thread_with_periodic_running_function
+from rucio.core.account_counter import fill_account_counter_history_table, get_updated_account_counters, update_account_counters
+from rucio.core.monitor import MetricManager
 from rucio.daemons.common import HeartbeatHandler, run_daemon
 
 if TYPE_CHECKING:
     from types import FrameType
     from typing import Optional
 
+METRICS = MetricManager(module=__name__)
 graceful_stop = threading.Event()
 DAEMON_NAME = 'abacus-account'
 
 
 def account_update(
         once: bool = False,
-        sleep_time: int = 10
+        sleep_time: int = 10,
+        bulk: int = 1
 ) -> None:
     """
     Main loop to check and update the Account Counters.
@@ -49,12 +53,16 @@ def account_update(
         executable=DAEMON_NAME,
         partition_wait_time=1,
         sleep_time=sleep_time,
-        run_once_fnc=run_once,
+        run_once_fnc=functools.partial(
+            run_once,
+            bulk=bulk,
+        )
     )
 
 
 def run_once(
         heartbeat_handler: HeartbeatHandler,
+        bulk: int = 1,
         **_kwargs
 ) -> None:
     worker_number, total_workers, logger = heartbeat_handler.live()
@@ -69,13 +77,19 @@ def run_once(
         logger(logging.INFO, 'did not get any work')
         return
 
-    for account_counter in updated_account_counters:
+    cycle_start = time.time()
+    nb_rows = 0
+    for chunk in chunks(updated_account_counters, bulk):
         worker_number, total_workers, logger = heartbeat_handler.live()
         if graceful_stop.is_set():
             break
         start_time = time.time()
-        update_account_counter(account=account_counter['account'], rse_id=account_counter['rse_id'])
-        logger(logging.DEBUG, 'update of account-rse counter "%s-%s" took %f' % (account_counter['account'], account_counter['rse_id'], time.time() - start_time))
+        nb_rows += update_account_counters(account_counters=chunk)
+        logger(logging.DEBUG, 'update of %d account-rse counters took %f' % (len(chunk), time.time() - start_time))
+    cycle_time = time.time() - cycle_start
+    METRICS.counter('updated_rows').inc(nb_rows)
+    METRICS.gauge('updated_rows_per_second').set(nb_rows / cycle_time if cycle_time else 0)
+    logger(logging.INFO, 'consumed %d updated account counters in %f seconds' % (nb_rows, cycle_time))
 
 
 def stop(signum: "Optional[int]" = None, frame: "Optional[FrameType]" = None) -> None:
@@ -90,7 +104,8 @@ def run(
         once: bool = False,
         threads: int = 1,
         fill_history_table: bool = False,
-        sleep_time: int = 10
+        sleep_time: int = 10,
+        bulk: int = 1
 ) -> None:
     """
     Starts up the Abacus-Account threads.
@@ -102,10 +117,10 @@ def run(
 
     if once:
         logging.info('main: executing one iteration only')
-        account_update(once)
+        account_update(once, bulk=bulk)
     else:
         logging.info('main: starting threads')
-        thread_list = [threading.Thread(target=account_update, kwargs={'once': once, 'sleep_time': sleep_time}) for i in
+        thread_list = [threading.Thread(target=account_update, kwargs={'once': once, 'sleep_time': sleep_time, 'bulk': bulk}) for i in
                        range(0, threads)]
         if fill_history_table:
             thread_list.append(get_thread_with_periodic_running_function(3600, fill_account_counter_history_table, graceful_stop))
@@ -16,6 +16,7 @@
 Abacus-RSE is a daemon to update RSE counters.
 """
 
+import functools
 import logging
 import threading
 import time
@@ -24,21 +25,24 @@ from typing import TYPE_CHECKING
 import rucio.db.sqla.util
 from rucio.common import exception
 from rucio.common.logging import setup_logging
-from rucio.common.utils import get_thread_with_periodic_running_function
-from rucio.core.rse_counter import fill_rse_counter_history_table, get_updated_rse_counters, update_rse_counter
+from rucio.common.utils import chunks, get_thread_with_periodic_running_function
+from rucio.core.monitor import MetricManager
+from rucio.core.rse_counter import fill_rse_counter_history_table, get_updated_rse_counters, update_rse_counters
 from rucio.daemons.common import HeartbeatHandler, run_daemon
 
 if TYPE_CHECKING:
     from types import FrameType
     from typing import Optional
 
+METRICS = MetricManager(module=__name__)
 graceful_stop = threading.Event()
 DAEMON_NAME = 'abacus-rse'
 
 
 def rse_update(
         once: bool = False,
-        sleep_time: int = 10
+        sleep_time: int = 10,
+        bulk: int = 1
 ) -> None:
     """
     Main loop to check and update the RSE Counters.
@@ -49,12 +53,16 @@ def rse_update(
         executable=DAEMON_NAME,
         partition_wait_time=1,
         sleep_time=sleep_time,
-        run_once_fnc=run_once,
+        run_once_fnc=functools.partial(
+            run_once,
+            bulk=bulk,
+        )
     )
 
 
 def run_once(
         heartbeat_handler: HeartbeatHandler,
+        bulk: int = 1,
         **_kwargs
 ) -> None:
     worker_number, total_workers, logger = heartbeat_handler.live()
@@ -70,13 +78,19 @@ def run_once(
         logger(logging.INFO, 'did not get any work')
         return
 
-    for rse_id in rse_ids:
+    cycle_start = time.time()
+    nb_rows = 0
+    for chunk in chunks(rse_ids, bulk):
         worker_number, total_workers, logger = heartbeat_handler.live()
         if graceful_stop.is_set():
             break
         start_time = time.time()
-        update_rse_counter(rse_id=rse_id)
-        logger(logging.DEBUG, 'update of rse "%s" took %f' % (rse_id, time.time() - start_time))
+        nb_rows += update_rse_counters(rse_ids=chunk)
+        logger(logging.DEBUG, 'update of %d rses took %f' % (len(chunk), time.time() - start_time))
+    cycle_time = time.time() - cycle_start
+    METRICS.counter('updated_rows').inc(nb_rows)
+    METRICS.gauge('updated_rows_per_second').set(nb_rows / cycle_time if cycle_time else 0)
+    logger(logging.INFO, 'consumed %d updated rse counters in %f seconds' % (nb_rows, cycle_time))
 
 
 def stop(signum: "Optional[int]" = None, frame: "Optional[FrameType]" = None) -> None:
@@ -91,7 +105,8 @@ def run(
         once: bool = False,
         threads: int = 1,
         fill_history_table: bool = False,
-        sleep_time: int = 10
+        sleep_time: int = 10,
+        bulk: int = 1
 ) -> None:
     """
     Starts up the Abacus-RSE threads.
@@ -103,10 +118,10 @@ def run(
 
     if once:
         logging.info('main: executing one iteration only')
-        rse_update(once)
+        rse_update(once, bulk=bulk)
     else:
         logging.info('main: starting threads')
-        thread_list = [threading.Thread(target=rse_update, kwargs={'once': once, 'sleep_time': sleep_time}) for i in
+        thread_list = [threading.Thread(target=rse_update, kwargs={'once': once, 'sleep_time': sleep_time, 'bulk': bulk}) for i in
                        range(0, threads)]
         if fill_history_table:
             thread_list.append(get_thread_with_periodic_running_function(3600, fill_rse_counter_history_table, graceful_stop))
@@ -20,6 +20,7 @@ import queue
 import socket
 import threading
 import time
+import weakref
 from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar, Union
 
 from rucio.common.logging import formatted_logger
@@ -36,6 +37,68 @@ T = TypeVar('T')
 METRICS = MetricManager(module=__name__)
 
 
+class _HeartbeatAgent:
+    """
+    Renews the heartbeats of all the HeartbeatHandlers of the process.
+
+    The first handler due for renewal renews, in a single bulk upsert, the heartbeats of all the
+    handlers of the same executable which called live() since the previous renewal and caches the
+    assignments of all of them. The other handlers then reuse their cached assignment until it is
+    due for renewal. A handler which stops calling live() is not renewed on its behalf anymore.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # handlers which called live() since the last renewal, with their payload, per (executable, hostname, pid)
+        self._pending: dict[tuple[str, str, int], weakref.WeakKeyDictionary[HeartbeatHandler, Optional[str]]] = {}
+        # handler -> (time of the renewal, payload, assignment)
+        self._renewed: weakref.WeakKeyDictionary[HeartbeatHandler, tuple[datetime.datetime, Optional[str], dict[str, int]]] = weakref.WeakKeyDictionary()
+
+    def live(
+            self,
+            handler: 'HeartbeatHandler',
+            force_renew: bool = False,
+            payload: Optional[str] = None
+    ) -> dict[str, int]:
+        """
+        :return: the assignment of the handler, the same object as long as it was not renewed.
+        """
+        key = (handler.executable, handler.hostname, handler.pid)
+        with self._lock:
+            pending = self._pending.setdefault(key, weakref.WeakKeyDictionary())
+            pending[handler] = payload
+
+            renewed = self._renewed.get(handler)
+            if not force_renew \
+                    and renewed \
+                    and renewed[0] >= datetime.datetime.now() - datetime.timedelta(seconds=handler.renewal_interval) \
+                    and renewed[1] == payload:
+                return renewed[2]
+
+            handlers = list(pending.items())
+            pending.clear()
+            try:
+                assignments = heartbeat_core.live_bulk(handler.executable, handler.hostname, handler.pid,
+                                                       threads=[(hdl.hb_thread, hdl_payload) for hdl, hdl_payload in handlers],
+                                                       older_than=handler.older_than or 600,
+                                                       hash_executable=handler.hash_executable)
+            except Exception:
+                pending.update(handlers)
+                raise
+            now = datetime.datetime.now()
+            for hdl, hdl_payload in handlers:
+                self._renewed[hdl] = (now, hdl_payload, assignments[hdl.hb_thread.ident])
+            return self._renewed[handler][2]
+
+    def forget(self, handler: 'HeartbeatHandler') -> None:
+        with self._lock:
+            self._pending.get((handler.executable, handler.hostname, handler.pid), {}).pop(handler, None)
+            self._renewed.pop(handler, None)
+
+
+HEARTBEAT_AGENT = _HeartbeatAgent()
+
+
 class HeartbeatHandler:
     """
     Simple contextmanager which sets a heartbeat and associated logger on entry and cleans up the heartbeat on exit.
@@ -67,6 +130,7 @@ class HeartbeatHandler:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        HEARTBEAT_AGENT.forget(self)
         if self.last_heart_beat:
             heartbeat_core.die(self.executable, self.hostname, self.pid, self.hb_thread)
             if self.logger:
@@ -88,18 +152,13 @@ class HeartbeatHandler:
             payload: Optional[str] = None
     ) -> tuple[int, int, 'Callable']:
         """
+        The heartbeats of all the handlers of the process are renewed together by HEARTBEAT_AGENT.
+
         :return: a tuple: <the number of the current worker>, <total number of workers>, <decorated logger>
         """
-        if force_renew \
-                or not self.last_time \
-                or not self.last_heart_beat \
-                or self.last_time < datetime.datetime.now() - datetime.timedelta(seconds=self.renewal_interval) \
-                or self.last_payload != payload:
-            if self.older_than:
-                self.last_heart_beat = heartbeat_core.live(self.executable, self.hostname, self.pid, self.hb_thread, payload=payload, older_than=self.older_than)
-            else:
-                self.last_heart_beat = heartbeat_core.live(self.executable, self.hostname, self.pid, self.hb_thread, payload=payload)
-
+        heart_beat = HEARTBEAT_AGENT.live(self, force_renew=force_renew, payload=payload)
+        if heart_beat is not self.last_heart_beat:
+            self.last_heart_beat = heart_beat
             prefix = '[%i/%i]: ' % (self.last_heart_beat['assign_thread'], self.last_heart_beat['nr_threads'])
             self.logger = formatted_logger(logging.log, prefix + '%s')
 
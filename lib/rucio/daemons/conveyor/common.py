@@ -21,6 +21,7 @@ import functools
 import itertools
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING, Any, Optional
 
 from rucio.common.config import config_get_bool
@@ -407,25 +408,99 @@ def submit_transfer(
     :param timeout:               Timeout
     :param logger:                Optional decorated logger that can be passed from the calling daemons or servers.
     """
+    if not _mark_submitting(transfertool_obj, transfers, logger):
+        return
 
+    for submitted_transfers, eid, state_to_set in _submit_job(transfertool_obj, transfers, job_params, timeout, logger):
+        _set_submission_state(transfertool_obj, submitted_transfers, eid, state_to_set, logger)
+
+
+def submit_transfers(
+        jobs: "Sequence[tuple[Transfertool, Sequence[DirectTransfer], dict[str, str]]]",
+        max_submissions_per_host: int = 1,
+        timeout: Optional[int] = None,
+        logger: "LoggerFunction" = logging.log
+) -> None:
+    """
+    Submit several jobs, possibly towards different transfertool hosts.
+
+    Up to max_submissions_per_host jobs are submitted concurrently to each host, so that a slow host
+    doesn't delay the submission to the others. Only the submission itself runs in worker threads:
+    the requests are marked SUBMITTING beforehand, and the outcome of each submission is registered
+    in the database by the calling thread as soon as it is known.
+
+    :param jobs:                      List of (transfertool object, transfers, job parameters) tuples.
+    :param max_submissions_per_host:  Maximum number of concurrent submissions to a transfertool host.
+    :param timeout:                   Timeout
+    :param logger:                    Optional decorated logger that can be passed from the calling daemons or servers.
+    """
+    if max_submissions_per_host <= 1:
+        for transfertool_obj, transfers, job_params in jobs:
+            submit_transfer(transfertool_obj=transfertool_obj, transfers=transfers, job_params=job_params, timeout=timeout, logger=logger)
+        return
+
+    executors: dict[str, ThreadPoolExecutor] = {}
+    try:
+        futures = {}
+        for transfertool_obj, transfers, job_params in jobs:
+            if not _mark_submitting(transfertool_obj, transfers, logger):
+                continue
+            executor = executors.get(transfertool_obj.external_host)
+            if executor is None:
+                executor = executors[transfertool_obj.external_host] = ThreadPoolExecutor(max_workers=max_submissions_per_host)
+            futures[executor.submit(_submit_job, transfertool_obj, transfers, job_params, timeout, logger)] = transfertool_obj
+
+        for future in as_completed(futures):
+            transfertool_obj = futures[future]
+            for submitted_transfers, eid, state_to_set in future.result():
+                _set_submission_state(transfertool_obj, submitted_transfers, eid, state_to_set, logger)
+    finally:
+        for executor in executors.values():
+            executor.shutdown()
+
+
+def _mark_submitting(
+        transfertool_obj: "Transfertool",
+        transfers: "Sequence[DirectTransfer]",
+        logger: "LoggerFunction" = logging.log
+) -> bool:
+    """
+    Mark the transfers of a job as SUBMITTING.
+
+    :returns: True if the job can be submitted.
+    """
     for transfer in transfers:
         try:
             transfer_core.mark_submitting(transfer, external_host=transfertool_obj.external_host, logger=logger)
         except RequestNotFound as error:
             logger(logging.ERROR, str(error))
-            return
+            return False
         except Exception:
             logger(logging.ERROR, 'Failed to prepare requests %s state to SUBMITTING. Mark it SUBMISSION_FAILED and abort submission.' % [str(t.rws) for t in transfers], exc_info=True)
             transition_request_state(request_id=transfer.rws.request_id, state=RequestState.SUBMISSION_FAILED)
-            return
+            return False
+    return True
+
+
+def _submit_job(
+        transfertool_obj: "Transfertool",
+        transfers: "Sequence[DirectTransfer]",
+        job_params: dict[str, str],
+        timeout: Optional[int] = None,
+        logger: "LoggerFunction" = logging.log
+) -> list[tuple["Sequence[DirectTransfer]", Optional[str], Optional[RequestState]]]:
+    """
+    Submit a job to the transfertool, or its transfers one by one if the bulk submission
+    fails due to duplicate submissions. Doesn't touch the database.
 
+    :returns: list of (transfers, external id, state to set) tuples, one per submission.
+    """
     try:
-        _submit_transfers(transfertool_obj, transfers, job_params, timeout, logger)
+        return [(transfers, *_submit_transfers(transfertool_obj, transfers, job_params, timeout, logger))]
     except DuplicateFileTransferSubmission as error:
         logger(logging.WARNING, 'Failed to bulk submit a job because of duplicate file : %s', str(error))
         logger(logging.INFO, 'Submitting files one by one')
-        for transfer in transfers:
-            _submit_transfers(transfertool_obj, [transfer], job_params, timeout, logger)
+        return [([transfer], *_submit_transfers(transfertool_obj, [transfer], job_params, timeout, logger)) for transfer in transfers]
 
 
 def _submit_transfers(
@@ -434,13 +509,15 @@ def _submit_transfers(
         job_params: dict[str, str],
         timeout: Optional[int] = None,
         logger: "LoggerFunction" = logging.log
-) -> None:
+) -> tuple[Optional[str], Optional[RequestState]]:
     """
     helper function for submit_transfers. Performs the actual submission of one or more transfers.
 
     If the bulk submission of multiple transfers fails due to duplicate submissions, the exception
     is propagated to the caller context, which is then responsible for calling this function again for each
     of the transfers separately.
+
+    :returns: the external id, if the job was submitted, and the state to set on the transfers.
     """
     logger(logging.DEBUG, 'About to submit job to %s with timeout %s' % (transfertool_obj, timeout))
     # A eid is returned if the job is properly submitted otherwise an exception is raised
@@ -471,8 +548,22 @@ def _submit_transfers(
         stopwatch.stop()
         logger(logging.DEBUG, 'Submit job %s to %s in %s seconds' % (eid, transfertool_obj, stopwatch.elapsed))
         METRICS.timer('submit_bulk_transfer_per_file').observe(stopwatch.elapsed / (len(transfers) or 1))
+        METRICS.timer('submit_job').observe(stopwatch.elapsed)
         METRICS.counter('submit_bulk_transfer').inc(len(transfers))
 
+    return eid, state_to_set
+
+
+def _set_submission_state(
+        transfertool_obj: "Transfertool",
+        transfers: "Sequence[DirectTransfer]",
+        eid: Optional[str],
+        state_to_set: Optional[RequestState],
+        logger: "LoggerFunction" = logging.log
+) -> None:
+    """
+    Register the outcome of a submission in the database. If this fails, try to cancel the submitted job.
+    """
     if state_to_set:
         try:
             transfer_core.set_transfers_state(
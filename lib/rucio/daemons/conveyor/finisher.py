@@ -234,7 +234,7 @@ def run(
     if rucio.db.sqla.util.is_old_db():
         raise DatabaseException('Database was not updated, daemon won\'t start')
 
-    cached_topology = ExpiringObjectCache(ttl=300, new_obj_fnc=lambda: Topology())
+    cached_topology = ExpiringObjectCache(ttl=3600, new_obj_fnc=lambda: Topology(), refresh_interval=300, refresh_fnc=lambda topology: topology.refresh())
     finisher(
         once=once,
         activities=activities,
@@ -23,6 +23,7 @@ import logging
 import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from itertools import groupby
 from typing import TYPE_CHECKING, Any, Optional
 
@@ -30,7 +31,7 @@ from requests.exceptions import RequestException
 from sqlalchemy.exc import DatabaseError
 
 import rucio.db.sqla.util
-from rucio.common.config import config_get, config_get_bool, config_get_float
+from rucio.common.config import config_get, config_get_bool, config_get_float, config_get_int
 from rucio.common.exception import DatabaseException, TransferToolTimeout, TransferToolWrongAnswer
 from rucio.common.logging import setup_logging
 from rucio.common.stopwatch import Stopwatch
@@ -49,7 +50,7 @@ if TYPE_CHECKING:
 
     from rucio.common.types import LoggerFunction
     from rucio.daemons.common import HeartbeatHandler
-    from rucio.transfertool.transfertool import Transfertool
+    from rucio.transfertool.transfertool import TransferStatusReport, Transfertool
 
 GRACEFUL_STOP = threading.Event()
 METRICS = MetricManager(module=__name__)
@@ -117,9 +118,11 @@ def _handle_requests(
         transfertool: str,
         transfer_stats_manager: request_core.TransferStatsManager,
         oidc_support: bool,
+        max_concurrent_polls: int = 1,
         *,
         logger: "LoggerFunction" = logging.log,
 ) -> None:
+    polls = []
     transfs.sort(key=lambda t: (t['external_host'] or '',
                                 t['scope'].vo if multi_vo else '',
                                 t['external_id'] or '',
@@ -141,17 +144,32 @@ def _handle_requests(
                         'oidc_support': oidc_support,
                     })
 
-                transfertool_obj = transfertool_cls(external_host=external_host, **transfertool_kwargs)
-                poll_transfers(
-                    transfertool_obj=transfertool_obj,
-                    transfers_by_eid=chunk,
-                    transfer_stats_manager=transfer_stats_manager,
-                    timeout=timeout,
-                    logger=logger,
-                )
+                polls.append((transfertool_cls(external_host=external_host, **transfertool_kwargs), chunk))
             except Exception:
                 logger(logging.ERROR, 'Exception', exc_info=True)
 
+    if max_concurrent_polls > 1 and len(polls) > 1:
+        poll_transfers_concurrently(
+            polls=polls,
+            transfer_stats_manager=transfer_stats_manager,
+            max_concurrent_polls=max_concurrent_polls,
+            timeout=timeout,
+            logger=logger,
+        )
+        return
+
+    for transfertool_obj, chunk in polls:
+        try:
+            poll_transfers(
+                transfertool_obj=transfertool_obj,
+                transfers_by_eid=chunk,
+                transfer_stats_manager=transfer_stats_manager,
+                timeout=timeout,
+                logger=logger,
+            )
+        except Exception:
+            logger(logging.ERROR, 'Exception', exc_info=True)
+
 
 def poller(
         once: bool = False,
@@ -173,6 +191,8 @@ def poller(
     timeout = config_get_float('conveyor', 'poll_timeout', default=None, raise_exception=False)
     multi_vo = config_get_bool('common', 'multi_vo', False, None)
     oidc_support = config_get_bool('conveyor', 'poller_oidc_support', default=False, raise_exception=False)
+    # If bigger than 1, up to this number of bulk queries are sent concurrently to the transfertool hosts
+    max_concurrent_polls = config_get_int('conveyor', 'max_concurrent_polls', default=1, raise_exception=False)
 
     executable = DAEMON_NAME
 
@@ -220,6 +240,7 @@ def poller(
             oidc_support=oidc_support,
             transfertool=transfertool,  # type: ignore (transfertool is not None)
             transfer_stats_manager=transfer_stats_manager,
+            max_concurrent_polls=max_concurrent_polls,
         )
 
     with transfer_stats_manager:
@@ -276,7 +297,7 @@ def run(
         parsed_activity_shares.update((share, int(percentage * db_bulk)) for share, percentage in parsed_activity_shares.items())
         logging.info('activity shares enabled: %s' % parsed_activity_shares)
 
-    cached_topology = ExpiringObjectCache(ttl=300, new_obj_fnc=lambda: Topology())
+    cached_topology = ExpiringObjectCache(ttl=3600, new_obj_fnc=lambda: Topology(), refresh_interval=300, refresh_fnc=lambda topology: topology.refresh())
     poller(
         once=once,
         fts_bulk=fts_bulk,
@@ -300,32 +321,83 @@ def poll_transfers(
     """
     Poll a list of transfers from an FTS server
     """
+    for queried_transfers_by_eid, resps in _query_transfers(transfertool_obj, transfers_by_eid, timeout, logger):
+        _update_transfers(transfertool_obj, queried_transfers_by_eid, resps, transfer_stats_manager, logger)
+
+
+def poll_transfers_concurrently(
+        polls: "Sequence[tuple[Transfertool, Mapping[str, Mapping[str, Any]]]]",
+        transfer_stats_manager: request_core.TransferStatsManager,
+        max_concurrent_polls: int,
+        timeout: "Optional[int]" = None,
+        logger: "LoggerFunction" = logging.log
+) -> None:
+    """
+    Poll several lists of transfers, possibly from different FTS servers, with up to max_concurrent_polls
+    queries in flight at once. The database is only accessed from the calling thread, which applies the
+    state updates of each query as soon as its response arrives.
+
+    :param polls: Sequence of (transfertool_obj, transfers_by_eid) to poll.
+    """
+    stopwatch = Stopwatch()
+    with ThreadPoolExecutor(max_workers=max_concurrent_polls) as executor:
+        futures = {
+            executor.submit(_query_transfers, transfertool_obj, transfers_by_eid, timeout, logger): transfertool_obj
+            for transfertool_obj, transfers_by_eid in polls
+        }
+        for future in as_completed(futures):
+            transfertool_obj = futures[future]
+            try:
+                for queried_transfers_by_eid, resps in future.result():
+                    _update_transfers(transfertool_obj, queried_transfers_by_eid, resps, transfer_stats_manager, logger)
+            except Exception:
+                logger(logging.ERROR, 'Exception', exc_info=True)
+    stopwatch.stop()
+    logger(logging.DEBUG, 'Polled %i bulks of transfers with concurrency %i in %s seconds' % (len(polls), max_concurrent_polls, stopwatch.elapsed))
+
+
+def _query_transfers(
+        transfertool_obj: 'Transfertool',
+        transfers_by_eid: 'Mapping[str, Mapping[str, Any]]',
+        timeout: "Optional[int]" = None,
+        logger: "LoggerFunction" = logging.log
+) -> "list[tuple[Mapping[str, Mapping[str, Any]], dict[str, Any]]]":
+    """
+    Query the status of a list of transfers from an FTS server. If the bulk query is not understood
+    by the server, the transfers are queried one job at a time. Doesn't access the database.
 
-    poll_individual_transfers = False
+    :returns: list of (transfers_by_eid, responses) for each successful query.
+    """
     try:
-        _poll_transfers(transfertool_obj, transfers_by_eid, transfer_stats_manager, timeout, logger)
+        resps = _bulk_query(transfertool_obj, transfers_by_eid, timeout, logger)
     except TransferToolWrongAnswer:
-        poll_individual_transfers = True
-
-    if poll_individual_transfers:
         logger(logging.ERROR, 'Problem querying %s on %s. All jobs are being checked individually' % (list(transfers_by_eid), transfertool_obj))
-        for external_id, transfers in transfers_by_eid.items():
-            logger(logging.DEBUG, 'Checking %s on %s' % (external_id, transfertool_obj))
-            try:
-                _poll_transfers(transfertool_obj, {external_id: transfers}, transfer_stats_manager, timeout, logger)
-            except Exception as err:
-                logger(logging.ERROR, 'Problem querying %s on %s . Error returned : %s' % (external_id, transfertool_obj, str(err)))
+    else:
+        return [(transfers_by_eid, resps)] if resps is not None else []
+
+    results = []
+    for external_id, transfers in transfers_by_eid.items():
+        logger(logging.DEBUG, 'Checking %s on %s' % (external_id, transfertool_obj))
+        try:
+            resps = _bulk_query(transfertool_obj, {external_id: transfers}, timeout, logger)
+        except Exception as err:
+            logger(logging.ERROR, 'Problem querying %s on %s . Error returned : %s' % (external_id, transfertool_obj, str(err)))
+            continue
+        if resps is not None:
+            results.append(({external_id: transfers}, resps))
+    return results
 
 
-def _poll_transfers(
+def _bulk_query(
         transfertool_obj: 'Transfertool',
         transfers_by_eid: 'Mapping[str, Mapping[str, Any]]',
-        transfer_stats_manager: request_core.TransferStatsManager,
         timeout: "Optional[int]" = None,
         logger: "LoggerFunction" = logging.log
-) -> None:
+) -> "Optional[dict[str, Any]]":
     """
-    Helper function for poll_transfers which performs the actual polling and database update.
+    Helper function for _query_transfers which performs the actual query.
+
+    :returns: the responses of the transfertool, or None if the query failed.
     """
     is_bulk = len(transfers_by_eid) > 1
     try:
@@ -335,22 +407,59 @@ def _poll_transfers(
         stopwatch.stop()
         METRICS.timer('bulk_query_transfers').observe(stopwatch.elapsed / (len(transfers_by_eid) or 1))
         logger(logging.DEBUG, 'Polled %s transfer requests status in %s seconds' % (len(transfers_by_eid), stopwatch.elapsed))
+        return resps
     except TransferToolTimeout as error:
         logger(logging.ERROR, str(error))
-        return
     except TransferToolWrongAnswer as error:
         logger(logging.ERROR, str(error))
         if is_bulk:
             raise  # The calling context will retry transfers one-by-one
-        else:
-            return
     except RequestException as error:
         logger(logging.ERROR, "Failed to contact FTS server: %s" % (str(error)))
-        return
     except Exception:
         logger(logging.ERROR, "Failed to query FTS info", exc_info=True)
-        return
+    return None
+
 
+def _update_transfers_state(
+        tt_status_reports: "Sequence[TransferStatusReport]",
+        transfer_stats_manager: request_core.TransferStatsManager,
+        logger: "LoggerFunction" = logging.log
+) -> dict[str, int]:
+    """
+    Apply the reports of a job in one transaction. If that fails for another reason than the database,
+    e.g. because of a faulty report, apply them again one by one, each in its own transaction, so that
+    the faulty report doesn't prevent the update of the other requests of the job.
+    """
+    try:
+        return transfer_core.update_transfers_state(tt_status_reports=tt_status_reports, stats_manager=transfer_stats_manager, logger=logger)
+    except (DatabaseException, DatabaseError):
+        raise
+    except Exception:
+        if len(tt_status_reports) <= 1:
+            raise
+        logger(logging.WARNING, 'Failed to update %d requests together, updating them one by one' % len(tt_status_reports))
+
+    outcomes = {}
+    for tt_status_report in tt_status_reports:
+        try:
+            outcomes.update(transfer_core.update_transfers_state(tt_status_reports=[tt_status_report], stats_manager=transfer_stats_manager, logger=logger))
+        except Exception:
+            logger(logging.ERROR, 'Failed to update request %s' % tt_status_report.request_id, exc_info=True)
+            outcomes[tt_status_report.request_id] = 0
+    return outcomes
+
+
+def _update_transfers(
+        transfertool_obj: 'Transfertool',
+        transfers_by_eid: 'Mapping[str, Mapping[str, Any]]',
+        resps: dict[str, Any],
+        transfer_stats_manager: request_core.TransferStatsManager,
+        logger: "LoggerFunction" = logging.log
+) -> None:
+    """
+    Update the database with the responses of a query performed by _query_transfers.
+    """
     tss = time.time()
     logger(logging.DEBUG, 'Updating %s transfer requests status' % (len(transfers_by_eid)))
     cnt = 0
@@ -371,12 +480,12 @@ def _poll_transfers(
                 logger(logging.WARNING, "Failed to poll FTS(%s) job (%s): %s" % (transfertool_obj, transfer_id, transf_resp))
                 METRICS.counter('query_transfer_exception').inc()
             else:
-                for request_id in request_ids.intersection(transf_resp):
-                    ret = transfer_core.update_transfer_state(
-                        tt_status_report=transf_resp[request_id],
-                        stats_manager=transfer_stats_manager,
-                        logger=logger,
-                    )
+                outcomes = _update_transfers_state(
+                    tt_status_reports=[transf_resp[request_id] for request_id in request_ids.intersection(transf_resp)],
+                    transfer_stats_manager=transfer_stats_manager,
+                    logger=logger,
+                )
+                for ret in outcomes.values():
                     cnt += ret
                     if ret:
                         METRICS.counter('update_request_state.{updated}').labels(updated=True).inc(delta=ret)
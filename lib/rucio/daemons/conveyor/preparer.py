@@ -65,7 +65,7 @@ def run(
     if rucio.db.sqla.util.is_old_db():
         raise exception.DatabaseException('Database was not updated, daemon won\'t start')
 
-    cached_topology = ExpiringObjectCache(ttl=300, new_obj_fnc=lambda: Topology(ignore_availability=ignore_availability))
+    cached_topology = ExpiringObjectCache(ttl=3600, new_obj_fnc=lambda: Topology(ignore_availability=ignore_availability), refresh_interval=300, refresh_fnc=lambda topology: topology.refresh())
 
     preparer(
         once=once,
@@ -16,8 +16,10 @@
 Conveyor is a daemon to manage file transfers.
 """
 
+import functools
 import json
 import logging
+import queue
 import socket
 import threading
 import time
@@ -28,7 +30,7 @@ import stomp
 
 import rucio.db.sqla.util
 from rucio.common import exception
-from rucio.common.config import config_get, config_get_bool, config_get_int, config_get_list
+from rucio.common.config import config_get, config_get_bool, config_get_float, config_get_int, config_get_list
 from rucio.common.logging import setup_logging
 from rucio.common.policy import get_policy
 from rucio.core import request as request_core
@@ -39,9 +41,11 @@ from rucio.db.sqla.session import transactional_session
 from rucio.transfertool.fts3 import FTS3CompletionMessageTransferStatusReport
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
     from types import FrameType
 
     from sqlalchemy.orm import Session
+    from stomp import Connection12
     from stomp.utils import Frame
 
     from rucio.common.types import LoggerFunction
@@ -53,6 +57,141 @@ GRACEFUL_STOP = threading.Event()
 DAEMON_NAME = 'conveyor-receiver'
 
 
+@transactional_session
+def perform_request_updates(
+        tt_status_reports: "Sequence[FTS3CompletionMessageTransferStatusReport]",
+        transfer_stats_manager: request_core.TransferStatsManager,
+        *,
+        session: Optional["Session"] = None,
+        logger: "LoggerFunction" = logging.log
+) -> None:
+    """
+    Apply the reports parsed from several completion messages in one transaction.
+
+    :raises: any error preventing the update of the requests. The transaction is then rolled back.
+    """
+    reports_to_apply = []
+    for tt_status_report in tt_status_reports:
+        try:
+            if tt_status_report.get_db_fields_to_update(session=session, logger=logger):  # type: ignore
+                logging.info('RECEIVED %s', tt_status_report)
+                reports_to_apply.append(tt_status_report)
+        except Exception:
+            logging.critical(traceback.format_exc())
+
+    if not reports_to_apply:
+        return
+    outcomes = transfer_core.update_transfers_state(
+        tt_status_reports=reports_to_apply,
+        stats_manager=transfer_stats_manager,
+        session=session,
+        logger=logger,
+    )
+    for ret in outcomes.values():
+        if ret:
+            METRICS.counter('update_request_state.{updated}').labels(updated=True).inc(delta=ret)
+        else:
+            METRICS.counter('update_request_state.{updated}').labels(updated=False).inc()
+
+
+class ReportBatcher:
+    """
+    Accumulate the transfer status reports received by the listeners, and apply them from worker
+    threads in batches of up to batch_size reports, or of the reports received within batch_interval
+    seconds, each batch in one transaction. A report is only acknowledged once it is committed.
+
+    The queue of pending reports is bounded: when the workers fall behind, the listeners block,
+    and thus stop consuming from the broker, instead of accumulating reports in memory.
+    """
+
+    def __init__(
+            self,
+            transfer_stats_manager: request_core.TransferStatsManager,
+            batch_size: int,
+            batch_interval: float,
+            nb_workers: int = 1,
+            graceful_stop: threading.Event = GRACEFUL_STOP,
+    ):
+        self._transfer_stats_manager = transfer_stats_manager
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.queue_size = 2 * batch_size * nb_workers
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._graceful_stop = graceful_stop
+        self._workers = [threading.Thread(target=self._run, name='ReportBatcher-%d' % i, daemon=True) for i in range(nb_workers)]
+
+    def start(self) -> None:
+        for worker in self._workers:
+            worker.start()
+
+    def join(self) -> None:
+        """
+        Wait for the workers to apply the pending reports. Only returns once graceful_stop is set.
+        """
+        for worker in self._workers:
+            worker.join()
+
+    def put(
+            self,
+            tt_status_report: FTS3CompletionMessageTransferStatusReport,
+            acknowledge: "Callable[[bool], None]",
+    ) -> None:
+        """
+        Enqueue a report. Blocks while the queue is full.
+
+        :param tt_status_report: The report to apply.
+        :param acknowledge:      Called with True once the report is committed, or with False if it failed to be applied.
+        """
+        self._queue.put((tt_status_report, acknowledge))
+
+    def _next_batch(self) -> list[tuple[FTS3CompletionMessageTransferStatusReport, "Callable[[bool], None]"]]:
+        try:
+            batch = [self._queue.get(timeout=1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._graceful_stop.is_set() or not self._queue.empty():
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: "Sequence[tuple[FTS3CompletionMessageTransferStatusReport, Callable[[bool], None]]]") -> None:
+        """
+        Apply the reports of the batch in one transaction. If this fails, the reports are retried one
+        by one, so that a single faulty report only causes its own message to be negatively acknowledged.
+        """
+        success = True
+        try:
+            with METRICS.timer('flush_batch'):
+                perform_request_updates([tt_status_report for tt_status_report, _ in batch], self._transfer_stats_manager)
+            METRICS.counter('flushed_reports').inc(delta=len(batch))
+        except Exception:
+            if len(batch) > 1:
+                logging.warning('Failed to apply a batch of %d reports. Retrying them one by one.', len(batch), exc_info=True)
+                METRICS.counter('failed_batches').inc()
+                for report_and_acknowledge in batch:
+                    self._flush([report_and_acknowledge])
+                return
+            logging.critical(traceback.format_exc())
+            success = False
+        for _, acknowledge in batch:
+            try:
+                acknowledge(success)
+            except Exception:
+                logging.warning('Failed to acknowledge a message', exc_info=True)
+
+
 class Receiver:
 
     def __init__(
@@ -61,12 +200,16 @@ class Receiver:
             id_: str,
             total_threads: int,
             transfer_stats_manager: request_core.TransferStatsManager,
-            all_vos: bool = False
+            all_vos: bool = False,
+            conn: "Optional[Connection12]" = None,
+            batcher: Optional[ReportBatcher] = None,
     ):
         self.__all_vos = all_vos
         self.__broker = broker
         self.__id = id_
         self.__total_threads = total_threads
+        self.__conn = conn
+        self.__batcher = batcher
         self._transfer_stats_manager = transfer_stats_manager
 
     @METRICS.count_it
@@ -75,11 +218,40 @@ class Receiver:
 
     @METRICS.count_it
     def on_message(self, frame: "Frame") -> None:
-        msg = json.loads(frame.body)  # type: ignore
+        if self.__batcher is None:
+            msg = json.loads(frame.body)  # type: ignore
+            if self._is_completion_message(msg):
+                self._perform_request_update(msg)
+            return
 
+        # Messages are acknowledged by the client: an acknowledgment is only sent for
+        # completion messages once their update is committed. With STOMP 1.2, a message
+        # is acknowledged with the value of its "ack" header.
+        msg_id = frame.headers['message-id']
+        ack_id = frame.headers['ack']
+        try:
+            msg = json.loads(frame.body)  # type: ignore
+            if self._is_completion_message(msg):
+                tt_status_report = FTS3CompletionMessageTransferStatusReport(msg.get('endpnt', None), request_id=msg['file_metadata'].get('request_id', None), fts_message=msg)
+                self.__batcher.put(tt_status_report, acknowledge=functools.partial(self._acknowledge, ack_id))
+                return
+        except Exception:
+            METRICS.counter('json_error').inc()
+            logging.error('[%s] Failed to parse message %s' % (self.__broker, msg_id), exc_info=True)
+        self._acknowledge(ack_id, True)
+
+    def _acknowledge(self, ack_id: str, success: bool) -> None:
+        if self.__conn is None:
+            return
+        if success:
+            self.__conn.ack(ack_id)
+        else:
+            self.__conn.nack(ack_id)
+
+    def _is_completion_message(self, msg: dict[str, Any]) -> bool:
         if not self.__all_vos:
             if 'vo' not in msg or msg['vo'] != get_policy():
-                return
+                return False
 
         if 'job_metadata' in msg.keys() \
            and isinstance(msg['job_metadata'], dict) \
@@ -88,8 +260,8 @@ class Receiver:
 
             if 'job_state' in msg.keys() and (str(msg['job_state']) != 'ACTIVE' or msg.get('job_multihop', False) is True):
                 METRICS.counter('message_rucio').inc()
-
-                self._perform_request_update(msg)
+                return True
+        return False
 
     @transactional_session
     def _perform_request_update(
@@ -177,10 +349,26 @@ def receiver(
             )
         conns.append(con)
 
+    # If bigger than 1, the completion messages are applied in batches of up to this size, and acknowledged once committed
+    batch_size = config_get_int('conveyor', 'receiver_batch_size', default=1, raise_exception=False)
+    batch_interval = config_get_float('conveyor', 'receiver_batch_interval', default=1, raise_exception=False)
+    batch_workers = config_get_int('conveyor', 'receiver_batch_workers', default=1, raise_exception=False)
+    subscription_id = 'rucio-messaging-fts3'
+
     logging.info('receiver started')
 
     with (HeartbeatHandler(executable=DAEMON_NAME, renewal_interval=30) as heartbeat_handler,
           request_core.TransferStatsManager() as transfer_stats_manager):
+        batcher = None
+        if batch_size > 1:
+            batcher = ReportBatcher(
+                transfer_stats_manager=transfer_stats_manager,
+                batch_size=batch_size,
+                batch_interval=batch_interval,
+                nb_workers=batch_workers,
+            )
+            batcher.start()
+
         while not GRACEFUL_STOP.is_set():
 
             _, _, logger = heartbeat_handler.live()
@@ -198,17 +386,27 @@ def receiver(
                             id_=id_,
                             total_threads=total_threads,
                             transfer_stats_manager=transfer_stats_manager,
-                            all_vos=all_vos
+                            all_vos=all_vos,
+                            conn=conn,
+                            batcher=batcher,
                         ))
                     if not use_ssl:
                         conn.connect(username, password, wait=True)
                     else:
                         conn.connect(wait=True)
-                    conn.subscribe(destination=config_get('messaging-fts3', 'destination'),
-                                   id='rucio-messaging-fts3',
-                                   ack='auto')
+                    if batcher is None:
+                        conn.subscribe(destination=config_get('messaging-fts3', 'destination'),
+                                       id=subscription_id,
+                                       ack='auto')
+                    else:
+                        conn.subscribe(destination=config_get('messaging-fts3', 'destination'),
+                                       id=subscription_id,
+                                       ack='client-individual',
+                                       headers={'activemq.prefetchSize': batcher.queue_size})
             time.sleep(1)
 
+        if batcher is not None:
+            batcher.join()
         for conn in conns:
             try:
                 conn.disconnect()
@@ -31,7 +31,7 @@ from rucio.core.request import RequestWithSources, list_and_mark_transfer_reques
 from rucio.core.topology import ExpiringObjectCache, Topology
 from rucio.core.transfer import DEFAULT_MULTIHOP_TOMBSTONE_DELAY, TRANSFERTOOL_CLASSES_BY_NAME, ProtocolFactory, list_transfer_admin_accounts, transfer_path_str
 from rucio.daemons.common import ProducerConsumerDaemon, db_workqueue
-from rucio.daemons.conveyor.common import get_conveyor_rses, pick_and_prepare_submission_path, submit_transfer
+from rucio.daemons.conveyor.common import get_conveyor_rses, pick_and_prepare_submission_path, submit_transfers
 from rucio.db.sqla.constants import RequestState, RequestType
 from rucio.transfertool.fts3 import FTS3Transfertool
 from rucio.transfertool.globus import GlobusTransferTool
@@ -124,6 +124,7 @@ def _handle_requests(
         timeout: Optional[float],
         transfertool_kwargs: dict,
         metrics: MetricManager,
+        max_submissions_per_host: int = 1,
         logger: "LoggerFunction" = logging.log,
 ) -> None:
     topology, requests_with_sources = batch
@@ -145,6 +146,7 @@ def _handle_requests(
         logger=logger,
     )
 
+    jobs = []
     for builder, transfer_paths in transfers.items():
         # Globus Transfertool is not yet production-ready, but we need to partially activate it
         # in all submitters if we want to enable native multi-hopping between transfertools.
@@ -165,11 +167,16 @@ def _handle_requests(
         grouped_jobs = transfertool_obj.group_into_submit_jobs(transfer_paths)
         metrics.timer('bulk_group_transfer').observe(stopwatch.elapsed / (len(transfer_paths) or 1))
 
-        logger(logging.DEBUG, 'Starting to submit transfers for %s', transfertool_obj)
         for job in grouped_jobs:
             logger(logging.DEBUG, 'submitjob: transfers=%s, job_params=%s' % ([str(t) for t in job['transfers']], job['job_params']))
-            submit_transfer(transfertool_obj=transfertool_obj, transfers=job['transfers'], job_params=job['job_params'],
-                            timeout=timeout, logger=logger)  # type: ignore (unclear whether timeout is supposed to be float or int)
+            jobs.append((transfertool_obj, job['transfers'], job['job_params']))
+
+    logger(logging.DEBUG, 'Starting to submit %s jobs', len(jobs))
+    stopwatch = Stopwatch()
+    submit_transfers(jobs, max_submissions_per_host=max_submissions_per_host,
+                     timeout=timeout, logger=logger)  # type: ignore (unclear whether timeout is supposed to be float or int)
+    if jobs:
+        metrics.timer('submit_jobs.time_per_job').observe(stopwatch.elapsed / len(jobs))
 
 
 def _get_max_time_in_queue_conf() -> dict[str, int]:
@@ -244,6 +251,8 @@ def submitter(
         logging.info(f'Following failover schemes filtered out: {list(config_failover_schemes.difference(failover_schemes))}')
 
     timeout = config_get_float('conveyor', 'submit_timeout', default=None, raise_exception=False)
+    # If bigger than 1, up to this number of jobs are submitted concurrently to each transfertool host
+    max_submissions_per_host = config_get_int('conveyor', 'max_submissions_per_host', default=1, raise_exception=False)
 
     bring_online = config_get_int('conveyor', 'bring_online', default=43200, raise_exception=False)
 
@@ -312,6 +321,7 @@ def submitter(
             timeout=timeout,
             transfertool_kwargs=transfertool_kwargs,
             metrics=metrics,
+            max_submissions_per_host=max_submissions_per_host,
         )
 
     ProducerConsumerDaemon(
@@ -386,7 +396,7 @@ def run(
                 if activity in activities:
                     activities.remove(activity)
 
-    cached_topology = ExpiringObjectCache(ttl=300, new_obj_fnc=lambda: Topology(ignore_availability=ignore_availability))
+    cached_topology = ExpiringObjectCache(ttl=3600, new_obj_fnc=lambda: Topology(ignore_availability=ignore_availability), refresh_interval=300, refresh_fnc=lambda topology: topology.refresh())
     submitter(
         once=once,
         rses=working_rses,
@@ -31,6 +31,7 @@ import threading
 import time
 from configparser import NoOptionError, NoSectionError
 from email.mime.text import MIMEText
+from queue import Empty, Queue
 from typing import TYPE_CHECKING, Any, Optional, Union
 
 import requests
@@ -41,17 +42,18 @@ import rucio.db.sqla.util
 from rucio.common.config import (
     config_get,
     config_get_bool,
+    config_get_float,
     config_get_int,
     config_get_list,
 )
 from rucio.common.exception import DatabaseException
 from rucio.common.logging import setup_logging
-from rucio.core.message import delete_messages, retrieve_messages
+from rucio.core.message import claim_messages, delete_messages, release_messages, retrieve_messages
 from rucio.core.monitor import MetricManager
 from rucio.daemons.common import run_daemon
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Sequence
+    from collections.abc import Callable, Iterable, Sequence
     from types import FrameType
 
     from stomp.utils import Frame
@@ -70,6 +72,16 @@ RECONNECT_COUNTER = METRICS.counter(
     documentation="Counts Hermes reconnects to different ActiveMQ brokers",
     labelnames=("host",),
 )
+DELIVERY_TIMER = METRICS.timer(
+    name="delivery.{service}",
+    documentation="Time to deliver a batch of messages to a service",
+    labelnames=("service",),
+)
+BACKLOG_GAUGE = METRICS.gauge(
+    name="backlog.{service}",
+    documentation="Number of messages queued or being delivered to a service",
+    labelnames=("service",),
+)
 
 
 def default(datetype: Union[datetime.date, datetime.datetime]) -> str:
@@ -535,6 +547,356 @@ def aggregate_to_influx(
     return 204
 
 
+def _deliver_to_influx(
+        messages: "Sequence[dict[str, Any]]",
+        endpoint: str,
+        logger: "LoggerFunction"
+) -> list[dict[str, Any]]:
+    """
+    Submit messages to InfluxDB
+
+    :param messages:           The list of messages.
+    :param endpoint:           The InfluxDB endpoint were to send the messages.
+    :param logger:             The logger object.
+
+    :returns:                  List of delivered messages
+    """
+    # For influxDB, bulk submission, either everything succeeds or fails
+    t_time = time.time()
+    logger(logging.DEBUG, "Will submit to influxDB")
+    try:
+        state = aggregate_to_influx(
+            messages=messages,
+            bin_size="1m",
+            endpoint=endpoint,
+            logger=logger,
+        )
+        if state in [204, 200]:
+            logger(
+                logging.INFO,
+                "%s messages successfully submitted to influxDB in %s seconds",
+                len(messages),
+                time.time() - t_time,
+            )
+            return list(messages)
+        logger(
+            logging.ERROR,
+            "Failure to submit %s messages to influxDB. Returned status: %s",
+            len(messages),
+            state,
+        )
+    except Exception as error:
+        logger(logging.ERROR, "Error sending to InfluxDB : %s", str(error))
+    return []
+
+
+def _deliver_to_elastic(
+        messages: "Sequence[dict[str, Any]]",
+        endpoint: str,
+        logger: "LoggerFunction"
+) -> list[dict[str, Any]]:
+    """
+    Submit messages to ElasticSearch
+
+    :param messages:           The list of messages.
+    :param endpoint:           The ES endpoint were to send the messages.
+    :param logger:             The logger object.
+
+    :returns:                  List of delivered messages
+    """
+    # For elastic, bulk submission, either everything succeeds or fails
+    t_time = time.time()
+    try:
+        state = submit_to_elastic(
+            messages=messages,
+            endpoint=endpoint,
+            logger=logger,
+        )
+        if state in [200, 204]:
+            logger(
+                logging.INFO,
+                "%s messages successfully submitted to elastic in %s seconds",
+                len(messages),
+                time.time() - t_time,
+            )
+            return list(messages)
+        logger(
+            logging.ERROR,
+            "Failure to submit %s messages to elastic. Returned status: %s",
+            len(messages),
+            state,
+        )
+    except Exception as error:
+        logger(logging.ERROR, "Error sending to Elastic : %s", str(error))
+    return []
+
+
+def _deliver_by_email(
+        messages: "Sequence[dict[str, Any]]",
+        logger: "LoggerFunction"
+) -> list[dict[str, Any]]:
+    """
+    Send messages by email
+
+    :param messages:           The list of messages.
+    :param logger:             The logger object.
+
+    :returns:                  List of delivered messages
+    """
+    t_time = time.time()
+    try:
+        messages_sent = deliver_emails(messages=messages, logger=logger)
+        logger(
+            logging.INFO,
+            "%s messages successfully submitted by emails in %s seconds",
+            len(messages),
+            time.time() - t_time,
+        )
+        return [message for message in messages if message["id"] in messages_sent]
+    except Exception as error:
+        logger(logging.ERROR, "Error sending email : %s", str(error))
+    return []
+
+
+def _deliver_to_activemq(
+        messages: "Sequence[dict[str, Any]]",
+        conns: "Sequence[stomp.Connection12]",
+        destination: str,
+        username: str,
+        password: str,
+        use_ssl: bool,
+        logger: "LoggerFunction"
+) -> list[dict[str, Any]]:
+    """
+    Deliver messages to ActiveMQ
+
+    :param messages:           The list of messages.
+    :param conns:              A list of connections.
+    :param destination:        The destination topic or queue.
+    :param username:           The username if no SSL connection.
+    :param password:           The username if no SSL connection.
+    :param use_ssl:            Boolean to choose if SSL connection is used.
+    :param logger:             The logger object.
+
+    :returns:                  List of delivered messages
+    """
+    t_time = time.time()
+    try:
+        messages_sent = set(deliver_to_activemq(
+            messages=messages,
+            conns=conns,
+            destination=destination,
+            username=username,
+            password=password,
+            use_ssl=use_ssl,
+            logger=logger,
+        ))
+        logger(
+            logging.INFO,
+            "%s messages successfully submitted to ActiveMQ in %s seconds",
+            len(messages),
+            time.time() - t_time,
+        )
+        return [message for message in messages if message["id"] in messages_sent]
+    except Exception as error:
+        logger(logging.ERROR, "Error sending to ActiveMQ : %s", str(error))
+    return []
+
+
+def setup_delivery(
+        service: str,
+        logger: "LoggerFunction"
+) -> "Optional[Callable[[Sequence[dict[str, Any]]], list[dict[str, Any]]]]":
+    """
+    Set up the delivery of messages to a service
+
+    :param service:            The service, e.g. influx, elastic, email or activemq.
+    :param logger:             The logger object.
+
+    :returns:                  A function delivering a list of messages to the service and returning
+                               the delivered ones, or None if the service cannot be set up.
+    """
+    if service == "influx":
+        try:
+            influx_endpoint = config_get("hermes", "influxdb_endpoint", False, None)
+            if influx_endpoint:
+                return functools.partial(_deliver_to_influx, endpoint=influx_endpoint, logger=logger)
+            logger(
+                logging.ERROR,
+                "InfluxDB defined in the services list, but no endpoint can be found",
+            )
+        except Exception as err:
+            logger(logging.ERROR, str(err))
+    elif service == "elastic":
+        try:
+            elastic_endpoint = config_get("hermes", "elastic_endpoint", False, None)
+            if elastic_endpoint:
+                return functools.partial(_deliver_to_elastic, endpoint=elastic_endpoint, logger=logger)
+            logger(
+                logging.ERROR,
+                "Elastic defined in the services list, but no endpoint can be found",
+            )
+        except Exception as err:
+            logger(logging.ERROR, str(err))
+    elif service == "activemq":
+        try:
+            conns, destination, username, password, use_ssl = setup_activemq(logger)
+            if conns:
+                return functools.partial(
+                    _deliver_to_activemq,
+                    conns=conns,
+                    destination=destination,
+                    username=username,
+                    password=password,
+                    use_ssl=use_ssl,
+                    logger=logger,
+                )
+            logger(
+                logging.ERROR,
+                "ActiveMQ defined in the services list, cannot be setup",
+            )
+        except Exception as err:
+            logger(logging.ERROR, str(err))
+    elif service == "email":
+        return functools.partial(_deliver_by_email, logger=logger)
+    return None
+
+
+def _delete_delivered_messages(messages: "Iterable[dict[str, Any]]") -> None:
+    delete_messages(messages=[
+        {
+            "id": message["id"],
+            "created_at": message["created_at"],
+            "updated_at": message["created_at"],
+            "payload": str(message["payload"]),
+            "event_type": message["event_type"],
+            "services": message["services"]
+        }
+        for message in messages
+    ])
+
+
+class ServiceWorker:
+    """
+    Delivers the messages of one service in a thread of its own, so that a slow
+    service doesn't delay the delivery to the other ones.
+
+    The hermes thread queues the messages in a bounded queue. The worker delivers them
+    in batches of up to batch_size messages, or what was queued flush_interval seconds
+    after the first message of the batch, and deletes the delivered messages after each batch.
+    The messages which could not be delivered are retrieved again at a later cycle; claimed
+    messages are released for that when release_undelivered is set.
+    """
+
+    def __init__(
+            self,
+            service: str,
+            deliver: "Callable[[Sequence[dict[str, Any]]], list[dict[str, Any]]]",
+            queue_size: int,
+            batch_size: int,
+            flush_interval: float,
+            logger: "LoggerFunction",
+            release_undelivered: bool = False
+    ):
+        """
+        :param service:            The service, e.g. influx, elastic, email or activemq.
+        :param deliver:            The delivery function returned by setup_delivery.
+        :param queue_size:         Maximum number of messages queued or being delivered.
+        :param batch_size:         Maximum number of messages delivered at once.
+        :param flush_interval:     Maximum time in seconds a message waits for the batch to fill up.
+        :param logger:             The logger object.
+        :param release_undelivered: If True, release the lease of the messages which could not be delivered.
+        """
+        self.service = service
+        self.queue_size = queue_size
+        self._deliver = deliver
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._logger = logger
+        self._release_undelivered = release_undelivered
+        self._queue: "Queue[Optional[dict[str, Any]]]" = Queue()
+        self._pending_ids: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="hermes-%s" % service, daemon=True)
+        self._thread.start()
+
+    @property
+    def free_slots(self) -> int:
+        """
+        Number of messages which can still be queued.
+        """
+        with self._lock:
+            return max(self.queue_size - len(self._pending_ids), 0)
+
+    def put(self, messages: "Iterable[dict[str, Any]]") -> int:
+        """
+        Queue the messages which are not queued or being delivered already.
+
+        :param messages:           The list of messages.
+
+        :returns:                  The number of queued messages.
+        """
+        with self._lock:
+            new_messages = [message for message in messages if message["id"] not in self._pending_ids]
+            self._pending_ids.update(message["id"] for message in new_messages)
+            backlog = len(self._pending_ids)
+        for message in new_messages:
+            self._queue.put(message)
+        BACKLOG_GAUGE.labels(service=self.service).set(backlog)
+        return len(new_messages)
+
+    def close(self) -> None:
+        """
+        Deliver the queued messages and stop the worker.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            message = self._queue.get()
+            if message is None:
+                return
+            batch = [message]
+            deadline = time.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                try:
+                    message = self._queue.get(timeout=max(deadline - time.time(), 0))
+                except Empty:
+                    break
+                if message is None:
+                    stop = True
+                    break
+                batch.append(message)
+            self._deliver_batch(batch)
+
+    def _deliver_batch(self, batch: list[dict[str, Any]]) -> None:
+        t_time = time.time()
+        try:
+            delivered = self._deliver(batch)
+        except Exception as error:
+            self._logger(logging.ERROR, "Error delivering to %s : %s", self.service, str(error))
+            delivered = []
+        DELIVERY_TIMER.labels(service=self.service).observe(time.time() - t_time)
+        if delivered:
+            try:
+                self._logger(logging.INFO, "Deleting %s messages delivered to %s", len(delivered), self.service)
+                _delete_delivered_messages(delivered)
+            except Exception as error:
+                self._logger(logging.ERROR, "Error deleting messages delivered to %s : %s", self.service, str(error))
+        if self._release_undelivered and len(delivered) < len(batch):
+            delivered_ids = {message["id"] for message in delivered}
+            try:
+                release_messages([message for message in batch if message["id"] not in delivered_ids])
+            except Exception as error:
+                self._logger(logging.ERROR, "Error releasing messages not delivered to %s : %s", self.service, str(error))
+        with self._lock:
+            self._pending_ids.difference_update(message["id"] for message in batch)
+            backlog = len(self._pending_ids)
+        BACKLOG_GAUGE.labels(service=self.service).set(backlog)
+
+
 def build_message_dict(
         bulk: int,
         thread: int,
@@ -542,6 +904,7 @@ def build_message_dict(
         message_dict: dict[str, list[dict[str, Any]]],
         logger: "LoggerFunction",
         service: Optional[str] = None,
+        lease_duration: Optional[int] = None,
 ) -> None:
     """
     Retrieves messages from the database and builds a dictionary with the keys being the services, and the values a list of the messages (built up of dictionary / json information)
@@ -552,17 +915,27 @@ def build_message_dict(
     :param message_dict:       Either empty dictionary to be built, or build upon when using query_by_service.
     :param logger:             The logger object.
     :param service:            When passed, only returns messages table for this specific service.
+    :param lease_duration:     When passed, the messages are claimed with a lease of this duration in seconds instead of being
+                               partitioned between the threads.
 
     :returns:                  None, but builds on the dictionary message_dict passed to this fuction (for when querying multiple services).
     """
     start_time = time.time()
-    messages = retrieve_messages(
-        bulk=bulk,
-        old_mode=False,
-        thread=thread,
-        total_threads=total_threads,
-        service_filter=service,
-    )
+    if lease_duration:
+        messages = claim_messages(
+            bulk=bulk,
+            lease_duration=lease_duration,
+            old_mode=False,
+            service_filter=service,
+        )
+    else:
+        messages = retrieve_messages(
+            bulk=bulk,
+            old_mode=False,
+            thread=thread,
+            total_threads=total_threads,
+            service_filter=service,
+        )
 
     if messages:
         if service is not None:
@@ -604,24 +977,38 @@ def hermes(once: bool = False, bulk: int = 1000, sleep_time: int = 10) -> None:
     The list of services need to be define in the config service in the hermes section.
     The list of endpoints need to be defined in rucio.cfg in the hermes section.
 
+    With service_workers enabled in the hermes section, each service gets a ServiceWorker
+    delivering its messages in a thread of its own.
+
     :param once:       Run only once.
     :param bulk:       The number of requests to process.
     :param sleep_time: Time between two cycles.
     """
-    run_daemon(
-        once=once,
-        graceful_stop=graceful_stop,
-        executable=DAEMON_NAME,
-        partition_wait_time=1,
-        sleep_time=sleep_time,
-        run_once_fnc=functools.partial(
-            run_once,
-            bulk=bulk,
-        ),
-    )
+    service_workers = {} if config_get_bool("hermes", "service_workers", raise_exception=False, default=False) else None
+    try:
+        run_daemon(
+            once=once,
+            graceful_stop=graceful_stop,
+            executable=DAEMON_NAME,
+            partition_wait_time=1,
+            sleep_time=sleep_time,
+            run_once_fnc=functools.partial(
+                run_once,
+                bulk=bulk,
+                service_workers=service_workers,
+            ),
+        )
+    finally:
+        for worker in (service_workers or {}).values():
+            worker.close()
 
 
-def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> bool:
+def run_once(
+        heartbeat_handler: "HeartbeatHandler",
+        bulk: int,
+        service_workers: Optional[dict[str, ServiceWorker]] = None,
+        **_kwargs
+) -> bool:
 
     worker_number, total_workers, logger = heartbeat_handler.live()
     try:
@@ -630,38 +1017,23 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
         logger(logging.DEBUG, "No services found, exiting")
         sys.exit(1)
 
-    if "influx" in services_list:
-        influx_endpoint = None
-        try:
-            influx_endpoint = config_get("hermes", "influxdb_endpoint", False, None)
-            if not influx_endpoint:
-                logger(
-                    logging.ERROR,
-                    "InfluxDB defined in the services list, but no endpoint can be found",
-                )
-        except Exception as err:
-            logger(logging.ERROR, str(err))
-    if "elastic" in services_list:
-        elastic_endpoint = None
-        try:
-            elastic_endpoint = config_get("hermes", "elastic_endpoint", False, None)
-            if not elastic_endpoint:
-                logger(
-                    logging.ERROR,
-                    "Elastic defined in the services list, but no endpoint can be found",
-                )
-        except Exception as err:
-            logger(logging.ERROR, str(err))
-    if "activemq" in services_list:
-        try:
-            conns, destination, username, password, use_ssl = setup_activemq(logger)
-            if not conns:
-                logger(
-                    logging.ERROR,
-                    "ActiveMQ defined in the services list, cannot be setup",
-                )
-        except Exception as err:
-            logger(logging.ERROR, str(err))
+    # With lease_messages, any number of hermes instances can work concurrently without partitioning the messages between them.
+    # The service workers always lease the messages: the lease keeps the messages queued or being delivered out of the next
+    # retrievals, without it the same oldest messages would be retrieved again and the workers could not run ahead.
+    lease_duration = None
+    if service_workers is not None or config_get_bool("hermes", "lease_messages", raise_exception=False, default=False):
+        lease_duration = config_get_int("hermes", "lease_duration", raise_exception=False, default=600)
+
+    if service_workers is not None:
+        return _queue_to_service_workers(
+            services_list=services_list,
+            service_workers=service_workers,
+            bulk=bulk,
+            lease_duration=lease_duration,
+            heartbeat_handler=heartbeat_handler,
+        )
+
+    deliveries = {service: setup_delivery(service, logger) for service in services_list}
 
     worker_number, total_workers, logger = heartbeat_handler.live()
     message_dict = {}
@@ -677,6 +1049,7 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
                 message_dict=message_dict,
                 logger=logger,
                 service=service,
+                lease_duration=lease_duration,
             )
     else:
         build_message_dict(
@@ -684,126 +1057,89 @@ def run_once(heartbeat_handler: "HeartbeatHandler", bulk: int, **_kwargs) -> boo
             thread=worker_number,
             total_threads=total_workers,
             message_dict=message_dict,
-            logger=logger
+            logger=logger,
+            lease_duration=lease_duration,
         )
 
-    if message_dict:
-        to_delete = []
-
-        if "influx" in message_dict and influx_endpoint:
-            # For influxDB, bulk submission, either everything succeeds or fails
-            t_time = time.time()
-            logger(logging.DEBUG, "Will submit to influxDB")
-            try:
-                state = aggregate_to_influx(
-                    messages=message_dict["influx"],
-                    bin_size="1m",
-                    endpoint=influx_endpoint,
-                    logger=logger,
-                )
-                if state in [204, 200]:
-                    logger(
-                        logging.INFO,
-                        "%s messages successfully submitted to influxDB in %s seconds",
-                        len(message_dict["influx"]),
-                        time.time() - t_time,
-                    )
-                    for message in message_dict["influx"]:
-                        to_delete.append(message)
-                else:
-                    logger(
-                        logging.ERROR,
-                        "Failure to submit %s messages to influxDB. Returned status: %s",
-                        len(message_dict["influx"]),
-                        state,
-                    )
-            except Exception as error:
-                logger(logging.ERROR, "Error sending to InfluxDB : %s", str(error))
+    to_delete = []
+    for service, messages in message_dict.items():
+        deliver = deliveries.get(service)
+        if deliver:
+            to_delete.extend(deliver(messages))
 
-        if "elastic" in message_dict and elastic_endpoint:
-            # For elastic, bulk submission, either everything succeeds or fails
-            t_time = time.time()
-            try:
-                state = submit_to_elastic(
-                    messages=message_dict["elastic"],
-                    endpoint=elastic_endpoint,
-                    logger=logger,
-                )
-                if state in [200, 204]:
-                    logger(
-                        logging.INFO,
-                        "%s messages successfully submitted to elastic in %s seconds",
-                        len(message_dict["elastic"]),
-                        time.time() - t_time,
-                    )
-                    for message in message_dict["elastic"]:
-                        to_delete.append(message)
-                else:
-                    logger(
-                        logging.ERROR,
-                        "Failure to submit %s messages to elastic. Returned status: %s",
-                        len(message_dict["elastic"]),
-                        state,
-                    )
-            except Exception as error:
-                logger(logging.ERROR, "Error sending to Elastic : %s", str(error))
+    logger(logging.INFO, "Deleting %s messages", len(to_delete))
+    _delete_delivered_messages(to_delete)
+    if lease_duration:
+        delivered_ids = {message["id"] for message in to_delete}
+        release_messages([message for messages in message_dict.values() for message in messages if message["id"] not in delivered_ids])
+    must_sleep = True
+    return must_sleep
 
-        if "email" in message_dict:
-            t_time = time.time()
-            try:
-                messages_sent = deliver_emails(
-                    messages=message_dict["email"], logger=logger
-                )
-                logger(
-                    logging.INFO,
-                    "%s messages successfully submitted by emails in %s seconds",
-                    len(message_dict["email"]),
-                    time.time() - t_time,
-                )
-                for message in message_dict["email"]:
-                    if message["id"] in messages_sent:
-                        to_delete.append(message)
-            except Exception as error:
-                logger(logging.ERROR, "Error sending email : %s", str(error))
 
-        if "activemq" in message_dict:
-            t_time = time.time()
-            try:
-                messages_sent = deliver_to_activemq(
-                    messages=message_dict["activemq"],
-                    conns=conns,  # type: ignore (argument could be None)
-                    destination=destination,  # type: ignore (argument could be None)
-                    username=username,  # type: ignore (argument could be None)
-                    password=password,  # type: ignore (argument could be None)
-                    use_ssl=use_ssl,  # type: ignore (argument could be None)
-                    logger=logger,
-                )
-                logger(
-                    logging.INFO,
-                    "%s messages successfully submitted to ActiveMQ in %s seconds",
-                    len(message_dict["activemq"]),
-                    time.time() - t_time,
-                )
-                for message in message_dict["activemq"]:
-                    if message["id"] in messages_sent:
-                        to_delete.append(message)
-            except Exception as error:
-                logger(logging.ERROR, "Error sending to ActiveMQ : %s", str(error))
+def _queue_to_service_workers(
+        services_list: "Sequence[str]",
+        service_workers: dict[str, ServiceWorker],
+        bulk: int,
+        lease_duration: int,
+        heartbeat_handler: "HeartbeatHandler"
+) -> bool:
+    """
+    Claim the messages of each service and queue them to its ServiceWorker. The workers
+    are started at the first call. The messages of a service are only claimed while its
+    queue has free slots, a slow service thus only delays its own messages. The messages
+    leased by a worker are not claimed again until it delivered or released them.
+
+    :param services_list:      The services to deliver to.
+    :param service_workers:    The ServiceWorker of each service, filled at the first call.
+    :param bulk:               The maximum number of messages retrieved per service.
+    :param lease_duration:     The duration in seconds of the lease of the claimed messages.
+    :param heartbeat_handler:  The heartbeat handler.
+
+    :returns:                  True if the daemon must sleep before the next call.
+    """
+    worker_number, total_workers, logger = heartbeat_handler.live()
+    queue_size = config_get_int("hermes", "service_queue_size", raise_exception=False, default=2 * bulk)
+    batch_size = config_get_int("hermes", "service_batch_size", raise_exception=False, default=bulk)
+    flush_interval = config_get_float("hermes", "service_flush_interval", raise_exception=False, default=1)
 
-    logger(logging.INFO, "Deleting %s messages", len(to_delete))
-    to_delete = [
-        {
-            "id": message["id"],
-            "created_at": message["created_at"],
-            "updated_at": message["created_at"],
-            "payload": str(message["payload"]),
-            "event_type": message["event_type"],
-            "services": message["services"]
-        }
-        for message in to_delete
-    ]
-    delete_messages(messages=to_delete)
     must_sleep = True
+    for service in services_list:
+        worker = service_workers.get(service)
+        if worker is None:
+            deliver = setup_delivery(service, logger)
+            if not deliver:
+                continue
+            worker = service_workers[service] = ServiceWorker(
+                service=service,
+                deliver=deliver,
+                queue_size=queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                logger=logger,
+                release_undelivered=True,
+            )
+
+        free_slots = worker.free_slots
+        if not free_slots:
+            logger(logging.DEBUG, "Queue of %s is full, not retrieving messages", service)
+            continue
+        to_claim = min(bulk, free_slots)
+        message_dict = {}
+        build_message_dict(
+            bulk=to_claim,
+            thread=worker_number,
+            total_threads=total_workers,
+            message_dict=message_dict,
+            logger=logger,
+            service=service,
+            lease_duration=lease_duration,
+        )
+        messages = message_dict.get(service, [])
+        queued = worker.put(messages)
+        logger(logging.DEBUG, "Queued %s new messages for %s", queued, service)
+        if queued and len(messages) >= to_claim:
+            # There are probably more messages waiting for this service
+            must_sleep = False
     return must_sleep
 
 
@@ -24,9 +24,12 @@ import random
 import threading
 import time
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from configparser import NoOptionError, NoSectionError
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from math import log2
+from queue import Empty, Queue
 from typing import TYPE_CHECKING, Any, Optional
 
 from dogpile.cache.api import NoValue
@@ -50,15 +53,14 @@ from rucio.core.rse import RseData, determine_audience_for_rse, determine_scope_
 from rucio.core.rse_expression_parser import parse_expression
 from rucio.core.rule import get_evaluation_backlog
 from rucio.core.vo import list_vos
-from rucio.daemons.common import run_daemon
+from rucio.daemons.common import HeartbeatHandler, run_daemon
 from rucio.rse import rsemanager as rsemgr
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Sequence
+    from collections.abc import Callable, Iterable, Sequence
     from types import FrameType
 
     from rucio.common.types import LFNDict, LoggerFunction
-    from rucio.daemons.common import HeartbeatHandler
 
 GRACEFUL_STOP = threading.Event()
 METRICS = MetricManager(module=__name__)
@@ -145,7 +147,8 @@ def delete_from_storage(heartbeat_handler, hb_payload, replicas, prot, rse_info,
         prot.connect()
         for replica in replicas:
             # Physical deletion
-            _, _, logger = heartbeat_handler.live(payload=hb_payload)
+            if heartbeat_handler:
+                _, _, logger = heartbeat_handler.live(payload=hb_payload)
             stopwatch = Stopwatch()
             deletion_dict = {'scope': replica['scope'].external,
                              'name': replica['name'],
@@ -288,8 +291,9 @@ def __try_reserve_worker_slot(heartbeat_handler: "HeartbeatHandler", rse: RseDat
     The function doesn't guarantee strong consistency: the number of total workers may end being slightly
     higher than the configured limit.
 
-    The reservation is done using the "payload" field of the rucio heart-beats.
-    if reservation successful, returns the heartbeat payload used for the reservation. Otherwise, returns None
+    The reservation is done using the "payload" field of the rucio heart-beats. The slot is held by the
+    heartbeat of the deletion worker, with the returned payload, as long as it deletes (see _DeletionPipeline).
+    if reservation successful, returns the heartbeat payload to use for the reservation. Otherwise, returns None
     """
 
     rse_hostname_key = '%s,%s' % (rse.id, hostname)
@@ -307,7 +311,6 @@ def __try_reserve_worker_slot(heartbeat_handler: "HeartbeatHandler", rse: RseDat
         logger(logging.DEBUG, 'Too many deletion threads for %s on RSE %s. Back off', hostname, rse.name)
         return None
     logger(logging.INFO, 'Nb workers on %s smaller than the limit (current %i vs max %i). Starting new worker on RSE %s', hostname, tot_threads_for_hostname, max_deletion_thread, rse.name)
-    _, total_workers, logger = heartbeat_handler.live(payload=rse_hostname_key)
     logger(logging.DEBUG, 'Total deletion workers for %s : %i', hostname, tot_threads_for_hostname + 1)
     return rse_hostname_key
 
@@ -379,6 +382,257 @@ def __check_rse_usage(rse: RseData, greedy: bool = False, logger: "LoggerFunctio
     return 0, True
 
 
+class _HostDeletionPools:
+    """
+    Thread pools doing the physical deletion, one per storage hostname.
+
+    The pools are shared by all the reaper threads of the process. The pool of a hostname
+    has get_max_deletion_threads_by_hostname(hostname) threads and accepts no more chunks
+    than it has threads, so that a slow storage endpoint only backs up its own pool and a
+    reserved chunk starts, and takes its heartbeat slot, right away.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pools: dict[str, tuple[int, ThreadPoolExecutor]] = {}
+        self._in_flight: dict[str, int] = {}
+
+    def reserve(self, hostname: str) -> bool:
+        """
+        Reserve a place for one chunk of replicas in the pool of the hostname.
+
+        :param hostname: The hostname of the storage.
+        :returns: True if the place was reserved, False if the pool is full.
+        """
+        max_threads = max(get_max_deletion_threads_by_hostname(hostname), 1)
+        with self._lock:
+            in_flight = self._in_flight.get(hostname, 0)
+            if in_flight >= max_threads:
+                return False
+            self._in_flight[hostname] = in_flight + 1
+        return True
+
+    def release(self, hostname: str) -> None:
+        """
+        Release a place reserved in the pool of the hostname.
+
+        :param hostname: The hostname of the storage.
+        """
+        with self._lock:
+            self._in_flight[hostname] -= 1
+
+    def submit(self, hostname: str, fnc: "Callable[..., Any]", *args, **kwargs) -> Future:
+        """
+        Run a function in the pool of the hostname. The place must have been reserved before,
+        it is released when the function returns, before the result is set on the future.
+
+        :param hostname: The hostname of the storage.
+        :param fnc:      The function to run.
+        :returns: The future of the function call.
+        """
+        max_threads = max(get_max_deletion_threads_by_hostname(hostname), 1)
+        with self._lock:
+            pool_threads, pool = self._pools.get(hostname, (0, None))
+            if pool is None or pool_threads != max_threads:
+                # The number of threads was reconfigured. The chunks already submitted to the former pool still run.
+                if pool is not None:
+                    pool.shutdown(wait=False)
+                pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='reaper-%s' % hostname)
+                self._pools[hostname] = (max_threads, pool)
+            return pool.submit(self._run_and_release, hostname, fnc, *args, **kwargs)
+
+    def _run_and_release(self, hostname: str, fnc: "Callable[..., Any]", *args, **kwargs) -> Any:
+        try:
+            return fnc(*args, **kwargs)
+        finally:
+            self.release(hostname)
+
+    def shutdown(self) -> None:
+        """
+        Wait for all the submitted functions to return and stop the threads of the pools.
+        """
+        with self._lock:
+            pools = [pool for _, pool in self._pools.values()]
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=True)
+
+
+HOST_POOLS = _HostDeletionPools()
+
+
+class _DeletionPipeline:
+    """
+    Physical deletion and catalog update stages of a reaper thread.
+
+    The replicas listed and marked by _run_once are deleted from the storage in the
+    per-hostname pools, chunk_size at a time. While it deletes, the pool thread holds a
+    heartbeat with the payload reserved by __try_reserve_worker_slot, so that the deletion
+    workers of all the reaper processes are still limited per hostname. The deleted replicas
+    go through a bounded queue to a single catalog thread, which removes everything queued
+    in the meantime with one delete_replicas call per RSE.
+    """
+
+    def __init__(self, pools: _HostDeletionPools, queue_size: int = 100, batch_size: int = 1000) -> None:
+        """
+        :param pools:      The per-hostname pools doing the physical deletion.
+        :param queue_size: Maximum number of deleted chunks waiting for the catalog thread.
+        :param batch_size: Maximum number of replicas removed from the catalog in one delete_replicas call.
+        """
+        self._pools = pools
+        self._batch_size = batch_size
+        self._queue: "Queue[Optional[tuple[RseData, list[dict[str, Any]], LoggerFunction]]]" = Queue(maxsize=queue_size)
+        self._futures: list[Future] = []
+        self._catalog_thread = threading.Thread(target=self._update_catalog, name='reaper-catalog', daemon=True)
+        self._catalog_thread.start()
+
+    def __enter__(self) -> "_DeletionPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def reserve(self, hostname: str) -> bool:
+        return self._pools.reserve(hostname)
+
+    def release(self, hostname: str) -> None:
+        self._pools.release(hostname)
+
+    def submit(
+            self,
+            hostname: str,
+            rse: RseData,
+            replicas: list[dict[str, Any]],
+            chunk_size: int,
+            scheme: Optional[str],
+            auto_exclude_threshold: int,
+            heartbeat_handler: "HeartbeatHandler",
+            hb_payload: str,
+            logger: "LoggerFunction"
+    ) -> None:
+        """
+        Delete replicas from the storage and then from the catalog, asynchronously.
+        A place must have been reserved in the pool of the hostname before.
+
+        :param heartbeat_handler: The heartbeat handler of the calling reaper thread, whose executable and
+                                  renewal interval are used for the heartbeat of the deletion worker.
+        :param hb_payload:        The heartbeat payload reserving the deletion slot.
+        """
+        self._futures = [future for future in self._futures if not future.done()]
+        self._futures.append(self._pools.submit(hostname, self._delete, rse, replicas, chunk_size, scheme, auto_exclude_threshold,
+                                                heartbeat_handler.executable, heartbeat_handler.renewal_interval, hb_payload, logger))
+
+    def close(self) -> None:
+        """
+        Wait for the chunks submitted so far to be deleted and removed from the catalog.
+        """
+        wait(self._futures)
+        self._futures = []
+        self._queue.put(None)
+        self._catalog_thread.join()
+
+    def _delete(
+            self,
+            rse: RseData,
+            replicas: list[dict[str, Any]],
+            chunk_size: int,
+            scheme: Optional[str],
+            auto_exclude_threshold: int,
+            executable: str,
+            renewal_interval: int,
+            hb_payload: str,
+            logger: "LoggerFunction"
+    ) -> None:
+        with HeartbeatHandler(executable=executable, renewal_interval=renewal_interval) as heartbeat_handler:
+            heartbeat_handler.live(payload=hb_payload)
+            self._delete_chunks(rse, replicas, chunk_size, scheme, auto_exclude_threshold, heartbeat_handler, hb_payload, logger)
+
+    def _delete_chunks(
+            self,
+            rse: RseData,
+            replicas: list[dict[str, Any]],
+            chunk_size: int,
+            scheme: Optional[str],
+            auto_exclude_threshold: int,
+            heartbeat_handler: "HeartbeatHandler",
+            hb_payload: str,
+            logger: "LoggerFunction"
+    ) -> None:
+        try:
+            prot = rsemgr.create_protocol(rse.info, 'delete', scheme=scheme, logger=logger)
+            if rse.attributes.get(RseAttr.OIDC_SUPPORT) is True and prot.attributes['scheme'] == 'davs':
+                audience = determine_audience_for_rse(rse.id)
+                # FIXME: At the time of writing, StoRM requires `storage.read`
+                # in order to perform a stat operation.
+                scope = determine_scope_for_rse(rse.id, scopes=['storage.modify', 'storage.read'])
+                auth_token = request_token(audience, scope)
+                if auth_token:
+                    logger(logging.INFO, 'Using a token to delete on RSE %s', rse.name)
+                    prot = rsemgr.create_protocol(rse.info, 'delete', scheme=scheme, auth_token=auth_token, logger=logger)
+                else:
+                    logger(logging.WARNING, 'Failed to procure a token to delete on RSE %s', rse.name)
+            for file_replicas in chunks(replicas, chunk_size):
+                # Refresh heartbeat
+                _, _, logger = heartbeat_handler.live(payload=hb_payload)
+                del_start_time = time.time()
+                for replica in file_replicas:
+                    try:
+                        lfn: "LFNDict" = {
+                            'scope': replica['scope'].external,
+                            'name': replica['name'],
+                            'path': replica['path']
+                        }
+                        replica['pfn'] = str(list(rsemgr.lfns2pfns(rse_settings=rse.info,
+                                                                   lfns=[lfn],
+                                                                   operation='delete', scheme=scheme).values())[0])
+                    except (ReplicaUnAvailable, ReplicaNotFound) as error:
+                        logger(logging.WARNING, 'Failed get pfn UNAVAILABLE replica %s:%s on %s with error %s', replica['scope'], replica['name'], rse.name, str(error))
+                        replica['pfn'] = None
+
+                    except Exception:
+                        logger(logging.CRITICAL, 'Exception', exc_info=True)
+
+                is_staging = rse.columns['staging_area']
+                deleted_files = delete_from_storage(heartbeat_handler, hb_payload, file_replicas, prot, rse.info, is_staging, auto_exclude_threshold, logger=logger)
+                logger(logging.INFO, '%i files processed in %s seconds', len(file_replicas), time.time() - del_start_time)
+                self._queue.put((rse, deleted_files, logger))
+        except RSEProtocolNotSupported:
+            logger(logging.WARNING, 'Protocol %s not supported on %s', scheme, rse.name)
+        except Exception:
+            logger(logging.CRITICAL, 'Exception', exc_info=True)
+
+    def _update_catalog(self) -> None:
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            try:
+                while True:
+                    items.append(self._queue.get_nowait())
+            except Empty:
+                pass
+
+            files_by_rse: dict[RseData, list[dict[str, Any]]] = {}
+            loggers: dict[RseData, "LoggerFunction"] = {}
+            for item in items:
+                if item is None:
+                    stop = True
+                    continue
+                rse, deleted_files, loggers[rse] = item
+                files_by_rse.setdefault(rse, []).extend(deleted_files)
+
+            for rse, deleted_files in files_by_rse.items():
+                logger = loggers[rse]
+                for files in chunks(deleted_files, self._batch_size):
+                    del_start = time.time()
+                    try:
+                        delete_replicas(rse_id=rse.id, files=files)  # type: ignore (argument missing: session)
+                    except Exception:
+                        logger(logging.CRITICAL, 'Exception', exc_info=True)
+                        continue
+                    logger(logging.DEBUG, 'delete_replicas succeeded on %s : %s replicas in %s seconds', rse.name, len(files), time.time() - del_start)
+                    METRICS.counter('deletion.done').inc(len(files))
+
+
 def reaper(
         rses: "Sequence[str]",
         include_rses: Optional[str],
@@ -410,26 +664,28 @@ def reaper(
     :param auto_exclude_threshold: Number of service unavailable exceptions after which the RSE gets temporarily excluded.
     :param auto_exclude_timeout:   Timeout for temporarily excluded RSEs.
     """
-    run_daemon(
-        once=once,
-        graceful_stop=GRACEFUL_STOP,
-        executable=DAEMON_NAME,
-        partition_wait_time=0 if once else 10,
-        sleep_time=sleep_time,
-        run_once_fnc=functools.partial(
-            run_once,
-            rses=rses,
-            include_rses=include_rses,
-            exclude_rses=exclude_rses,
-            vos=vos,
-            chunk_size=chunk_size,
-            greedy=greedy,
-            scheme=scheme,
-            delay_seconds=delay_seconds,
-            auto_exclude_threshold=auto_exclude_threshold,
-            auto_exclude_timeout=auto_exclude_timeout,
+    with _DeletionPipeline(HOST_POOLS) as pipeline:
+        run_daemon(
+            once=once,
+            graceful_stop=GRACEFUL_STOP,
+            executable=DAEMON_NAME,
+            partition_wait_time=0 if once else 10,
+            sleep_time=sleep_time,
+            run_once_fnc=functools.partial(
+                run_once,
+                rses=rses,
+                include_rses=include_rses,
+                exclude_rses=exclude_rses,
+                vos=vos,
+                chunk_size=chunk_size,
+                greedy=greedy,
+                scheme=scheme,
+                delay_seconds=delay_seconds,
+                auto_exclude_threshold=auto_exclude_threshold,
+                auto_exclude_timeout=auto_exclude_timeout,
+                pipeline=pipeline,
+            )
         )
-    )
 
 
 def run_once(
@@ -444,6 +700,7 @@ def run_once(
         auto_exclude_threshold: int,
         auto_exclude_timeout: int,
         heartbeat_handler: "HeartbeatHandler",
+        pipeline: Optional[_DeletionPipeline] = None,
         **_kwargs
 ) -> bool:
 
@@ -485,20 +742,23 @@ def run_once(
     # Scale the number of allowed iterations with the number of total reaper workers
     iteration = 0
     max_fast_reiterations = int(log2(total_workers))
-    while rses_to_process and iteration <= max_fast_reiterations:
-        rses_to_process = _run_once(
-            rses_to_process=rses_to_process,
-            chunk_size=chunk_size,
-            greedy=greedy,
-            scheme=scheme,
-            delay_seconds=delay_seconds,
-            auto_exclude_threshold=auto_exclude_threshold,
-            auto_exclude_timeout=auto_exclude_timeout,
-            heartbeat_handler=heartbeat_handler,
-        )
-        if rses_to_process and iteration < max_fast_reiterations:
-            logger(logging.INFO, "Will perform fast-reiteration %d/%d with rses: %s", iteration + 1, max_fast_reiterations, [str(rse) for rse in rses_to_process])
-        iteration += 1
+    # Without a pipeline from the calling context, wait for the deletions before returning
+    with nullcontext(pipeline) if pipeline else _DeletionPipeline(HOST_POOLS) as pipeline:
+        while rses_to_process and iteration <= max_fast_reiterations:
+            rses_to_process = _run_once(
+                rses_to_process=rses_to_process,
+                chunk_size=chunk_size,
+                greedy=greedy,
+                scheme=scheme,
+                delay_seconds=delay_seconds,
+                auto_exclude_threshold=auto_exclude_threshold,
+                auto_exclude_timeout=auto_exclude_timeout,
+                heartbeat_handler=heartbeat_handler,
+                pipeline=pipeline,
+            )
+            if rses_to_process and iteration < max_fast_reiterations:
+                logger(logging.INFO, "Will perform fast-reiteration %d/%d with rses: %s", iteration + 1, max_fast_reiterations, [str(rse) for rse in rses_to_process])
+            iteration += 1
 
     if rses_to_process:
         # There is still more work to be performed.
@@ -517,6 +777,7 @@ def _run_once(
         auto_exclude_threshold: int,
         auto_exclude_timeout: int,
         heartbeat_handler: "HeartbeatHandler",
+        pipeline: _DeletionPipeline,
         **_kwargs
 ) -> list[RseData]:
 
@@ -585,6 +846,10 @@ def _run_once(
             # Might need to reschedule a try on this RSE later in the same cycle
             continue
 
+        if not pipeline.reserve(rse_hostname):
+            logger(logging.DEBUG, 'Deletion pool of %s is full. Back off on RSE %s', rse_hostname, rse.name)
+            continue
+
         # List and mark BEING_DELETED the files to delete
         del_start_time = time.time()
         try:
@@ -607,59 +872,22 @@ def _run_once(
 
         except (DatabaseException, IntegrityError, DatabaseError) as error:
             logger(logging.ERROR, '%s', str(error))
+            pipeline.release(rse_hostname)
             continue
         except Exception:
             logger(logging.CRITICAL, 'Exception', exc_info=True)
+            pipeline.release(rse_hostname)
             continue
-        # Physical  deletion will take place there
+        if not replicas:
+            pipeline.release(rse_hostname)
+            continue
+        # Physical deletion, and then removal from the catalog, will take place in the deletion pool of the hostname
         try:
             rse.ensure_loaded(load_info=True, load_attributes=True)
-            prot = rsemgr.create_protocol(rse.info, 'delete', scheme=scheme, logger=logger)
-            if rse.attributes.get(RseAttr.OIDC_SUPPORT) is True and prot.attributes['scheme'] == 'davs':
-                audience = determine_audience_for_rse(rse.id)
-                # FIXME: At the time of writing, StoRM requires `storage.read`
-                # in order to perform a stat operation.
-                scope = determine_scope_for_rse(rse.id, scopes=['storage.modify', 'storage.read'])
-                auth_token = request_token(audience, scope)
-                if auth_token:
-                    logger(logging.INFO, 'Using a token to delete on RSE %s', rse.name)
-                    prot = rsemgr.create_protocol(rse.info, 'delete', scheme=scheme, auth_token=auth_token, logger=logger)
-                else:
-                    logger(logging.WARNING, 'Failed to procure a token to delete on RSE %s', rse.name)
-            for file_replicas in chunks(replicas, chunk_size):
-                # Refresh heartbeat
-                _, total_workers, logger = heartbeat_handler.live(payload=hb_payload)
-                del_start_time = time.time()
-                for replica in file_replicas:
-                    try:
-                        lfn: "LFNDict" = {
-                            'scope': replica['scope'].external,
-                            'name': replica['name'],
-                            'path': replica['path']
-                        }
-                        replica['pfn'] = str(list(rsemgr.lfns2pfns(rse_settings=rse.info,
-                                                                   lfns=[lfn],
-                                                                   operation='delete', scheme=scheme).values())[0])
-                    except (ReplicaUnAvailable, ReplicaNotFound) as error:
-                        logger(logging.WARNING, 'Failed get pfn UNAVAILABLE replica %s:%s on %s with error %s', replica['scope'], replica['name'], rse.name, str(error))
-                        replica['pfn'] = None
-
-                    except Exception:
-                        logger(logging.CRITICAL, 'Exception', exc_info=True)
-
-                is_staging = rse.columns['staging_area']
-                deleted_files = delete_from_storage(heartbeat_handler, hb_payload, file_replicas, prot, rse.info, is_staging, auto_exclude_threshold, logger=logger)
-                logger(logging.INFO, '%i files processed in %s seconds', len(file_replicas), time.time() - del_start_time)
-
-                # Then finally delete the replicas
-                del_start = time.time()
-                delete_replicas(rse_id=rse.id, files=deleted_files)  # type: ignore (argument missing: session)
-                logger(logging.DEBUG, 'delete_replicas succeeded on %s : %s replicas in %s seconds', rse.name, len(deleted_files), time.time() - del_start)
-                METRICS.counter('deletion.done').inc(len(deleted_files))
-        except RSEProtocolNotSupported:
-            logger(logging.WARNING, 'Protocol %s not supported on %s', scheme, rse.name)
+            pipeline.submit(rse_hostname, rse, replicas, chunk_size, scheme, auto_exclude_threshold, heartbeat_handler, hb_payload, logger)
         except Exception:
             logger(logging.CRITICAL, 'Exception', exc_info=True)
+            pipeline.release(rse_hostname)
 
     if paused_rses:
         logger(logging.INFO, 'Deletion paused for a while for following RSEs: %s', ', '.join(paused_rses))
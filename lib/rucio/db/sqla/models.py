@@ -1577,6 +1577,8 @@ class Message(BASE, ModelBase):
     payload: Mapped[str] = mapped_column(String(4000))
     payload_nolimit: Mapped[Optional[str]] = mapped_column(Text)
     services: Mapped[Optional[str]] = mapped_column(String(256))
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(255))
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     _table_args = (PrimaryKeyConstraint('id', name='MESSAGES_ID_PK'),
                    CheckConstraint('EVENT_TYPE IS NOT NULL', name='MESSAGES_EVENT_TYPE_NN'),
                    CheckConstraint('PAYLOAD IS NOT NULL', name='MESSAGES_PAYLOAD_NN'),
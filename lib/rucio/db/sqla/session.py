@@ -44,6 +44,7 @@ if TYPE_CHECKING:
 
     from pymysql import Connection as MySQLConnection
     from sqlalchemy.engine.base import Engine
+    from sqlalchemy.orm import SessionTransaction
 
     from rucio.common.types import LoggerFunction
 
@@ -70,6 +71,7 @@ DEFAULT_SCHEMA_NAME = config_get(DATABASE_SECTION, 'schema',
                                  raise_exception=False, default=None, check_config_table=False)
 _METADATA = MetaData(schema=DEFAULT_SCHEMA_NAME)
 _MAKER, _ENGINE, _LOCK = None, None, Lock()
+_AFTER_COMMIT_KEY = 'after_commit'
 
 
 SQLA_CONFIG_POOLCLASS_MAPPING = {
@@ -503,6 +505,30 @@ def transactional_session(function: "Callable[P, R]") -> 'Callable':
     return _update_session_wrapper(new_funct, function)
 
 
+def after_commit(session: "Session", function: "Callable[[], Any]") -> None:
+    '''
+    Call function once the transaction of the session is committed, e.g. to drop a cache entry
+    only when the change is visible to the other sessions. Nothing is called on rollback.
+    '''
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(function)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session: "Session") -> None:
+    transaction = session.get_transaction()
+    if transaction is not None and transaction.is_active:
+        # Only a savepoint was released
+        return
+    for function in session.info.pop(_AFTER_COMMIT_KEY, ()):
+        function()
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_after_commit(session: "Session", transaction: "SessionTransaction") -> None:
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
 @retrying(retry_on_exception=retry_if_db_connection_error,
           wait_fixed=500,
           stop_max_attempt_number=2)
@@ -22,9 +22,10 @@ import sqlalchemy
 from alembic import command, op
 from alembic.config import Config
 from dogpile.cache.api import NoValue
-from sqlalchemy import Column, PrimaryKeyConstraint, func, inspect
+from sqlalchemy import Column, PrimaryKeyConstraint, event, func, inspect
 from sqlalchemy.dialects.postgresql.base import PGInspector
 from sqlalchemy.exc import DatabaseError, IntegrityError
+from sqlalchemy.orm import Session as OrmSession
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.schema import CreateSchema, CreateTable, DropConstraint, DropTable, ForeignKeyConstraint, MetaData, Table
 from sqlalchemy.sql.ddl import DropSchema
@@ -36,17 +37,18 @@ from rucio.common.config import config_get, config_get_list
 from rucio.common.constants import DEFAULT_VO
 from rucio.common.schema import get_schema_value
 from rucio.common.types import InternalAccount, LoggerFunction
-from rucio.common.utils import generate_uuid
+from rucio.common.utils import chunks, generate_uuid
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import AccountStatus, AccountType, IdentityType
 from rucio.db.sqla.session import get_dump_engine, get_engine, get_session
 from rucio.db.sqla.types import InternalScopeString, String
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Callable, Sequence
 
-    from sqlalchemy.engine import Inspector
-    from sqlalchemy.orm import Query, Session
+    from sqlalchemy.engine import Inspector, Row
+    from sqlalchemy.orm import InstrumentedAttribute, Query, Session, SessionTransaction
+    from sqlalchemy.sql import ColumnElement
 
     # TypeVar representing the DeclarativeObj class defined inside _create_temp_table
     DeclarativeObj = TypeVar('DeclarativeObj')
@@ -542,3 +544,113 @@ def temp_table_mngr(session: "Session") -> TempTableManager:
         mngr = TempTableManager(session)
         session.info[key] = mngr
     return mngr
+
+
+def delete_and_return(
+        model: type["DeclarativeObj"],
+        condition: "ColumnElement[bool]",
+        *columns: "InstrumentedAttribute[Any]",
+        session: "Session",
+) -> "Sequence[Row]":
+    """
+    Delete the rows of the model matching the condition and return the given columns of the deleted rows.
+
+    Uses DELETE ... RETURNING where the database supports it. Otherwise, the rows are
+    selected with a lock and deleted by primary key, which requires the model to have an 'id' column.
+    """
+    if session.get_bind().dialect.delete_returning:
+        stmt = sqlalchemy.delete(
+            model
+        ).where(
+            condition
+        ).returning(
+            *columns
+        ).execution_options(
+            synchronize_session=False
+        )
+        return session.execute(stmt).all()
+
+    stmt = select(
+        model.id,
+        *columns
+    ).where(
+        condition
+    ).with_for_update()
+    rows = session.execute(stmt).all()
+    for chunk in chunks([row.id for row in rows], 1000):
+        stmt = sqlalchemy.delete(
+            model
+        ).where(
+            model.id.in_(chunk)
+        ).execution_options(
+            synchronize_session=False
+        )
+        session.execute(stmt)
+    return rows
+
+
+class DeltaAccumulator:
+    """
+    Sums counter deltas per key until the end of the current transaction of a session.
+
+    Each kind of delta is registered with a flush function which receives the
+    dictionary {key: [files, bytes]} and writes it to the database. All kinds are
+    flushed right before the transaction commits, so a transaction which updates the
+    same counter many times writes a single row per key instead of one row per update.
+    Deltas which are still pending when the transaction ends otherwise, e.g. on
+    rollback, are dropped.
+
+    Savepoints are not tracked: deltas added within a rolled back savepoint are
+    still flushed with the enclosing transaction.
+    """
+
+    def __init__(self, session: "Session"):
+        self.session = session
+        self.deltas = {}
+        self.flush_functions = {}
+
+    def add(self, kind: str, key: Any, files: int, bytes_: int, flush_fnc: "Callable[[dict[Any, list[int]], Session], None]") -> None:
+        deltas = self.deltas.setdefault(kind, {})
+        self.flush_functions.setdefault(kind, flush_fnc)
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += files
+        delta[1] += bytes_
+
+    def flush(self, kind: Optional[str] = None) -> None:
+        """
+        Write the accumulated deltas (of the given kind, or of all kinds) to the database.
+        """
+        kinds = [kind] if kind else list(self.deltas)
+        for kind_ in kinds:
+            deltas = self.deltas.pop(kind_, None)
+            if deltas:
+                self.flush_functions[kind_](deltas, self.session)
+
+    def clear(self) -> None:
+        self.deltas.clear()
+
+
+def delta_accumulator(session: "Session") -> DeltaAccumulator:
+    """
+    Creates (if doesn't yet exist) and returns a DeltaAccumulator instance associated to the session
+    """
+    key = 'delta_accumulator'
+    accumulator = session.info.get(key)
+    if not accumulator:
+        accumulator = DeltaAccumulator(session)
+        session.info[key] = accumulator
+    return accumulator
+
+
+@event.listens_for(OrmSession, 'before_commit')
+def _flush_delta_accumulator(session: "Session") -> None:
+    accumulator = session.info.get('delta_accumulator')
+    if accumulator:
+        accumulator.flush()
+
+
+@event.listens_for(OrmSession, 'after_transaction_end')
+def _clear_delta_accumulator(session: "Session", transaction: "SessionTransaction") -> None:
+    accumulator = session.info.get('delta_accumulator')
+    if accumulator and transaction.parent is None:
+        accumulator.clear()
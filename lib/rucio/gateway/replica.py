@@ -241,12 +241,18 @@ def list_replicas(
         resolve_parents: bool = False,
         nrandom: Optional[int] = None,
         updated_after: Optional[datetime.datetime] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
         issuer: Optional[str] = None,
         vo: str = DEFAULT_VO
 ) -> 'Iterator[dict[str, Any]]':
     """
     List file replicas for a list of data identifiers.
 
+    In paginated mode (page_size set), at most one page of files is returned. If more files
+    are available, the last element yielded is {'next_cursor': token}; the token must be
+    passed as cursor to get the following page.
+
     :param dids: The list of data identifiers (DIDs).
     :param schemes: A list of schemes to filter the replicas. (e.g. file, http, ...)
     :param unavailable: (deprecated) Also include unavailable replicas in the list.
@@ -259,11 +265,22 @@ def list_replicas(
     :param resolve_archives: When set to True, find archives which contain the replicas.
     :param resolve_parents: When set to True, find all parent datasets which contain the replicas.
     :param updated_after: datetime object (UTC time), only return replicas updated after this time
+    :param page_size: If set, the number of replicas fetched per page.
+    :param cursor: The continuation token returned by the previous page.
     :param issuer: The issuer account.
     :param vo: The VO to act on.
     """
     validate_schema(name='r_dids', obj=dids, vo=vo)
 
+    list_cursor = None
+    if page_size:
+        if cursor:
+            list_cursor = replica.ListReplicasCursor.from_token(cursor, page_size=page_size)
+        else:
+            list_cursor = replica.ListReplicasCursor(page_size=page_size)
+    elif cursor:
+        raise exception.InvalidObject('A page_size is required to use a continuation cursor')
+
     # Allow selected authenticated users to retrieve signed URLs.
     # Unauthenticated users, or permission-less users will get the raw URL without the signature.
     sign_urls = False
@@ -282,7 +299,8 @@ def list_replicas(
                                          client_location=client_location, domain=domain,
                                          sign_urls=sign_urls, signature_lifetime=signature_lifetime,
                                          resolve_archives=resolve_archives, resolve_parents=resolve_parents,
-                                         nrandom=nrandom, updated_after=updated_after, by_rse_name=True, session=session)
+                                         nrandom=nrandom, updated_after=updated_after, by_rse_name=True,
+                                         cursor=list_cursor, session=session)
 
         for rep in replicas:
             rep['scope'] = rep['scope'].external
@@ -296,6 +314,9 @@ def list_replicas(
 
             yield rep
 
+        if list_cursor and not list_cursor.exhausted:
+            yield {'next_cursor': list_cursor.to_token()}
+
 
 def add_replicas(
         rse: str,
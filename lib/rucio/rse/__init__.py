@@ -78,7 +78,9 @@ if rsemanager.CLIENT_MODE:   # pylint:disable=no-member
 
 
 if rsemanager.SERVER_MODE:   # pylint:disable=no-member
-    from rucio.common.cache import MemcacheRegion
+    from rucio.common.cache import LocalCache, MemcacheRegion, TieredCacheRegion
+    from rucio.common.config import config_get_int
+    from rucio.core.monitor import MetricManager
     from rucio.core.rse import get_rse_id, get_rse_protocols
     from rucio.core.vo import map_vo
 
@@ -93,5 +95,12 @@ if rsemanager.SERVER_MODE:   # pylint:disable=no-member
 
     setattr(rsemanager, '__request_rse_info', tmp_rse_info)
     setattr(rsemanager, '__get_signed_url', get_signed_url_server)
-    RSE_REGION = MemcacheRegion(expiration_time=900)
+    # Keep the most used RSEs in a process-local tier in front of memcached
+    RSE_REGION = TieredCacheRegion(
+        region=MemcacheRegion(expiration_time=900),
+        local=LocalCache(maxsize=config_get_int('cache', 'rse_info_local_size', raise_exception=False, default=1000, check_config_table=False),
+                         expiration_time=config_get_int('cache', 'rse_info_local_ttl', raise_exception=False, default=60, check_config_table=False)),
+        metrics=MetricManager(module=__name__),
+        name='rse_info',
+    )
     setattr(rsemanager, 'RSE_REGION', RSE_REGION)
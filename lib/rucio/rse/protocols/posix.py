@@ -16,16 +16,21 @@ import logging
 import os
 import os.path
 import shutil
+from functools import partial
 from subprocess import call
 
 from rucio.common import exception
 from rucio.common.checksum import adler32
 from rucio.rse.protocols import protocol
 
+COPY_BLOCK_SIZE = 1024 * 1024
+
 
 class Default(protocol.RSEProtocol):
     """ Implementing access to RSEs using the local filesystem."""
 
+    checksum_while_transferring = True
+
     def exists(self, pfn):
         """
             Checks if the requested file is known by the referred RSE.
@@ -57,19 +62,28 @@ class Default(protocol.RSEProtocol):
         """ Closes the connection to RSE."""
         pass
 
-    def get(self, pfn, dest, transfer_timeout=None):
+    def get(self, pfn, dest, transfer_timeout=None, checksum_calculator=None):
         """ Provides access to files stored inside connected the RSE.
 
             :param pfn: Physical file name of requested file
             :param dest: Name and path of the files when stored at the client
             :param transfer_timeout Transfer timeout (in seconds) - dummy
+            :param checksum_calculator: Optional ChecksumCalculator given the data while it is copied
 
             :raises DestinationNotAccessible: if the destination storage was not accessible.
             :raises ServiceUnavailable: if some generic error occurred in the library.
             :raises SourceNotFound: if the source file was not found on the referred storage.
          """
         try:
-            shutil.copy(self.pfn2path(pfn), dest)
+            if checksum_calculator is None:
+                shutil.copy(self.pfn2path(pfn), dest)
+            else:
+                path = self.pfn2path(pfn)
+                with open(path, 'rb') as source, open(dest, 'wb') as destination:
+                    for block in iter(partial(source.read, COPY_BLOCK_SIZE), b''):
+                        checksum_calculator.update(block)
+                        destination.write(block)
+                shutil.copymode(path, dest)
         except OSError as e:
             try:  # To check if the error happened local or remote
                 with open(dest, 'wb'):
@@ -215,6 +229,8 @@ class Default(protocol.RSEProtocol):
 class Symlink(Default):
     """ Implementing access to RSEs using the local filesystem, creating a symlink on a get """
 
+    checksum_while_transferring = False
+
     def get(self, pfn, dest, transfer_timeout=None):
         """ Provides access to files stored inside connected the RSE.
             A download/get will create a symlink on the local file system pointing to the
@@ -44,6 +44,10 @@ if TYPE_CHECKING:
 class RSEProtocol(ABC):
     """ This class is virtual and acts as a base to inherit new protocols from. It further provides some common functionality which applies for the majority of the protocols."""
 
+    # Whether get() accepts a `checksum_calculator` argument: a rucio.common.checksum.ChecksumCalculator
+    # which is given the downloaded data while it is written, so that it doesn't need to be read again.
+    checksum_while_transferring = False
+
     def __init__(
             self,
             protocol_attr: dict[str, Any],
@@ -98,29 +102,29 @@ class RSEProtocol(ABC):
             prefix = ''.join(['/', prefix])
         if not prefix.endswith('/'):
             prefix = ''.join([prefix, '/'])
+        # the URL prefix is the same for all the LFNs, build it only once
+        url_prefix = ''.join([self.attributes['scheme'], '://', self.attributes['hostname'], ':', str(self.attributes['port']), prefix])
 
         lfns = [lfns] if isinstance(lfns, dict) else lfns
+        paths = {}
+        if self.translator and getattr(self._get_path, '__func__', None) is RSEProtocol._get_path:
+            # deterministic paths can be computed in bulk by the translator
+            dids = [(str(lfn['scope']), lfn['name']) for lfn in lfns if lfn.get('path') is None]
+            try:
+                paths = dict(zip(dids, self.translator.paths(dids)))
+            except exception.ReplicaNotFound:
+                # one of the LFNs failed: compute the paths one by one, to only skip the failing ones
+                paths = {}
+
         for lfn in lfns:
             scope, name = str(lfn['scope']), lfn['name']
             if 'path' in lfn and lfn['path'] is not None:
-                pfns['%s:%s' % (scope, name)] = ''.join([self.attributes['scheme'],
-                                                         '://',
-                                                         self.attributes['hostname'],
-                                                         ':',
-                                                         str(self.attributes['port']),
-                                                         prefix,
-                                                         lfn['path'] if not lfn['path'].startswith('/') else lfn['path'][1:]
-                                                         ])
+                pfns['%s:%s' % (scope, name)] = ''.join([url_prefix, lfn['path'] if not lfn['path'].startswith('/') else lfn['path'][1:]])
+            elif (scope, name) in paths:
+                pfns['%s:%s' % (scope, name)] = ''.join([url_prefix, paths[scope, name]])
             else:
                 try:
-                    pfns['%s:%s' % (scope, name)] = ''.join([self.attributes['scheme'],
-                                                             '://',
-                                                             self.attributes['hostname'],
-                                                             ':',
-                                                             str(self.attributes['port']),
-                                                             prefix,
-                                                             self._get_path(scope=scope, name=name)
-                                                             ])
+                    pfns['%s:%s' % (scope, name)] = ''.join([url_prefix, self._get_path(scope=scope, name=name)])
                 except exception.ReplicaNotFound as e:
                     self.logger(logging.WARNING, str(e))
         return pfns
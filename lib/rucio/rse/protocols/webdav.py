@@ -152,6 +152,8 @@ class Default(protocol.RSEProtocol):
 
     """ Implementing access to RSEs using the webDAV protocol."""
 
+    checksum_while_transferring = True
+
     def connect(self, credentials: Optional[dict[str, Any]] = None) -> None:
         """ Establishes the actual connection to the referred RSE.
 
@@ -274,12 +276,13 @@ class Default(protocol.RSEProtocol):
         except requests.exceptions.ConnectionError as error:
             raise exception.ServiceUnavailable(error)
 
-    def get(self, pfn, dest='.', transfer_timeout=None):
+    def get(self, pfn, dest='.', transfer_timeout=None, checksum_calculator=None):
         """ Provides access to files stored inside connected the RSE.
 
             :param pfn: Physical file name of requested file
             :param dest: Name and path of the files when stored at the client
             :param transfer_timeout: Transfer timeout (in seconds)
+            :param checksum_calculator: Optional ChecksumCalculator given the data while it is written
 
             :raises DestinationNotAccessible, ServiceUnavailable, SourceNotFound, RSEAccessDenied
         """
@@ -299,6 +302,8 @@ class Default(protocol.RSEProtocol):
                         print('Malformed HTTP response (missing content-length header).')
                     for chunk in result.iter_content(chunksize):
                         file_out.write(chunk)
+                        if checksum_calculator is not None:
+                            checksum_calculator.update(chunk)
                         if length:
                             nchunk += 1
             elif result.status_code in [404, ]:
@@ -92,6 +92,20 @@ def get_rse_info(
     return rse_info
 
 
+def invalidate_rse_info(rse_id: str) -> None:
+    """
+        Drop the cached information of an RSE, after its protocols or settings were modified.
+
+        The process-local tier, if any, is cleared entirely, as its entries can also be
+        indexed by RSE name.
+
+        :param rse_id: The id of the modified RSE.
+    """
+    RSE_REGION.delete('rse_info_%s' % rse_id)   # NOQA pylint: disable=undefined-variable
+    if hasattr(RSE_REGION, 'invalidate_local'):   # NOQA pylint: disable=undefined-variable
+        RSE_REGION.invalidate_local()   # NOQA pylint: disable=undefined-variable
+
+
 def _get_possible_protocols(
         rse_settings: types.RSESettingsDict,
         operation: str,
@@ -240,6 +254,8 @@ def create_protocol(
         except AttributeError as e:
             logger(logging.DEBUG, 'Protocol implementations not supported.')
             raise exception.RucioException(str(e))  # TODO: provide proper rucio exception
+    # the protocol owns its attributes, don't modify the (possibly cached and shared) rse_settings
+    protocol_attr = copy.copy(protocol_attr)
     protocol_attr['auth_token'] = auth_token
     protocol = mod(protocol_attr, rse_settings, logger=logger)
     return protocol
@@ -23,7 +23,7 @@ from rucio.common.exception import ConfigNotFound
 from rucio.common.plugins import PolicyPackageAlgorithms
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Mapping
+    from collections.abc import Callable, Iterable, Mapping
 
     from rucio.common.types import RSESettingsDict
 
@@ -250,11 +250,29 @@ class RSEDeterministicTranslation(PolicyPackageAlgorithms):
 
             :returns: RSE specific URI of the physical file
         """
+        return self._algorithm_callable()(scope, name, self.rse, self.rse_attributes, self.protocol_attributes)
+
+    def paths(
+            self,
+            dids: "Iterable[tuple[str, str]]"
+    ) -> list[str]:
+        """ Transforms a batch of logical file names into PFN paths.
+
+            The algorithm is resolved once for the whole batch.
+
+            :param dids: iterable of (scope, name) tuples
+
+            :returns: list of RSE specific URIs, in the order of the input
+        """
+        algorithm_callable = self._algorithm_callable()
+        rse, rse_attributes, protocol_attributes = self.rse, self.rse_attributes, self.protocol_attributes
+        return [algorithm_callable(scope, name, rse, rse_attributes, protocol_attributes) for scope, name in dids]
+
+    def _algorithm_callable(self) -> 'Callable[..., str]':
         algorithm = self.rse_attributes.get(RseAttr.LFN2PFN_ALGORITHM, 'default')
         if algorithm == 'default':
             algorithm = RSEDeterministicTranslation._DEFAULT_LFN2PFN
-        algorithm_callable = super()._get_one_algorithm(RSEDeterministicTranslation._algorithm_type, algorithm)
-        return algorithm_callable(scope, name, self.rse, self.rse_attributes, self.protocol_attributes)
+        return super()._get_one_algorithm(RSEDeterministicTranslation._algorithm_type, algorithm)
 
 
 RSEDeterministicTranslation._module_init_()  # pylint: disable=protected-access
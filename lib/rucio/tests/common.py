@@ -48,6 +48,8 @@ skip_non_belleii = pytest.mark.skipif(not ('POLICY' in os.environ and os.environ
                                       reason="specific belleii tests")
 skip_outside_gh_actions = pytest.mark.skipif(os.getenv("GITHUB_ACTIONS") != "true",
                                              reason="Skipping tests outside GitHub Actions")
+skip_without_benchmarks = pytest.mark.skipif(os.getenv("RUCIO_BENCHMARKS") != "true",
+                                             reason="benchmarks only run with RUCIO_BENCHMARKS=true")
 
 
 def is_influxdb_available() -> bool:
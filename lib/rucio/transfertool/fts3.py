@@ -16,6 +16,7 @@ import datetime
 import json
 import logging
 import pathlib
+import threading
 import traceback
 import uuid
 from configparser import NoOptionError, NoSectionError
@@ -25,7 +26,7 @@ from urllib.parse import urlparse
 
 import requests
 from dogpile.cache.api import NoValue
-from requests.adapters import ReadTimeout
+from requests.adapters import HTTPAdapter, ReadTimeout
 from requests.packages.urllib3 import disable_warnings  # pylint: disable=import-error
 
 from rucio.common.cache import MemcacheRegion
@@ -114,6 +115,29 @@ _SCITAGS_ACTIVITY_IDS = {}
 FTS_FILE_EXISTS_ERROR_MSG = 'Destination file exists and is on tape'  # used in FTS  >= 3.12.12
 FTS_FILE_EXISTS_ERROR_MSG_LEGACY = 'Destination file exists and overwrite is not enabled'  # Error message used in FTS < 3.12.12, checked in Rucio for backwards compatibility
 
+# Connection pools shared by all the FTS3Transfertool instances of the process, one per FTS host
+_HOST_HTTP_SESSIONS: dict[str, requests.Session] = {}
+_HOST_HTTP_SESSIONS_LOCK = threading.Lock()
+
+
+def _http_session_for_host(external_host: str) -> requests.Session:
+    """
+    Get the requests session, and thus the pool of connections, used by all the transfertools
+    of the process towards the given FTS host. Certificates and headers are passed per request.
+
+    :param external_host: The FTS server URL.
+    """
+    with _HOST_HTTP_SESSIONS_LOCK:
+        http_session = _HOST_HTTP_SESSIONS.get(external_host)
+        if http_session is None:
+            pool_size = config_get_int('conveyor', 'fts_connection_pool_size', raise_exception=False, default=10)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            http_session = requests.Session()
+            http_session.mount('https://', adapter)
+            http_session.mount('http://', adapter)
+            _HOST_HTTP_SESSIONS[external_host] = http_session
+        return http_session
+
 
 def _scitags_ids(logger: "LoggerFunction" = logging.log) -> "tuple[int | None, dict[str, int]]":
     """
@@ -1106,14 +1130,15 @@ class FTS3Transfertool(Transfertool):
         post_result = None
         stopwatch = Stopwatch()
         try:
-            post_result = requests.post('%s/jobs' % self.external_host,
-                                        verify=self.verify,
-                                        cert=self.cert,
-                                        data=params_str,
-                                        headers=self.headers,
-                                        timeout=timeout)
+            post_result = _http_session_for_host(self.external_host).post('%s/jobs' % self.external_host,
+                                                                          verify=self.verify,
+                                                                          cert=self.cert,
+                                                                          data=params_str,
+                                                                          headers=self.headers,
+                                                                          timeout=timeout)
             labels = {'host': self.__extract_host(self.external_host)}
             METRICS.timer('submit_transfer.{host}').labels(**labels).observe(stopwatch.elapsed / (len(files) or 1))
+            METRICS.timer('submit_job.{host}').labels(**labels).observe(stopwatch.elapsed)
         except ReadTimeout as error:
             raise TransferToolTimeout(error)
         except json.JSONDecodeError as error:
@@ -1280,13 +1305,12 @@ class FTS3Transfertool(Transfertool):
         """
 
         responses = {}
-        fts_session = requests.Session()
         xfer_ids = ','.join(requests_by_eid)
-        jobs = fts_session.get('%s/jobs/%s?files=file_state,dest_surl,finish_time,start_time,staging_start,staging_finished,reason,source_surl,file_metadata' % (self.external_host, xfer_ids),
-                               verify=self.verify,
-                               cert=self.cert,
-                               headers=self.headers,
-                               timeout=timeout)
+        jobs = _http_session_for_host(self.external_host).get('%s/jobs/%s?files=file_state,dest_surl,finish_time,start_time,staging_start,staging_finished,reason,source_surl,file_metadata' % (self.external_host, xfer_ids),
+                                                              verify=self.verify,
+                                                              cert=self.cert,
+                                                              headers=self.headers,
+                                                              timeout=timeout)
 
         if jobs is None:
             BULK_QUERY_COUNTER.labels(state='failure', host=self.__extract_host(self.external_host)).inc()
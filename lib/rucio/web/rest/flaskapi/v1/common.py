@@ -35,6 +35,7 @@ from rucio.common.constants import DEFAULT_VO
 from rucio.common.exception import CannotAuthenticate, DatabaseException, IdentityError, RucioException, UnsupportedRequestedContentType
 from rucio.common.schema import get_schema_value
 from rucio.common.utils import generate_uuid, render_json
+from rucio.core.permission import permission_cache
 from rucio.core.vo import map_vo
 from rucio.gateway.authentication import validate_auth_token
 from rucio.gateway.identity import get_default_account, list_accounts_for_identity, verify_identity
@@ -99,7 +100,9 @@ class ErrorHandlingMethodView(MethodView):
     def dispatch_request(self, *args, **kwargs) -> Union['ResponseReturnValue', flask.wrappers.Response]:
         headers = self.get_headers() or None
         try:
-            return super(ErrorHandlingMethodView, self).dispatch_request(*args, **kwargs)
+            # the permission checks repeated while serving a request are only evaluated once
+            with permission_cache():
+                return super(ErrorHandlingMethodView, self).dispatch_request(*args, **kwargs)
         except HTTPException:
             raise
         except DatabaseException as error:
@@ -591,9 +591,15 @@ class ListReplicas(ErrorHandlingMethodView):
                   nrandom:
                     description: "The maximum number of replicas to return."
                     type: integer
+                  page_size:
+                    description: "If set, only return one page of files, fetching at most this many replicas (files are never split between pages). Not supported with metalink."
+                    type: integer
+                  cursor:
+                    description: "The continuation token returned by the previous page."
+                    type: string
         responses:
           200:
-            description: "OK"
+            description: "OK. In paginated mode, if more files are available, the last element is an object with a single 'next_cursor' key holding the continuation token of the next page."
             content:
               application/json:
                 schema:
@@ -697,6 +703,15 @@ class ListReplicas(ErrorHandlingMethodView):
         nrandom = param_get(parameters, 'nrandom', default=None)
         if nrandom:
             nrandom = int(nrandom)
+        page_size = param_get(parameters, 'page_size', default=None)
+        cursor = param_get(parameters, 'cursor', default=None)
+        if page_size:
+            try:
+                page_size = int(page_size)
+            except ValueError:
+                return generate_http_error_flask(400, 'InvalidObject', 'page_size must be an integer')
+            if metalink:
+                return generate_http_error_flask(400, 'InvalidObject', 'Pagination is not supported with metalink')
 
         limit = request.args.get('limit', default=None)
         select = request.args.get('select', default=select)
@@ -725,8 +740,13 @@ class ListReplicas(ErrorHandlingMethodView):
                                            resolve_parents=resolve_parents,
                                            nrandom=nrandom,
                                            updated_after=updated_after,
+                                           page_size=page_size,
+                                           cursor=cursor,
                                            issuer=issuer,
                                            vo=vo):
+                    if 'next_cursor' in rfile:
+                        yield rfile
+                        continue
 
                     # Sort rfile['pfns'] and limit its size according to "limit" parameter
                     lanreplicas = {}
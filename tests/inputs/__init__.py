@@ -24,3 +24,6 @@ GEOIP_LITE2_CITY_TEST_DB = DIRECTORY / 'GeoLite2-City-Test.tar.gz'
 
 # Downloaded on 05/oct/2023 from https://www.scitags.org/api.json
 SCITAGS_JSON = DIRECTORY / 'scitags.json'
+
+# FTS3 completion message of a successful transfer, as received by the conveyor-receiver
+FTS3_COMPLETION_MESSAGE_JSON = DIRECTORY / 'fts3_completion_message.json'
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from threading import Thread
 
 
@@ -35,7 +35,8 @@ class MockServer:
             self.wfile.write(message.encode())
 
     def __init__(self, request_handler_cls):
-        self.server = HTTPServer(('localhost', 0), request_handler_cls)
+        # Requests are handled concurrently, to allow testing concurrent clients
+        self.server = ThreadingHTTPServer(('localhost', 0), request_handler_cls)
         self.thread = Thread(target=self.server.serve_forever)
         self.thread.daemon = True
 
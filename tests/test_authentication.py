@@ -17,13 +17,15 @@ import time
 
 import pytest
 from requests import session
+from sqlalchemy import delete, event
 
 from rucio.common.exception import AccessDenied, CannotAuthenticate, Duplicate
-from rucio.common.utils import ssh_sign
-from rucio.core.authentication import strip_x509_proxy_attributes
+from rucio.common.utils import generate_uuid, ssh_sign
+from rucio.core.authentication import invalidate_cached_tokens, strip_x509_proxy_attributes, validate_auth_token
 from rucio.core.identity import add_account_identity, del_account_identity
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import IdentityType
+from rucio.db.sqla.session import get_engine
 from rucio.gateway.authentication import get_auth_token_saml, get_auth_token_ssh, get_auth_token_user_pass, get_ssh_challenge_token
 from rucio.tests.common import hdrdict, headers, loginhdr, vohdr
 
@@ -293,3 +295,39 @@ def test_non_jwt_validation():
     from rucio.gateway.authentication import validate_auth_token
     with pytest.raises(CannotAuthenticate):
         validate_auth_token('a.b.c')
+
+
+def test_token_validation_cache(root_account, db_session):
+    """ AUTHENTICATION (CORE): Valid and invalid tokens are cached until invalidated """
+    token = 'cachedtoken' + generate_uuid()
+    models.Token(account=root_account, token=token, ip='127.0.0.1', expired_at=datetime.datetime.utcnow() + datetime.timedelta(hours=1)).save(session=db_session)
+    db_session.commit()
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        if 'tokens' in statement:
+            statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, 'before_cursor_execute', count_statements)
+    try:
+        assert validate_auth_token(token)['account'] == root_account
+        with pytest.raises(CannotAuthenticate):
+            validate_auth_token('garbage' + token)
+        assert len(statements) == 2
+
+        # Both the valid and the invalid token are served from the cache
+        assert validate_auth_token(token)['account'] == root_account
+        with pytest.raises(CannotAuthenticate):
+            validate_auth_token('garbage' + token)
+        assert len(statements) == 2
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statements)
+
+    db_session.execute(delete(models.Token).where(models.Token.token == token))
+    db_session.commit()
+    assert validate_auth_token(token)['account'] == root_account
+    invalidate_cached_tokens([token])
+    with pytest.raises(CannotAuthenticate):
+        validate_auth_token(token)
@@ -11,21 +11,27 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import inspect
+import json
 import logging
 import threading
 import time
+from copy import deepcopy
 from datetime import datetime, timedelta
+from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest.mock import patch
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import pytest
-from sqlalchemy import and_, delete, select, update
+import stomp
+from sqlalchemy import and_, delete, event, select, update
+from stomp.utils import Frame
 
 import rucio.daemons.reaper.reaper
 from rucio.common.checksum import adler32
 from rucio.common.constants import RseAttr
-from rucio.common.exception import ReplicaNotFound, RequestNotFound
+from rucio.common.exception import ReplicaNotFound, RequestNotFound, RucioException
 from rucio.common.types import FileToUploadDict, InternalAccount
 from rucio.common.utils import generate_uuid
 from rucio.core import config as core_config
@@ -37,21 +43,23 @@ from rucio.core import replica as replica_core
 from rucio.core import request as request_core
 from rucio.core import rse as rse_core
 from rucio.core import rule as rule_core
+from rucio.core import transfer as transfer_core
 from rucio.core.account_limit import set_local_account_limit
 from rucio.daemons.conveyor.finisher import finisher
 from rucio.daemons.conveyor.poller import poller
 from rucio.daemons.conveyor.preparer import preparer
 from rucio.daemons.conveyor.receiver import GRACEFUL_STOP as RECEIVER_GRACEFUL_STOP
-from rucio.daemons.conveyor.receiver import Receiver, receiver
+from rucio.daemons.conveyor.receiver import Receiver, ReportBatcher, receiver
 from rucio.daemons.conveyor.stager import stager
 from rucio.daemons.conveyor.submitter import submitter
 from rucio.daemons.conveyor.throttler import throttler
 from rucio.daemons.reaper.reaper import reaper
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import DatabaseOperationType, LockState, ReplicaState, RequestState, RequestType, RSEType, RuleState
-from rucio.db.sqla.session import db_session
-from rucio.tests.common import skip_rse_tests_with_accounts
+from rucio.db.sqla.session import db_session, get_engine
+from rucio.tests.common import skip_rse_tests_with_accounts, skip_without_benchmarks
 from rucio.transfertool.fts3 import FTS3Transfertool
+from tests.inputs import FTS3_COMPLETION_MESSAGE_JSON
 from tests.mocks.mock_http_server import MockServer
 from tests.ruciopytest import NoParallelGroups
 
@@ -143,8 +151,6 @@ def __get_source(request_id, src_rse_id, scope, name):
 @pytest.fixture
 def scitags_mock(core_config_mock):
     """Run a mock http server which always returns the content of scitags.json from test/inputs"""
-    from pathlib import Path
-
     from tests.inputs import SCITAGS_JSON
 
     class _SendScitagsJson(MockServer.Handler):
@@ -1800,3 +1806,267 @@ def test_bittorrent_submission(did_factory, root_account, vo, download_client, f
             'no_subdir': True,
         }])
         assert adler32(f'{tmp_dir}/{did["name"]}') == did_core.get_did(**did)['adler32']
+
+
+@pytest.mark.noparallel(groups=[NoParallelGroups.SUBMITTER, NoParallelGroups.POLLER])
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('conveyor', 'max_concurrent_polls', 4),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_concurrent_polling(rse_factory, did_factory, root_account, core_config_mock, caches_mock):
+    """
+    The poller can send the bulk queries of a cycle concurrently to the FTS hosts, and apply
+    the resulting state changes as the responses arrive.
+    """
+    lock = threading.Lock()
+    files_by_job = {}
+    queries_in_flight = []
+    max_queries_in_flight = []
+
+    class _FTSStub(MockServer.Handler):
+        def do_POST(self):
+            job_params = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            job_id = generate_uuid()
+            with lock:
+                files_by_job[job_id] = job_params['files']
+            self.send_code_and_message(200, {'Content-Type': 'application/json'}, json.dumps({'job_id': job_id}))
+
+        def do_GET(self):
+            job_ids = urlparse(self.path).path.split('/')[-1].split(',')
+            with lock:
+                queries_in_flight.append(None)
+                max_queries_in_flight.append(len(queries_in_flight))
+            time.sleep(0.2)
+            with lock:
+                queries_in_flight.pop()
+            jobs = [{
+                'job_id': job_id,
+                'http_status': '200 Ok',
+                'job_state': 'FINISHED',
+                'job_metadata': {},
+                'files': [{
+                    'file_state': 'FINISHED',
+                    'file_metadata': file['metadata'],
+                    'source_surl': file['sources'][0],
+                    'dest_surl': file['destinations'][0],
+                    'reason': '',
+                    'start_time': None,
+                    'finish_time': None,
+                    'staging_start': None,
+                    'staging_finished': None,
+                } for file in files_by_job[job_id]],
+            } for job_id in job_ids]
+            self.send_code_and_message(200, {'Content-Type': 'application/json'}, json.dumps(jobs))
+
+    with MockServer(_FTSStub) as server:
+        src_rse, src_rse_id = rse_factory.make_posix_rse()
+        dst_rse, dst_rse_id = rse_factory.make_posix_rse()
+        distance_core.add_distance(src_rse_id, dst_rse_id, distance=10)
+        for rse_id in (src_rse_id, dst_rse_id):
+            rse_core.add_rse_attribute(rse_id, RseAttr.FTS, server.base_url)
+        dids = [did_factory.random_file_did() for _ in range(6)]
+        for did in dids:
+            replica_core.add_replica(rse_id=src_rse_id, account=root_account, bytes_=1, adler32='aaaaaaaa', **did)
+            rule_core.add_rule(dids=[did], account=root_account, copies=1, rse_expression=dst_rse, grouping='ALL', weight=None, lifetime=None, locked=False, subscription_id=None)
+
+        submitter(once=True, rses=[{'id': rse_id} for rse_id in (src_rse_id, dst_rse_id)], partition_wait_time=0, transfertype='single', filter_transfertool=None)
+        poller(once=True, older_than=0, partition_wait_time=0, fts_bulk=1, filter_transfertool=None)
+
+    for did in dids:
+        request = request_core.get_request_by_did(rse_id=dst_rse_id, **did)
+        assert request['state'] == RequestState.DONE
+    assert max(max_queries_in_flight) > 1
+
+
+class _StompConnectionStub:
+    """
+    Stands for the connection to the broker: records the acknowledgments sent by the receiver,
+    which must be valid calls of the STOMP 1.2 connection of stomp.py, outside of any transaction
+    """
+    def __init__(self):
+        self.acks = []
+        self.nacks = []
+
+    @staticmethod
+    def _ack_id(method, *args, **kwargs):
+        arguments = inspect.signature(method).bind(None, *args, **kwargs).arguments
+        assert arguments.get('transaction') is None
+        return arguments['id']
+
+    def ack(self, *args, **kwargs):
+        self.acks.append(self._ack_id(stomp.Connection12.ack, *args, **kwargs))
+
+    def nack(self, *args, **kwargs):
+        self.nacks.append(self._ack_id(stomp.Connection12.nack, *args, **kwargs))
+
+
+def _submitted_requests_and_completion_frames(rse_factory, did_factory, root_account, nb_requests):
+    """
+    Create requests in SUBMITTED state, and the frames of the FTS completion messages of their successful transfers.
+    """
+    _, src_rse_id = rse_factory.make_mock_rse()
+    _, dst_rse_id = rse_factory.make_mock_rse()
+    dids = [did_factory.random_file_did() for _ in range(nb_requests)]
+    for did in dids:
+        replica_core.add_replica(src_rse_id, account=root_account, bytes_=1, **did)
+    request_core.queue_requests([{
+        'dest_rse_id': dst_rse_id,
+        'source_rse_id': src_rse_id,
+        'request_type': RequestType.TRANSFER,
+        'rule_id': generate_uuid(),
+        'retry_count': 1,
+        'attributes': {'activity': 'User Subscription', 'bytes': 1, 'md5': '', 'adler32': ''},
+        **did,
+    } for did in dids])
+
+    external_id = generate_uuid()
+    requests = [request_core.get_request_by_did(rse_id=dst_rse_id, **did) for did in dids]
+    with db_session(DatabaseOperationType.WRITE) as session:
+        session.execute(update(models.Request).where(models.Request.id.in_([r['id'] for r in requests])).values(
+            state=RequestState.SUBMITTED, external_id=external_id, external_host='https://fts.test:8446'
+        ))
+
+    template = json.loads(Path(FTS3_COMPLETION_MESSAGE_JSON).read_text())
+    frames = []
+    for i, request in enumerate(requests):
+        msg = deepcopy(template)
+        msg['tr_id'] += external_id
+        msg['job_id'] = external_id
+        msg['file_metadata'].update({
+            'request_id': request['id'],
+            'scope': request['scope'].external,
+            'name': request['name'],
+            'src_rse_id': src_rse_id,
+            'dest_rse_id': dst_rse_id,
+        })
+        frames.append(Frame('MESSAGE', headers={'message-id': 'ID:%d' % i, 'ack': 'ACK:%d' % i}, body=json.dumps(msg)))
+    return requests, frames
+
+
+def test_receiver_batches(rse_factory, did_factory, root_account):
+    """
+    In batching mode, the receiver applies the completion messages in batches and only acknowledges
+    them once their batch is committed.
+    """
+    requests, frames = _submitted_requests_and_completion_frames(rse_factory, did_factory, root_account, nb_requests=12)
+    frames.append(Frame('MESSAGE', headers={'message-id': 'ID:not-rucio', 'ack': 'ACK:not-rucio'}, body=json.dumps({'job_metadata': {'issuer': 'someone'}})))
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('UPDATE requests'):
+            statements.append(statement)
+
+    conn = _StompConnectionStub()
+    stop = threading.Event()
+    with request_core.TransferStatsManager() as transfer_stats_manager:
+        batcher = ReportBatcher(transfer_stats_manager=transfer_stats_manager, batch_size=5, batch_interval=1, graceful_stop=stop)
+        listener = Receiver(broker='stub', id_='0', total_threads=1, transfer_stats_manager=transfer_stats_manager, all_vos=True,
+                            conn=conn, batcher=batcher)
+        event.listen(get_engine(), 'before_cursor_execute', count_statements)
+        try:
+            batcher.start()
+            for frame in frames:
+                listener.on_message(frame)
+            stop.set()
+            batcher.join()
+        finally:
+            event.remove(get_engine(), 'before_cursor_execute', count_statements)
+
+    assert sorted(conn.acks) == sorted(frame.headers['ack'] for frame in frames)
+    assert not conn.nacks
+    assert len(statements) < len(requests)
+    for request in requests:
+        assert request_core.get_request(request['id'])['state'] == RequestState.DONE
+
+
+def test_receiver_nacks_failed_batch(rse_factory, did_factory, root_account):
+    """
+    In batching mode, the completion messages of a batch whose update failed are negatively acknowledged,
+    and the batch is rolled back.
+    """
+    requests, frames = _submitted_requests_and_completion_frames(rse_factory, did_factory, root_account, nb_requests=3)
+
+    conn = _StompConnectionStub()
+    stop = threading.Event()
+    with request_core.TransferStatsManager() as transfer_stats_manager, \
+            patch('rucio.daemons.conveyor.receiver.transfer_core.update_transfers_state', side_effect=RucioException('Failed')):
+        batcher = ReportBatcher(transfer_stats_manager=transfer_stats_manager, batch_size=5, batch_interval=1, graceful_stop=stop)
+        listener = Receiver(broker='stub', id_='0', total_threads=1, transfer_stats_manager=transfer_stats_manager, all_vos=True,
+                            conn=conn, batcher=batcher)
+        batcher.start()
+        for frame in frames:
+            listener.on_message(frame)
+        stop.set()
+        batcher.join()
+
+    assert not conn.acks
+    assert sorted(conn.nacks) == sorted(frame.headers['ack'] for frame in frames)
+    for request in requests:
+        assert request_core.get_request(request['id'])['state'] == RequestState.SUBMITTED
+
+
+
+def test_receiver_nacks_only_failed_report(rse_factory, did_factory, root_account):
+    """
+    In batching mode, a batch which fails because of one report is retried report by report:
+    only the completion message of the faulty report is negatively acknowledged.
+    """
+    requests, frames = _submitted_requests_and_completion_frames(rse_factory, did_factory, root_account, nb_requests=3)
+    faulty_request_id = requests[1]['id']
+    update_transfers_state = transfer_core.update_transfers_state
+
+    def _update_transfers_state(tt_status_reports, *args, **kwargs):
+        if any(tt_status_report.request_id == faulty_request_id for tt_status_report in tt_status_reports):
+            raise RucioException('Failed')
+        return update_transfers_state(tt_status_reports, *args, **kwargs)
+
+    conn = _StompConnectionStub()
+    stop = threading.Event()
+    with request_core.TransferStatsManager() as transfer_stats_manager, \
+            patch('rucio.daemons.conveyor.receiver.transfer_core.update_transfers_state', side_effect=_update_transfers_state):
+        batcher = ReportBatcher(transfer_stats_manager=transfer_stats_manager, batch_size=5, batch_interval=1, graceful_stop=stop)
+        listener = Receiver(broker='stub', id_='0', total_threads=1, transfer_stats_manager=transfer_stats_manager, all_vos=True,
+                            conn=conn, batcher=batcher)
+        batcher.start()
+        for frame in frames:
+            listener.on_message(frame)
+        stop.set()
+        batcher.join()
+
+    assert conn.nacks == [frames[1].headers['ack']]
+    assert sorted(conn.acks) == sorted([frames[0].headers['ack'], frames[2].headers['ack']])
+    assert request_core.get_request(requests[0]['id'])['state'] == RequestState.DONE
+    assert request_core.get_request(requests[1]['id'])['state'] == RequestState.SUBMITTED
+    assert request_core.get_request(requests[2]['id'])['state'] == RequestState.DONE
+
+
+@skip_without_benchmarks
+@pytest.mark.parametrize("batch_size", [1, 10, 100])
+def test_benchmark_receiver_batches(rse_factory, did_factory, root_account, batch_size):
+    """
+    Report the number of completion messages applied per second, depending on the size of the batches.
+    """
+    requests, frames = _submitted_requests_and_completion_frames(rse_factory, did_factory, root_account, nb_requests=400)
+
+    conn = _StompConnectionStub()
+    stop = threading.Event()
+    with request_core.TransferStatsManager() as transfer_stats_manager:
+        batcher = ReportBatcher(transfer_stats_manager=transfer_stats_manager, batch_size=batch_size, batch_interval=1, graceful_stop=stop) if batch_size > 1 else None
+        listener = Receiver(broker='stub', id_='0', total_threads=1, transfer_stats_manager=transfer_stats_manager, all_vos=True,
+                            conn=conn, batcher=batcher)
+        start = time.perf_counter()
+        if batcher:
+            batcher.start()
+        for frame in frames:
+            listener.on_message(frame)
+        stop.set()
+        if batcher:
+            batcher.join()
+        elapsed = time.perf_counter() - start
+
+    print('batch_size=%d: %d messages in %.2f s, %.0f messages/s' % (batch_size, len(frames), elapsed, len(frames) / elapsed))
+    for request in requests:
+        assert request_core.get_request(request['id'])['state'] == RequestState.DONE
@@ -13,6 +13,9 @@
 # limitations under the License.
 
 import itertools
+import json
+import threading
+import time
 from datetime import datetime, timedelta
 from random import randint
 from unittest.mock import patch
@@ -22,6 +25,7 @@ from sqlalchemy import and_, delete, func, select, update
 
 from rucio.common.constants import RseAttr
 from rucio.common.exception import RequestNotFound
+from rucio.common.utils import generate_uuid
 from rucio.core import config as core_config
 from rucio.core import distance as distance_core
 from rucio.core import replica as replica_core
@@ -33,6 +37,9 @@ from rucio.daemons.reaper.reaper import reaper
 from rucio.db.sqla.constants import DatabaseOperationType, RequestState
 from rucio.db.sqla.models import Request, Source
 from rucio.db.sqla.session import db_session
+from rucio.tests.common import skip_without_benchmarks
+from rucio.transfertool.fts3 import FTS3Transfertool
+from tests.mocks.mock_http_server import MockServer
 from tests.ruciopytest import NoParallelGroups
 
 
@@ -486,3 +493,87 @@ def test_hop_penalty(rse_factory, did_factory, root_account, file_config_mock, c
     request_core.get_request_by_did(rse_id=rse2_id, **did)
     with pytest.raises(RequestNotFound):
         request_core.get_request_by_did(rse_id=rse5_id, **did)
+
+
+def _submit_to_fts_stub(rse_factory, did_factory, root_account, nb_jobs, submit_delay):
+    """
+    Submit nb_jobs single-file jobs to a FTS stub which takes submit_delay seconds to answer.
+
+    :returns: the maximum number of submissions handled concurrently by the stub, the total
+              submission time and the latency of each submission.
+    """
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+    latencies = []
+
+    class _FTSStub(MockServer.Handler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            with lock:
+                in_flight.append(None)
+                max_in_flight.append(len(in_flight))
+            time.sleep(submit_delay)
+            with lock:
+                in_flight.pop()
+            self.send_code_and_message(200, {'Content-Type': 'application/json'}, json.dumps({'job_id': generate_uuid()}))
+
+    class _TimedFTS3Transfertool(FTS3Transfertool):
+        def submit(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return super().submit(*args, **kwargs)
+            finally:
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+    with MockServer(_FTSStub) as server:
+        src_rse, src_rse_id = rse_factory.make_posix_rse()
+        dst_rse, dst_rse_id = rse_factory.make_posix_rse()
+        distance_core.add_distance(src_rse_id, dst_rse_id, distance=10)
+        for rse_id in (src_rse_id, dst_rse_id):
+            rse_core.add_rse_attribute(rse_id, RseAttr.FTS, server.base_url)
+        dids = [did_factory.random_file_did() for _ in range(nb_jobs)]
+        for did in dids:
+            replica_core.add_replica(rse_id=src_rse_id, account=root_account, bytes_=1, adler32='aaaaaaaa', **did)
+            rule_core.add_rule(dids=[did], account=root_account, copies=1, rse_expression=dst_rse, grouping='ALL', weight=None, lifetime=None, locked=False, subscription_id=None)
+
+        start = time.perf_counter()
+        with patch('rucio.core.transfer.TRANSFERTOOL_CLASSES_BY_NAME', new={'fts3': _TimedFTS3Transfertool}):
+            submitter(once=True, rses=[{'id': rse_id} for rse_id in (src_rse_id, dst_rse_id)], bulk=nb_jobs, partition_wait_time=None,
+                      transfertools=['fts3'], transfertype='single', filter_transfertool=None)
+        elapsed = time.perf_counter() - start
+
+        for did in dids:
+            request = request_core.get_request_by_did(rse_id=dst_rse_id, **did)
+            assert request['state'] == RequestState.SUBMITTED
+            assert request['external_host'] == server.base_url
+    return max(max_in_flight), elapsed, latencies
+
+
+@pytest.mark.noparallel(groups=[NoParallelGroups.SUBMITTER])
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('conveyor', 'max_submissions_per_host', 4),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_concurrent_submission(rse_factory, did_factory, root_account, core_config_mock, caches_mock):
+    """ SUBMITTER: jobs are submitted concurrently to a FTS host, up to max_submissions_per_host at once """
+    max_in_flight, _, _ = _submit_to_fts_stub(rse_factory, did_factory, root_account, nb_jobs=8, submit_delay=0.2)
+    assert 1 < max_in_flight <= 4
+
+
+@skip_without_benchmarks
+@pytest.mark.noparallel(groups=[NoParallelGroups.SUBMITTER])
+@pytest.mark.parametrize("max_submissions_per_host", [1, 8])
+def test_benchmark_concurrent_submission(rse_factory, did_factory, root_account, max_submissions_per_host):
+    """ SUBMITTER: report the jobs/s and p99 submission latency towards a slow FTS host """
+    core_config.set('conveyor', 'max_submissions_per_host', max_submissions_per_host)
+    try:
+        _, elapsed, latencies = _submit_to_fts_stub(rse_factory, did_factory, root_account, nb_jobs=100, submit_delay=0.05)
+    finally:
+        core_config.remove_option('conveyor', 'max_submissions_per_host')
+    latencies.sort()
+    print('max_submissions_per_host=%d: %d jobs in %.2f s, %.1f jobs/s, p99 submit latency %.3f s'
+          % (max_submissions_per_host, len(latencies), elapsed, len(latencies) / elapsed, latencies[int(len(latencies) * 0.99) - 1]))
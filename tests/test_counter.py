@@ -12,16 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import random
+import time
 from time import sleep
 
 import pytest
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import and_, delete, event, func, insert, select, update
 
 from rucio.core import account_counter, rse_counter
 from rucio.core.account import get_usage
+from rucio.core.replica import add_replica
+from rucio.core.rule import add_rule
 from rucio.daemons.abacus.account import account_update
 from rucio.daemons.abacus.rse import rse_update
 from rucio.db.sqla import models
+from rucio.db.sqla.session import get_engine
+from rucio.tests.common import skip_without_benchmarks
 
 
 @pytest.mark.noparallel(reason='runs abacus daemons')
@@ -74,6 +79,133 @@ class TestCoreRSECounter:
             del cnt['updated_at']
             assert cnt == {'files': count, 'bytes': sum_}
 
+    def test_increase_summed_per_transaction(self, rse_factory, db_session):
+        """ RSE COUNTER (CORE): Increases within a transaction are written as a single row """
+        _, rse_id = rse_factory.make_mock_rse()
+        _, other_rse_id = rse_factory.make_mock_rse()
+
+        for _ in range(10):
+            rse_counter.increase(rse_id=rse_id, files=1, bytes_=10, session=db_session)
+        rse_counter.decrease(rse_id=rse_id, files=3, bytes_=30, session=db_session)
+        rse_counter.increase(rse_id=other_rse_id, files=1, bytes_=10, session=db_session)
+        rse_counter.decrease(rse_id=other_rse_id, files=1, bytes_=10, session=db_session)
+        db_session.commit()
+
+        stmt = select(
+            models.UpdatedRSECounter.files,
+            models.UpdatedRSECounter.bytes
+        ).where(
+            models.UpdatedRSECounter.rse_id.in_([rse_id, other_rse_id])
+        )
+        assert db_session.execute(stmt).all() == [(7, 70)]
+
+        # Deltas of a rolled back transaction are dropped
+        rse_counter.increase(rse_id=other_rse_id, files=1, bytes_=10, session=db_session)
+        db_session.rollback()
+        db_session.commit()
+        assert db_session.execute(stmt).all() == [(7, 70)]
+
+        # Pending deltas are visible to the abacus functions within the same transaction
+        rse_counter.increase(rse_id=rse_id, files=1, bytes_=10, session=db_session)
+        rse_counter.update_rse_counter(rse_id=rse_id, session=db_session)
+        db_session.commit()
+        assert db_session.execute(stmt).all() == []
+        cnt = rse_counter.get_counter(rse_id=rse_id)
+        del cnt['updated_at']
+        assert cnt == {'files': 8, 'bytes': 80}
+
+    def test_update_counters_set_based(self, rse_factory, db_session):
+        """ RSE COUNTER (CORE): Update the counters of several RSEs with set-based statements """
+        rse_ids = [rse_factory.make_mock_rse()[1] for _ in range(3)]
+        db_session.execute(insert(models.UpdatedRSECounter), [{'rse_id': rse_id, 'files': 1, 'bytes': 10 * (i + 1)}
+                                                              for i, rse_id in enumerate(rse_ids) for _ in range(5)])
+        db_session.commit()
+
+        statements = []
+
+        def count_statements(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0])
+
+        engine = get_engine()
+        event.listen(engine, 'before_cursor_execute', count_statements)
+        try:
+            assert rse_counter.update_rse_counters(rse_ids=rse_ids[:2]) == 10
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statements)
+        assert statements.count('DELETE') <= 2  # the pending rows, and the leftovers of the temporary table on sqlite and mysql
+
+        for i, rse_id in enumerate(rse_ids[:2]):
+            cnt = rse_counter.get_counter(rse_id=rse_id)
+            del cnt['updated_at']
+            assert cnt == {'files': 5, 'bytes': 50 * (i + 1)}
+        stmt = select(
+            models.UpdatedRSECounter.rse_id,
+            func.count()
+        ).where(
+            models.UpdatedRSECounter.rse_id.in_(rse_ids)
+        ).group_by(
+            models.UpdatedRSECounter.rse_id
+        )
+        assert db_session.execute(stmt).all() == [(rse_ids[2], 5)]
+
+    def test_collapse_updated_counters(self, rse_factory, db_session):
+        """ RSE COUNTER (CORE): Collapse a backlog of updated counters into one row per RSE """
+        _, rse_id = rse_factory.make_mock_rse()
+        db_session.execute(insert(models.UpdatedRSECounter), [{'rse_id': rse_id, 'files': 1, 'bytes': i} for i in range(20)])
+        db_session.commit()
+
+        assert rse_counter.collapse_updated_rse_counters() >= 19
+        stmt = select(
+            models.UpdatedRSECounter.files,
+            models.UpdatedRSECounter.bytes
+        ).where(
+            models.UpdatedRSECounter.rse_id == rse_id
+        )
+        assert db_session.execute(stmt).all() == [(20, sum(range(20)))]
+
+        rse_update(once=True)
+        cnt = rse_counter.get_counter(rse_id=rse_id)
+        del cnt['updated_at']
+        assert cnt == {'files': 20, 'bytes': sum(range(20))}
+
+    @skip_without_benchmarks
+    def test_benchmark_abacus_cycle(self, rse_factory, db_session):
+        """ RSE COUNTER (CORE): Benchmark the updated counter rows and the abacus cycle time with and without summed deltas """
+        _, rse_id = rse_factory.make_mock_rse()
+        db_session.commit()
+        rse_update(once=True)
+        nb_updates = 5000
+        stmt = select(
+            func.count()
+        ).select_from(
+            models.UpdatedRSECounter
+        ).where(
+            models.UpdatedRSECounter.rse_id == rse_id
+        )
+
+        # One transaction per increase, as done when each update wrote its own row
+        for _ in range(nb_updates):
+            rse_counter.increase(rse_id=rse_id, files=1, bytes_=10, session=db_session)
+            db_session.commit()
+        separate_rows = db_session.execute(stmt).scalar_one()
+        start = time.perf_counter()
+        rse_update(once=True)
+        separate_time = time.perf_counter() - start
+
+        for _ in range(nb_updates):
+            rse_counter.increase(rse_id=rse_id, files=1, bytes_=10, session=db_session)
+        db_session.commit()
+        summed_rows = db_session.execute(stmt).scalar_one()
+        start = time.perf_counter()
+        rse_update(once=True)
+        summed_time = time.perf_counter() - start
+
+        print('%d updates in separate transactions: %d rows, abacus cycle %.3f s' % (nb_updates, separate_rows, separate_time))
+        print('%d updates in one transaction: %d rows, abacus cycle %.3f s' % (nb_updates, summed_rows, summed_time))
+        assert summed_rows == 1
+        cnt = rse_counter.get_counter(rse_id=rse_id)
+        assert cnt['files'] == 2 * nb_updates
+
     def test_fill_counter_history(self, db_session):
         """RSE COUNTER (CORE): Fill the usage history with the current value."""
         stmt = delete(models.RSEUsageHistory)
@@ -171,3 +303,54 @@ class TestCoreAccountCounter:
         history_usage = {(usage['rse_id'], usage['files'], usage['account'], usage['bytes']) for usage in db_session.execute(stmt).scalars()}
         assert (rse_id, count, account, sum_) in history_usage
         assert (rse_id, new_count, account, sum_) in history_usage
+
+    def test_rule_creation_writes_one_row_per_rse(self, root_account, rse_factory, did_factory, db_session):
+        """ACCOUNT COUNTER (CORE): Rules created in one transaction write a single updated counter row per RSE"""
+        rse, rse_id = rse_factory.make_mock_rse()
+        db_session.commit()
+        files = [did_factory.random_file_did() for _ in range(10)]
+        for file in files:
+            add_replica(rse_id=rse_id, account=root_account, bytes_=100, **file)
+
+        add_rule(dids=files, account=root_account, copies=1, rse_expression=rse, grouping='NONE', weight=None, lifetime=None, locked=False, subscription_id=None)
+
+        stmt = select(
+            models.UpdatedAccountCounter.files,
+            models.UpdatedAccountCounter.bytes
+        ).where(
+            and_(models.UpdatedAccountCounter.account == root_account,
+                 models.UpdatedAccountCounter.rse_id == rse_id)
+        )
+        assert db_session.execute(stmt).all() == [(10, 1000)]
+
+    def test_update_counters_set_based(self, jdoe_account, root_account, rse_factory, db_session):
+        """ACCOUNT COUNTER (CORE): Update the counters of several accounts and RSEs in one transaction"""
+        _, rse_id = rse_factory.make_mock_rse()
+        account_counter.add_counter(rse_id=rse_id, account=jdoe_account, session=db_session)
+        db_session.execute(insert(models.UpdatedAccountCounter), [{'account': account, 'rse_id': rse_id, 'files': 1, 'bytes': 10}
+                                                                  for account in (jdoe_account, root_account) for _ in range(5)])
+        db_session.commit()
+
+        assert account_counter.update_account_counters([{'account': jdoe_account, 'rse_id': rse_id},
+                                                        {'account': root_account, 'rse_id': rse_id}]) == 10
+        for account in (jdoe_account, root_account):
+            cnt = get_usage(rse_id=rse_id, account=account)
+            del cnt['updated_at']
+            assert cnt == {'files': 5, 'bytes': 50}
+
+    def test_collapse_updated_counters(self, jdoe_account, rse_factory, db_session):
+        """ACCOUNT COUNTER (CORE): Collapse a backlog of updated counters into one row per account and RSE"""
+        _, rse_id = rse_factory.make_mock_rse()
+        db_session.execute(insert(models.UpdatedAccountCounter), [{'account': jdoe_account, 'rse_id': rse_id, 'files': 1, 'bytes': i} for i in range(20)])
+        db_session.commit()
+
+        assert account_counter.collapse_updated_account_counters() >= 19
+        stmt = select(
+            func.count(),
+            func.sum(models.UpdatedAccountCounter.files),
+            func.sum(models.UpdatedAccountCounter.bytes)
+        ).where(
+            and_(models.UpdatedAccountCounter.account == jdoe_account,
+                 models.UpdatedAccountCounter.rse_id == rse_id)
+        )
+        assert db_session.execute(stmt).one() == (1, 20, sum(range(20)))
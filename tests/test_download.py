@@ -16,16 +16,18 @@ import logging
 import os
 import shutil
 import tarfile
+import threading
+import time
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 from unittest.mock import ANY, MagicMock, patch
 from zipfile import ZipFile
 
 import pytest
 
-from rucio.client.downloadclient import DownloadClient
+from rucio.client.downloadclient import DownloadClient, HostStreamLimiter, TraceSender
 from rucio.common.checksum import md5
 from rucio.common.config import config_add_section, config_set
-from rucio.common.exception import InputValidationError, NoFilesDownloaded, RucioException
+from rucio.common.exception import InputValidationError, NoFilesDownloaded, RucioException, ServiceUnavailable
 from rucio.common.types import FileToUploadDict, InternalScope
 from rucio.common.utils import generate_uuid
 from rucio.core import did as did_core
@@ -593,42 +595,144 @@ def test_transfer_timeout(rse_factory, did_factory, download_client):
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=360)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=360, checksum_calculator=ANY)
 
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir, 'transfer_timeout': 10}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=10)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=10, checksum_calculator=ANY)
 
         # transfer_timeout set. transfer_speed_timeout is ignored.
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir, 'transfer_timeout': 5, 'transfer_speed_timeout': 1}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=5)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=5, checksum_calculator=ANY)
 
         # 60s static + 2bytes(file size) at 1Bps = 62s
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir, 'transfer_speed_timeout': 0.001}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=62)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=62, checksum_calculator=ANY)
 
         # 60s static + 2bytes(file size) at high speed = 60s
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir, 'transfer_speed_timeout': 10000}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=60)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=60, checksum_calculator=ANY)
 
         # transfer_timeout=0 means no timeout
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir, 'transfer_timeout': 0}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=0)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=0, checksum_calculator=ANY)
 
         # transfer_speed_timeout=0 is ignored
         with TemporaryDirectory() as tmp_dir:
             mocks_get.clear()
             download_client.download_dids([{'did': did_str, 'base_dir': tmp_dir, 'transfer_speed_timeout': 0}])
-            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=60)
+            mocks_get[0].assert_called_with(ANY, ANY, transfer_timeout=60, checksum_calculator=ANY)
+
+
+def test_download_reuses_protocols(rse_factory, did_factory, download_client):
+    """CLIENT(USER): Files downloaded from the same RSE reuse the connected protocol"""
+    rse, _ = rse_factory.make_posix_rse()
+    dataset = did_factory.upload_test_dataset(rse, nb_files=4)
+
+    protocols = []
+
+    class CountingPosixProtocol(PosixProtocol):
+        def __init__(self, *args, protocols=protocols, **kwargs):
+            super(CountingPosixProtocol, self).__init__(*args, **kwargs)
+            protocols.append(self)
+
+    with patch('rucio.rse.protocols.posix.Default', CountingPosixProtocol), TemporaryDirectory() as tmp_dir:
+        result = download_client.download_dids([{'did': '%s:%s' % (item['did_scope'], item['did_name']), 'base_dir': tmp_dir} for item in dataset], num_threads=1)
+    assert all(item['clientState'] == 'DONE' for item in result)
+    assert len(protocols) == 1
+
+
+def test_download_reconnects_stale_protocol(rse_factory, did_factory, download_client):
+    """CLIENT(USER): A pooled protocol whose connection fails is replaced by a new one"""
+    rse, _ = rse_factory.make_posix_rse()
+    dataset = did_factory.upload_test_dataset(rse, nb_files=2)
+
+    protocols = []
+
+    class StalePosixProtocol(PosixProtocol):
+        def __init__(self, *args, protocols=protocols, **kwargs):
+            super(StalePosixProtocol, self).__init__(*args, **kwargs)
+            self.nb_get = 0
+            protocols.append(self)
+
+        def get(self, *args, **kwargs):
+            self.nb_get += 1
+            if self is protocols[0] and self.nb_get > 1:
+                raise ServiceUnavailable('Connection reset by peer')
+            return super(StalePosixProtocol, self).get(*args, **kwargs)
+
+    with patch('rucio.rse.protocols.posix.Default', StalePosixProtocol), TemporaryDirectory() as tmp_dir:
+        result = download_client.download_dids([{'did': '%s:%s' % (item['did_scope'], item['did_name']), 'base_dir': tmp_dir} for item in dataset], num_threads=1)
+    assert all(item['clientState'] == 'DONE' for item in result)
+    assert len(protocols) == 2
+    assert all(item['attemptnr'] == 1 for item in result)
+
+
+def test_host_stream_limiter():
+    """CLIENT(USER): The number of concurrent downloads per host follows the observed throughput"""
+    streams = HostStreamLimiter(initial_streams=2, max_streams=3)
+    streams.acquire('host1')
+    streams.acquire('host1')
+    # Another host has its own streams
+    streams.acquire('host2')
+    streams.release('host2', 1)
+
+    acquired = threading.Event()
+
+    def acquire_third():
+        streams.acquire('host1')
+        acquired.set()
+
+    thread = threading.Thread(target=acquire_third)
+    thread.start()
+    assert not acquired.wait(0.2)
+    # A failed download frees the stream without counting for the throughput
+    streams.release('host1', None)
+    thread.join()
+    assert acquired.is_set()
+
+    # The first evaluation probes one more stream, a better throughput keeps the extra stream up to max_streams
+    streams.release('host1', 1000)
+    streams.release('host1', 1000)
+    assert streams.limit('host1') == 3
+    for _ in range(3):
+        streams.acquire('host1')
+    for _ in range(3):
+        streams.release('host1', 10 ** 9)
+    assert streams.limit('host1') == 3
+
+    # A worse throughput removes a stream
+    for _ in range(3):
+        streams.acquire('host1')
+    time.sleep(0.1)
+    for _ in range(3):
+        streams.release('host1', 1)
+    assert streams.limit('host1') == 2
+
+
+def test_trace_sender():
+    """CLIENT(USER): Traces are sent in batches from a background thread"""
+    sent = []
+    with patch('rucio.client.downloadclient.send_trace', side_effect=lambda traces, endpoint, user_agent: sent.append(traces)):
+        sender = TraceSender('https://trace.test', 'rucio-clients', batch_size=3)
+        trace = {'clientState': 'DOWNLOAD_ATTEMPT'}
+        sender.send(trace)
+        trace['clientState'] = 'DONE'
+        for _ in range(5):
+            sender.send(trace)
+        sender.close()
+    traces = [trace for batch in sent for trace in batch]
+    assert all(len(batch) <= 3 for batch in sent)
+    assert [trace['clientState'] for trace in traces] == ['DOWNLOAD_ATTEMPT'] + ['DONE'] * 5
 
 
 def test_download_file_with_impl(rse_factory, did_factory, download_client, mock_scope):
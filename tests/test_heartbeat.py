@@ -17,12 +17,14 @@ import threading
 from datetime import datetime, timedelta
 
 import pytest
-from sqlalchemy import delete, update
+from sqlalchemy import delete, event, update
 
-from rucio.core.heartbeat import cardiac_arrest, die, list_heartbeats, list_payload_counts, live, sanity_check
+from rucio.core.heartbeat import cardiac_arrest, die, list_heartbeats, list_payload_counts, live, live_bulk, sanity_check
+from rucio.daemons.common import HeartbeatHandler
 from rucio.db.sqla.constants import DatabaseOperationType
 from rucio.db.sqla.models import Heartbeat
 from rucio.db.sqla.session import db_session as db_session_context
+from rucio.db.sqla.session import get_engine
 
 
 @pytest.fixture
@@ -118,6 +120,44 @@ class TestHeartbeat:
         assert live(executable, 'host1', pids[1]) == {'assign_thread': 1, 'nr_threads': 2}
         assert live(executable, 'host0', pids[0]) == {'assign_thread': 0, 'nr_threads': 2}
 
+    def test_heartbeat_bulk(self, thread_factory, executable_factory):
+        """ HEARTBEAT (CORE): Multiple threads of a process at once """
+
+        pids = [self._pid() for _ in range(2)]
+        threads = [thread_factory() for _ in range(3)]
+        executable = executable_factory()
+        assert live(executable, 'host0', pids[0], threads[0]) == {'assign_thread': 0, 'nr_threads': 1}
+        assert live_bulk(executable, 'host1', pids[1], [(threads[1], None), (threads[2], 'payload')]) == {
+            threads[1].ident: {'assign_thread': 1 if threads[1].ident < threads[2].ident else 2, 'nr_threads': 3},
+            threads[2].ident: {'assign_thread': 2 if threads[1].ident < threads[2].ident else 1, 'nr_threads': 3},
+        }
+        assert live_bulk(executable, 'host0', pids[0], [(threads[0], None)]) == {threads[0].ident: {'assign_thread': 0, 'nr_threads': 3}}
+        assert list_payload_counts(executable) == {'payload': 1}
+
+    def test_heartbeat_bulk_concurrently_deleted(self, thread_factory, executable_factory):
+        """ HEARTBEAT (CORE): A heartbeat deleted during a bulk renewal is inserted again at the next one """
+
+        pid = self._pid()
+        threads = [thread_factory() for _ in range(2)]
+        executable = executable_factory()
+        live_bulk(executable, 'host0', pid, [(thread, None) for thread in threads])
+
+        with db_session_context(DatabaseOperationType.WRITE) as session:
+            execute = session.execute
+
+            def _execute_after_deletion(statement, *args, **kwargs):
+                if statement.is_dml and statement.is_update:
+                    execute(delete(Heartbeat).where(Heartbeat.pid == pid, Heartbeat.thread_id == threads[0].ident))
+                return execute(statement, *args, **kwargs)
+
+            session.execute = _execute_after_deletion
+            assert live_bulk(executable, 'host0', pid, [(thread, None) for thread in threads], session=session) == {
+                threads[0].ident: {'assign_thread': 0, 'nr_threads': 1},
+                threads[1].ident: {'assign_thread': 0, 'nr_threads': 1},
+            }
+
+        assert live_bulk(executable, 'host0', pid, [(threads[0], None)])[threads[0].ident]['nr_threads'] == 2
+
     def test_heartbeat_payload(self, thread_factory, executable_factory):
         """ HEARTBEAT (CORE): Test heartbeat with payload"""
 
@@ -192,3 +232,50 @@ class TestHeartbeat:
         # Custom expiration delay. Host2 health checks should get removed too.
         sanity_check(executable2, 'host2', expiration_delay=timedelta(hours=5).total_seconds())
         assert len(list_heartbeats()) == 2
+
+
+def test_heartbeat_handler_bulk_renewal(executable_factory):
+    """ HEARTBEAT (DAEMONS): The heartbeats of all the handlers of a process are renewed together """
+
+    executable = executable_factory()
+    handlers = []
+    created = threading.Barrier(11)
+    done = threading.Event()
+
+    def _create_handler():
+        handlers.append(HeartbeatHandler(executable=executable, renewal_interval=60))
+        created.wait()
+        done.wait()
+
+    threads = [threading.Thread(target=_create_handler) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    created.wait()
+    try:
+        for handler in handlers:
+            handler.live()
+        # Cached heartbeats are not renewed, but the handlers are renewed by the next renewal
+        for handler in handlers:
+            handler.live()
+
+        statements = []
+
+        def count_statements(conn, cursor, statement, parameters, context, executemany):
+            if 'heartbeats' in statement:
+                statements.append(statement)
+
+        engine = get_engine()
+        event.listen(engine, 'before_cursor_execute', count_statements)
+        try:
+            handlers[0].live(force_renew=True)
+            assignments = [handler.live()[:2] for handler in handlers]
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statements)
+        assert len(statements) == 3
+        assert sorted(assignments) == [(assign_thread, 10) for assign_thread in range(10)]
+    finally:
+        for handler in handlers:
+            handler.__exit__(None, None, None)
+        done.set()
+        for thread in threads:
+            thread.join()
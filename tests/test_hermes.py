@@ -16,6 +16,8 @@
 Hermes Test
 """
 
+import logging
+import threading
 import time
 from datetime import datetime
 from json import loads
@@ -26,9 +28,11 @@ import requests
 import stomp
 
 from rucio.common.config import config_get, config_get_int, config_get_list
+from rucio.core import config as config_core
 from rucio.core.message import add_message, retrieve_messages, truncate_messages
 from rucio.daemons.hermes import hermes
 from rucio.tests.common import rse_name_generator, skip_missing_elasticsearch_influxdb_in_env
+from tests.mocks.mock_http_server import MockServer
 
 
 class MyListener:
@@ -283,3 +287,149 @@ def test_hermes(core_config_mock, caches_mock, monkeypatch):
 
     # Checking email
     assert service_dict["email"] == 0
+
+
+class StompConnectionStub:
+    def __init__(self):
+        self.sent = []
+
+    def is_connected(self):
+        return True
+
+    def send(self, body, destination, headers):
+        self.sent.append(loads(body))
+
+
+@pytest.mark.noparallel(reason="fails when run in parallel")
+@pytest.mark.parametrize(
+    "core_config_mock",
+    [
+        {
+            "table_content": [
+                ("hermes", "services_list", "influx,activemq,elastic"),
+                ("hermes", "service_workers", True),
+                ("hermes", "influxdb_token", "mytoken"),
+                ("hermes", "service_batch_size", 2),
+                ("hermes", "service_flush_interval", 0.1),
+            ]
+        }
+    ],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "caches_mock",
+    [
+        {
+            "caches_to_mock": [
+                "rucio.core.config.REGION",
+            ]
+        }
+    ],
+    indirect=True,
+)
+def test_hermes_service_workers(core_config_mock, caches_mock, monkeypatch):
+    """HERMES (DAEMON): Test the delivery of messages with a worker per service."""
+    truncate_messages()
+    mock_rse = rse_name_generator()
+    nb_messages = 5
+    for _ in range(nb_messages):
+        add_message("deletion-done", {"bytes": 2, "rse": mock_rse, "created_at": datetime.utcnow().replace(microsecond=0)})
+
+    posted = []
+
+    class _RecordPost(MockServer.Handler):
+        def do_POST(self):
+            posted.append((self.path, self.rfile.read(int(self.headers["Content-Length"])).decode()))
+            self.send_code_and_message(204, {}, "")
+
+    stomp_stub = StompConnectionStub()
+    monkeypatch.setattr(hermes, "setup_activemq", lambda logger: ([stomp_stub], "/queue/events", None, None, False))
+    with MockServer(_RecordPost) as mock_server:
+        config_core.set("hermes", "influxdb_endpoint", mock_server.base_url + "/influx")
+        config_core.set("hermes", "elastic_endpoint", mock_server.base_url + "/elastic")
+        hermes.hermes(once=True)
+
+    assert retrieve_messages(50, old_mode=False) == []
+    # Batches of 2 messages at most
+    assert len([path for path, _ in posted if path == "/influx"]) == 3
+    assert sum(data.count('"index"') for path, data in posted if path == "/elastic") == nb_messages
+    assert len(stomp_stub.sent) == nb_messages
+    assert all(message["payload"]["rse"] == mock_rse for message in stomp_stub.sent)
+
+
+@pytest.mark.noparallel(reason="fails when run in parallel")
+@pytest.mark.parametrize(
+    "core_config_mock",
+    [{"table_content": [("hermes", "services_list", "activemq")]}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "caches_mock",
+    [{"caches_to_mock": ["rucio.core.config.REGION"]}],
+    indirect=True,
+)
+def test_service_workers_run_ahead(core_config_mock, caches_mock):
+    """HERMES (DAEMON): Test that the messages queued to a busy service worker are not retrieved again."""
+    truncate_messages()
+    nb_messages = 6
+    for _ in range(nb_messages):
+        add_message("deletion-done", {"bytes": 2, "rse": "MOCK", "created_at": datetime.utcnow().replace(microsecond=0)})
+
+    busy_service = threading.Event()
+    delivered = []
+
+    def _deliver(messages):
+        busy_service.wait(10)
+        delivered.extend(messages)
+        return messages
+
+    worker = hermes.ServiceWorker("activemq", _deliver, queue_size=nb_messages, batch_size=2, flush_interval=0.1, logger=logging.log, release_undelivered=True)
+    heartbeat_handler = MagicMock()
+    heartbeat_handler.live.return_value = (0, 1, logging.log)
+    try:
+        for _ in range(nb_messages // 2):
+            # Each call claims new messages while the former ones are still queued or being delivered
+            must_sleep = hermes._queue_to_service_workers(services_list=["activemq"], service_workers={"activemq": worker},
+                                                          bulk=2, lease_duration=600, heartbeat_handler=heartbeat_handler)
+            assert not must_sleep
+        assert worker.free_slots == 0
+    finally:
+        busy_service.set()
+        worker.close()
+    assert len({message["id"] for message in delivered}) == nb_messages
+    assert retrieve_messages(50, old_mode=False) == []
+
+
+def test_service_worker_slow_service():
+    """HERMES (DAEMON): Test that a slow service doesn't delay the delivery to the other ones."""
+    slow_service = threading.Event()
+    fast_batches = []
+
+    def _deliver_slow(messages):
+        slow_service.wait(10)
+        return []
+
+    def _deliver_fast(messages):
+        fast_batches.append([message["id"] for message in messages])
+        return []
+
+    slow_worker = hermes.ServiceWorker("slow", _deliver_slow, queue_size=4, batch_size=2, flush_interval=0.1, logger=logging.log)
+    fast_worker = hermes.ServiceWorker("fast", _deliver_fast, queue_size=4, batch_size=2, flush_interval=0.1, logger=logging.log)
+    messages = [{"id": str(i)} for i in range(3)]
+    try:
+        assert slow_worker.put(messages) == 3
+        assert fast_worker.put(messages) == 3
+        # Messages already queued are not queued twice
+        assert slow_worker.put(messages) == 0
+        assert slow_worker.free_slots == 1
+
+        # The fast worker delivers its messages while the slow one is still blocked
+        fast_worker.close()
+        assert fast_batches == [["0", "1"], ["2"]]
+        assert fast_worker.free_slots == 4
+        assert slow_worker.free_slots == 1
+    finally:
+        slow_service.set()
+        slow_worker.close()
+        fast_worker.close()
+    assert slow_worker.free_slots == 4
@@ -522,3 +522,47 @@ def test_judge_double_container_with_existing_rule(
 
     assert not get_replica_locks(**file)
     assert not get_replica_locks(**dataset)
+
+
+def test_judge_add_files_with_source_replica_expression(
+    did_factory: "TemporaryDidFactory",
+    rse_factory: "TemporaryRSEFactory",
+    root_account: "InternalAccount"
+):
+    """
+    JUDGE EVALUATOR:
+    Test the locks created when attaching files to a dataset protected by a rule with a
+    source_replica_expression. Some of the files are already replicated on the destination,
+    the other ones must be transferred from the allowed source if they have a replica there.
+    """
+    src_rse = RSE_namedtuple(*rse_factory.make_mock_rse())
+    other_rse = RSE_namedtuple(*rse_factory.make_mock_rse())
+    dst_rse = RSE_namedtuple(*rse_factory.make_mock_rse())
+
+    dataset = did_factory.make_dataset()
+    rule_id, = add_rule(
+        dids=[dataset],
+        account=root_account,
+        copies=1,
+        rse_expression=dst_rse.name,
+        grouping="DATASET",
+        weight=None,
+        lifetime=None,
+        locked=False,
+        subscription_id=None,
+        source_replica_expression=src_rse.name,
+    )
+
+    files_by_rse = {rse.id: [did_factory.random_file_did() for _ in range(3)] for rse in (src_rse, other_rse, dst_rse)}
+    for rse_id, files in files_by_rse.items():
+        for file in files:
+            add_replica(rse_id=rse_id, account=root_account, bytes_=10, **file)
+    attach_dids(dids=[file for files in files_by_rse.values() for file in files], account=root_account, **dataset)
+
+    re_evaluator(once=True, did_limit=None)
+
+    lock_states = {(lock['scope'], lock['name']): lock['state'] for lock in get_replica_locks_for_rule_id(rule_id)}
+    assert len(lock_states) == 9
+    assert all(lock_states[file['scope'], file['name']] == LockState.REPLICATING for file in files_by_rse[src_rse.id])
+    assert all(lock_states[file['scope'], file['name']] == LockState.STUCK for file in files_by_rse[other_rse.id])
+    assert all(lock_states[file['scope'], file['name']] == LockState.OK for file in files_by_rse[dst_rse.id])
@@ -15,16 +15,19 @@
 import json
 import random
 import string
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select
 
 from rucio.common.constants import MAX_MESSAGE_LENGTH
 from rucio.common.exception import InvalidObject, RucioException
-from rucio.common.utils import generate_uuid
-from rucio.core.message import add_message, add_messages, delete_messages, retrieve_messages, truncate_messages
+from rucio.common.utils import chunks, generate_uuid
+from rucio.core.message import add_message, add_messages, claim_messages, delete_messages, release_messages, retrieve_messages, truncate_messages
 from rucio.db.sqla.models import Message
-from rucio.db.sqla.session import get_session
+from rucio.db.sqla.session import get_engine, get_session
+from rucio.tests.common import skip_without_benchmarks
 
 
 @pytest.mark.noparallel(reason='fails when run in parallel')
@@ -130,6 +133,143 @@ def test_large_payload(core_config_mock, caches_mock):
     assert messages[0]['payload'] == dict_long_payload
 
 
+@pytest.mark.noparallel(reason='fails when run in parallel')
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('hermes', 'services_list', 'activemq'),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_retrieve_mixed_payloads(core_config_mock, caches_mock):
+    """ MESSAGE (CORE): Test retrieving small and large payloads with a single query """
+    truncate_messages()
+
+    long_payload = 'x' * (MAX_MESSAGE_LENGTH + 20)
+    event_type = generate_uuid()[:10]
+    add_messages([{'event_type': event_type, 'payload': {'number': cnt, 'data': long_payload if cnt % 2 else 'short'}} for cnt in range(10)])
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        if 'messages' in statement:
+            statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, 'before_cursor_execute', count_statements)
+    try:
+        messages = retrieve_messages(40)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statements)
+    assert len(statements) == 1
+    assert sorted((msg['payload']['number'], msg['payload']['data']) for msg in messages) == [(cnt, long_payload if cnt % 2 else 'short') for cnt in range(10)]
+
+
+@skip_without_benchmarks
+@pytest.mark.noparallel(reason='fails when run in parallel')
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('hermes', 'services_list', 'activemq'),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_benchmark_retrieve_messages(core_config_mock, caches_mock):
+    """ MESSAGE (CORE): Benchmark the retrieval of 100k messages, one in ten with a large payload """
+    truncate_messages()
+
+    nb_messages = 100000
+    long_payload = 'x' * (MAX_MESSAGE_LENGTH + 1000)
+    add_messages([{'event_type': 'RULE_OK', 'payload': {'number': cnt, 'data': long_payload if cnt % 10 == 0 else 'short'}} for cnt in range(nb_messages)])
+
+    retrieved = 0
+    retrieve_time = 0
+    while True:
+        start = time.perf_counter()
+        messages = retrieve_messages(1000)
+        retrieve_time += time.perf_counter() - start
+        if not messages:
+            break
+        retrieved += len(messages)
+        for messages_chunk in chunks(messages, 100):
+            delete_messages([{'id': msg['id'], 'created_at': msg['created_at'], 'updated_at': msg['created_at'],
+                              'payload': json.dumps(msg['payload']), 'event_type': msg['event_type']} for msg in messages_chunk])
+    print('retrieve_messages: %d messages in %.2f seconds, %.0f messages/s' % (retrieved, retrieve_time, retrieved / retrieve_time))
+    assert retrieved == nb_messages
+
+
+@pytest.mark.noparallel(reason='fails when run in parallel')
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('hermes', 'services_list', 'activemq'),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_claim_messages(core_config_mock, caches_mock):
+    """ MESSAGE (CORE): Test claiming, releasing and reclaiming messages with a lease """
+    truncate_messages()
+
+    event_type = generate_uuid()[:10]
+    add_messages([{'event_type': event_type, 'payload': {'number': cnt}} for cnt in range(10)])
+
+    first = claim_messages(6, lease_duration=600, owner='first', event_type=event_type)
+    second = claim_messages(6, lease_duration=600, owner='second', event_type=event_type)
+    assert len(first) == 6
+    assert len(second) == 4
+    assert {msg['id'] for msg in first}.isdisjoint(msg['id'] for msg in second)
+    assert claim_messages(6, lease_duration=600, event_type=event_type) == []
+
+    # Released messages can be claimed again right away
+    release_messages(second)
+    third = claim_messages(6, lease_duration=0, owner='third', event_type=event_type)
+    assert sorted(msg['payload']['number'] for msg in third) == sorted(msg['payload']['number'] for msg in second)
+
+    # Messages whose lease expired can be claimed again
+    time.sleep(1)
+    fourth = claim_messages(6, lease_duration=600, owner='fourth', event_type=event_type)
+    assert {msg['id'] for msg in fourth} == {msg['id'] for msg in third}
+
+    # A caller claiming again only gets the messages claimed by the new call
+    release_messages(fourth)
+    fifth = claim_messages(2, lease_duration=600, owner='first', event_type=event_type)
+    sixth = claim_messages(6, lease_duration=600, owner='first', event_type=event_type)
+    assert len(fifth) == 2
+    assert len(sixth) == 2
+    assert {msg['id'] for msg in fifth}.isdisjoint(msg['id'] for msg in sixth)
+
+
+@skip_without_benchmarks
+@pytest.mark.noparallel(reason='fails when run in parallel')
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('hermes', 'services_list', 'activemq'),
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.core.config.REGION',
+]}], indirect=True)
+def test_benchmark_claim_messages(core_config_mock, caches_mock):
+    """ MESSAGE (CORE): Benchmark claiming and deleting 20k messages with 1, 4 and 16 concurrent workers """
+    nb_messages = 20000
+
+    def worker():
+        processed = 0
+        while True:
+            messages = claim_messages(100, lease_duration=600)
+            if not messages:
+                return processed
+            delete_messages([{'id': msg['id'], 'created_at': msg['created_at'], 'updated_at': msg['created_at'],
+                              'payload': json.dumps(msg['payload']), 'event_type': msg['event_type']} for msg in messages])
+            processed += len(messages)
+
+    for nb_workers in (1, 4, 16):
+        truncate_messages()
+        add_messages([{'event_type': 'RULE_OK', 'payload': {'number': cnt}} for cnt in range(nb_messages)])
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=nb_workers) as executor:
+            processed = sum(executor.map(lambda _: worker(), range(nb_workers)))
+        elapsed = time.perf_counter() - start
+        print('claim_messages: %2d workers, %d messages in %.2f seconds, %.0f messages/s' % (nb_workers, processed, elapsed, processed / elapsed))
+        # Every message is processed exactly once
+        assert processed == nb_messages
+
+
 @pytest.mark.noparallel(reason='fails when run in parallel')
 @pytest.mark.parametrize("core_config_mock", [{"table_content": [
     ('hermes', 'services_list', 'nonexistingservice'),
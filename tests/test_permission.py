@@ -12,10 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from dogpile.cache.api import NO_VALUE
+from sqlalchemy import event
+
 from rucio.common.config import config_get
 from rucio.common.types import InternalScope
-from rucio.core.account import add_account_attribute
+from rucio.core.account import ACCOUNT_ATTRIBUTES_CACHE, add_account_attribute, has_account_attribute
+from rucio.core.permission import PROCESS_DECISIONS, permission_cache
 from rucio.core.scope import add_scope
+from rucio.db.sqla.session import get_engine, get_session
 from rucio.gateway.permission import has_permission
 from rucio.tests.common import scope_name_generator, skip_non_belleii
 
@@ -74,3 +79,49 @@ class TestPermissionCoreGateway:
         kwargs = {'options': {'boost_rule': True}}
         assert has_permission(issuer='root', action='update_rule', kwargs=kwargs, vo=vo)
         assert not has_permission(issuer='jdoe', action='update_rule', kwargs=kwargs, vo=vo)
+
+    def test_permission_decision_cache(self, vo, random_account):
+        """ PERMISSION(CORE): Check that decisions are cached and invalidated when account attributes change """
+        statements = []
+
+        def count_statements(conn, cursor, statement, parameters, context, executemany):
+            if 'account_attr_map' in statement:
+                statements.append(statement)
+
+        engine = get_engine()
+        event.listen(engine, 'before_cursor_execute', count_statements)
+        try:
+            assert not has_permission(issuer=random_account.external, action='skip_availability_check', kwargs={}, vo=vo)
+            assert not has_permission(issuer=random_account.external, action='skip_availability_check', kwargs={}, vo=vo)
+            assert len(statements) == 1
+
+            add_account_attribute(random_account, 'admin', True)
+            statements.clear()
+            with permission_cache():
+                assert has_permission(issuer=random_account.external, action='skip_availability_check', kwargs={}, vo=vo)
+                assert len(statements) == 1
+                # Decisions taken in the context are kept even when the ones of the process are dropped
+                PROCESS_DECISIONS.invalidate()
+                assert has_permission(issuer=random_account.external, action='skip_availability_check', kwargs={}, vo=vo)
+                assert len(statements) == 1
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_statements)
+
+    def test_account_attributes_invalidated_on_commit(self, random_account):
+        """ PERMISSION(CORE): Check that the cached account attributes are only dropped once the change is committed """
+        assert not has_account_attribute(random_account, 'admin')
+
+        session = get_session()()
+        try:
+            add_account_attribute(random_account, 'admin', True, session=session)
+            session.rollback()
+            assert ACCOUNT_ATTRIBUTES_CACHE.get(random_account) is not NO_VALUE
+
+            add_account_attribute(random_account, 'admin', True, session=session)
+            session.begin_nested().commit()
+            assert ACCOUNT_ATTRIBUTES_CACHE.get(random_account) is not NO_VALUE
+            session.commit()
+            assert ACCOUNT_ATTRIBUTES_CACHE.get(random_account) is NO_VALUE
+        finally:
+            session.close()
+        assert has_account_attribute(random_account, 'admin')
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from datetime import datetime, timedelta
 
 import pytest
@@ -26,7 +27,7 @@ from rucio.core import replica as replica_core
 from rucio.core import rse as rse_core
 from rucio.core import rule as rule_core
 from rucio.daemons.reaper.dark_reaper import reaper as dark_reaper
-from rucio.daemons.reaper.reaper import reaper
+from rucio.daemons.reaper.reaper import _HostDeletionPools, reaper
 from rucio.daemons.reaper.reaper import run as run_reaper
 from rucio.db.sqla import models
 from rucio.db.sqla.constants import OBSOLETE
@@ -496,6 +497,33 @@ def test_reaper_without_rse_usage(vo, caches_mock):
     assert len(list(replica_core.list_replicas(dids, rse_expression=rse_name))) == nb_files - nb_epoch_tombstone
 
 
+@pytest.mark.parametrize("core_config_mock", [{"table_content": [
+    ('reaper', 'max_deletion_threads_slow.example.org', 2)
+]}], indirect=True)
+@pytest.mark.parametrize("caches_mock", [{"caches_to_mock": [
+    'rucio.daemons.reaper.reaper.REGION'
+]}], indirect=True)
+def test_deletion_pools_per_hostname(core_config_mock, caches_mock):
+    """ REAPER (DAEMON): Test that a slow storage only backs up its own deletion pool."""
+    pools = _HostDeletionPools()
+    slow_storage = threading.Event()
+    futures = []
+    for _ in range(2):
+        assert pools.reserve('slow.example.org')
+        futures.append(pools.submit('slow.example.org', slow_storage.wait, 10))
+    # 2 running chunks, no place left
+    assert not pools.reserve('slow.example.org')
+
+    assert pools.reserve('fast.example.org')
+    assert pools.submit('fast.example.org', lambda: True).result(timeout=10)
+
+    slow_storage.set()
+    pools.shutdown()
+    assert all(future.result() for future in futures)
+    assert pools.reserve('slow.example.org')
+    pools.release('slow.example.org')
+
+
 @skip_rse_tests_with_accounts
 @pytest.mark.dirty(reason="leaves files in XRD containers")
 @pytest.mark.noparallel(groups=[NoParallelGroups.WEB])
@@ -32,7 +32,22 @@ from rucio.common.schema import get_schema_value
 from rucio.common.utils import clean_pfns, generate_uuid, parse_response
 from rucio.core.config import set as cconfig_set
 from rucio.core.did import add_did, attach_dids, get_did, get_did_atime, list_files, set_status
-from rucio.core.replica import add_bad_dids, add_replica, add_replicas, delete_replicas, get_bad_pfns, get_replica, get_replica_atime, get_replicas_state, get_rse_coverage_of_dataset, list_replicas, set_tombstone, touch_replica, update_replica_state
+from rucio.core.replica import (
+    ListReplicasCursor,
+    add_bad_dids,
+    add_replica,
+    add_replicas,
+    delete_replicas,
+    get_bad_pfns,
+    get_replica,
+    get_replica_atime,
+    get_replicas_state,
+    get_rse_coverage_of_dataset,
+    list_replicas,
+    set_tombstone,
+    touch_replica,
+    update_replica_state,
+)
 from rucio.core.rse import add_protocol, add_rse_attribute, del_rse_attribute
 from rucio.daemons.badreplicas.minos import minos
 from rucio.daemons.badreplicas.minos_temporary_expiration import minos_tu_expiration
@@ -596,6 +611,36 @@ class TestReplicaCore:
         assert len(list(list_replicas([{'scope': mock_scope, 'name': dsn}], updated_after=t2))) == 1
         assert len(list(list_replicas([{'scope': mock_scope, 'name': dsn}], updated_after=t3))) == 0
 
+    def test_list_replicas_paginated(self, rse_factory, mock_scope, root_account):
+        """ REPLICA (CORE): List file replicas page by page with a keyset cursor """
+        rse_ids = [rse_factory.make_mock_rse()[1] for _ in range(3)]
+        dsn = 'ds_page_test_%s' % generate_uuid()
+        add_did(scope=mock_scope, name=dsn, did_type='DATASET', account=root_account)
+        files = [{'scope': mock_scope, 'name': '%s._%04d.data' % (dsn, i), 'bytes': 1, 'adler32': '0cc737eb'} for i in range(7)]
+        # the files have replicas on 1 to 3 RSEs
+        for i, rse_id in enumerate(rse_ids):
+            add_replicas(rse_id=rse_id, files=files[:3 + 2 * i], account=root_account)
+        attach_dids(scope=mock_scope, name=dsn, dids=files, account=root_account)
+        expected = {f['name']: {rse_id for i, rse_id in enumerate(rse_ids) if f in files[:3 + 2 * i]} for f in files}
+
+        for page_size in (1, 2, 4, 100):
+            cursor = ListReplicasCursor(page_size=page_size)
+            listed = {}
+            nb_pages = 0
+            while not cursor.exhausted:
+                nb_pages += 1
+                for replica in list_replicas([{'scope': mock_scope, 'name': dsn}], cursor=cursor):
+                    assert replica['name'] not in listed
+                    listed[replica['name']] = set(replica['rses'])
+                # resume from the continuation token, as a stateless server would do
+                exhausted = cursor.exhausted
+                cursor = ListReplicasCursor.from_token(cursor.to_token(), page_size=page_size)
+                cursor.exhausted = exhausted
+            assert listed == expected
+            assert nb_pages <= len(files) + 1
+            if page_size == 100:
+                assert nb_pages == 1
+
     def test_add_bad_dids(self, rse_factory, mock_scope, root_account):
         """ REPLICA (CORE): Declare a list of replicas as bad.  """
         _, rse_id = rse_factory.make_mock_rse()
@@ -1048,6 +1093,27 @@ def test_client_get_nrandom(rse_factory, did_factory, did_client, replica_client
     assert len(replicas) == 10
 
 
+def test_client_list_replicas_paginated(rse_factory, did_factory, did_client, replica_client):
+    """ REPLICA (CLIENT): list the replicas of a dataset page by page"""
+    rse, _ = rse_factory.make_posix_rse()
+
+    dataset = did_factory.make_dataset()
+    dataset = {'scope': dataset['scope'].external, 'name': dataset['name']}
+
+    files = []
+    for _ in range(5):
+        file = did_factory.upload_test_file(rse)
+        files.append({'scope': file['scope'].external, 'name': file['name']})
+    did_client.add_files_to_dataset(files=files, **dataset)
+
+    replicas = list(replica_client.list_replicas(dids=[dataset], page_size=2))
+    assert sorted(r['name'] for r in replicas) == sorted(f['name'] for f in files)
+    assert all(r['rses'] == {rse: r['rses'][rse]} for r in replicas)
+
+    with pytest.raises(RucioException):
+        list(replica_client.list_replicas(dids=[dataset], page_size=2, cursor='not-a-token'))
+
+
 class TestReplicaMetalink:
 
     @pytest.mark.dirty
@@ -17,17 +17,23 @@ from datetime import datetime
 from typing import Union
 
 import pytest
+from sqlalchemy import delete, event, select, update
 
 from rucio.common.config import config_get_bool
 from rucio.common.constants import RseAttr
 from rucio.common.utils import generate_uuid, parse_response
 from rucio.core.distance import add_distance
 from rucio.core.replica import add_replica
-from rucio.core.request import TransferStatsManager, get_request_by_did, list_requests, list_requests_history, queue_requests, set_transfer_limit
+from rucio.core.request import TransferStatsManager, get_request_by_did, get_requests, list_requests, list_requests_history, queue_requests, set_transfer_limit, transition_requests_state
 from rucio.core.rse import add_rse_attribute
+from rucio.core.transfer import update_transfers_state
+from rucio.daemons.conveyor import poller
 from rucio.db.sqla import constants, models
-from rucio.db.sqla.constants import RequestState, RequestType
+from rucio.db.sqla.constants import DatabaseOperationType, RequestState, RequestType
+from rucio.db.sqla.session import db_session as new_db_session
+from rucio.db.sqla.session import get_engine
 from rucio.tests.common import auth, hdrdict, headers, vohdr
+from rucio.transfertool.transfertool import TransferStatusReport
 
 
 @pytest.mark.parametrize("file_config_mock", [
@@ -371,3 +377,150 @@ def test_api_metrics(vo, rest_client, auth_token, rse_factory, did_factory, root
     response = json.loads(response.get_data(as_text=True))
     metric = response.get(f'{src_rse}:{dst_rse}')
     assert metric is not None
+
+
+class _DoneStatusReport(TransferStatusReport):
+
+    supported_db_fields = [
+        'state',
+        'external_id',
+        'transferred_at',
+    ]
+
+    def __init__(self, request_id, external_id):
+        super().__init__(request_id)
+        self.external_id = external_id
+        self.transferred_at = None
+
+    def initialize(self, session, logger=None):
+        self.state = RequestState.DONE
+        self.transferred_at = datetime.utcnow()
+
+    def get_monitor_msg_fields(self, session, logger=None):
+        return {'transfer-endpoint': 'https://fts.test:8446'}
+
+
+def test_update_transfers_state_in_bulk(rse_factory, did_factory, root_account):
+    """ REQUEST (CORE): the state transitions of many requests are applied with set-based statements """
+
+    _, src_rse_id = rse_factory.make_mock_rse()
+    _, dst_rse_id = rse_factory.make_mock_rse()
+    dids = [did_factory.random_file_did() for _ in range(10)]
+    requests = []
+    for did in dids:
+        add_replica(src_rse_id, account=root_account, bytes_=1, **did)
+        requests.append({
+            'dest_rse_id': dst_rse_id,
+            'source_rse_id': src_rse_id,
+            'request_type': RequestType.TRANSFER,
+            'rule_id': generate_uuid(),
+            'retry_count': 1,
+            'attributes': {'activity': 'User Subscription', 'bytes': 1, 'md5': '', 'adler32': ''},
+            **did,
+        })
+    queue_requests(requests)
+
+    external_id = generate_uuid()
+    request_ids = [get_request_by_did(rse_id=dst_rse_id, **did)['id'] for did in dids]
+    with new_db_session(DatabaseOperationType.WRITE) as session:
+        session.execute(update(models.Request).where(models.Request.id.in_(request_ids)).values(
+            state=RequestState.SUBMITTED, external_id=external_id, external_host='https://fts.test:8446', source_rse_id=src_rse_id
+        ))
+    reports = [_DoneStatusReport(request_id, external_id) for request_id in request_ids]
+    reports.append(_DoneStatusReport(generate_uuid(), external_id))
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('UPDATE', 'INSERT')):
+            statements.append(statement.split('(')[0].split(' SET ')[0].strip())
+
+    engine = get_engine()
+    event.listen(engine, 'before_cursor_execute', count_statements)
+    try:
+        outcomes = update_transfers_state(reports, TransferStatsManager())
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statements)
+
+    assert outcomes == {**{request_id: 1 for request_id in request_ids}, reports[-1].request_id: 0}
+    assert statements.count('UPDATE requests') == 1
+    assert len([s for s in statements if s.startswith('INSERT INTO messages')]) == 1
+    for did in dids:
+        assert get_request_by_did(rse_id=dst_rse_id, **did)['state'] == RequestState.DONE
+    with new_db_session(DatabaseOperationType.READ) as session:
+        stmt = select(models.Message.payload).where(models.Message.event_type == 'transfer-done')
+        payloads = [json.loads(payload) for payload in session.execute(stmt).scalars()]
+    assert set(request_ids).issubset(p['request-id'] for p in payloads)
+
+
+class _FaultyStatusReport(_DoneStatusReport):
+
+    def get_monitor_msg_fields(self, session, logger=None):
+        raise ValueError('Faulty report')
+
+
+def test_update_transfers_state_failure(rse_factory, did_factory, root_account):
+    """ REQUEST (CORE): a failed bulk update is rolled back, and the poller then applies the reports one by one """
+
+    _, src_rse_id = rse_factory.make_mock_rse()
+    _, dst_rse_id = rse_factory.make_mock_rse()
+    dids = [did_factory.random_file_did() for _ in range(3)]
+    for did in dids:
+        add_replica(src_rse_id, account=root_account, bytes_=1, **did)
+    queue_requests([{
+        'dest_rse_id': dst_rse_id,
+        'source_rse_id': src_rse_id,
+        'request_type': RequestType.TRANSFER,
+        'rule_id': generate_uuid(),
+        'retry_count': 1,
+        'attributes': {'activity': 'User Subscription', 'bytes': 1, 'md5': '', 'adler32': ''},
+        **did,
+    } for did in dids])
+
+    external_id = generate_uuid()
+    request_ids = [get_request_by_did(rse_id=dst_rse_id, **did)['id'] for did in dids]
+    with new_db_session(DatabaseOperationType.WRITE) as session:
+        session.execute(update(models.Request).where(models.Request.id.in_(request_ids)).values(
+            state=RequestState.SUBMITTED, external_id=external_id, external_host='https://fts.test:8446', source_rse_id=src_rse_id
+        ))
+
+    def _reports():
+        return [_DoneStatusReport(request_ids[0], external_id), _FaultyStatusReport(request_ids[1], external_id), _DoneStatusReport(request_ids[2], external_id)]
+
+    with pytest.raises(ValueError):
+        update_transfers_state(_reports(), TransferStatsManager())
+    assert [get_request_by_did(rse_id=dst_rse_id, **did)['state'] for did in dids] == [RequestState.SUBMITTED] * 3
+
+    outcomes = poller._update_transfers_state(_reports(), TransferStatsManager())
+    assert outcomes == {request_ids[0]: 1, request_ids[1]: 0, request_ids[2]: 1}
+    assert [get_request_by_did(rse_id=dst_rse_id, **did)['state'] for did in dids] == [RequestState.DONE, RequestState.SUBMITTED, RequestState.DONE]
+
+
+def test_transition_requests_state_of_deleted_request(rse_factory, did_factory, root_account):
+    """ REQUEST (CORE): a request deleted after being loaded is skipped without failing the other transitions """
+
+    _, src_rse_id = rse_factory.make_mock_rse()
+    _, dst_rse_id = rse_factory.make_mock_rse()
+    dids = [did_factory.random_file_did() for _ in range(3)]
+    for did in dids:
+        add_replica(src_rse_id, account=root_account, bytes_=1, **did)
+    queue_requests([{
+        'dest_rse_id': dst_rse_id,
+        'source_rse_id': src_rse_id,
+        'request_type': RequestType.TRANSFER,
+        'rule_id': generate_uuid(),
+        'retry_count': 1,
+        'attributes': {'activity': 'User Subscription', 'bytes': 1, 'md5': '', 'adler32': ''},
+        **did,
+    } for did in dids])
+    request_ids = [get_request_by_did(rse_id=dst_rse_id, **did)['id'] for did in dids]
+
+    with new_db_session(DatabaseOperationType.WRITE) as session:
+        requests = get_requests(request_ids, session=session)
+        session.execute(delete(models.Request).where(models.Request.id == request_ids[0]))
+        outcomes = transition_requests_state({request_id: {'state': RequestState.SUBMITTING} for request_id in request_ids},
+                                             requests=requests, session=session)
+
+    assert outcomes == {request_ids[0]: False, request_ids[1]: True, request_ids[2]: True}
+    for did in dids[1:]:
+        assert get_request_by_did(rse_id=dst_rse_id, **did)['state'] == RequestState.SUBMITTING
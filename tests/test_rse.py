@@ -25,8 +25,10 @@ from rucio.core.account_limit import get_rse_account_usage, set_local_account_li
 from rucio.core.did import add_did, attach_dids
 from rucio.core.request import delete_transfer_limit, set_transfer_limit
 from rucio.core.rse import (
+    add_protocol,
     add_rse,
     add_rse_attribute,
+    del_protocols,
     del_rse,
     del_rse_attribute,
     get_rse,
@@ -41,6 +43,7 @@ from rucio.core.rse import (
     restore_rse,
     rse_exists,
     rse_is_empty,
+    update_protocols,
     update_rse,
 )
 from rucio.core.rule import add_rule
@@ -275,6 +278,46 @@ def test_rse_get_supported_checksums_from_attributes(vo, caches_mock):
     del_rse(rse_id)
 
 
+def test_rse_info_local_cache(rse_factory, metrics_mock):
+    """ RSE (CORE): rse_info is served by the local cache tier, and invalidated on modification """
+    _, rse_id = rse_factory.make_mock_rse()
+
+    rse_info = mgr.get_rse_info(rse_id=rse_id)
+    assert mgr.get_rse_info(rse_id=rse_id) is rse_info
+    assert metrics_mock.get_sample_value('rucio_rse_rse_info_total', labels={'result': 'local_hit'}) >= 1
+    assert {p['scheme'] for p in rse_info['protocols']} == {'mock'}
+
+    protocol = {'scheme': 'root', 'hostname': 'localhost', 'port': 1094, 'prefix': '/rucio/', 'impl': 'rucio.rse.protocols.xrootd.Default',
+                'domains': {'wan': {'read': 1, 'write': 1, 'delete': 1, 'third_party_copy_read': 1, 'third_party_copy_write': 1}}}
+    add_protocol(rse_id, protocol)
+    assert {p['scheme'] for p in mgr.get_rse_info(rse_id=rse_id)['protocols']} == {'mock', 'root'}
+
+    update_protocols(rse_id, scheme='root', data={'prefix': '/other/'}, hostname='localhost', port=1094)
+    assert [p['prefix'] for p in mgr.get_rse_info(rse_id=rse_id)['protocols'] if p['scheme'] == 'root'] == ['/other/']
+
+    del_protocols(rse_id, scheme='root')
+    assert {p['scheme'] for p in mgr.get_rse_info(rse_id=rse_id)['protocols']} == {'mock'}
+
+    update_rse(rse_id, {'availability_write': False})
+    assert mgr.get_rse_info(rse_id=rse_id)['availability_write'] is False
+
+
+def test_rse_info_invalidated_on_commit(rse_factory):
+    """ RSE (CORE): the cached rse_info is only invalidated once the modification is committed """
+    _, rse_id = rse_factory.make_mock_rse()
+    assert mgr.get_rse_info(rse_id=rse_id)['availability_write'] is True
+
+    db_session = session.get_session()()
+    try:
+        update_rse(rse_id, {'availability_write': False}, session=db_session)
+        # Read concurrently, before the modification is visible
+        assert mgr.get_rse_info(rse_id=rse_id)['availability_write'] is True
+        db_session.commit()
+    finally:
+        db_session.close()
+    assert mgr.get_rse_info(rse_id=rse_id)['availability_write'] is False
+
+
 def test_create_rse_success(vo, rest_client, auth_token):
     """ RSE (REST): send a POST to create a new RSE """
     rse_name = rse_name_generator()
@@ -19,6 +19,7 @@ import pytest
 
 from rucio.common.exception import InvalidRSEExpression, RSEWriteBlocked
 from rucio.core import rse, rse_expression_parser
+from rucio.db.sqla.session import get_session
 
 
 def attribute_name_generator(size=10):
@@ -214,6 +215,93 @@ class TestRSEExpressionParserCore:
         expected = sorted([self.rse4_id, self.rse5_id])
         assert value == expected
 
+    def test_compiled_expression_cache(self):
+        """ RSE_EXPRESSION_PARSER (CORE) Test that the expression tree is built only once per expression """
+        expression = "%s|%s" % (self.tag1, self.tag2)
+        rse_expression_parser.parse_expression(expression, **self.filter)
+        compiled = rse_expression_parser.COMPILED_EXPRESSIONS.get(expression)
+        assert isinstance(compiled, rse_expression_parser.UnionOperator)
+        rse_expression_parser.LOCAL_REGION.invalidate()
+        rse_expression_parser.parse_expression(expression, **self.filter)
+        assert rse_expression_parser.COMPILED_EXPRESSIONS.get(expression) is compiled
+
+    def test_local_cache_invalidation(self, rse_factory):
+        """ RSE_EXPRESSION_PARSER (CORE) Test that modifying RSE attributes invalidates the resolved expressions """
+        rse_name, rse_id = rse_factory.make_mock_rse()
+        attribute = attribute_name_generator()
+        rse.add_rse_attribute(self.rse1_id, attribute, "xx")
+
+        value = [t_rse['id'] for t_rse in rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)]
+        assert value == [self.rse1_id]
+
+        rse.add_rse_attribute(rse_id, attribute, "xx")
+        value = sorted([t_rse['id'] for t_rse in rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)])
+        assert value == sorted([self.rse1_id, rse_id])
+
+        rse.del_rse_attribute(self.rse1_id, attribute)
+        value = [t_rse['id'] for t_rse in rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)]
+        assert value == [rse_id]
+
+        # Returned dictionaries must not alias the cached ones
+        rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)[0]['rse'] = 'modified'
+        assert rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)[0]['rse'] == rse_name
+
+    def test_local_cache_invalidated_on_commit(self, rse_factory):
+        """ RSE_EXPRESSION_PARSER (CORE) Test that the resolved expressions are only invalidated once the change is committed """
+        _, rse_id = rse_factory.make_mock_rse()
+        attribute = attribute_name_generator()
+        rse.add_rse_attribute(self.rse1_id, attribute, "xx")
+        version = rse.get_rse_state_version()
+
+        session = get_session()()
+        try:
+            rse.add_rse_attribute(rse_id, attribute, "xx", session=session)
+            session.rollback()
+            assert rse.get_rse_state_version() == version
+
+            rse.add_rse_attribute(rse_id, attribute, "xx", session=session)
+            # Resolved concurrently, before the change is visible
+            value = [t_rse['id'] for t_rse in rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)]
+            assert value == [self.rse1_id]
+            assert rse.get_rse_state_version() == version
+            session.commit()
+            assert rse.get_rse_state_version() > version
+        finally:
+            session.close()
+
+        value = sorted([t_rse['id'] for t_rse in rse_expression_parser.parse_expression("%s=xx" % attribute, **self.filter)])
+        assert value == sorted([self.rse1_id, rse_id])
+
+    def test_bitmap_engine(self):
+        """ RSE_EXPRESSION_PARSER (CORE) Test that the bitmap engine resolves the same RSEs as the set engine """
+        expressions = [
+            self.rse1,
+            self.tag1,
+            "%s=uk" % self.attribute,
+            "%s|%s" % (self.tag1, self.tag2),
+            "%s\\%s" % (self.tag1, self.rse3),
+            "%s&%s=uk" % (self.tag2, self.attribute),
+            "%s\\(%s|%s=fr)" % (self.tag1, self.rse3, self.attribute),
+            "(((((%s))))|%s=us)&%s|(%s=at|%s=de)" % (self.tag1, self.attribute, self.tag2, self.attribute, self.attribute),
+            "(*)&%s=at" % self.attribute,
+            "%s<21" % self.attribute_numeric,
+            "%s>30" % self.attribute_numeric,
+            "*\\%s" % self.tag1,
+        ]
+        for expression in expressions:
+            expected = sorted(t_rse['id'] for t_rse in rse_expression_parser.resolve_expression(expression, engine='set'))
+            value = sorted(t_rse['id'] for t_rse in rse_expression_parser.resolve_expression(expression, engine='bitmap'))
+            assert value == expected
+
+    @pytest.mark.parametrize("core_config_mock", [{"table_content": [('core', 'rse_expression_engine', 'bitmap')]}], indirect=True)
+    def test_bitmap_engine_parse_expression(self, core_config_mock, rse_factory):
+        """ RSE_EXPRESSION_PARSER (CORE) Test parse_expression with the bitmap engine configured """
+        rse_name, rse_id = rse_factory.make_mock_rse()
+        value = sorted([t_rse['id'] for t_rse in rse_expression_parser.parse_expression("%s|%s" % (self.tag2, rse_name), **self.filter)])
+        assert value == sorted([self.rse4_id, self.rse5_id, rse_id])
+        with pytest.raises(InvalidRSEExpression):
+            rse_expression_parser.parse_expression("%s&%s" % (self.tag2, rse_name), **self.filter)
+
 
 @pytest.mark.noparallel(reason='uses pre-defined RSE')
 class TestRSEExpressionParserClient:
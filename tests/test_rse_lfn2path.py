@@ -13,12 +13,15 @@
 # limitations under the License.
 
 import copy
+import logging
 import os
 from configparser import NoOptionError, NoSectionError
 
 import pytest
 
 from rucio.common import config
+from rucio.common.exception import ReplicaNotFound
+from rucio.rse.protocols.mock import Default as MockProtocol
 from rucio.rse.translation import RSEDeterministicTranslation
 
 
@@ -67,6 +70,42 @@ class TestDeterministicTranslation:
         )
         assert translator.path("foo", "bar") == "foo/bar"
 
+    def test_paths(self):
+        """LFN2PFN: Translate a batch of LFNs to paths (Success)"""
+        translator = RSEDeterministicTranslation(
+            rse=self.rse,
+            rse_attributes={
+                'rse': self.rse,
+                'lfn2pfn_algorithm': 'hash',
+            },
+            protocol_attributes=self.protocol_attributes,
+        )
+        dids = [("foo", "bar"), ("foo", "baz"), ("other", "bar")]
+        assert translator.paths(dids) == [translator.path(scope, name) for scope, name in dids]
+        assert translator.paths(dids)[0] == "foo/4e/99/bar"
+        assert translator.paths([]) == []
+
+    def test_lfns2pfns_failing_lfn(self):
+        """LFN2PFN: An LFN which fails to translate doesn't prevent the PFNs of the other LFNs of the batch"""
+
+        def failing_test(scope, name, rse, rse_attrs, proto_attrs):
+            """Test function failing for one of the names."""
+            if name == 'missing':
+                raise ReplicaNotFound('No path for %s:%s' % (scope, name))
+            return '%s/%s' % (scope, name)
+
+        RSEDeterministicTranslation.register(failing_test)
+        protocol = MockProtocol(
+            protocol_attr={'auth_token': None, 'scheme': 'mock', 'hostname': 'localhost', 'port': 0, 'prefix': '/test/'},
+            rse_settings={'rse': self.rse, 'deterministic': True, 'lfn2pfn_algorithm': 'failing_test'},
+            logger=logging.log,
+        )
+        lfns = [{'scope': 'foo', 'name': 'bar'}, {'scope': 'foo', 'name': 'missing'}, {'scope': 'foo', 'name': 'baz'}]
+        assert protocol.lfns2pfns(lfns) == {
+            'foo:bar': 'mock://localhost:0/test/foo/bar',
+            'foo:baz': 'mock://localhost:0/test/foo/baz',
+        }
+
     @pytest.mark.skipif(os.environ.get('POLICY') != 'atlas', reason='Test ATLAS hash convention')
     def test_user_scope(self):
         """LFN2PFN: Test special user scope rules (Success)"""
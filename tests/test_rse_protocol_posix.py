@@ -17,7 +17,9 @@ import shutil
 
 import pytest
 
+from rucio.common.checksum import ChecksumCalculator, adler32, md5
 from rucio.rse import rsemanager as mgr
+from rucio.rse.protocols.posix import Default
 from rucio.tests.common import load_test_conf_file, skip_rse_tests_with_accounts
 
 from .rsemgr_api_test import MgrTestCases
@@ -84,3 +86,18 @@ class TestRsePOSIXSymlink(MgrTestCases):
     def setup_obj(self, setup_rse_and_files, vo):
         rse_settings, tmpdir, user = setup_rse_and_files
         self.init(tmpdir=tmpdir, rse_settings=rse_settings, user=user, vo=vo)
+
+
+def test_get_computes_checksum_while_copying(file_factory, tmp_path):
+    """POSIX (RSE/PROTOCOLS): The checksums given to get() are computed from the copied data """
+    source = file_factory.file_generator(size=3 * 2 ** 20 + 5)
+    protocol_attr = {'auth_token': None, 'scheme': 'file', 'hostname': '', 'port': 0, 'prefix': str(source.parent),
+                     'impl': 'rucio.rse.protocols.posix.Default', 'extended_attributes': None, 'domains': {}}
+    protocol = Default(protocol_attr, {'deterministic': False, 'rse': 'MOCK-POSIX'})
+    assert protocol.checksum_while_transferring
+
+    dest = tmp_path / 'dest'
+    calculator = ChecksumCalculator(['adler32', 'md5'])
+    protocol.get('file://%s' % source, str(dest), checksum_calculator=calculator)
+    assert calculator.hexdigests() == {'adler32': adler32(dest), 'md5': md5(dest)}
+    assert calculator.nbytes == os.path.getsize(dest)
@@ -22,7 +22,7 @@ from rucio.common.utils import generate_uuid
 from rucio.core import request as request_core
 from rucio.core import rse as rse_core
 from rucio.core import rule as rule_core
-from rucio.core.distance import add_distance
+from rucio.core.distance import add_distance, delete_distances, update_distances
 from rucio.core.replica import add_replicas
 from rucio.core.request import list_and_mark_transfer_requests_and_source_replicas
 from rucio.core.topology import Topology, get_hops
@@ -150,6 +150,120 @@ def test_get_hops(rse_factory):
     assert hop4['dest_rse'].id == rse6_id
 
 
+def test_topology_refresh(rse_factory):
+    """
+    A populated topology only applies the database changes which happened since the previous (re-)load
+    """
+    _, rse1_id = rse_factory.make_mock_rse()
+    rse2_name, rse2_id = rse_factory.make_mock_rse()
+    _, rse3_id = rse_factory.make_mock_rse()
+    add_distance(rse1_id, rse2_id, distance=10)
+    add_distance(rse2_id, rse3_id, distance=10)
+
+    topology = Topology(rse_ids=[rse1_id, rse2_id, rse3_id]).refresh()
+    topology.ensure_loaded(load_attributes=True)
+    topology.ensure_edges_loaded()
+    rse1, rse2, rse3 = topology[rse1_id], topology[rse2_id], topology[rse3_id]
+    assert not hasattr(rse1, '__dict__')
+    assert set(topology.edges) == {(rse1, rse2), (rse2, rse3)}
+
+    # New and updated distances are applied on the existing graph
+    add_distance(rse1_id, rse3_id, distance=30)
+    update_distances(rse1_id, rse2_id, distance=20)
+    topology.refresh()
+    assert topology[rse1_id] is rse1
+    assert set(topology.edges) == {(rse1, rse2), (rse2, rse3), (rse1, rse3)}
+    assert topology.edge(rse1, rse2).cost == 20
+    assert topology.edge(rse1, rse3).cost == 30
+    assert rse3 in rse1.out_edges
+
+    # Deleted distances are detected too
+    delete_distances(rse2_id, rse3_id)
+    topology.refresh()
+    assert set(topology.edges) == {(rse1, rse2), (rse1, rse3)}
+    assert rse3 not in rse2.out_edges
+
+    # A deletion together with an insertion leaves the number of rows unchanged
+    delete_distances(rse1_id, rse3_id)
+    add_distance(rse3_id, rse1_id, distance=40)
+    topology.refresh()
+    assert set(topology.edges) == {(rse1, rse2), (rse3, rse1)}
+
+    # A row committed late, with an updated_at before the high-water mark, is not missed
+    db_session = get_session()
+    db_session.query(models.Distance).filter_by(src_rse_id=rse3_id, dest_rse_id=rse1_id).update({
+        models.Distance.distance: 50,
+        models.Distance.updated_at: topology._distances_hwm - datetime.timedelta(minutes=1),
+    }, synchronize_session=False)
+    db_session.commit()
+    topology.refresh()
+    assert topology.edge(rse3, rse1).cost == 50
+
+    # RSE data is re-loaded only for the loaded fields
+    rse_core.add_rse_attribute(rse2_id, 'hop_penalty', '42')
+    topology.refresh()
+    assert rse2.attributes['hop_penalty'] == '42'
+    assert rse2._info is None
+
+    rse_core.del_rse_attribute(rse2_id, 'hop_penalty')
+    topology.refresh()
+    assert 'hop_penalty' not in rse2.attributes
+
+    # Usage, limits and transfer limits are kept up-to-date too
+    topology.ensure_loaded(load_usage=True, load_limits=True)
+    rse2.ensure_loaded(load_transfer_limits=True)
+    assert not rse2.transfer_limits
+    rse_core.set_rse_usage(rse1_id, source='storage', used=1, free=2)
+    rse_core.set_rse_limits(rse1_id, name='MinFreeSpace', value=10)
+    limit_id = request_core.set_transfer_limit(rse_expression=rse2_name, max_transfers=5, strategy='fifo')
+    topology.refresh()
+    assert [(usage['used'], usage['free']) for usage in rse1.usage if usage['source'] == 'storage'] == [(1, 2)]
+    assert rse1.limits['MinFreeSpace'] == 10
+    assert [limit['max_transfers'] for limits in rse2.transfer_limits.values() for limit in limits.values()] == [5]
+
+    request_core.set_transfer_limit_stats(limit_id, waitings=3, transfers=4)
+    topology.refresh()
+    assert [limit['transfers'] for limits in rse2.transfer_limits.values() for limit in limits.values()] == [4]
+
+
+def test_shortest_paths_cache(rse_factory):
+    """
+    Shortest paths towards a destination are computed once and re-used until the topology changes
+    """
+    _, rse1_id = rse_factory.make_mock_rse()
+    _, rse2_id = rse_factory.make_mock_rse()
+    _, rse3_id = rse_factory.make_mock_rse()
+    _, rse4_id = rse_factory.make_mock_rse()
+    add_distance(rse1_id, rse4_id, distance=10)
+    add_distance(rse2_id, rse3_id, distance=10)
+    add_distance(rse3_id, rse4_id, distance=10)
+
+    def _search(src_nodes):
+        return topology.search_shortest_paths(src_nodes=src_nodes, dst_node=rse4, operation_src='third_party_copy_read',
+                                              operation_dest='third_party_copy_write', domain='wan', limit_dest_schemes=[])
+
+    for multihop_rse_ids in ({rse3_id}, set()):
+        topology = Topology().refresh().configure_multihop(multihop_rse_ids=multihop_rse_ids)
+        rse1, rse2, rse3, rse4 = topology[rse1_id], topology[rse2_id], topology[rse3_id], topology[rse4_id]
+
+        paths = _search([rse1, rse2])
+        assert [hop['source_rse'] for hop in paths[rse1]] == [rse1]
+        if multihop_rse_ids:
+            assert [hop['source_rse'] for hop in paths[rse2]] == [rse2, rse3]
+        else:
+            assert rse2 not in paths
+        assert _search([rse1, rse2])[rse1] is paths[rse1]
+
+        # The cache is invalidated when the topology is refreshed
+        add_distance(rse2_id, rse4_id, distance=20)
+        topology.refresh()
+        paths = _search([rse2, rse1])
+        assert [hop['source_rse'] for hop in paths[rse2]] == [rse2]
+        assert paths[rse2][0]['cumulated_distance'] == 20
+        assert _search([rse1, rse2])[rse2] is paths[rse2]
+        delete_distances(rse2_id, rse4_id)
+
+
 def test_disk_vs_tape_priority(rse_factory, root_account, mock_scope, file_config_mock):
     tape1_rse_name, tape1_rse_id = rse_factory.make_posix_rse(rse_type=RSEType.TAPE)
     tape2_rse_name, tape2_rse_id = rse_factory.make_posix_rse(rse_type=RSEType.TAPE)
@@ -14,14 +14,17 @@
 
 import datetime
 import logging
+import mmap
 import os
 import types
+import zlib
 from typing import cast, get_type_hints
 
 import pytest
 
 from rucio.common.bittorrent import bittorrent_v2_merkle_sha256
-from rucio.common.exception import InvalidType
+from rucio.common.checksum import CHECKSUM_ALGO_DICT, CHECKSUM_BLOCK_SIZE, STREAMING_CHECKSUM_ALGO_DICT, ChecksumCalculator, checksums, checksums_of_files
+from rucio.common.exception import ChecksumCalculationError, InvalidType
 from rucio.common.logging import formatted_logger
 from rucio.common.utils import Availability, clone_function, parse_did_filter_from_string, retrying
 
@@ -187,6 +190,65 @@ def test_bittorrent_sa256_merkle(file_factory):
         assert (root, layers, piece_size) == _sha256_merkle_via_libtorrent(file, piece_size=piece_size)
 
 
+def test_checksums_single_pass(file_factory):
+    """ Checksums computed in a single pass or fed block by block are the same as the ones of the per-algorithm functions """
+    names = list(STREAMING_CHECKSUM_ALGO_DICT)
+    for size in (0, 1, 65536, 2 ** 20 + 3, CHECKSUM_BLOCK_SIZE, 2 * CHECKSUM_BLOCK_SIZE + 1):
+        file = file_factory.file_generator(size=size)
+        expected = {name: CHECKSUM_ALGO_DICT[name](str(file)) for name in names}
+        assert checksums(file, names) == expected
+        # Immutable files are mapped in memory
+        assert checksums(file, names, immutable=True) == expected
+
+        calculator = ChecksumCalculator(names)
+        with open(file, 'rb') as f:
+            while block := f.read(1000):
+                calculator.update(block)
+        assert calculator.hexdigests() == expected
+        assert calculator.nbytes == size
+
+
+def test_checksums_of_unmappable_file():
+    """ Files which cannot be mapped in memory are read """
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b'rucio')
+    os.close(write_fd)
+    assert checksums(read_fd, ['adler32', 'md5']) == {'adler32': '067d0223', 'md5': 'e3bb9cde4fc1377696d10b3295e77acb'}
+
+
+def test_checksums_of_truncated_file(file_factory, monkeypatch):
+    """ A file truncated while computing its checksum is not mapped in memory, which would crash the process """
+    monkeypatch.setattr('rucio.common.checksum.CHECKSUM_BLOCK_SIZE', mmap.PAGESIZE)
+    file = file_factory.file_generator(size=4 * mmap.PAGESIZE)
+    with open(file, 'rb') as f:
+        expected = {'adler32': '%08x' % zlib.adler32(f.read(mmap.PAGESIZE))}
+    update = ChecksumCalculator.update
+
+    def _truncate(self, block):
+        update(self, block)
+        os.truncate(file, mmap.PAGESIZE)
+
+    def _mmap(*args, **kwargs):
+        raise AssertionError('A mutable file must not be mapped in memory')
+
+    monkeypatch.setattr(ChecksumCalculator, 'update', _truncate)
+    monkeypatch.setattr(mmap, 'mmap', _mmap)
+    assert checksums(file, ['adler32']) == expected
+    assert checksums_of_files([file], ['adler32'], max_workers=2) == [expected]
+
+
+def test_checksums_of_files(file_factory):
+    """ The batch of files gives the checksums of each file, in order, whatever the number of threads """
+    files = [file_factory.file_generator(size=size) for size in (0, 10, 2 ** 20, 1000, 3 * 2 ** 20)]
+    expected = [checksums(file, ['adler32', 'md5']) for file in files]
+    for max_workers in (None, 1, 3, 10):
+        assert checksums_of_files(files, ['adler32', 'md5'], max_workers=max_workers) == expected
+    assert checksums_of_files([], ['adler32']) == []
+
+    with pytest.raises(ChecksumCalculationError):
+        checksums_of_files(files + [files[0].parent / 'missing'], ['md5'], max_workers=2)
+
+
 # A sample callable that deliberately includes:
 #   * positional parameter with a default (b)
 #   * keyword‑only parameter with a default (k)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure how fast a backlog of updated_rse_counters rows is consumed.
+
+A synthetic backlog spread over a number of RSEs is written to a scratch database
+(a private in-memory SQLite database by default, or the database given with --db-url,
+whose rucio tables are created if needed and which must not be a production database).
+The backlog is consumed once by summing and deleting ORM objects row by row, as
+update_rse_counter formerly did, and once with the set-based update_rse_counters,
+processing --bulk RSEs per transaction.
+"""
+
+import os.path
+import sys
+import time
+from argparse import ArgumentParser
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+os.chdir(base_path)
+
+from sqlalchemy import create_engine, delete, insert, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from rucio.common.utils import chunks, generate_uuid  # noqa: E402
+from rucio.core.rse_counter import update_rse_counters  # noqa: E402
+from rucio.db.sqla import models  # noqa: E402
+
+
+def fill_backlog(session, rse_ids, nb_rows):
+    session.execute(delete(models.UpdatedRSECounter))
+    session.execute(delete(models.RSEUsage).where(models.RSEUsage.rse_id.in_(rse_ids)))
+    for chunk in chunks(range(nb_rows), 50000):
+        session.execute(insert(models.UpdatedRSECounter), [{'id': generate_uuid(), 'rse_id': rse_ids[i % len(rse_ids)], 'files': 1, 'bytes': 1024} for i in chunk])
+    session.commit()
+
+
+def consume_orm(session, rse_ids, _bulk):
+    for rse_id in rse_ids:
+        stmt = select(models.UpdatedRSECounter).where(models.UpdatedRSECounter.rse_id == rse_id)
+        updated_rse_counters = session.execute(stmt).scalars().all()
+        models.RSEUsage(rse_id=rse_id, source='rucio',
+                        used=sum(updated.bytes for updated in updated_rse_counters),
+                        files=sum(updated.files for updated in updated_rse_counters)).save(session=session)
+        for updated in updated_rse_counters:
+            updated.delete(flush=False, session=session)
+        session.commit()
+
+
+def consume_set_based(session, rse_ids, bulk):
+    for chunk in chunks(rse_ids, bulk):
+        update_rse_counters(rse_ids=chunk, session=session)
+        session.commit()
+
+
+def benchmark(label, consume, session, rse_ids, nb_rows, bulk):
+    fill_backlog(session, rse_ids, nb_rows)
+    start = time.perf_counter()
+    consume(session, rse_ids, bulk)
+    elapsed = time.perf_counter() - start
+    print('%10d rows  %-10s  %8.2f s  %10.0f rows/s' % (nb_rows, label, elapsed, nb_rows / elapsed))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark the consumption of a backlog of updated RSE counters.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000], help='Number of rows of the synthetic backlogs')
+    parser.add_argument('--rses', type=int, default=100, help='Number of RSEs the rows are spread over')
+    parser.add_argument('--bulk', type=int, default=10, help='Number of RSEs updated per transaction in the set-based mode')
+    parser.add_argument('--db-url', default='sqlite://', help='SQLAlchemy URL of a scratch database')
+    parser.add_argument('--skip-orm', action='store_true', help='Only run the set-based mode')
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    models.register_models(engine)
+    session = sessionmaker(bind=engine)()
+    rse_ids = [generate_uuid() for _ in range(args.rses)]
+    for nb_rows in args.rows:
+        if not args.skip_orm:
+            benchmark('orm', consume_orm, session, rse_ids, nb_rows, args.bulk)
+        benchmark('set-based', consume_set_based, session, rse_ids, nb_rows, args.bulk)
+    session.close()
+    engine.dispose()
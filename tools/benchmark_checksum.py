@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the throughput of the checksum computation of the files of an upload.
+
+For each file size the script writes a set of random files to a temporary directory and
+computes their checksums three times: one read of each file per algorithm with 64 KiB
+blocks (the former implementation), a single pass over each file (rucio.common.checksum.checksums)
+and the parallel batch (rucio.common.checksum.checksums_of_files). The files are read once
+beforehand, so the results measure the checksum computation and not the storage.
+"""
+
+import hashlib
+import os.path
+import sys
+import tempfile
+import time
+import zlib
+from argparse import ArgumentParser
+from functools import partial
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+os.chdir(base_path)
+
+from rucio.common.checksum import checksums, checksums_of_files  # noqa: E402
+
+LEGACY_BLOCK_SIZE = 64 * 1024
+
+
+def legacy_adler32(path):
+    adler = 1
+    with open(path, 'rb') as f:
+        for block in iter(partial(f.read, LEGACY_BLOCK_SIZE), b''):
+            adler = zlib.adler32(block, adler)
+    return '%08x' % (adler & 0xFFFFFFFF)
+
+
+def legacy_md5(path):
+    checksum = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(partial(f.read, LEGACY_BLOCK_SIZE), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+LEGACY_ALGO_DICT = {'adler32': legacy_adler32, 'md5': legacy_md5}
+
+
+def separate_passes(paths, checksum_names, workers):
+    return [{name: LEGACY_ALGO_DICT[name](path) for name in checksum_names} for path in paths]
+
+
+def single_pass(paths, checksum_names, workers):
+    return [checksums(path, checksum_names) for path in paths]
+
+
+def parallel_batch(paths, checksum_names, workers):
+    return checksums_of_files(paths, checksum_names, max_workers=workers)
+
+
+def write_files(directory, size, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, 'file_%d_%06d' % (size, i))
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+    for path in paths:
+        with open(path, 'rb') as f:
+            while f.read(LEGACY_BLOCK_SIZE * 16):
+                pass
+    return paths
+
+
+def benchmark(label, fnc, paths, size, checksum_names, workers, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fnc(paths, checksum_names, workers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    total = size * len(paths)
+    print('%12d bytes x %6d  %-16s  %8.3f s  %7.3f GB/s' % (size, len(paths), label, best, total / best / 1e9))
+    return result
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark the checksum computation of the files of an upload.')
+    parser.add_argument('--sizes', nargs='+', default=['4096:5000', '1048576:500', '67108864:16', '1073741824:2'],
+                        help='File sizes and number of files, as SIZE:COUNT')
+    parser.add_argument('--checksums', nargs='+', default=['adler32', 'md5'], help='Algorithms to compute')
+    parser.add_argument('--workers', type=int, default=None, help='Threads of the parallel batch, defaults to the number of cores')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs of each method, the fastest is reported')
+    args = parser.parse_args()
+
+    print('%d cores, computing %s' % (os.cpu_count() or 1, ', '.join(args.checksums)))
+    for size_count in args.sizes:
+        size, count = (int(value) for value in size_count.split(':'))
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_files(directory, size, count)
+            reference = None
+            if set(args.checksums) <= set(LEGACY_ALGO_DICT):
+                reference = benchmark('separate passes', separate_passes, paths, size, args.checksums, args.workers, args.repeat)
+            result = benchmark('single pass', single_pass, paths, size, args.checksums, args.workers, args.repeat)
+            assert reference is None or result == reference
+            result = benchmark('parallel batch', parallel_batch, paths, size, args.checksums, args.workers, args.repeat)
+            assert reference is None or result == reference
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the 'set' and 'bitmap' RSE expression engines on synthetic topologies.
+
+The topologies are created in a private in-memory SQLite database, the configured
+Rucio database is not touched. For every topology size the script reports the time
+to resolve a set of expressions with both engines; for the bitmap engine the time to
+build the RSEBitmapIndex is reported separately, as the index is shared by all the
+expressions resolved until the RSEs change.
+"""
+
+import os.path
+import random
+import sys
+import time
+from argparse import ArgumentParser
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+os.chdir(base_path)
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from rucio.common.utils import generate_uuid  # noqa: E402
+from rucio.core.rse import list_rse_attribute_associations, list_rses  # noqa: E402
+from rucio.core.rse_expression_parser import RSEBitmapIndex, resolve_expression  # noqa: E402
+from rucio.db.sqla import models  # noqa: E402
+
+CLOUDS = ['CA', 'CERN', 'DE', 'ES', 'FR', 'IT', 'ND', 'NL', 'RU', 'TW', 'UK', 'US']
+TYPES = ['DATADISK', 'SCRATCHDISK', 'LOCALGROUPDISK', 'MCTAPE', 'DATATAPE']
+
+EXPRESSIONS = [
+    'tier=1',
+    'cloud=DE&type=DATADISK',
+    '(cloud=DE|cloud=FR|cloud=IT)&tier<3\\type=SCRATCHDISK',
+    '*\\(tape=True|cloud=US)',
+    '((tier=1|tier=2)&(cloud=UK|cloud=NL|cloud=ND))|(freespace>900&type=DATADISK)',
+    '(((cloud=CA|cloud=CERN)&tier=0)|((cloud=ES|cloud=RU)&tier=2&type=LOCALGROUPDISK))\\tape=True',
+]
+
+
+def create_topology(session, nb_rses, rand):
+    rses = []
+    attributes = []
+    for i in range(nb_rses):
+        rse_id = generate_uuid()
+        name = 'SITE%05d_%s' % (i, rand.choice(TYPES))
+        rses.append({'id': rse_id, 'rse': name, 'vo': 'def', 'deleted': False})
+        rse_type = name.rsplit('_', 1)[1]
+        attributes.extend([
+            {'rse_id': rse_id, 'key': name, 'value': True},
+            {'rse_id': rse_id, 'key': 'tier', 'value': str(rand.randint(0, 3))},
+            {'rse_id': rse_id, 'key': 'cloud', 'value': rand.choice(CLOUDS)},
+            {'rse_id': rse_id, 'key': 'type', 'value': rse_type},
+            {'rse_id': rse_id, 'key': 'tape', 'value': rse_type.endswith('TAPE')},
+            {'rse_id': rse_id, 'key': 'freespace', 'value': str(rand.randint(0, 1000))},
+        ])
+    session.execute(insert(models.RSE), rses)
+    session.execute(insert(models.RSEAttrAssociation), attributes)
+    session.commit()
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def benchmark(nb_rses, repeat, rand):
+    engine = create_engine('sqlite://')
+    models.register_models(engine)
+    session = sessionmaker(bind=engine)()
+    create_topology(session, nb_rses, rand)
+
+    index_time, index = timed(lambda: RSEBitmapIndex(list_rses(session=session), list_rse_attribute_associations(session=session)), 1)
+    print('%6d RSEs: bitmap index built in %8.2f ms' % (nb_rses, index_time * 1000))
+    for expression in EXPRESSIONS:
+        set_time, set_result = timed(lambda: resolve_expression(expression, engine='set', session=session), repeat)
+        bitmap_time, bitmap_result = timed(lambda: resolve_expression(expression, engine='bitmap', index=index, session=session), repeat)
+        assert sorted(rse['id'] for rse in set_result) == sorted(rse['id'] for rse in bitmap_result)
+        print('    %5d matches  set: %9.2f ms  bitmap: %7.3f ms  speedup: %7.1fx  %s' % (len(set_result), set_time * 1000, bitmap_time * 1000, set_time / bitmap_time, expression))
+    session.close()
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark the RSE expression engines on synthetic topologies.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 5000, 10000], help='Number of RSEs of the synthetic topologies')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of times every expression is resolved')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rand = random.Random(args.seed)  # noqa: S311
+    for size in args.sizes:
+        benchmark(size, args.repeat, rand)
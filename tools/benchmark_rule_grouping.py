@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the memory and CPU cost of the lock working set of the rule grouping algorithms.
+
+For a synthetic dataset the script builds the new locks once as models.ReplicaLock
+objects (the former representation) and once as ReplicaLockRecord objects, and reports
+the peak memory and the time needed to build them and to write them to a private
+in-memory SQLite database. The configured Rucio database is not touched.
+"""
+
+import gc
+import os.path
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+os.chdir(base_path)
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import rucio.core.rule  # noqa: E402,F401  rule_grouping cannot be imported before rule
+from rucio.common.types import InternalAccount, InternalScope  # noqa: E402
+from rucio.common.utils import generate_uuid  # noqa: E402
+from rucio.core.rule_grouping import ReplicaLockRecord, flush_locks_and_replicas  # noqa: E402
+from rucio.db.sqla import models  # noqa: E402
+from rucio.db.sqla.constants import LockState  # noqa: E402
+
+
+def orm_lock(scope, name, rule_id, rse_id, account, bytes_):
+    return models.ReplicaLock(scope=scope, name=name, rule_id=rule_id, rse_id=rse_id, account=account, bytes=bytes_, state=LockState.REPLICATING)
+
+
+def record_lock(scope, name, rule_id, rse_id, account, bytes_):
+    return ReplicaLockRecord(scope=scope, name=name, rule_id=rule_id, rse_id=rse_id, account=account, bytes_=bytes_, state=LockState.REPLICATING)
+
+
+def build(factory, nb_files, rse_ids):
+    scope = InternalScope('mock', vo='def', from_external=False)
+    account = InternalAccount('root', vo='def', from_external=False)
+    rule_id = generate_uuid()
+    locks_to_create = {rse_id: [] for rse_id in rse_ids}
+    for i in range(nb_files):
+        rse_id = rse_ids[i % len(rse_ids)]
+        locks_to_create[rse_id].append(factory(scope, 'file_%08d' % i, rule_id, rse_id, account, 1024))
+    return locks_to_create
+
+
+def benchmark(label, factory, flush, nb_files, rse_ids):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    locks_to_create = build(factory, nb_files, rse_ids)
+    build_time = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    engine = create_engine('sqlite://')
+    models.register_models(engine)
+    session = sessionmaker(bind=engine)()
+    start = time.perf_counter()
+    flush(locks_to_create, session)
+    flush_time = time.perf_counter() - start
+    session.rollback()
+    session.close()
+    engine.dispose()
+    print('%8d files  %-18s  peak memory: %8.1f MiB  build: %7.3f s  flush: %7.3f s' % (nb_files, label, peak / 2 ** 20, build_time, flush_time))
+
+
+def flush_orm(locks_to_create, session):
+    session.add_all([lock for sublist in locks_to_create.values() for lock in sublist])
+    session.flush()
+
+
+def flush_records(locks_to_create, session):
+    flush_locks_and_replicas(replicas_to_create={}, locks_to_create=locks_to_create, session=session)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark the lock working set of the rule grouping algorithms.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Number of files of the synthetic datasets')
+    parser.add_argument('--rses', type=int, default=3, help='Number of RSEs the locks are spread over')
+    args = parser.parse_args()
+
+    rse_ids = [generate_uuid() for _ in range(args.rses)]
+    for size in args.sizes:
+        benchmark('models.ReplicaLock', orm_lock, flush_orm, size, rse_ids)
+        benchmark('ReplicaLockRecord', record_lock, flush_records, size, rse_ids)
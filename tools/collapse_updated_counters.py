@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# Copyright European Organization for Nuclear Research (CERN) since 2012
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Collapse the backlog of the updated_rse_counters and updated_account_counters tables
+into a single row per RSE, respectively per account and RSE, so that the abacus
+daemons have fewer rows to read. Safe to run while the abacus daemons are running.
+"""
+
+import os.path
+import sys
+import time
+from argparse import ArgumentParser
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+os.chdir(base_path)
+
+from rucio.core.account_counter import collapse_updated_account_counters  # noqa: E402
+from rucio.core.rse_counter import collapse_updated_rse_counters  # noqa: E402
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Collapse the backlog of the updated RSE and account counters.')
+    parser.add_argument('--skip-rse-counters', action='store_true', help='Do not collapse the updated_rse_counters table')
+    parser.add_argument('--skip-account-counters', action='store_true', help='Do not collapse the updated_account_counters table')
+    args = parser.parse_args()
+
+    if not args.skip_rse_counters:
+        start = time.perf_counter()
+        removed = collapse_updated_rse_counters()
+        print('updated_rse_counters: removed %d rows in %.1f s' % (removed, time.perf_counter() - start))
+    if not args.skip_account_counters:
+        start = time.perf_counter()
+        removed = collapse_updated_account_counters()
+        print('updated_account_counters: removed %d rows in %.1f s' % (removed, time.perf_counter() - start))